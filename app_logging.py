@@ -0,0 +1,69 @@
+"""Logging setup and per-loader summary counters shared by the Flask apps.
+
+Loaders iterate over thousands of XML elements; writing a console line per element
+made large missions load noticeably slower (especially on Windows consoles). They
+count per-item outcomes in a ``LoadSummary`` instead and log one INFO line per run;
+the per-item detail is only formatted and written at DEBUG level.
+
+The level comes from the ``XML_VIEWER_LOG_LEVEL`` environment variable (default INFO),
+e.g. ``set XML_VIEWER_LOG_LEVEL=DEBUG`` before starting an app to see every skipped item.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import Counter
+from typing import Any, Optional, Union
+
+LOG_LEVEL_ENV = "XML_VIEWER_LOG_LEVEL"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def configure(level: Optional[Union[int, str]] = None) -> None:
+    """Install a console handler on the root logger unless one is already configured."""
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV, "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class LoadSummary:
+    """Per-item counters for one loader/saver run, logged as a single line.
+
+        summary = LoadSummary(logger, 'groups')
+        summary.skip('no_position', "Skipping group '%s': no position found", name)
+        summary.add('matched_proto')
+        summary.log('Loaded %d groups from %s', len(groups), path)
+
+    ``skip``/``detail`` messages are only formatted when DEBUG is enabled.
+    """
+
+    def __init__(self, logger: logging.Logger, subject: str) -> None:
+        self.logger = logger
+        self.subject = subject
+        self.counts: Counter = Counter()
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+    def add(self, key: str, n: int = 1) -> None:
+        self.counts[key] += n
+
+    def skip(self, reason: str, msg: str, *args: Any) -> None:
+        """Count an item skipped for ``reason``; ``msg`` is the DEBUG-level detail."""
+        self.counts[f"skipped_{reason}"] += 1
+        if self._debug:
+            self.logger.debug(msg, *args)
+
+    def detail(self, msg: str, *args: Any) -> None:
+        if self._debug:
+            self.logger.debug(msg, *args)
+
+    def log(self, msg: str, *args: Any, level: int = logging.INFO) -> None:
+        """Log ``msg`` followed by the non-zero counters, e.g. ``(matched_proto=12, skipped_no_position=3)``."""
+        counters = ", ".join(f"{key}={value}" for key, value in sorted(self.counts.items()) if value)
+        if counters:
+            msg = f"{msg} ({counters})"
+        self.logger.log(level, msg, *args)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic DayZ mission folder for benchmarking the map viewer and economy editor.
+
+Layout (mirrors a real server so profile/loadout discovery works unchanged):
+
+    <root>/mpmissions/dayzOffline.synthetic/
+        db/types.xml, cfgeconomycore.xml (+ mod type files), cfglimitsdefinition.xml,
+        mapgrouppos.xml, mapgroupproto.xml, cfgeventspawns.xml, env/*.xml,
+        cfgplayerspawnpoints.xml, cfgeffectarea.json, expansion/settings/AIPatrolSettings.json
+    <root>/profile/ExpansionMod/Loadouts/*.json
+
+Usage:
+    python benchmarks/generate_mission.py OUTPUT_DIR --scale medium
+    python benchmarks/generate_mission.py OUTPUT_DIR --scale small --set groups=50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Optional
+
+MISSION_NAME = 'dayzOffline.synthetic'
+MAP_SIZE = 15360
+
+# Element counts per scale; any key can be overridden with --set key=value
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {
+        'types': 500, 'mod_type_files': 2, 'types_per_mod_file': 100,
+        'groups': 2000, 'group_protos': 200,
+        'events': 50, 'positions_per_event': 10,
+        'territory_files': 3, 'territories_per_file': 20, 'zones_per_territory': 5,
+        'player_spawns': 100, 'effect_areas': 20,
+        'patrols': 20, 'waypoints_per_patrol': 10, 'loadouts': 10,
+    },
+    'medium': {
+        'types': 3000, 'mod_type_files': 10, 'types_per_mod_file': 300,
+        'groups': 20000, 'group_protos': 1000,
+        'events': 200, 'positions_per_event': 25,
+        'territory_files': 8, 'territories_per_file': 60, 'zones_per_territory': 8,
+        'player_spawns': 500, 'effect_areas': 100,
+        'patrols': 150, 'waypoints_per_patrol': 20, 'loadouts': 40,
+    },
+    'large': {
+        'types': 10000, 'mod_type_files': 40, 'types_per_mod_file': 500,
+        'groups': 80000, 'group_protos': 3000,
+        'events': 600, 'positions_per_event': 50,
+        'territory_files': 15, 'territories_per_file': 150, 'zones_per_territory': 10,
+        'player_spawns': 2000, 'effect_areas': 300,
+        'patrols': 500, 'waypoints_per_patrol': 30, 'loadouts': 120,
+    },
+}
+
+CATEGORIES = ['tools', 'containers', 'clothes', 'food', 'weapons', 'books', 'explosives', 'lootdispatch']
+USAGES = ['Military', 'Police', 'Medic', 'Firefighter', 'Industrial', 'Farm', 'Coast', 'Town', 'Village', 'Hunting']
+VALUES = ['Tier1', 'Tier2', 'Tier3', 'Tier4', 'Unique']
+TAGS = ['floor', 'shelves', 'ground']
+TERRITORY_TYPES = ['wolf', 'bear', 'deer', 'cattle', 'pig', 'sheep', 'goat', 'hen', 'fox', 'hare',
+                   'infected_city', 'infected_village', 'infected_military', 'roe', 'boar']
+FACTIONS = ['West', 'East', 'Guards', 'Civilian', 'Raiders', 'Mercenaries']
+SPEEDS = ['WALK', 'JOG', 'SPRINT']
+
+
+def _write_xml(root: ET.Element, path: Path, xml_declaration: bool = True) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tree = ET.ElementTree(root)
+    ET.indent(tree, space='    ')
+    tree.write(path, encoding='utf-8', xml_declaration=xml_declaration)
+
+
+def _coord(rng: random.Random) -> float:
+    return round(rng.uniform(100, MAP_SIZE - 100), 2)
+
+
+def _type_element(rng: random.Random, name: str) -> ET.Element:
+    type_elem = ET.Element('type', name=name)
+    for field, value in (
+        ('nominal', rng.randint(0, 50)), ('lifetime', rng.choice([3600, 7200, 14400, 28800])),
+        ('restock', 0), ('min', rng.randint(0, 20)), ('quantmin', -1), ('quantmax', -1),
+        ('cost', 100),
+    ):
+        ET.SubElement(type_elem, field).text = str(value)
+    ET.SubElement(type_elem, 'flags', count_in_cargo='0', count_in_hoarder='0', count_in_map='1',
+                  count_in_player='0', crafted='0', deloot='0')
+    ET.SubElement(type_elem, 'category', name=rng.choice(CATEGORIES))
+    for usage in rng.sample(USAGES, rng.randint(1, 3)):
+        ET.SubElement(type_elem, 'usage', name=usage)
+    ET.SubElement(type_elem, 'value', name=rng.choice(VALUES))
+    return type_elem
+
+
+def _write_types(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    types_root = ET.Element('types')
+    for idx in range(scale['types']):
+        types_root.append(_type_element(rng, f'SyntheticItem_{idx}'))
+    # Event names resolve to categories through the types files
+    for idx in range(scale['events']):
+        types_root.append(_type_element(rng, f'StaticSynthetic_{idx}'))
+    _write_xml(types_root, mission / 'db' / 'types.xml')
+
+    economycore = ET.Element('economycore')
+    ET.SubElement(economycore, 'classes')
+    for file_idx in range(scale['mod_type_files']):
+        folder = f'mod_{file_idx}'
+        ce = ET.SubElement(economycore, 'ce', folder=folder)
+        ET.SubElement(ce, 'file', name='types.xml', type='types')
+        ET.SubElement(ce, 'file', name='spawnabletypes.xml', type='spawnabletypes')
+        mod_root = ET.Element('types')
+        for idx in range(scale['types_per_mod_file']):
+            mod_root.append(_type_element(rng, f'Mod{file_idx}_Item_{idx}'))
+        _write_xml(mod_root, mission / folder / 'types.xml')
+    _write_xml(economycore, mission / 'cfgeconomycore.xml')
+
+    limits = ET.Element('lists')
+    for tag, child, names in (('categories', 'category', CATEGORIES), ('tags', 'tag', TAGS),
+                              ('usageflags', 'usage', USAGES), ('valueflags', 'value', VALUES)):
+        parent = ET.SubElement(limits, tag)
+        for name in names:
+            ET.SubElement(parent, child, name=name)
+    _write_xml(limits, mission / 'cfglimitsdefinition.xml')
+
+
+def _write_groups(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    proto_names = [f'Land_Synthetic_{idx}' for idx in range(scale['group_protos'])]
+    proto_root = ET.Element('prototype')
+    for name in proto_names:
+        group = ET.SubElement(proto_root, 'group', name=name, lootmax=str(rng.randint(1, 10)))
+        ET.SubElement(group, 'usage', name=rng.choice(USAGES))
+        container = ET.SubElement(group, 'container', name='lootFloor')
+        for _ in range(rng.randint(1, 4)):
+            ET.SubElement(container, 'point', pos=f'{rng.uniform(-5, 5):.3f} 0.5 {rng.uniform(-5, 5):.3f}',
+                          range='0.5', height='1.0')
+    _write_xml(proto_root, mission / 'mapgroupproto.xml')
+
+    pos_root = ET.Element('map')
+    for _ in range(scale['groups']):
+        # A few groups use names without a prototype, like map objects with no loot
+        name = rng.choice(proto_names) if rng.random() < 0.9 else f'Land_NoProto_{rng.randint(0, 99)}'
+        ET.SubElement(pos_root, 'group', name=name,
+                      pos=f'{_coord(rng)} {rng.uniform(0, 400):.2f} {_coord(rng)}',
+                      rpy='0 0 0', a=f'{rng.uniform(0, 360):.2f}')
+    _write_xml(pos_root, mission / 'mapgrouppos.xml')
+
+
+def _write_event_spawns(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    root = ET.Element('eventposdef')
+    for idx in range(scale['events']):
+        event = ET.SubElement(root, 'event', name=f'StaticSynthetic_{idx}')
+        for _ in range(scale['positions_per_event']):
+            ET.SubElement(event, 'pos', x=str(_coord(rng)), z=str(_coord(rng)), a=f'{rng.uniform(0, 360):.1f}')
+    _write_xml(root, mission / 'cfgeventspawns.xml')
+
+
+def _write_territories(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    for file_idx in range(scale['territory_files']):
+        territory_type = TERRITORY_TYPES[file_idx % len(TERRITORY_TYPES)]
+        if file_idx >= len(TERRITORY_TYPES):
+            territory_type = f'{territory_type}_{file_idx}'
+        root = ET.Element('territory-type')
+        for _ in range(scale['territories_per_file']):
+            territory = ET.SubElement(root, 'territory', color=f'{rng.randint(0, 0xFFFFFFFF)}')
+            cx, cz = _coord(rng), _coord(rng)
+            for zone_idx in range(scale['zones_per_territory']):
+                ET.SubElement(territory, 'zone', name=f'Zone_{zone_idx}', smin='0', smax='0',
+                              dmin=str(rng.randint(1, 3)), dmax=str(rng.randint(4, 8)),
+                              x=f'{cx + rng.uniform(-200, 200):.2f}', z=f'{cz + rng.uniform(-200, 200):.2f}',
+                              r=str(rng.randint(30, 120)))
+        _write_xml(root, mission / 'env' / f'{territory_type}_territories.xml')
+
+
+def _write_player_spawns(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    root = ET.Element('playerspawnpoints')
+    fresh = ET.SubElement(root, 'fresh')
+    params = ET.SubElement(fresh, 'generator_params')
+    ET.SubElement(params, 'grid_density').text = '4'
+    ET.SubElement(params, 'grid_width').text = '200'
+    ET.SubElement(params, 'grid_height').text = '200'
+    bubbles = ET.SubElement(fresh, 'generator_posbubbles')
+    for _ in range(scale['player_spawns']):
+        ET.SubElement(bubbles, 'pos', x=str(_coord(rng)), z=str(_coord(rng)))
+    _write_xml(root, mission / 'cfgplayerspawnpoints.xml')
+
+
+def _write_effect_areas(rng: random.Random, mission: Path, scale: Dict[str, int]) -> None:
+    areas = []
+    for idx in range(scale['effect_areas']):
+        areas.append({
+            'AreaName': f'Synthetic-Zone-{idx}',
+            'Type': 'ContaminatedArea_Static',
+            'TriggerType': 'ContaminatedTrigger',
+            'Data': {
+                'Pos': [_coord(rng), 0, _coord(rng)],
+                'Radius': rng.randint(50, 400),
+                'PosHeight': 25,
+                'NegHeight': 10,
+                'InnerRingCount': 2,
+                'InnerPartDist': 50,
+                'OuterRingToggle': 1,
+                'OuterPartDist': 40,
+                'OuterOffset': 0,
+                'VerticalLayers': 0,
+                'VerticalOffset': 0,
+                'ParticleName': 'graphics/particles/contaminated_area_gas_bigass',
+            },
+            'PlayerData': {'AroundPartName': 'graphics/particles/contaminated_area_gas_around',
+                           'TinyPartName': 'graphics/particles/contaminated_area_gas_around_tiny',
+                           'PPERequesterType': 'PPERequester_ContaminatedAreaTint'},
+        })
+    safe_positions = [[_coord(rng), _coord(rng)] for _ in range(max(1, scale['effect_areas'] // 2))]
+    path = mission / 'cfgeffectarea.json'
+    path.write_text(json.dumps({'Areas': areas, 'SafePositions': safe_positions}, indent=4), encoding='utf-8')
+
+
+def _write_ai_patrols(rng: random.Random, mission: Path, profile: Path, scale: Dict[str, int]) -> None:
+    loadout_names = [f'SyntheticLoadout_{idx}' for idx in range(scale['loadouts'])]
+    loadouts_dir = profile / 'ExpansionMod' / 'Loadouts'
+    loadouts_dir.mkdir(parents=True, exist_ok=True)
+    for name in loadout_names:
+        loadout = {
+            'ClassName': '',
+            'Include': '',
+            'Chance': 1.0,
+            'Quantity': {'Min': 0.0, 'Max': 0.0},
+            'Health': [],
+            'InventoryAttachments': [
+                {'SlotName': slot, 'Items': [{'ClassName': f'Synthetic_{slot}_{i}', 'Chance': 0.5,
+                                              'Quantity': {'Min': 0.0, 'Max': 0.0}, 'Health': [],
+                                              'InventoryAttachments': [], 'InventoryCargo': [],
+                                              'ConstructionPartsBuilt': [], 'Sets': []}
+                                             for i in range(3)]}
+                for slot in ('Body', 'Legs', 'Feet', 'Back', 'Headgear')
+            ],
+            'InventoryCargo': [{'ClassName': f'SyntheticItem_{i}', 'Chance': 0.3,
+                                'Quantity': {'Min': 0.0, 'Max': 0.0}, 'Health': [],
+                                'InventoryAttachments': [], 'InventoryCargo': [],
+                                'ConstructionPartsBuilt': [], 'Sets': []}
+                               for i in range(rng.randint(2, 10))],
+            'ConstructionPartsBuilt': [],
+            'Sets': [],
+        }
+        (loadouts_dir / f'{name}.json').write_text(json.dumps(loadout, indent=4), encoding='utf-8')
+
+    patrols = []
+    for idx in range(scale['patrols']):
+        cx, cz = _coord(rng), _coord(rng)
+        patrols.append({
+            'Name': f'Synthetic Patrol {idx}',
+            'Persist': 0,
+            'Faction': rng.choice(FACTIONS),
+            'Formation': '',
+            'FormationLooseness': 0.0,
+            'Loadout': rng.choice(loadout_names) if loadout_names else '',
+            'Units': [],
+            'NumberOfAI': rng.randint(1, 6),
+            'Behaviour': rng.choice(['LOOP', 'ALTERNATE', 'HALT_OR_ALTERNATE']),
+            'Speed': rng.choice(SPEEDS),
+            'UnderThreatSpeed': 'SPRINT',
+            'CanBeLooted': 1,
+            'UnlimitedReload': 0,
+            'SniperProneDistanceThreshold': 0.0,
+            'AccuracyMin': -1.0,
+            'AccuracyMax': -1.0,
+            'ThreatDistanceLimit': -1.0,
+            'DamageMultiplier': -1.0,
+            'DamageReceivedMultiplier': -1.0,
+            'Chance': 1.0,
+            'MinDistRadius': -1.0,
+            'MaxDistRadius': -1.0,
+            'DespawnRadius': -1.0,
+            'MinSpreadRadius': 1.0,
+            'MaxSpreadRadius': 100.0,
+            'Waypoints': [[round(cx + rng.uniform(-300, 300), 2), 0.0, round(cz + rng.uniform(-300, 300), 2)]
+                          for _ in range(scale['waypoints_per_patrol'])],
+        })
+    settings = {
+        'm_Version': 22,
+        'Enabled': 1,
+        'FormationScale': -1.0,
+        'DespawnTime': 600.0,
+        'RespawnTime': -1.0,
+        'MinDistRadius': 400.0,
+        'MaxDistRadius': 1000.0,
+        'DespawnRadius': 1100.0,
+        'AccuracyMin': -1.0,
+        'AccuracyMax': -1.0,
+        'ThreatDistanceLimit': -1.0,
+        'DamageMultiplier': -1.0,
+        'DamageReceivedMultiplier': -1.0,
+        'ObjectPatrols': [],
+        'Patrols': patrols,
+    }
+    settings_dir = mission / 'expansion' / 'settings'
+    settings_dir.mkdir(parents=True, exist_ok=True)
+    (settings_dir / 'AIPatrolSettings.json').write_text(json.dumps(settings, indent=4), encoding='utf-8')
+
+
+def resolve_scale(scale: str = 'small', overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Element counts for a named scale with per-key overrides applied."""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}' (choose from {', '.join(SCALES)})")
+    counts = dict(SCALES[scale])
+    for key, value in (overrides or {}).items():
+        if key not in counts:
+            raise ValueError(f"Unknown scale key '{key}' (choose from {', '.join(counts)})")
+        counts[key] = int(value)
+    return counts
+
+
+def generate_mission(root_dir, scale: str = 'small', overrides: Optional[Dict[str, int]] = None, seed: int = 1) -> Path:
+    """Write a synthetic mission under ``root_dir`` and return the mission directory.
+
+    The same scale, overrides and seed always produce byte-identical files.
+    """
+    counts = resolve_scale(scale, overrides)
+    rng = random.Random(seed)
+    root_dir = Path(root_dir)
+    mission = root_dir / 'mpmissions' / MISSION_NAME
+    profile = root_dir / 'profile'
+    mission.mkdir(parents=True, exist_ok=True)
+
+    _write_types(rng, mission, counts)
+    _write_groups(rng, mission, counts)
+    _write_event_spawns(rng, mission, counts)
+    _write_territories(rng, mission, counts)
+    _write_player_spawns(rng, mission, counts)
+    _write_effect_areas(rng, mission, counts)
+    _write_ai_patrols(rng, mission, profile, counts)
+    return mission
+
+
+def parse_overrides(pairs) -> Dict[str, int]:
+    overrides = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value, got '{pair}'")
+        overrides[key.strip()] = int(value)
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic DayZ mission for benchmarks.')
+    parser.add_argument('output', help='Directory to create the server layout in')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--set', dest='overrides', action='append', metavar='KEY=N',
+                        help='Override one element count, e.g. --set groups=50000')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    mission = generate_mission(args.output, args.scale, parse_overrides(args.overrides), args.seed)
+    print(f"Generated {args.scale} mission: {mission}")
+    for key, value in resolve_scale(args.scale, parse_overrides(args.overrides)).items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Benchmark the map viewer and economy editor load/save endpoints on a synthetic mission.
+
+Every endpoint is called through the Flask test client, so the numbers cover routing,
+parsing, SQLite, payload building and JSON serialization but not the network. Loads are
+measured cold (all parsed-file caches dropped before each call) and warm; saves post a
+small changeset built from a fresh (untimed) load before each call. A few hot helpers
+(marker sourceId hashing) are timed as direct calls and also report items per second.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale medium --output results.json
+    python benchmarks/run_benchmarks.py --scale medium --compare baseline.json
+    python benchmarks/run_benchmarks.py --only groups --repeat 10
+
+Results are JSON ({meta, results: [{name, medianMs, ...}]}) so runs on different
+commits can be compared with --compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.generate_mission import generate_mission, parse_overrides, resolve_scale, SCALES  # noqa: E402
+
+# Fraction of items each save benchmark modifies
+CHANGE_FRACTION = 0.01
+
+# Markers hashed per call by the sourceId benchmark
+MARKER_ID_COUNT = 50_000
+
+
+class Case(NamedTuple):
+    name: str
+    app: str  # 'map', 'economy' or 'local' (a direct call, no request)
+    method: str
+    path: str
+    # Untimed; returns request kwargs (query_string/json) for one timed call, or call kwargs
+    prepare: Callable[[Any, str], Dict[str, Any]]
+    cold: bool = False
+    # Local cases only: the timed call, returning how many items it processed
+    call: Optional[Callable[..., int]] = None
+
+
+def _changed(items: List[Any]) -> List[Any]:
+    count = max(1, int(len(items) * CHANGE_FRACTION))
+    step = max(1, len(items) // count)
+    return items[::step][:count]
+
+
+def _moved(item: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    # Step one hundredth up from an even hundredth and down from an odd one: every call
+    # flips the parity, so repeated runs move x back and forth instead of drifting
+    dx = 0.01 if round(item['x'] * 100) % 2 == 0 else -0.01
+    return {**item, 'x': round(item['x'] + dx, 2), **extra}
+
+
+def _query(client, mission_dir):
+    return {'query_string': {'mission_dir': mission_dir}}
+
+
+def _get_json(client, path, mission_dir):
+    response = client.get(path, query_string={'mission_dir': mission_dir})
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response.get_json()
+
+
+def _groups_save(client, mission_dir):
+    groups = _get_json(client, '/api/groups', mission_dir)['groups']
+    changed = {g['id'] for g in _changed(groups)}
+    markers = [_moved(g) if g['id'] in changed else g for g in groups]
+    return {'json': {'mission_dir': mission_dir, 'markers': markers}}
+
+
+def _event_spawns_save(client, mission_dir):
+    spawns = _get_json(client, '/api/event-spawns', mission_dir)['event_spawns']
+    modified = [_moved({'sourceId': s['sourceId'], 'x': s['x'], 'z': s['z'], 'a': s['a']}) for s in _changed(spawns)]
+    return {'json': {'mission_dir': mission_dir, 'changes': {'modified': modified}}}
+
+
+def _territories_save(client, mission_dir):
+    territories = _get_json(client, '/api/territories', mission_dir)['territories']
+    zones = [
+        {**zone, 'territoryIndex': t_idx, 'zoneIndex': z_idx, 'territoryType': territory['territory_type']}
+        for t_idx, territory in enumerate(territories)
+        for z_idx, zone in enumerate(territory['zones'])
+    ]
+    modified = [_moved(zone) for zone in _changed(zones)]
+    return {'json': {'mission_dir': mission_dir, 'changes': {'modified': modified}}}
+
+
+def _player_spawns_save(client, mission_dir):
+    points = _get_json(client, '/api/player-spawn-points', mission_dir)['spawn_points']
+    modified = [_moved({'sourceId': p['sourceId'], 'x': p['x'], 'y': p['y'], 'z': p['z']}) for p in _changed(points)]
+    return {'json': {'mission_dir': mission_dir, 'changes': {'modified': modified}}}
+
+
+def _effect_areas_save(client, mission_dir):
+    areas = _get_json(client, '/api/effect-areas', mission_dir)['areas']
+    modified = [_moved({k: a[k] for k in ('sourceId', 'name', 'x', 'y', 'z', 'radius')}) for a in _changed(areas)]
+    return {'json': {'mission_dir': mission_dir, 'changes': {'modified': modified}}}
+
+
+def _ai_patrols_patch(client, mission_dir):
+    body = _get_json(client, '/api/ai-patrols', mission_dir)
+    modified = []
+    for idx in range(0, len(body['patrols']), max(1, int(1 / CHANGE_FRACTION))):
+        patrol = body['patrols'][idx]
+        waypoint = patrol['Waypoints'][0] if patrol.get('Waypoints') else [0.0, 0.0, 0.0]
+        moved = _moved({'x': waypoint[0]})['x']
+        modified.append({'sourceId': body['patrol_ids'][idx], 'waypoints': {'0': [moved, waypoint[1], waypoint[2]]}})
+    return {'json': {'mission_dir': mission_dir, 'changes': {'modified': modified}}}
+
+
+def _ai_patrols_save(client, mission_dir):
+    patrols = _get_json(client, '/api/ai-patrols', mission_dir)['patrols']
+    return {'json': {'mission_dir': mission_dir, 'patrols': patrols}}
+
+
+def _economy_load(client, mission_dir):
+    return {'json': {'mission_dir': mission_dir}}
+
+
+def _economy_field_update(client, mission_dir):
+    element = _get_json(client, '/api/elements', mission_dir)['elements'][0]
+    value = 11 if str(element.get('nominal')) == '10' else 10
+    return {'json': {'mission_dir': mission_dir, 'value': value},
+            'path_args': (element['_element_key'],)}
+
+
+def _economy_export(client, mission_dir):
+    return {'json': {'mission_dir': mission_dir, 'export_subfolder': 'benchmark-export'}}
+
+
+def _marker_id_columns(client, mission_dir):
+    indices = range(MARKER_ID_COUNT)
+    return {'columns': (
+        [f'Land_House_{i % 300}' for i in indices],
+        [round(i * 0.37, 2) for i in indices],
+        [round(i * 0.01, 2) for i in indices],
+        [round(i * 0.53, 2) for i in indices],
+        list(indices),
+    )}
+
+
+def _marker_ids(columns):
+    from map_data_adapters import GROUPS_ADAPTER
+
+    return len(GROUPS_ADAPTER.source_ids_from_columns(*columns))
+
+
+def build_cases() -> List[Case]:
+    cases = []
+    for name, path in (
+        ('groups', '/api/groups'),
+        ('event-spawns', '/api/event-spawns'),
+        ('territories', '/api/territories'),
+        ('player-spawn-points', '/api/player-spawn-points'),
+        ('effect-areas', '/api/effect-areas'),
+        ('ai-patrols', '/api/ai-patrols'),
+        ('ai-patrol-loadouts', '/api/ai-patrols/loadouts'),
+    ):
+        cases.append(Case(f'map.load.{name}.cold', 'map', 'GET', path, _query, cold=True))
+        cases.append(Case(f'map.load.{name}.warm', 'map', 'GET', path, _query))
+    cases += [
+        Case('map.save.groups', 'map', 'POST', '/api/groups/save', _groups_save),
+        Case('map.save.event-spawns', 'map', 'POST', '/api/event-spawns/save', _event_spawns_save),
+        Case('map.save.territories', 'map', 'POST', '/api/territories/save', _territories_save),
+        Case('map.save.player-spawn-points', 'map', 'POST', '/api/player-spawn-points/save', _player_spawns_save),
+        Case('map.save.effect-areas', 'map', 'POST', '/api/effect-areas/save', _effect_areas_save),
+        Case('map.save.ai-patrols.patch', 'map', 'POST', '/api/ai-patrols/patch', _ai_patrols_patch),
+        Case('map.save.ai-patrols.full', 'map', 'POST', '/api/ai-patrols/save', _ai_patrols_save),
+        Case('economy.load.import', 'economy', 'POST', '/api/load', _economy_load, cold=True),
+        Case('economy.load.elements', 'economy', 'GET', '/api/elements', _query),
+        Case('economy.load.reference-data', 'economy', 'GET', '/api/reference-data', _query),
+        Case('economy.save.field', 'economy', 'PUT', '/api/elements/{}/field/nominal', _economy_field_update),
+        Case('economy.save.export', 'economy', 'POST', '/api/export', _economy_export),
+        Case('local.marker-ids', 'local', '', '', _marker_id_columns, call=_marker_ids),
+    ]
+    return cases
+
+
+def reset_caches() -> None:
+    """Drop every parsed-file cache so the next request re-reads its files."""
+    import map_viewer_app
+    import mission_data
+    from mission_files import ParsedFileCache
+
+    for value in vars(map_viewer_app).values():
+        if isinstance(value, ParsedFileCache):
+            value.invalidate()
+    mission_data.invalidate()
+
+
+def _server_timing(header: Optional[str]) -> Dict[str, float]:
+    stages = {}
+    for part in (header or '').split(','):
+        name, _, rest = part.strip().partition(';dur=')
+        if name and rest:
+            stages[name] = float(rest)
+    return stages
+
+
+def run_local_case(case: Case, mission_dir: str, repeat: int) -> Dict[str, Any]:
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        kwargs = case.prepare(None, mission_dir)
+        start = time.perf_counter()
+        items = case.call(**kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    return {
+        'name': case.name,
+        'runs': repeat,
+        'items': items,
+        'minMs': round(min(timings), 3),
+        'medianMs': round(median, 3),
+        'meanMs': round(statistics.fmean(timings), 3),
+        'maxMs': round(max(timings), 3),
+        'itemsPerSecond': round(items / (median / 1000)) if median else None,
+    }
+
+
+def run_case(case: Case, client, mission_dir: str, repeat: int) -> Dict[str, Any]:
+    timings = []
+    stage_totals: Dict[str, float] = {}
+    status = None
+    size = 0
+    for _ in range(repeat):
+        kwargs = case.prepare(client, mission_dir)
+        path = case.path.format(*kwargs.pop('path_args', ()))
+        if case.cold:
+            reset_caches()
+        start = time.perf_counter()
+        response = client.open(path, method=case.method, **kwargs)
+        body = response.get_data()
+        timings.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+        size = len(body)
+        if status >= 400:
+            raise RuntimeError(f"{case.name}: {case.method} {path} returned {status}: {body[:300]!r}")
+        for name, ms in _server_timing(response.headers.get('Server-Timing')).items():
+            stage_totals[name] = stage_totals.get(name, 0.0) + ms
+    return {
+        'name': case.name,
+        'method': case.method,
+        'path': case.path,
+        'status': status,
+        'runs': repeat,
+        'bytes': size,
+        'minMs': round(min(timings), 3),
+        'medianMs': round(statistics.median(timings), 3),
+        'meanMs': round(statistics.fmean(timings), 3),
+        'maxMs': round(max(timings), 3),
+        'stagesMs': {name: round(total / repeat, 3) for name, total in sorted(stage_totals.items())},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(mission_dir: str, repeat: int = 5, only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    import economy_editor_app
+    import map_viewer_app
+
+    clients = {
+        'map': map_viewer_app.app.test_client(),
+        'economy': economy_editor_app.app.test_client(),
+    }
+    results = []
+    with tempfile.TemporaryDirectory() as app_data:
+        # Keep the app-local catalog/colour files out of the repo's data/ folder
+        with mock.patch.object(map_viewer_app, 'get_ai_patrol_options_catalog_path',
+                               return_value=Path(app_data) / 'ai_patrol_options.json'), \
+             mock.patch.object(map_viewer_app, 'get_marker_color_config_path',
+                               return_value=Path(app_data) / 'marker_colors.json'):
+            # The economy benchmarks read the database the import creates
+            clients['economy'].post('/api/load', json={'mission_dir': mission_dir})
+            for case in build_cases():
+                if only and not any(token in case.name for token in only):
+                    continue
+                if case.call is not None:
+                    result = run_local_case(case, mission_dir, repeat)
+                    results.append(result)
+                    print(f"{result['name']:<40} median {result['medianMs']:>9.2f} ms  "
+                          f"min {result['minMs']:>9.2f} ms  {result['itemsPerSecond']:>10} items/s")
+                    continue
+                result = run_case(case, clients[case.app], mission_dir, repeat)
+                results.append(result)
+                print(f"{result['name']:<40} median {result['medianMs']:>9.2f} ms  "
+                      f"min {result['minMs']:>9.2f} ms  {result['bytes']:>10} B")
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path) -> None:
+    """Print the median change of each benchmark against a previous results file."""
+    baseline = {r['name']: r for r in json.loads(baseline_path.read_text(encoding='utf-8'))['results']}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(result['name'])
+        if before is None or not before['medianMs']:
+            print(f"{result['name']:<40} (new)")
+            continue
+        change = (result['medianMs'] - before['medianMs']) / before['medianMs'] * 100
+        print(f"{result['name']:<40} {before['medianMs']:>9.2f} -> {result['medianMs']:>9.2f} ms  ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark load/save endpoints on a synthetic mission.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--set', dest='overrides', action='append', metavar='KEY=N',
+                        help='Override one element count, e.g. --set groups=50000')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed calls per benchmark (default: 5)')
+    parser.add_argument('--only', nargs='+', metavar='TEXT', help='Run benchmarks whose name contains TEXT')
+    parser.add_argument('--mission-root', help='Generate into this folder and keep it (default: temp dir)')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare medians against')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    overrides = parse_overrides(args.overrides)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(args.mission_root) if args.mission_root else Path(tmp_dir)
+        started = time.perf_counter()
+        mission_dir = str(generate_mission(root, args.scale, overrides, args.seed))
+        print(f"Generated {args.scale} mission in {time.perf_counter() - started:.1f}s: {mission_dir}")
+        results = run_benchmarks(mission_dir, args.repeat, args.only)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'counts': resolve_scale(args.scale, overrides),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, Path(args.compare))
+
+
+if __name__ == '__main__':
+    main()
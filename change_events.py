@@ -0,0 +1,233 @@
+"""Change events pushed to open editors over Server-Sent Events.
+
+Editors subscribe to a channel with ``GET /api/events``: one channel per editor
+database (economy editor) or mission directory (map viewer), keyed by ``path_key``.
+Every write publishes a compact event on its channel (the element keys and fields
+that changed, or a map layer's sourceId-keyed changeset) so the other editors patch
+their local data instead of reloading whole datasets.
+
+Each channel keeps its last ``HISTORY_SIZE`` events. A browser reconnecting with
+``Last-Event-ID`` is replayed the events it missed; when those have dropped out of the
+history, or the id comes from an earlier server process, it gets a ``resync`` event and
+reloads instead. Channels are only created by subscribers, so publishing to a mission
+nobody watches does nothing (``is_watched`` lets callers skip building the payload).
+
+An open stream holds a server worker thread, so at most ``MAX_STREAMS`` are open at once
+(``XML_VIEWER_MAX_EVENT_STREAMS``); further requests get 503 and the editors retry later,
+resuming from the last event they received. Streams end after ``STREAM_SECONDS`` so the
+slots rotate; EventSource reconnects on its own.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from flask import Response, request
+
+import missions
+from mission_files import is_under, path_key
+
+# Events kept per channel for clients that reconnect
+HISTORY_SIZE = 500
+# Events queued for one slow subscriber before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 1000
+HEARTBEAT_SECONDS = 15.0
+STREAM_SECONDS = 60.0
+RETRY_MS = 3000
+# Streams open at once in this process; the rest of the server threads stay free for requests
+DEFAULT_MAX_STREAMS = 6
+try:
+    MAX_STREAMS = max(int(os.environ.get("XML_VIEWER_MAX_EVENT_STREAMS", DEFAULT_MAX_STREAMS)), 0)
+except ValueError:
+    MAX_STREAMS = DEFAULT_MAX_STREAMS
+
+# Event ids are "<process token>-<sequence>" so ids from before a restart force a resync
+_PROCESS_TOKEN = f"{os.getpid():x}{time.time_ns():x}"
+
+
+class ChangeEvent:
+    __slots__ = ("seq", "type", "data")
+
+    def __init__(self, seq: int, event_type: str, data: Dict[str, Any]) -> None:
+        self.seq = seq
+        self.type = event_type
+        self.data = data
+
+    @property
+    def id(self) -> str:
+        return f"{_PROCESS_TOKEN}-{self.seq}"
+
+    def frame(self) -> str:
+        """The event in text/event-stream format."""
+        payload = json.dumps(self.data, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Events published on one channel since the subscriber connected."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.holds_slot = False
+        self._events: Deque[ChangeEvent] = deque()
+        self._ready = threading.Condition()
+
+    def _push(self, event: ChangeEvent) -> None:
+        with self._ready:
+            if len(self._events) >= SUBSCRIBER_QUEUE_SIZE:
+                # Too far behind to catch up event by event
+                self._events.clear()
+                event = ChangeEvent(event.seq, "resync", {})
+            self._events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: float) -> List[ChangeEvent]:
+        """Wait up to ``timeout`` seconds for events and return all that are queued."""
+        with self._ready:
+            if not self._events:
+                self._ready.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+class _Channel:
+    __slots__ = ("seq", "history", "subscribers")
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self.history: Deque[ChangeEvent] = deque(maxlen=HISTORY_SIZE)
+        self.subscribers: Set[Subscription] = set()
+
+
+_CHANNELS: Dict[str, _Channel] = {}
+_LOCK = threading.Lock()
+_open_streams = 0
+
+
+def _parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    token, _, seq = (event_id or "").rpartition("-")
+    if not token or not seq.isdigit():
+        return None
+    return token, int(seq)
+
+
+def is_watched(path: Any) -> bool:
+    """True once an editor has subscribed to the channel of ``path``."""
+    with _LOCK:
+        return path_key(path) in _CHANNELS
+
+
+def publish(path: Any, event_type: str, data: Dict[str, Any]) -> Optional[str]:
+    """Send an event to the editors watching ``path``; returns its id (None if unwatched)."""
+    key = path_key(path)
+    with _LOCK:
+        channel = _CHANNELS.get(key)
+        if channel is None:
+            return None
+        channel.seq += 1
+        event = ChangeEvent(channel.seq, event_type, data)
+        channel.history.append(event)
+        for subscription in channel.subscribers:
+            subscription._push(event)
+    return event.id
+
+
+def subscribe(path: Any, last_event_id: Optional[str] = None) -> Subscription:
+    """Start receiving the events of ``path``, first replaying those after ``last_event_id``."""
+    key = path_key(path)
+    subscription = Subscription(key)
+    with _LOCK:
+        channel = _CHANNELS.setdefault(key, _Channel())
+        channel.subscribers.add(subscription)
+        if last_event_id:
+            parsed = _parse_event_id(last_event_id)
+            oldest = channel.history[0].seq if channel.history else channel.seq + 1
+            if (parsed is None or parsed[0] != _PROCESS_TOKEN or parsed[1] > channel.seq
+                    or parsed[1] < oldest - 1):
+                subscription._push(ChangeEvent(channel.seq, "resync", {}))
+            else:
+                for event in channel.history:
+                    if event.seq > parsed[1]:
+                        subscription._push(event)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription) -> None:
+    global _open_streams
+    with _LOCK:
+        channel = _CHANNELS.get(subscription.key)
+        if channel is not None:
+            channel.subscribers.discard(subscription)
+        if subscription.holds_slot:
+            subscription.holds_slot = False
+            _open_streams -= 1
+
+
+def _take_stream_slot() -> bool:
+    global _open_streams
+    with _LOCK:
+        if _open_streams >= MAX_STREAMS:
+            return False
+        _open_streams += 1
+        return True
+
+
+@missions.on_evict
+def forget(directory_key: str) -> None:
+    """Drop the idle channels of an evicted mission; streams still open keep theirs."""
+    with _LOCK:
+        for key in [key for key, channel in _CHANNELS.items()
+                    if is_under(key, directory_key) and not channel.subscribers]:
+            del _CHANNELS[key]
+
+
+def stream(subscription: Subscription, stream_seconds: float = STREAM_SECONDS,
+           heartbeat_seconds: float = HEARTBEAT_SECONDS) -> Iterator[str]:
+    """text/event-stream chunks for ``subscription`` until ``stream_seconds`` have passed."""
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        deadline = time.monotonic() + stream_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = subscription.get(min(heartbeat_seconds, remaining))
+            if events:
+                yield "".join(event.frame() for event in events)
+            else:
+                # Comment line; keeps proxies from timing out an idle stream
+                yield ": keep-alive\n\n"
+    finally:
+        unsubscribe(subscription)
+
+
+def event_stream_response(path: Any) -> Response:
+    """Streaming response for ``GET /api/events``, resuming after the request's Last-Event-ID.
+
+    The subscription starts before the response is returned, so a client that opens the
+    stream and then loads its data does not miss writes made in between. Over
+    ``MAX_STREAMS`` the answer is 503 with Retry-After.
+    """
+    if not _take_stream_slot():
+        return Response(
+            "Too many open event streams; retry later\n",
+            status=503,
+            mimetype="text/plain",
+            headers={"Retry-After": str(max(RETRY_MS // 1000, 1)), "Cache-Control": "no-cache"},
+        )
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    subscription = subscribe(path, last_event_id)
+    subscription.holds_slot = True
+    response = Response(
+        stream(subscription),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(lambda: unsubscribe(subscription))
+    return response
@@ -0,0 +1,349 @@
+"""Append-only change journal with undo/redo and named snapshots for the editor database.
+
+Every connection opened for a mutating request gets TEMP triggers (``install_triggers``)
+that copy each inserted, updated or deleted row of the journaled tables into
+``change_journal`` as JSON, tagged with the request's batch id. Undo replays the newest
+applied batch backwards, redo re-applies the most recently undone one, and a snapshot
+is just the highest journal id at the time it was taken, so rolling back an import is
+a replay of the rows it wrote instead of restoring a copy of the whole database.
+
+Rows move from ``applied`` to ``undone`` and back; a new change discards the redo
+history (``undone`` rows become ``discarded``) like an editor's undo stack. ``prune``
+(run by database maintenance) deletes discarded rows and applied batches past the
+retention period that no snapshot can still restore past.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import missions
+from mission_files import is_under, path_key
+
+# Tables whose rows are journaled; derived tables (type_element_core, the search index)
+# are rebuilt by their own triggers when a replay touches these.
+JOURNAL_TABLES = (
+    'type_elements', 'type_element_fields',
+    'element_categories', 'element_tags', 'element_usageflags', 'element_valueflags',
+    'element_itemclasses', 'element_itemtags', 'element_flags',
+    'categories', 'tags', 'usageflags', 'valueflags', 'itemclasses', 'itemtags', 'flags',
+)
+
+# Applied batches younger than this stay undoable through maintenance runs
+RETENTION_DAYS = 30
+
+_TRIGGER_CACHE: Dict[Tuple[str, int], List[str]] = {}
+_TRIGGER_CACHE_LOCK = threading.Lock()
+
+
+class JournalError(Exception):
+    """Undo/redo/restore cannot be applied (nothing to do, or the rows have diverged)."""
+
+
+def ensure_schema(cursor: sqlite3.Cursor) -> None:
+    """Create the journal, batch and snapshot tables if missing."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            element_key TEXT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            state TEXT NOT NULL DEFAULT 'applied',
+            undo_seq INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_journal_batch ON change_journal(batch_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_journal_element ON change_journal(element_key)')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_journal_undone ON change_journal(undo_seq) WHERE state = 'undone'")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_batches (
+            batch_id TEXT PRIMARY KEY,
+            label TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_snapshots (
+            name TEXT PRIMARY KEY,
+            journal_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # A new change makes the undone batches unreachable for redo
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_discard_redo AFTER INSERT ON change_journal
+        BEGIN
+            UPDATE change_journal SET state = 'discarded' WHERE state = 'undone';
+        END
+    ''')
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> List[Tuple[str, int]]:
+    """(name, pk position) of each column; pk position 0 means not part of the key."""
+    cursor.execute(f'PRAGMA table_info("{table}")')
+    return [(row[1], row[5]) for row in cursor.fetchall()]
+
+
+def _key_columns(columns: List[Tuple[str, int]]) -> List[str]:
+    keys = [name for name, pk in sorted(columns, key=lambda c: c[1]) if pk]
+    return keys or [name for name, _pk in columns]
+
+
+def _trigger_templates(conn: sqlite3.Connection) -> List[str]:
+    """CREATE TEMP TRIGGER statements for this database's layout, with __BATCH__/__LABEL__ placeholders."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    existing = {row[0] for row in cursor.fetchall()}
+    if 'change_journal' not in existing:
+        return []
+    statements = []
+    for table in JOURNAL_TABLES:
+        if table not in existing:
+            continue
+        columns = _table_columns(cursor, table)
+        names = [name for name, _pk in columns]
+        has_element_key = 'element_key' in names
+        for op, row in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')):
+            def row_json(prefix: str) -> str:
+                return 'json_object(' + ', '.join(f"'{name}', {prefix}.\"{name}\"" for name in names) + ')'
+            old_json = 'NULL' if op == 'insert' else row_json('OLD')
+            new_json = 'NULL' if op == 'delete' else row_json('NEW')
+            when = ''
+            if op == 'update':
+                when = 'WHEN ' + ' OR '.join(f'OLD."{name}" IS NOT NEW."{name}"' for name in names)
+            element_key = f'{row}.element_key' if has_element_key else 'NULL'
+            statements.append(f'''
+                CREATE TEMP TRIGGER journal_{table}_{op} AFTER {op.upper()} ON main.{table} {when}
+                BEGIN
+                    INSERT INTO journal_batches (batch_id, label)
+                        SELECT __BATCH__, __LABEL__
+                        WHERE NOT EXISTS (SELECT 1 FROM journal_batches WHERE batch_id = __BATCH__);
+                    INSERT INTO change_journal (batch_id, element_key, table_name, op, old_value, new_value)
+                        VALUES (__BATCH__, {element_key}, '{table}', '{op}', {old_json}, {new_json});
+                END
+            ''')
+    return statements
+
+
+def install_triggers(conn: sqlite3.Connection, db_file: Any, batch_id: str, label: str) -> bool:
+    """Journal this connection's writes under ``batch_id``; False if the database has no journal yet."""
+    schema_version = conn.execute('PRAGMA schema_version').fetchone()[0]
+    cache_key = (path_key(db_file), schema_version)
+    with _TRIGGER_CACHE_LOCK:
+        templates = _TRIGGER_CACHE.get(cache_key)
+    if templates is None:
+        templates = _trigger_templates(conn)
+        with _TRIGGER_CACHE_LOCK:
+            _TRIGGER_CACHE[cache_key] = templates
+    if not templates:
+        return False
+    batch_sql, label_sql = _sql_literal(batch_id), _sql_literal(label)
+    for template in templates:
+        conn.execute(template.replace('__BATCH__', batch_sql).replace('__LABEL__', label_sql))
+    return True
+
+
+@missions.on_evict
+def forget(directory_key: str) -> None:
+    """Drop the trigger templates of databases inside an evicted mission."""
+    with _TRIGGER_CACHE_LOCK:
+        for cache_key in [cache_key for cache_key in _TRIGGER_CACHE if is_under(cache_key[0], directory_key)]:
+            del _TRIGGER_CACHE[cache_key]
+
+
+def new_batch_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _apply(cursor: sqlite3.Cursor, keys_by_table: Dict[str, List[str]], table: str,
+           action: str, row: Dict[str, Any], match: Optional[Dict[str, Any]] = None) -> None:
+    if table not in keys_by_table:
+        keys_by_table[table] = _key_columns(_table_columns(cursor, table))
+    keys = keys_by_table[table]
+    if action == 'insert':
+        columns = ', '.join(f'"{column}"' for column in row)
+        placeholders = ', '.join('?' for _ in row)
+        cursor.execute(f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', list(row.values()))
+        return
+    where = ' AND '.join(f'"{key}" IS ?' for key in keys)
+    key_values = [(match or row)[key] for key in keys]
+    if action == 'delete':
+        cursor.execute(f'DELETE FROM "{table}" WHERE {where}', key_values)
+    else:
+        assignments = ', '.join(f'"{column}" = ?' for column in row)
+        cursor.execute(f'UPDATE "{table}" SET {assignments} WHERE {where}', [*row.values(), *key_values])
+    if cursor.rowcount != 1:
+        raise JournalError(f"Row in {table} has changed outside the journal; cannot replay")
+
+
+def _replay(conn: sqlite3.Connection, rows: List[sqlite3.Row], backwards: bool) -> None:
+    cursor = conn.cursor()
+    # Cascaded deletes are journaled child-first or parent-first; check keys at commit
+    cursor.execute('PRAGMA defer_foreign_keys = ON')
+    keys_by_table: Dict[str, List[str]] = {}
+    for row in rows:
+        old = json.loads(row['old_value']) if row['old_value'] else None
+        new = json.loads(row['new_value']) if row['new_value'] else None
+        table, op = row['table_name'], row['op']
+        if backwards:
+            if op == 'insert':
+                _apply(cursor, keys_by_table, table, 'delete', new)
+            elif op == 'delete':
+                _apply(cursor, keys_by_table, table, 'insert', old)
+            else:
+                _apply(cursor, keys_by_table, table, 'update', old, match=new)
+        else:
+            if op == 'insert':
+                _apply(cursor, keys_by_table, table, 'insert', new)
+            elif op == 'delete':
+                _apply(cursor, keys_by_table, table, 'delete', old)
+            else:
+                _apply(cursor, keys_by_table, table, 'update', new, match=old)
+
+
+def _batch_summary(cursor: sqlite3.Cursor, batch_id: str) -> Dict[str, Any]:
+    cursor.execute('''
+        SELECT b.label, COUNT(j.id) AS changes, COUNT(DISTINCT j.element_key) AS elements, MIN(j.created_at) AS created_at
+        FROM change_journal j LEFT JOIN journal_batches b ON b.batch_id = j.batch_id
+        WHERE j.batch_id = ?
+    ''', (batch_id,))
+    row = cursor.fetchone()
+    return {'batch_id': batch_id, 'label': row[0], 'changes': row[1], 'elements': row[2], 'created_at': row[3]}
+
+
+def _undo_batch(conn: sqlite3.Connection, batch_id: str) -> Dict[str, Any]:
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT * FROM change_journal WHERE batch_id = ? AND state = 'applied' ORDER BY id DESC", (batch_id,)
+    )
+    _replay(conn, cursor.fetchall(), backwards=True)
+    cursor.execute("SELECT COALESCE(MAX(undo_seq), 0) + 1 FROM change_journal")
+    seq = cursor.fetchone()[0]
+    cursor.execute(
+        "UPDATE change_journal SET state = 'undone', undo_seq = ? WHERE batch_id = ? AND state = 'applied'",
+        (seq, batch_id),
+    )
+    return _batch_summary(cursor, batch_id)
+
+
+def undo(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Revert the newest applied batch; the caller commits. Raises JournalError."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT batch_id FROM change_journal WHERE state = 'applied' ORDER BY id DESC LIMIT 1")
+    row = cursor.fetchone()
+    if row is None:
+        raise JournalError('Nothing to undo')
+    return _undo_batch(conn, row[0])
+
+
+def redo(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Re-apply the most recently undone batch; the caller commits. Raises JournalError."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT batch_id FROM change_journal WHERE state = 'undone' ORDER BY undo_seq DESC LIMIT 1")
+    row = cursor.fetchone()
+    if row is None:
+        raise JournalError('Nothing to redo')
+    batch_id = row[0]
+    cursor.execute("SELECT * FROM change_journal WHERE batch_id = ? AND state = 'undone' ORDER BY id", (batch_id,))
+    _replay(conn, cursor.fetchall(), backwards=False)
+    cursor.execute(
+        "UPDATE change_journal SET state = 'applied', undo_seq = NULL WHERE batch_id = ? AND state = 'undone'",
+        (batch_id,),
+    )
+    return _batch_summary(cursor, batch_id)
+
+
+def list_batches(cursor: sqlite3.Cursor, limit: int = 50) -> List[Dict[str, Any]]:
+    """Newest batches first with their label, state and change counts."""
+    cursor.execute('''
+        SELECT j.batch_id, b.label, MIN(j.state) AS state, COUNT(*) AS changes,
+               COUNT(DISTINCT j.element_key) AS elements, MIN(j.created_at) AS created_at, MAX(j.id) AS last_id
+        FROM change_journal j LEFT JOIN journal_batches b ON b.batch_id = j.batch_id
+        WHERE j.state <> 'discarded'
+        GROUP BY j.batch_id
+        ORDER BY last_id DESC
+        LIMIT ?
+    ''', (limit,))
+    return [
+        {'batch_id': row[0], 'label': row[1], 'state': row[2], 'changes': row[3],
+         'elements': row[4], 'created_at': row[5]}
+        for row in cursor.fetchall()
+    ]
+
+
+def create_snapshot(cursor: sqlite3.Cursor, name: str) -> Dict[str, Any]:
+    """Record the current journal position under ``name`` (replacing an older one)."""
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_journal WHERE state = 'applied'")
+    journal_id = cursor.fetchone()[0]
+    cursor.execute('INSERT OR REPLACE INTO journal_snapshots (name, journal_id) VALUES (?, ?)', (name, journal_id))
+    return {'name': name, 'journal_id': journal_id}
+
+
+def list_snapshots(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    cursor.execute('''
+        SELECT s.name, s.journal_id, s.created_at,
+               (SELECT COUNT(DISTINCT batch_id) FROM change_journal
+                WHERE id > s.journal_id AND state = 'applied') AS batches_since
+        FROM journal_snapshots s
+        ORDER BY s.journal_id DESC, s.created_at DESC
+    ''')
+    return [
+        {'name': row[0], 'journal_id': row[1], 'created_at': row[2], 'batches_since': row[3]}
+        for row in cursor.fetchall()
+    ]
+
+
+def restore_snapshot(conn: sqlite3.Connection, name: str) -> List[Dict[str, Any]]:
+    """Undo every batch applied after snapshot ``name``, newest first; the caller commits."""
+    cursor = conn.cursor()
+    cursor.execute('SELECT journal_id FROM journal_snapshots WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    if row is None:
+        raise JournalError(f"Snapshot '{name}' not found")
+    cursor.execute('''
+        SELECT batch_id FROM change_journal
+        WHERE id > ? AND state = 'applied'
+        GROUP BY batch_id
+        ORDER BY MAX(id) DESC
+    ''', (row[0],))
+    return [_undo_batch(conn, batch_id) for (batch_id,) in cursor.fetchall()]
+
+
+def prune(cursor: sqlite3.Cursor, retention_days: int = RETENTION_DAYS) -> Dict[str, int]:
+    """Delete discarded rows, then applied batches older than ``retention_days``.
+
+    Batches applied after the oldest snapshot are kept so every snapshot can still be
+    restored; undone batches are kept for redo. Batch labels of emptied batches go too.
+    Returns the deleted row counts; the caller commits.
+    """
+    cursor.execute("DELETE FROM change_journal WHERE state = 'discarded'")
+    discarded = cursor.rowcount
+    cursor.execute('SELECT MIN(journal_id) FROM journal_snapshots')
+    oldest_snapshot = cursor.fetchone()[0]
+    cursor.execute('''
+        DELETE FROM change_journal WHERE batch_id IN (
+            SELECT batch_id FROM change_journal
+            GROUP BY batch_id
+            HAVING MIN(state) = 'applied' AND MAX(state) = 'applied'
+               AND MAX(created_at) < datetime('now', ?)
+               AND (? IS NULL OR MAX(id) <= ?)
+        )
+    ''', (f'-{int(retention_days)} days', oldest_snapshot, oldest_snapshot))
+    applied = cursor.rowcount
+    cursor.execute('''
+        DELETE FROM journal_batches
+        WHERE NOT EXISTS (SELECT 1 FROM change_journal j WHERE j.batch_id = journal_batches.batch_id)
+    ''')
+    return {'discarded': discarded, 'applied': applied, 'batches': cursor.rowcount}
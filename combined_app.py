@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Single-process XML Data Viewer: the launcher, map viewer and economy editor mounted as
+blueprints on one Flask app.
+
+    /           launcher (iframes the two tools below, same origin)
+    /map/       map viewer
+    /economy/   economy editor
+
+Both tools read cfgeconomycore.xml and the types files through mission_data, so a
+mission opened in both is parsed once and invalidated together.
+"""
+
+from flask import Flask
+
+import app_logging
+import http_cache
+import instrumentation
+from economy_editor_app import bp as economy_editor_bp
+from launcher_app import bp as launcher_bp
+from map_viewer_app import bp as map_viewer_bp
+
+MAP_VIEWER_PREFIX = '/map'
+ECONOMY_EDITOR_PREFIX = '/economy'
+DEFAULT_PORT = 5000
+
+
+def create_app():
+    app_logging.configure()
+    app = Flask(__name__)
+    app.config['MAP_VIEWER_URL'] = f'{MAP_VIEWER_PREFIX}/'
+    app.config['ECONOMY_EDITOR_URL'] = f'{ECONOMY_EDITOR_PREFIX}/'
+    app.register_blueprint(launcher_bp)
+    app.register_blueprint(map_viewer_bp, url_prefix=MAP_VIEWER_PREFIX)
+    app.register_blueprint(economy_editor_bp, url_prefix=ECONOMY_EDITOR_PREFIX)
+    http_cache.init_app(app)
+    instrumentation.init_app(app)
+    return app
+
+
+app = create_app()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("XML Data Viewer (single process)")
+    print("=" * 60)
+    print(f"Launcher: http://localhost:{DEFAULT_PORT}")
+    print(f"Map Viewer: http://localhost:{DEFAULT_PORT}{MAP_VIEWER_PREFIX}/")
+    print(f"Economy Editor: http://localhost:{DEFAULT_PORT}{ECONOMY_EDITOR_PREFIX}/")
+    print("=" * 60)
+    app.run(debug=True, host='0.0.0.0', port=DEFAULT_PORT)
@@ -0,0 +1,196 @@
+"""Online backups of the economy editor database through SQLite's backup API.
+
+Copying the live ``.db`` file can capture a half-written page set. ``start_backup``
+instead copies the database in steps of ``BACKUP_PAGES_PER_STEP`` pages with
+``sqlite3.Connection.backup`` on a background thread, releasing the read lock between
+steps so edits are not blocked. The copy is written to a ``.partial`` file and renamed
+(optionally gzip-compressed) once complete. Pruning is opt-in: only a request that sets
+``keep_last``/``keep_daily`` removes older backups, including ones written by earlier
+versions under the same naming scheme.
+
+Backups run as ``jobs`` queued per database, so they never overlap a load, import or
+export of the same file; progress is available from ``get_job(job_id).as_dict()``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import jobs
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR_NAME = "backups"
+BACKUP_PAGES_PER_STEP = 256
+# Pause between steps (seconds) so writers on other connections can take the lock
+BACKUP_STEP_SLEEP = 0.002
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Which backups of a database survive pruning, and whether new ones are gzipped.
+
+    The ``keep_last`` newest backups are kept, plus the newest backup of each of the
+    ``keep_daily`` most recent days that have one. Zero for both (the default) disables
+    pruning.
+    """
+
+    keep_last: int = 0
+    keep_daily: int = 0
+    compress: bool = False
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> "RetentionPolicy":
+        """Policy from request options, falling back to the defaults; raises ValueError."""
+        default = cls()
+        keep_last = int(options.get("keep_last", default.keep_last))
+        keep_daily = int(options.get("keep_daily", default.keep_daily))
+        if keep_last < 0 or keep_daily < 0:
+            raise ValueError("keep_last and keep_daily must not be negative")
+        compress = options.get("compress", default.compress)
+        if isinstance(compress, str):
+            compress = compress.lower() in ("1", "true", "yes")
+        return cls(keep_last=keep_last, keep_daily=keep_daily, compress=bool(compress))
+
+
+def backup_dir_for(db_file: Any) -> Path:
+    return Path(db_file).parent / BACKUP_DIR_NAME
+
+
+def _backup_pattern(db_file: Path) -> "re.Pattern[str]":
+    return re.compile(
+        rf"^{re.escape(db_file.stem)}_backup_(\d{{8}}_\d{{6}})(?:_\d+)?{re.escape(db_file.suffix)}(?:\.gz)?$"
+    )
+
+
+def list_backups(db_file: Any) -> List[Path]:
+    """Backups of ``db_file``, newest first."""
+    db_file = Path(db_file)
+    backup_dir = backup_dir_for(db_file)
+    if not backup_dir.is_dir():
+        return []
+    pattern = _backup_pattern(db_file)
+    found = []
+    for path in backup_dir.iterdir():
+        match = pattern.match(path.name)
+        if match:
+            found.append((match.group(1), path.stat().st_mtime_ns, path))
+    found.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [path for _stamp, _mtime, path in found]
+
+
+def apply_retention(db_file: Any, policy: RetentionPolicy) -> List[Path]:
+    """Delete the backups of ``db_file`` that ``policy`` does not keep; returns them."""
+    if policy.keep_last <= 0 and policy.keep_daily <= 0:
+        return []
+    backups = list_backups(db_file)
+    pattern = _backup_pattern(Path(db_file))
+    keep = set(backups[:policy.keep_last])
+    days_seen: List[str] = []
+    for path in backups:
+        day = pattern.match(path.name).group(1)[:8]
+        if day not in days_seen:
+            if len(days_seen) >= policy.keep_daily:
+                break
+            days_seen.append(day)
+            keep.add(path)
+    removed = []
+    for path in backups:
+        if path not in keep:
+            try:
+                path.unlink()
+                removed.append(path)
+            except OSError as e:
+                logger.warning("Could not remove old backup %s: %s", path, e)
+    return removed
+
+
+def _new_backup_path(db_file: Path, compress: bool) -> Path:
+    backup_dir = backup_dir_for(db_file)
+    backup_dir.mkdir(exist_ok=True)
+    base = f"{db_file.stem}_backup_{datetime.now().strftime(TIMESTAMP_FORMAT)}"
+    extension = db_file.suffix + (".gz" if compress else "")
+    candidate = backup_dir / f"{base}{extension}"
+    counter = 1
+    while candidate.exists() or candidate.with_name(candidate.name + ".partial").exists():
+        candidate = backup_dir / f"{base}_{counter}{extension}"
+        counter += 1
+    return candidate
+
+
+def _run_backup(job: jobs.Job, db_file: Path, policy: RetentionPolicy) -> Dict[str, Any]:
+    # Named inside the job, so backups queued for the same database never share a path
+    backup_path = _new_backup_path(db_file, policy.compress)
+    job.update(backup_path=str(backup_path))
+    partial = backup_path.with_name(backup_path.name + ".partial")
+    # Compressed backups are copied uncompressed first, then gzipped into ``partial``
+    raw_copy = backup_path.with_name(backup_path.stem + ".partial") if policy.compress else partial
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        job.update(percent=100.0 * (total - remaining) / total if total else 0.0,
+                   pages_total=total, pages_remaining=remaining)
+        job.check_cancelled()
+
+    try:
+        source = sqlite3.connect(str(db_file))
+        target = sqlite3.connect(str(raw_copy))
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+        finally:
+            target.close()
+            source.close()
+        job.check_cancelled()
+        if policy.compress:
+            with open(raw_copy, "rb") as src, gzip.open(partial, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(raw_copy)
+        os.replace(partial, backup_path)
+    except BaseException:
+        for leftover in {partial, raw_copy}:
+            try:
+                leftover.unlink()
+            except OSError:
+                pass
+        raise
+    removed = apply_retention(db_file, policy)
+    job.update(size=backup_path.stat().st_size, removed=[str(path) for path in removed])
+    logger.info("Backed up %s to %s (%d pages, pruned %d old backups)",
+                db_file, backup_path, job.progress.get("pages_total", 0), len(removed))
+    return {"backup_path": str(backup_path)}
+
+
+def start_backup(db_file: Any, policy: Optional[RetentionPolicy] = None) -> jobs.Job:
+    """Queue an online backup of ``db_file`` as a background job and return the job."""
+    db_file = Path(db_file)
+    if not db_file.exists():
+        raise FileNotFoundError(f"Database file not found: {db_file}")
+    policy = policy or RetentionPolicy()
+    return jobs.submit(
+        "backup", db_file, lambda job: _run_backup(job, db_file, policy),
+        label=f"Backup of {db_file.name}",
+        progress={
+            "db_file_path": str(db_file),
+            "backup_path": None,
+            "compressed": policy.compress,
+            "pages_total": 0,
+            "pages_remaining": 0,
+            "size": None,
+            "removed": [],
+        },
+    )
+
+
+def get_job(job_id: str) -> Optional[jobs.Job]:
+    """The backup job ``job_id``, or None (also for jobs of other kinds)."""
+    job = jobs.get_job(job_id)
+    return job if job is not None and job.kind == "backup" else None
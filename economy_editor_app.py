@@ -5,18 +5,34 @@ Uses a properly normalized database schema without JSON blobs.
 """
 
 import os
+import logging
+import re
 import sqlite3
 import json
+import tempfile
+import uuid
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from flask import Flask, render_template, jsonify, request
+from flask import Blueprint, Flask, g, has_request_context, render_template, jsonify, request, url_for
 from datetime import datetime
 from collections import defaultdict
+import app_logging
+import change_events
+import change_journal
+import db_backup
+import http_cache
+import instrumentation
+import jobs
+import mission_data
+import missions
+from mission_files import ParsedFileCache, file_signature, path_key
 
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('economy_editor', __name__)
 
 # Allow iframe embedding for launcher (remove X-Frame-Options if set)
-@app.after_request
+@bp.after_request
 def set_frame_options(response):
     # Remove X-Frame-Options to allow embedding from launcher
     response.headers.pop('X-Frame-Options', None)
@@ -27,7 +43,7 @@ def set_frame_options(response):
     return response
 
 # Handle CORS preflight requests
-@app.before_request
+@bp.before_request
 def handle_options():
     if request.method == 'OPTIONS':
         response = jsonify({})
@@ -36,11 +52,6 @@ def handle_options():
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
         return response
 
-# Default mission directory
-DEFAULT_MISSION_DIR = r"E:\DayZ_Servers\Nyheim20_Server\mpmissions\empty.nyheim"
-current_mission_dir = DEFAULT_MISSION_DIR
-
-
 def get_db_path(mission_dir):
     """Get the database file path for a given mission directory."""
     mission_path = Path(mission_dir)
@@ -49,11 +60,45 @@ def get_db_path(mission_dir):
     return db_dir / 'editor_data_v2.db'
 
 
+# Mutating endpoints whose writes are not recorded in the change journal: the journal's
+# own replays, maintenance, and /api/load, which rebuilds from the mission files on disk
+JOURNAL_EXEMPT_ENDPOINTS = {
+    'undo_changes', 'redo_changes', 'manage_snapshots', 'restore_snapshot',
+    'database_maintenance', 'backup_database', 'load_data',
+    'create_import_session', 'import_session', 'check_import_duplicates', 'cancel_job',
+}
+
+
+def connect_db(db_file):
+    """
+    Open a database file with foreign keys enforced (SQLite leaves them off per connection).
+    Connections opened while handling a mutating request journal their writes under
+    one batch per request, so the request can be undone as a unit.
+    """
+    conn = instrumentation.connect(str(db_file))
+    conn.execute('PRAGMA foreign_keys = ON')
+    if (has_request_context() and request.method in ('POST', 'PUT', 'DELETE', 'PATCH')
+            and (request.endpoint or '').rsplit('.', 1)[-1] not in JOURNAL_EXEMPT_ENDPOINTS):
+        if 'journal_batch_id' not in g:
+            g.journal_batch_id = change_journal.new_batch_id()
+            g.journal_db_file = db_file
+        change_journal.install_triggers(conn, db_file, g.journal_batch_id, f'{request.method} {request.path}')
+    return conn
+
+
+@bp.after_request
+def publish_journaled_changes(response):
+    """Tell the other open editors what a successful mutating request changed."""
+    if 'journal_batch_id' in g and response.status_code < 400:
+        publish_element_changes(g.journal_db_file, [g.journal_batch_id])
+    return response
+
+
 def get_db_connection(mission_dir=None, db_file_path=None):
     """Get a database connection with row factory.
     
     Args:
-        mission_dir: Mission directory path (uses default if None)
+        mission_dir: Mission directory path or name (uses the default mission if None)
         db_file_path: Direct path to database file (takes precedence over mission_dir)
     """
     if db_file_path:
@@ -61,19 +106,46 @@ def get_db_connection(mission_dir=None, db_file_path=None):
         db_file = Path(db_file_path)
         if not db_file.exists():
             raise FileNotFoundError(f"Database file not found: {db_file_path}")
-        conn = sqlite3.connect(str(db_file))
+        missions.use(db_file)
+        conn = connect_db(db_file)
         conn.row_factory = sqlite3.Row
         return conn
     
     # Use mission directory
-    if mission_dir is None:
-        mission_dir = current_mission_dir
+    mission_dir = missions.require(mission_dir)
     db_file = get_db_path(mission_dir)
-    conn = sqlite3.connect(str(db_file))
+    conn = connect_db(db_file)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def db_etag(mission_dir=None, db_file_path=None):
+    """ETag for GET responses derived from the editor database file."""
+    db_file = db_file_path or get_db_path(missions.require(mission_dir))
+    return http_cache.sqlite_etag(db_file)
+
+
+def db_file_from_params(params):
+    """Database file selected by mission_dir/db_file_path request params."""
+    db_file_path = params.get('db_file_path')
+    if db_file_path:
+        return Path(db_file_path)
+    return get_db_path(missions.require(params.get('mission_dir')))
+
+
+def wants_async(params):
+    """True when a request asks to run as a background job ("async": true)."""
+    value = params.get('async', False)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def job_accepted(job):
+    """202 response for a queued background job; poll /api/jobs/<job_id> for progress."""
+    return jsonify({'success': True, 'job_id': job.id, 'status': job.as_dict()}), 202
+
+
 def infer_data_type(value):
     """Infer the SQLite data type from a Python value."""
     if value is None:
@@ -118,7 +190,8 @@ def parse_cfglimitsdefinition(mission_dir):
         return result
     
     try:
-        tree = ET.parse(xml_file)
+        with instrumentation.span('parse'):
+            tree = ET.parse(xml_file)
         root = tree.getroot()
         
         # Parse categories
@@ -154,15 +227,14 @@ def parse_cfglimitsdefinition(mission_dir):
                     result['valueflags'].append({'name': name})
     
     except Exception as e:
-        print(f"Error parsing cfglimitsdefinition.xml: {e}")
+        logger.error("Error parsing cfglimitsdefinition.xml: %s", e)
     
     return result
 
 
 def init_database(mission_dir=None):
     """Initialize the normalized database schema."""
-    if mission_dir is None:
-        mission_dir = current_mission_dir
+    mission_dir = missions.require(mission_dir)
     
     db_file = get_db_path(mission_dir)
     return init_database_for_file(db_file, mission_dir)
@@ -171,7 +243,7 @@ def init_database(mission_dir=None):
 def init_database_for_file(db_file_path, mission_dir=None):
     """Initialize the normalized database schema for a specific database file."""
     db_file = Path(db_file_path)
-    conn = sqlite3.connect(str(db_file))
+    conn = connect_db(db_file)
     cursor = conn.cursor()
     
     # Parse cfglimitsdefinition.xml to get reference data (if mission_dir provided)
@@ -372,6 +444,10 @@ def init_database_for_file(db_file_path, mission_dir=None):
     
     # Migration: add export column to type_elements if missing (existing DBs)
     ensure_export_column(cursor)
+    ensure_type_element_core(cursor)
+    ensure_element_search(cursor)
+    ensure_reference_version(cursor)
+    change_journal.ensure_schema(cursor)
     
     conn.commit()
     conn.close()
@@ -386,6 +462,249 @@ def ensure_export_column(cursor):
         cursor.execute('UPDATE type_elements SET export = 1 WHERE export IS NULL')
 
 
+# Numeric type fields projected from type_element_fields into typed, indexed columns
+TYPE_CORE_FIELDS = ('nominal', 'lifetime', 'restock', 'min', 'quantmin', 'quantmax', 'cost')
+
+
+def _core_value_sql(expr):
+    """SQL turning a field_value into a number, or NULL when it is not purely numeric."""
+    return (f"CASE WHEN trim({expr}) <> '' AND trim({expr}) NOT GLOB '*[^0-9.eE+-]*' "
+            f"THEN CAST(trim({expr}) AS NUMERIC) END")
+
+
+def ensure_type_element_core(cursor):
+    """
+    Ensure the type_element_core table, its indexes and sync triggers exist.
+
+    type_element_core holds one row per element with the core numeric fields as NUMERIC
+    columns, so filters/sorts such as "nominal > 50 ORDER BY cost" run in SQLite on indexes.
+    Triggers on type_elements/type_element_fields keep it in sync with every write path;
+    the first call on an existing database backfills it from type_element_fields.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_element_core'")
+    exists = cursor.fetchone() is not None
+    columns = ', '.join(f'"{field}" NUMERIC' for field in TYPE_CORE_FIELDS)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS type_element_core (
+            element_key TEXT PRIMARY KEY,
+            {columns},
+            FOREIGN KEY (element_key) REFERENCES type_elements(element_key) ON DELETE CASCADE
+        )
+    ''')
+    for field in TYPE_CORE_FIELDS:
+        # (field, element_key) serves "ORDER BY field, element_key" without a sort step
+        cursor.execute(f'DROP INDEX IF EXISTS idx_core_{field}')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_core_{field}_key ON type_element_core("{field}", element_key)')
+    
+    field_list = ', '.join(f"'{field}'" for field in TYPE_CORE_FIELDS)
+    
+    # Trigger bodies use NOT EXISTS rather than INSERT OR IGNORE: SQLite applies the conflict
+    # policy of the statement that fired the trigger (e.g. an upsert) to the body as well.
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_core_element_insert AFTER INSERT ON type_elements
+        BEGIN
+            INSERT INTO type_element_core (element_key)
+                SELECT NEW.element_key
+                WHERE NOT EXISTS (SELECT 1 FROM type_element_core WHERE element_key = NEW.element_key);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_core_element_delete AFTER DELETE ON type_elements
+        BEGIN
+            DELETE FROM type_element_core WHERE element_key = OLD.element_key;
+        END
+    ''')
+    for event, row, value_sql in (
+        ('INSERT', 'NEW', _core_value_sql('NEW.field_value')),
+        ('UPDATE', 'NEW', _core_value_sql('NEW.field_value')),
+        ('DELETE', 'OLD', 'NULL'),
+    ):
+        assignments = ', '.join(
+            f'"{field}" = CASE WHEN {row}.field_name = \'{field}\' THEN {value_sql} ELSE "{field}" END'
+            for field in TYPE_CORE_FIELDS
+        )
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_core_field_{event.lower()} AFTER {event} ON type_element_fields
+            WHEN {row}.field_name IN ({field_list}) AND {row}.field_order IS NULL
+            BEGIN
+                INSERT INTO type_element_core (element_key)
+                    SELECT element_key FROM type_elements WHERE element_key = {row}.element_key
+                    AND NOT EXISTS (SELECT 1 FROM type_element_core WHERE element_key = {row}.element_key);
+                UPDATE type_element_core SET {assignments} WHERE element_key = {row}.element_key;
+            END
+        ''')
+    
+    if not exists:
+        pivot = ', '.join(
+            f"MAX(CASE WHEN f.field_name = '{field}' THEN {_core_value_sql('f.field_value')} END)"
+            for field in TYPE_CORE_FIELDS
+        )
+        quoted = ', '.join(f'"{field}"' for field in TYPE_CORE_FIELDS)
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO type_element_core (element_key, {quoted})
+            SELECT e.element_key, {pivot}
+            FROM type_elements e
+            LEFT JOIN type_element_fields f
+                ON f.element_key = e.element_key AND f.field_order IS NULL AND f.field_name IN ({field_list})
+            GROUP BY e.element_key
+        ''')
+
+
+# Full-text search document columns: (column, link table, link column, reference table)
+ELEMENT_SEARCH_LINKS = (
+    ('categories', 'element_categories', 'category_id', 'categories'),
+    ('usageflags', 'element_usageflags', 'usageflag_id', 'usageflags'),
+    ('valueflags', 'element_valueflags', 'valueflag_id', 'valueflags'),
+    ('tags', 'element_tags', 'tag_id', 'tags'),
+    ('itemclass', 'element_itemclasses', 'itemclass_id', 'itemclasses'),
+    ('itemtags', 'element_itemtags', 'itemtag_id', 'itemtags'),
+)
+ELEMENT_SEARCH_COLUMNS = ('name', 'source') + tuple(link[0] for link in ELEMENT_SEARCH_LINKS)
+
+
+def ensure_element_search(cursor):
+    """
+    Ensure the type_elements_fts FTS5 index and its change-tracking triggers exist.
+    
+    The index holds one document per element (rowid = type_elements.id) with its name,
+    source folder/file and the names of its linked categories, flags, tags, itemclass
+    and itemtags. Triggers on the element, link and reference tables only record the
+    affected element_keys in type_elements_fts_dirty, so bulk imports stay cheap;
+    sync_element_search() re-indexes those elements before a search.
+    Returns False when the SQLite build has no FTS5 support.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_elements_fts'")
+    exists = cursor.fetchone() is not None
+    if not exists:
+        try:
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE type_elements_fts USING fts5(
+                    {', '.join(ELEMENT_SEARCH_COLUMNS)},
+                    prefix = '2 3'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning("Full-text search unavailable: %s", e)
+            return False
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS type_elements_fts_dirty (
+            element_key TEXT PRIMARY KEY
+        )
+    ''')
+    
+    # NOT EXISTS instead of OR IGNORE, see ensure_type_element_core
+    mark = ('INSERT INTO type_elements_fts_dirty (element_key) SELECT {0}.element_key WHERE NOT EXISTS '
+            '(SELECT 1 FROM type_elements_fts_dirty WHERE element_key = {0}.element_key);')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_fts_element_insert AFTER INSERT ON type_elements
+        BEGIN
+            {mark.format('NEW')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_fts_element_update
+        AFTER UPDATE OF name, source_file, source_folder ON type_elements
+        BEGIN
+            {mark.format('NEW')}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_fts_element_delete AFTER DELETE ON type_elements
+        BEGIN
+            DELETE FROM type_elements_fts WHERE rowid = OLD.id;
+            DELETE FROM type_elements_fts_dirty WHERE element_key = OLD.element_key;
+        END
+    ''')
+    for _column, link_table, link_column, ref_table in ELEMENT_SEARCH_LINKS:
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_fts_{link_table}_{event.lower()} AFTER {event} ON {link_table}
+                BEGIN
+                    {mark.format(row)}
+                END
+            ''')
+        # Renaming or deleting a reference row changes the documents of every linked element
+        for event in ('UPDATE OF name', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_fts_{ref_table}_{event.split()[0].lower()} AFTER {event} ON {ref_table}
+                BEGIN
+                    INSERT INTO type_elements_fts_dirty (element_key)
+                        SELECT l.element_key FROM {link_table} l
+                        WHERE l.{link_column} = OLD.id AND NOT EXISTS (
+                            SELECT 1 FROM type_elements_fts_dirty d WHERE d.element_key = l.element_key
+                        );
+                END
+            ''')
+    
+    if not exists:
+        cursor.execute('INSERT OR IGNORE INTO type_elements_fts_dirty (element_key) SELECT element_key FROM type_elements')
+    return True
+
+
+def sync_element_search(cursor):
+    """Re-index the elements recorded in type_elements_fts_dirty; returns how many were pending."""
+    cursor.execute('SELECT COUNT(*) FROM type_elements_fts_dirty')
+    pending = cursor.fetchone()[0]
+    if not pending:
+        return 0
+    
+    link_columns = ',\n'.join(
+        f'''(SELECT group_concat(r.name, ' ') FROM {link_table} l
+                JOIN {ref_table} r ON r.id = l.{link_column}
+                WHERE l.element_key = e.element_key)'''
+        for _column, link_table, link_column, ref_table in ELEMENT_SEARCH_LINKS
+    )
+    cursor.execute('''
+        DELETE FROM type_elements_fts WHERE rowid IN (
+            SELECT e.id FROM type_elements e
+            JOIN type_elements_fts_dirty d ON d.element_key = e.element_key
+        )
+    ''')
+    cursor.execute(f'''
+        INSERT INTO type_elements_fts (rowid, {', '.join(ELEMENT_SEARCH_COLUMNS)})
+        SELECT e.id, e.name,
+               trim(coalesce(e.source_folder, '') || ' ' || coalesce(e.source_file, '')),
+               {link_columns}
+        FROM type_elements e
+        JOIN type_elements_fts_dirty d ON d.element_key = e.element_key
+    ''')
+    cursor.execute('DELETE FROM type_elements_fts_dirty')
+    return pending
+
+
+# Reference tables served by /api/reference-data; writes to any of them bump reference_data_version
+REFERENCE_TABLES = ('categories', 'tags', 'usageflags', 'valueflags', 'itemclasses', 'itemtags', 'flags')
+
+
+def ensure_reference_version(cursor):
+    """
+    Ensure the reference_data_version row and the triggers that bump it.
+
+    version grows by one for every row inserted, updated or deleted in a reference table,
+    whatever the write path (editor, import, journal undo). generation is random per
+    database, so a recreated database never reuses an old version.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='reference_data_version'")
+    if cursor.fetchone():
+        return
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reference_data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation TEXT NOT NULL,
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute("INSERT INTO reference_data_version (id, generation, version) VALUES (1, lower(hex(randomblob(8))), 0)")
+    for table in REFERENCE_TABLES:
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    UPDATE reference_data_version SET version = version + 1;
+                END
+            ''')
+
+
 def ensure_count_in_hoarder_flag(conn):
     """Ensure count_in_hoarder flag exists and all elements have it set to 0 if not set."""
     cursor = conn.cursor()
@@ -428,89 +747,112 @@ def extract_element_data(root, element_type='type'):
     """
     Extract data from XML elements.
     """
-    results = []
+    return [extract_element(element) for element in root.findall(element_type)]
+
+
+def extract_element(element):
+    """
+    Extract the attributes and child data of a single XML element.
+    """
+    data = {}
+    # Add attributes
+    data.update(element.attrib)
     
-    for element in root.findall(element_type):
-        data = {}
-        # Add attributes
-        data.update(element.attrib)
-        
-        for child in element:
-            child_tag = child.tag
-            child_text = child.text.strip() if child.text and child.text.strip() else None
-            child_attrib = dict(child.attrib)
-            has_subchildren = len(child) > 0
+    for child in element:
+        child_tag = child.tag
+        child_text = child.text.strip() if child.text and child.text.strip() else None
+        child_attrib = dict(child.attrib)
+        has_subchildren = len(child) > 0
+        
+        if has_subchildren:
+            # Child has subchildren - store as nested structure
+            child_data = {}
+            child_data.update(child_attrib)
             
-            if has_subchildren:
-                # Child has subchildren - store as nested structure
-                child_data = {}
-                child_data.update(child_attrib)
+            for subchild in child:
+                subchild_text = subchild.text.strip() if subchild.text and subchild.text.strip() else None
+                subchild_attrib = dict(subchild.attrib)
                 
-                for subchild in child:
-                    subchild_text = subchild.text.strip() if subchild.text and subchild.text.strip() else None
-                    subchild_attrib = dict(subchild.attrib)
-                    
-                    if len(subchild) == 0:
-                        # Leaf node
-                        if subchild_text:
-                            subchild_value = subchild_text
-                        elif subchild_attrib:
-                            subchild_value = subchild_attrib
-                        else:
-                            continue
+                if len(subchild) == 0:
+                    # Leaf node
+                    if subchild_text:
+                        subchild_value = subchild_text
+                    elif subchild_attrib:
+                        subchild_value = subchild_attrib
                     else:
-                        # Has further nesting
-                        subchild_value = {}
-                        subchild_value.update(subchild_attrib)
-                        for subsubchild in subchild:
-                            subsubchild_text = subsubchild.text.strip() if subsubchild.text and subsubchild.text.strip() else None
-                            if subsubchild_text:
-                                subchild_value[subsubchild.tag] = subsubchild_text
-                    
-                    if subchild.tag not in child_data:
-                        child_data[subchild.tag] = []
-                    if not isinstance(child_data[subchild.tag], list):
-                        child_data[subchild.tag] = [child_data[subchild.tag]]
-                    child_data[subchild.tag].append(subchild_value)
+                        continue
+                else:
+                    # Has further nesting
+                    subchild_value = {}
+                    subchild_value.update(subchild_attrib)
+                    for subsubchild in subchild:
+                        subsubchild_text = subsubchild.text.strip() if subsubchild.text and subsubchild.text.strip() else None
+                        if subsubchild_text:
+                            subchild_value[subsubchild.tag] = subsubchild_text
                 
+                if subchild.tag not in child_data:
+                    child_data[subchild.tag] = []
+                if not isinstance(child_data[subchild.tag], list):
+                    child_data[subchild.tag] = [child_data[subchild.tag]]
+                child_data[subchild.tag].append(subchild_value)
+            
+            if child_tag not in data:
+                data[child_tag] = []
+            if not isinstance(data[child_tag], list):
+                data[child_tag] = [data[child_tag]]
+            data[child_tag].append(child_data)
+        else:
+            # Simple child element
+            if child_attrib:
+                # Has attributes - store as object
+                child_obj = child_attrib.copy()
+                if child_text:
+                    child_obj['_text'] = child_text
                 if child_tag not in data:
                     data[child_tag] = []
                 if not isinstance(data[child_tag], list):
                     data[child_tag] = [data[child_tag]]
-                data[child_tag].append(child_data)
-            else:
-                # Simple child element
-                if child_attrib:
-                    # Has attributes - store as object
-                    child_obj = child_attrib.copy()
-                    if child_text:
-                        child_obj['_text'] = child_text
-                    if child_tag not in data:
-                        data[child_tag] = []
+                data[child_tag].append(child_obj)
+            elif child_text:
+                # Simple text content
+                if child_tag not in data:
+                    data[child_tag] = child_text
+                else:
+                    # Convert to list if multiple
                     if not isinstance(data[child_tag], list):
                         data[child_tag] = [data[child_tag]]
-                    data[child_tag].append(child_obj)
-                elif child_text:
-                    # Simple text content
-                    if child_tag not in data:
-                        data[child_tag] = child_text
-                    else:
-                        # Convert to list if multiple
-                        if not isinstance(data[child_tag], list):
-                            data[child_tag] = [data[child_tag]]
-                        data[child_tag].append(child_text)
-                else:
-                    # Empty element - skip or store as empty dict
-                    pass
-        
-        results.append(data)
+                    data[child_tag].append(child_text)
+            else:
+                # Empty element - skip or store as empty dict
+                pass
     
-    return results
+    return data
+
+
+def iter_xml_elements(source, element_type='type'):
+    """
+    Yield extract_element() data for each top-level element of a file path or stream,
+    parsing incrementally and dropping each element once extracted.
+    """
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and element.tag == element_type:
+            yield extract_element(element)
+            root.clear()
 
 
-def load_xml_to_database(mission_dir, element_type='type'):
+def load_xml_to_database(mission_dir, element_type='type', job=None):
     """
     Load XML files from mission directory and populate normalized database.
+    When run as a background job, reports files_parsed/elements_written and stops
+    between files (before anything is committed) once cancelled.
     """
     conn = get_db_connection(mission_dir)
     cursor = conn.cursor()
@@ -528,42 +870,32 @@ def load_xml_to_database(mission_dir, element_type='type'):
     db_types_file = mission_path / 'db' / 'types.xml'
     files_to_load.append(('db/types.xml', 'db', 'types.xml', db_types_file))
     
-    # 2. Parse cfgeconomycore.xml to find all type files
+    # 2. Parse cfgeconomycore.xml to find all type files (shared with the map viewer)
     cfgeconomycore_file = mission_path / 'cfgeconomycore.xml'
     if cfgeconomycore_file.exists():
         try:
-            tree = ET.parse(cfgeconomycore_file)
-            root = tree.getroot()
-            
-            for ce_element in root.findall('.//ce'):
-                ce_folder_attr = ce_element.get('folder')
-                if not ce_folder_attr:
-                    continue
-                
-                ce_folder_attr = ce_folder_attr.replace('\\', '/').strip('/')
-                ce_folder_path = mission_path / ce_folder_attr
-                
-                for file_element in ce_element.findall('.//file'):
-                    file_type = file_element.get('type')
-                    file_name = file_element.get('name')
-                    if file_type == 'types' and file_name:
-                        full_file_path = ce_folder_path / file_name
-                        source_folder = ce_folder_attr
-                        source_file = file_name
-                        files_to_load.append((f"{source_folder}/{source_file}", source_folder, source_file, full_file_path))
+            for ref in mission_data.economycore_type_files(cfgeconomycore_file):
+                files_to_load.append((f"{ref.source_folder}/{ref.source_file}", ref.source_folder, ref.source_file, ref.path))
         except Exception as e:
-            print(f"Error parsing cfgeconomycore.xml: {e}")
+            logger.error("Error parsing cfgeconomycore.xml: %s", e)
     
     # 3. Load all identified files
-    for file_info in files_to_load:
+    for file_index, file_info in enumerate(files_to_load):
         source_identifier, source_folder, source_file, full_file_path = file_info
         
+        if job is not None:
+            job.update(percent=100.0 * file_index / len(files_to_load), files_total=len(files_to_load),
+                       files_parsed=file_count, elements_written=element_count)
+            if job.cancel_requested:
+                # Nothing has been committed yet
+                conn.close()
+                job.check_cancelled()
+        
         if not full_file_path.exists():
             continue
         
         try:
-            tree = ET.parse(full_file_path)
-            root = tree.getroot()
+            root = mission_data.types_root(full_file_path)
             
             elements = extract_element_data(root, element_type)
             
@@ -755,49 +1087,62 @@ def load_xml_to_database(mission_dir, element_type='type'):
             
             file_count += 1
         except Exception as e:
-            print(f"Error processing {full_file_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error processing %s: %s", full_file_path, e)
     
     conn.commit()
     conn.close()
     
+    if job is not None:
+        job.update(files_parsed=file_count, elements_written=element_count)
+    
     return {
         'file_count': file_count,
         'element_count': element_count
     }
 
 
-@app.route('/')
+@bp.route('/')
 def index():
     """Main page."""
-    return render_template('economy_editor.html')
+    # '' standalone, '/economy' when mounted by combined_app
+    return render_template('economy_editor.html', api_base=url_for('.index').rstrip('/'))
+
+
+def load_mission_data(mission_dir, element_type='type', job=None):
+    """Initialize the database and load the mission's XML files (the /api/load payload)."""
+    init_database(mission_dir)
+    result = load_xml_to_database(mission_dir, element_type, job)
+    change_events.publish(get_db_path(mission_dir), 'reload', {})
+    return {
+        'success': True,
+        'file_count': result['file_count'],
+        'element_count': result['element_count']
+    }
 
 
-@app.route('/api/load', methods=['POST'])
+@bp.route('/api/load', methods=['POST'])
 def load_data():
-    """Load XML data into the database."""
+    """
+    Load XML data into the database.
+    With "async": true the load runs as a background job (202 with its job_id).
+    """
     try:
         data = request.json
-        mission_dir = data.get('mission_dir', current_mission_dir)
+        mission_dir = missions.require(data.get('mission_dir'))
         element_type = data.get('element_type', 'type')
         
-        # Initialize database
-        init_database(mission_dir)
-        
-        # Load XML data
-        result = load_xml_to_database(mission_dir, element_type)
+        if wants_async(data):
+            job = jobs.submit('load', get_db_path(mission_dir),
+                              lambda job: load_mission_data(mission_dir, element_type, job),
+                              label=f'Load of {Path(mission_dir).name}')
+            return job_accepted(job)
         
-        return jsonify({
-            'success': True,
-            'file_count': result['file_count'],
-            'element_count': result['element_count']
-        })
+        return jsonify(load_mission_data(mission_dir, element_type))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/load-database', methods=['POST'])
+@bp.route('/api/load-database', methods=['POST'])
 def load_database():
     """Load data from a database file."""
     try:
@@ -823,24 +1168,27 @@ def load_database():
                 # Initialize the schema without populating reference data (no mission_dir)
                 init_database_for_file(db_file_path, mission_dir=None)
             else:
+                change_journal.ensure_schema(cursor)
+                conn.commit()
                 conn.close()
         except Exception as e:
             return jsonify({'success': False, 'error': f'Invalid database file: {str(e)}'}), 400
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in load_database")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/backup-database', methods=['POST'])
+@bp.route('/api/backup-database', methods=['POST'])
 def backup_database():
-    """Create a backup of the current database."""
+    """
+    Start an online backup of the database on a background thread.
+    Optional keep_last/keep_daily prune older backups (nothing is deleted without them),
+    compress gzips the new one;
+    poll /api/backup-database/<backup_id> for progress.
+    """
     try:
-        import shutil
-        from datetime import datetime
-        
         data = request.json
         db_file_path = data.get('db_file_path', '').strip()
         
@@ -851,813 +1199,1516 @@ def backup_database():
         if not db_file.exists():
             return jsonify({'success': False, 'error': 'Database file not found'}), 404
         
-        # Create backup filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_dir = db_file.parent / 'backups'
-        backup_dir.mkdir(exist_ok=True)
-        backup_file = backup_dir / f"{db_file.stem}_backup_{timestamp}{db_file.suffix}"
-        
-        # Copy database file
-        shutil.copy2(db_file, backup_file)
+        try:
+            policy = db_backup.RetentionPolicy.from_options(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Invalid retention options: {e}'}), 400
         
+        job = db_backup.start_backup(db_file, policy)
+        status = job.as_dict()
         return jsonify({
             'success': True,
-            'backup_path': str(backup_file)
-        })
+            'backup_id': job.id,
+            'backup_path': status['backup_path'],
+            'status': status
+        }), 202
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in backup_database")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/elements')
-def get_elements():
-    """Get all type elements from database."""
+@bp.route('/api/backup-database/<backup_id>')
+def backup_status(backup_id):
+    """Progress of a backup started by /api/backup-database."""
+    job = db_backup.get_job(backup_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Backup not found'}), 404
+    return jsonify({'success': True, 'status': job.as_dict()})
+
+
+@bp.route('/api/jobs')
+def list_background_jobs():
+    """Recent background jobs (newest first), only those of one database when mission_dir/db_file_path is given."""
+    key = db_file_from_params(request.args) if request.args.get('mission_dir') or request.args.get('db_file_path') else None
+    return jsonify({'success': True, 'jobs': [job.as_dict() for job in jobs.list_jobs(key)]})
+
+
+@bp.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Progress of a background load, import, export or backup."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'status': job.as_dict()})
+
+
+@bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Ask a background job to stop; it ends in the 'cancelled' state at its next check."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not job.cancel():
+        return jsonify({'success': False, 'error': f'Job already {job.state}', 'status': job.as_dict()}), 409
+    return jsonify({'success': True, 'status': job.as_dict()})
+
+
+def purge_orphans(cursor):
+    """
+    Remove rows whose foreign keys point at deleted parents (left behind while foreign
+    keys were not enforced). Follows each table's declared ON DELETE action: SET NULL
+    references are cleared, everything else is deleted. Returns {table: rows_purged}.
+    """
+    purged = {}
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = [row[0] for row in cursor.fetchall()]
+    for table in tables:
+        cursor.execute(f'PRAGMA foreign_key_list("{table}")')
+        for fk in cursor.fetchall():
+            parent, column, parent_column, on_delete = fk[2], fk[3], fk[4] or 'rowid', fk[6]
+            orphaned = f'"{column}" IS NOT NULL AND "{column}" NOT IN (SELECT "{parent_column}" FROM "{parent}")'
+            if on_delete == 'SET NULL':
+                cursor.execute(f'UPDATE "{table}" SET "{column}" = NULL WHERE {orphaned}')
+            else:
+                cursor.execute(f'DELETE FROM "{table}" WHERE {orphaned}')
+            if cursor.rowcount > 0:
+                purged[table] = purged.get(table, 0) + cursor.rowcount
+    if 'type_elements_fts' in tables:
+        cursor.execute('DELETE FROM type_elements_fts WHERE rowid NOT IN (SELECT id FROM type_elements)')
+        if cursor.rowcount > 0:
+            purged['type_elements_fts'] = cursor.rowcount
+        cursor.execute("INSERT INTO type_elements_fts (type_elements_fts) VALUES ('optimize')")
+    return purged
+
+
+@bp.route('/api/database-maintenance', methods=['POST'])
+def database_maintenance():
+    """Purge orphaned rows and old change journal entries, then ANALYZE and VACUUM the database."""
     try:
-        mission_dir = request.args.get('mission_dir')
-        db_file_path = request.args.get('db_file_path')
+        data = request.json or {}
+        mission_dir = missions.expand(data.get('mission_dir'))
+        db_file_path = data.get('db_file_path')
+        try:
+            journal_days = max(int(data.get('journal_days', change_journal.RETENTION_DAYS)), 0)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'journal_days must be an integer'}), 400
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
+            db_file = Path(db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
-        
-        # Ensure count_in_hoarder flag exists and is set for all elements
-        ensure_count_in_hoarder_flag(conn)
-        
+            db_file = get_db_path(mission_dir)
+        size_before = db_file.stat().st_size
         cursor = conn.cursor()
         
-        # Check if table exists, if not initialize schema
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_elements'")
-        if not cursor.fetchone():
-            conn.close()
-            # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
-            # Reconnect
-            if db_file_path:
-                conn = get_db_connection(db_file_path=db_file_path)
-            else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
-            # Ensure count_in_hoarder flag exists
-            ensure_count_in_hoarder_flag(conn)
-            cursor = conn.cursor()
-        
-        # Ensure export column exists (migration for existing DBs)
-        ensure_export_column(cursor)
+        purged = purge_orphans(cursor)
+        change_journal.ensure_schema(cursor)
+        journal_pruned = change_journal.prune(cursor, journal_days)
+        cursor.execute('ANALYZE')
         conn.commit()
-        
-        # Get all elements
-        cursor.execute('''
-            SELECT element_key, name, source_file, source_folder, COALESCE(export, 1) AS export
-            FROM type_elements
-            ORDER BY name
-        ''')
-        
-        elements = []
-        for row in cursor.fetchall():
-            element_key = row['element_key']
-            
-            # Load fields from type_element_fields
-            cursor.execute('''
-                SELECT field_name, field_value, data_type, field_order, attributes_json
-                FROM type_element_fields
-                WHERE element_key = ?
-                ORDER BY field_name, field_order
-            ''', (element_key,))
-            
-            data = {}
-            # Add name from type_elements table
-            if row['name']:
-                data['name'] = row['name']
-            
-            for field_row in cursor.fetchall():
-                field_name = field_row['field_name']
-                field_value = field_row['field_value']
-                field_order = field_row['field_order']
-                attributes_json = field_row['attributes_json']
-                
-                if field_order is not None:
-                    # Array field
-                    if field_name not in data:
-                        data[field_name] = []
-                    if attributes_json:
-                        attrs = json.loads(attributes_json)
-                        if field_value:
-                            attrs['_text'] = field_value
-                        data[field_name].append(attrs)
-                    else:
-                        data[field_name].append(field_value)
-                else:
-                    # Single value
-                    if attributes_json:
-                        attrs = json.loads(attributes_json)
-                        if field_value:
-                            attrs['_text'] = field_value
-                        data[field_name] = attrs
-                    else:
-                        data[field_name] = field_value
-            
-            # Get categories
-            cursor.execute('''
-                SELECT c.id, c.name
-                FROM categories c
-                JOIN element_categories ec ON c.id = ec.category_id
-                WHERE ec.element_key = ?
-            ''', (element_key,))
-            categories = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_categories'] = categories
-            data['_category_names'] = [c['name'] for c in categories]
-            
-            # Get tags
-            cursor.execute('''
-                SELECT t.id, t.name
-                FROM tags t
-                JOIN element_tags et ON t.id = et.tag_id
-                WHERE et.element_key = ?
-            ''', (element_key,))
-            tags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_tags'] = tags
-            data['_tag_names'] = [t['name'] for t in tags]
-            
-            # Get usageflags
-            cursor.execute('''
-                SELECT u.id, u.name
-                FROM usageflags u
-                JOIN element_usageflags eu ON u.id = eu.usageflag_id
-                WHERE eu.element_key = ?
-            ''', (element_key,))
-            usageflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_usageflags'] = usageflags
-            data['_usageflag_names'] = [u['name'] for u in usageflags]
-            
-            # Get valueflags
-            cursor.execute('''
-                SELECT v.id, v.name
-                FROM valueflags v
-                JOIN element_valueflags ev ON v.id = ev.valueflag_id
-                WHERE ev.element_key = ?
-            ''', (element_key,))
-            valueflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_valueflags'] = valueflags
-            data['_valueflag_names'] = [v['name'] for v in valueflags]
-            
-            # Get itemclass (always set, even if None)
-            cursor.execute('''
-                SELECT ic.id, ic.name
-                FROM itemclasses ic
-                JOIN element_itemclasses eic ON ic.id = eic.itemclass_id
-                WHERE eic.element_key = ?
-            ''', (element_key,))
-            itemclass_row = cursor.fetchone()
-            data['_itemclass_id'] = itemclass_row['id'] if itemclass_row else None
-            data['_itemclass_name'] = itemclass_row['name'] if itemclass_row else None
-            
-            # Get itemtags
-            cursor.execute('''
-                SELECT it.id, it.name
-                FROM itemtags it
-                JOIN element_itemtags eit ON it.id = eit.itemtag_id
-                WHERE eit.element_key = ?
-            ''', (element_key,))
-            itemtags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_itemtags'] = itemtags
-            data['_itemtag_names'] = [it['name'] for it in itemtags]
-            
-            # Get flags
-            cursor.execute('''
-                SELECT f.id, f.name
-                FROM flags f
-                JOIN element_flags ef ON f.id = ef.flag_id
-                WHERE ef.element_key = ? AND ef.value = 1
-            ''', (element_key,))
-            flags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-            data['_flags'] = flags
-            data['_flag_names'] = [f['name'] for f in flags]
-            
-            # Add metadata (export is DB-only, not in XML)
-            data['_export'] = bool(row['export'])
-            data['_element_key'] = element_key
-            data['_source_file'] = row['source_file']
-            data['_source_folder'] = row['source_folder']
-            folder_name = row['source_folder'] if row['source_folder'] else ''
-            source_file = row['source_file'] if row['source_file'] else ''
-            data['source'] = f"{folder_name}/{source_file}" if folder_name else source_file
-            
-            elements.append(data)
-        
+        # VACUUM cannot run inside a transaction
+        cursor.execute('VACUUM')
         conn.close()
         
+        logger.info("Database maintenance on %s purged %s, pruned journal %s", db_file, purged or 'no orphans', journal_pruned)
         return jsonify({
             'success': True,
-            'elements': elements,
-            'total': len(elements)
+            'purged': purged,
+            'journal_pruned': journal_pruned,
+            'size_before': size_before,
+            'size_after': db_file.stat().st_size
         })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        logger.exception("Unhandled error in database_maintenance")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/elements/delete', methods=['POST'])
-def delete_elements():
-    """Delete one or more elements from the database."""
+def _journal_connection(params):
+    """Connection for the journal endpoints from mission_dir/db_file_path request params."""
+    db_file_path = params.get('db_file_path')
+    if db_file_path:
+        conn = get_db_connection(db_file_path=db_file_path)
+    else:
+        conn = get_db_connection(params.get('mission_dir'))
+    change_journal.ensure_schema(conn.cursor())
+    return conn
+
+
+@bp.route('/api/journal')
+def get_journal():
+    """Recent change batches (newest first) and the named snapshots."""
     try:
-        data = request.json
-        element_keys = data.get('element_keys', [])
-        mission_dir = data.get('mission_dir')
-        db_file_path = data.get('db_file_path')
-        
-        if not element_keys:
-            return jsonify({'success': False, 'error': 'No elements specified for deletion'}), 400
-        
-        if db_file_path:
-            conn = get_db_connection(db_file_path=db_file_path)
-        else:
-            mission_dir = mission_dir or current_mission_dir
-            conn = get_db_connection(mission_dir)
+        try:
+            limit = min(int(request.args.get('limit', 50)), 500)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+        conn = _journal_connection(request.args)
         cursor = conn.cursor()
-        
-        deleted_count = 0
-        errors = []
-        
-        for element_key in element_keys:
-            try:
-                # Check if element exists
-                cursor.execute('SELECT element_key FROM type_elements WHERE element_key = ?', (element_key,))
-                if not cursor.fetchone():
-                    errors.append(f"Element '{element_key}' not found")
-                    continue
-                
-                # Delete element (CASCADE will handle related tables)
-                cursor.execute('DELETE FROM type_elements WHERE element_key = ?', (element_key,))
-                deleted_count += 1
-            except Exception as e:
-                errors.append(f"Error deleting '{element_key}': {str(e)}")
-        
+        batches = change_journal.list_batches(cursor, limit)
+        snapshots = change_journal.list_snapshots(cursor)
         conn.commit()
         conn.close()
-        
-        if errors and deleted_count == 0:
-            return jsonify({'success': False, 'error': 'Failed to delete elements', 'errors': errors}), 500
-        
         return jsonify({
             'success': True,
-            'deleted_count': deleted_count,
-            'errors': errors if errors else None
+            'batches': batches,
+            'can_undo': any(batch['state'] == 'applied' for batch in batches),
+            'can_redo': any(batch['state'] == 'undone' for batch in batches),
+            'snapshots': snapshots
         })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_journal")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/elements/create', methods=['POST'])
-def create_element():
-    """Create a new element in the database."""
+def _replay_journal(operation, *args):
+    """Run an undo/redo/restore in one transaction; 409 when the journal cannot be applied."""
+    conn = _journal_connection(request.json or {})
     try:
-        data = request.json
-        element_key = data.get('element_key')
-        name = data.get('name')
-        mission_dir = data.get('mission_dir')
-        db_file_path = data.get('db_file_path')
-        
-        if not element_key:
-            return jsonify({'success': False, 'error': 'element_key is required'}), 400
-        
-        if db_file_path:
-            conn = get_db_connection(db_file_path=db_file_path)
-        else:
-            mission_dir = mission_dir or current_mission_dir
-            conn = get_db_connection(mission_dir)
-        cursor = conn.cursor()
-        
-        # Check if element already exists
-        cursor.execute('SELECT element_key FROM type_elements WHERE element_key = ?', (element_key,))
-        if cursor.fetchone():
+        result = operation(conn, *args)
+        conn.commit()
+        batches = result if isinstance(result, list) else [result]
+        publish_element_changes(db_file_from_params(request.json or {}), [batch['batch_id'] for batch in batches])
+        return jsonify({'success': True, 'result': result})
+    except (change_journal.JournalError, sqlite3.IntegrityError) as e:
+        conn.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
+    finally:
+        conn.close()
+
+
+@bp.route('/api/journal/undo', methods=['POST'])
+def undo_changes():
+    """Revert the most recent change batch (one mutating request)."""
+    try:
+        return _replay_journal(change_journal.undo)
+    except Exception as e:
+        logger.exception("Unhandled error in undo_changes")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/journal/redo', methods=['POST'])
+def redo_changes():
+    """Re-apply the most recently undone change batch."""
+    try:
+        return _replay_journal(change_journal.redo)
+    except Exception as e:
+        logger.exception("Unhandled error in redo_changes")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/journal/snapshots', methods=['GET', 'POST'])
+def manage_snapshots():
+    """List named snapshots, or create one at the current point of the journal."""
+    try:
+        if request.method == 'GET':
+            conn = _journal_connection(request.args)
+            snapshots = change_journal.list_snapshots(conn.cursor())
+            conn.commit()
             conn.close()
-            return jsonify({'success': False, 'error': f'Element with key "{element_key}" already exists'}), 400
-        
-        # Insert new element (export defaults to true)
-        cursor.execute('''
-            INSERT INTO type_elements 
-            (element_key, name, source_file, source_folder, export, created_at, updated_at)
-            VALUES (?, ?, NULL, NULL, 1, ?, ?)
-        ''', (element_key, name, datetime.now().isoformat(), datetime.now().isoformat()))
-        
-        # Handle itemclass (single selection)
-        itemclass_id = data.get('itemclass_id')
-        if itemclass_id:
-            cursor.execute('''
-                INSERT INTO element_itemclasses (element_key, itemclass_id)
-                VALUES (?, ?)
-            ''', (element_key, itemclass_id))
-        
-        # Handle itemtags (multiple)
-        itemtag_ids = data.get('itemtag_ids', [])
-        for itemtag_id in itemtag_ids:
-            cursor.execute('''
-                INSERT INTO element_itemtags (element_key, itemtag_id)
-                VALUES (?, ?)
-            ''', (element_key, itemtag_id))
-        
-        # Handle categories (multiple)
-        category_ids = data.get('category_ids', [])
-        for category_id in category_ids:
-            cursor.execute('''
-                INSERT INTO element_categories (element_key, category_id)
-                VALUES (?, ?)
-            ''', (element_key, category_id))
-        
-        # Handle tags (multiple)
-        tag_ids = data.get('tag_ids', [])
-        for tag_id in tag_ids:
-            cursor.execute('''
-                INSERT INTO element_tags (element_key, tag_id)
-                VALUES (?, ?)
-            ''', (element_key, tag_id))
-        
-        # Handle usageflags (multiple)
-        usageflag_ids = data.get('usageflag_ids', [])
-        for usageflag_id in usageflag_ids:
-            cursor.execute('''
-                INSERT INTO element_usageflags (element_key, usageflag_id)
-                VALUES (?, ?)
-            ''', (element_key, usageflag_id))
-        
-        # Handle valueflags (multiple)
-        valueflag_ids = data.get('valueflag_ids', [])
-        for valueflag_id in valueflag_ids:
-            cursor.execute('''
-                INSERT INTO element_valueflags (element_key, valueflag_id)
-                VALUES (?, ?)
-            ''', (element_key, valueflag_id))
-        
-        # Handle flags (multiple)
-        flag_ids = data.get('flag_ids', [])
-        for flag_id in flag_ids:
-            cursor.execute('''
-                INSERT INTO element_flags (element_key, flag_id, value)
-                VALUES (?, ?, 1)
-            ''', (element_key, flag_id))
-        
-        # Handle custom fields (from JSON)
-        custom_fields = data.get('custom_fields', {})
-        if isinstance(custom_fields, dict):
-            for field_name, field_value in custom_fields.items():
-                if field_name.startswith('_'):
-                    continue  # Skip metadata fields
-                
-                data_type = infer_data_type(field_value)
-                cursor.execute('''
-                    INSERT INTO type_element_fields 
-                    (element_key, field_name, field_value, data_type, field_order, attributes_json)
-                    VALUES (?, ?, ?, ?, NULL, NULL)
-                ''', (element_key, field_name, str(field_value), data_type))
-        
+            return jsonify({'success': True, 'snapshots': snapshots})
+        
+        data = request.json or {}
+        name = (data.get('name') or '').strip()
+        if not name:
+            return jsonify({'success': False, 'error': 'Snapshot name is required'}), 400
+        conn = _journal_connection(data)
+        snapshot = change_journal.create_snapshot(conn.cursor(), name)
         conn.commit()
         conn.close()
-        
-        return jsonify({
-            'success': True,
-            'element_key': element_key,
-            'message': f'Element "{element_key}" created successfully'
-        })
+        return jsonify({'success': True, 'snapshot': snapshot})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in manage_snapshots")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/import-xml', methods=['POST'])
-def import_xml():
-    """Import elements from a user-specified XML file."""
+@bp.route('/api/journal/snapshots/<path:name>/restore', methods=['POST'])
+def restore_snapshot(name):
+    """Undo every change made after the named snapshot."""
     try:
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
-        
-        mission_dir = request.form.get('mission_dir', '')
-        db_file_path = request.form.get('db_file_path', '')
-        element_type = request.form.get('element_type', 'type')
-        
-        # Get decisions from form data (overwrite_all, skip_all, or individual decisions)
-        overwrite_all = request.form.get('overwrite_all', 'false').lower() == 'true'
-        skip_all = request.form.get('skip_all', 'false').lower() == 'true'
-        decisions_json = request.form.get('decisions', '{}')  # JSON object with element_key -> 'overwrite' or 'skip'
-        
-        try:
-            decisions = json.loads(decisions_json) if decisions_json else {}
-        except:
-            decisions = {}
-        
-        # Save uploaded file temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as tmp_file:
-            file.save(tmp_file.name)
-            tmp_path = tmp_file.name
-        
-        try:
-            # Create backup before import
-            if db_file_path:
-                import shutil
-                from datetime import datetime
-                db_file = Path(db_file_path)
-                if db_file.exists():
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    backup_dir = db_file.parent / 'backups'
-                    backup_dir.mkdir(exist_ok=True)
-                    backup_file = backup_dir / f"{db_file.stem}_backup_{timestamp}{db_file.suffix}"
-                    shutil.copy2(db_file, backup_file)
-            
-            # Process import
-            result = import_xml_file(tmp_path, mission_dir, db_file_path, element_type, overwrite_all, skip_all, decisions)
-            return jsonify(result)
-        finally:
-            # Clean up temporary file
-            try:
-                import os
-                os.unlink(tmp_path)
-            except:
-                pass
-                
+        return _replay_journal(change_journal.restore_snapshot, name)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in restore_snapshot")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/import-xml/check-duplicates', methods=['POST'])
-def check_import_duplicates():
-    """Check which elements in an XML file would be duplicates."""
+# Change events (see change_events.py); batches touching more elements publish "reload"
+EVENT_MAX_ELEMENTS = 500
+
+# /api/elements record keys fed by type_elements columns and the element link tables
+TYPE_ELEMENT_EVENT_KEYS = {
+    'name': ('name',),
+    'export': ('_export',),
+    'source_file': ('_source_file', 'source'),
+    'source_folder': ('_source_folder', 'source'),
+}
+ELEMENT_EVENT_KEYS = {
+    'element_categories': ('_categories', '_category_names'),
+    'element_tags': ('_tags', '_tag_names'),
+    'element_usageflags': ('_usageflags', '_usageflag_names'),
+    'element_valueflags': ('_valueflags', '_valueflag_names'),
+    'element_itemclasses': ('_itemclass_id', '_itemclass_name'),
+    'element_itemtags': ('_itemtags', '_itemtag_names'),
+    'element_flags': ('_flags', '_flag_names'),
+}
+
+
+def element_change_event(cursor, batch_ids):
+    """
+    What journal batches changed, as the "elements" event payload: the current value of
+    every record key they touched per element ({'element_key', 'fields'}; whole records
+    for added elements) and the keys of deleted elements. 'reference' is True when
+    reference tables changed too. None when more than EVENT_MAX_ELEMENTS were touched.
+    """
+    placeholders = ','.join('?' * len(batch_ids))
+    cursor.execute(f'''
+        SELECT element_key, table_name, op, old_value, new_value,
+               json_extract(COALESCE(new_value, old_value), '$.field_name') AS field_name
+        FROM change_journal
+        WHERE batch_id IN ({placeholders})
+    ''', batch_ids)
+    touched = {}
+    reference = False
+    for row in cursor.fetchall():
+        if row['element_key'] is None:
+            reference = reference or row['table_name'] in REFERENCE_TABLES
+            continue
+        keys = touched.setdefault(row['element_key'], set())
+        if row['table_name'] == 'type_element_fields':
+            keys.add(row['field_name'])
+        elif row['table_name'] == 'type_elements' and row['op'] != 'update':
+            keys.add(None)  # added, deleted or re-created: send the whole record
+        elif row['table_name'] == 'type_elements':
+            # Most edits only touch updated_at here
+            old, new = json.loads(row['old_value']), json.loads(row['new_value'])
+            for column, column_keys in TYPE_ELEMENT_EVENT_KEYS.items():
+                if old.get(column) != new.get(column):
+                    keys.update(column_keys)
+        else:
+            keys.update(ELEMENT_EVENT_KEYS.get(row['table_name'], ()))
+    if len(touched) > EVENT_MAX_ELEMENTS:
+        return None
+    
+    changed = []
+    deleted = []
+    for element_key, keys in touched.items():
+        if not keys:
+            continue
+        cursor.execute('''
+            SELECT element_key, name, source_file, source_folder, COALESCE(export, 1) AS export
+            FROM type_elements
+            WHERE element_key = ?
+        ''', (element_key,))
+        row = cursor.fetchone()
+        if row is None:
+            deleted.append(element_key)
+            continue
+        record = build_element_record(cursor, row)
+        if None not in keys:
+            # A removed field is sent as null
+            record = {key: record.get(key) for key in keys}
+        changed.append({'element_key': element_key, 'fields': record})
+    return {'changed': changed, 'deleted': deleted, 'reference': reference}
+
+
+def publish_element_changes(db_file, batch_ids):
+    """Publish what journal batches changed to the editors watching db_file."""
+    if not batch_ids or not change_events.is_watched(db_file):
+        return
     try:
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
-        
-        mission_dir = request.form.get('mission_dir', '')
-        db_file_path = request.form.get('db_file_path', '')
-        element_type = request.form.get('element_type', 'type')
-        
-        # Save uploaded file temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as tmp_file:
-            file.save(tmp_file.name)
-            tmp_path = tmp_file.name
-        
+        conn = instrumentation.connect(str(db_file))
+        conn.row_factory = sqlite3.Row
         try:
-            # Get database connection
-            if db_file_path:
-                conn = get_db_connection(db_file_path=db_file_path)
-            else:
-                mission_dir = mission_dir or current_mission_dir
-                conn = get_db_connection(mission_dir)
-            cursor = conn.cursor()
-            
-            # Get existing element keys
-            cursor.execute('SELECT element_key, name FROM type_elements')
-            existing_elements = {row['element_key']: row['name'] for row in cursor.fetchall()}
-            conn.close()
-            
-            # Parse XML file
-            tree = ET.parse(tmp_path)
-            root = tree.getroot()
-            elements = extract_element_data(root, element_type)
-            
-            duplicates = []
-            new_elements = []
-            
-            for elem in elements:
-                name_value = elem.get('name')
-                if not name_value:
-                    continue
-                
-                element_key = str(name_value)
-                
-                if element_key in existing_elements:
-                    duplicates.append({
-                        'element_key': element_key,
-                        'name': name_value,
-                        'existing_name': existing_elements[element_key]
-                    })
-                else:
-                    new_elements.append({
-                        'element_key': element_key,
-                        'name': name_value
-                    })
-            
-            return jsonify({
-                'success': True,
-                'duplicates': duplicates,
-                'new_elements': new_elements,
-                'total': len(elements),
-                'duplicate_count': len(duplicates),
-                'new_count': len(new_elements)
-            })
+            event = element_change_event(conn.cursor(), batch_ids)
         finally:
-            # Clean up temporary file
-            try:
-                import os
-                os.unlink(tmp_path)
-            except:
-                pass
-                
+            conn.close()
+    except Exception:
+        logger.exception("Could not build change event for %s", db_file)
+        return
+    if event is None:
+        change_events.publish(db_file, 'reload', {})
+        return
+    if event['changed'] or event['deleted']:
+        change_events.publish(db_file, 'elements', {'changed': event['changed'], 'deleted': event['deleted']})
+    if event['reference']:
+        change_events.publish(db_file, 'reference', {})
+
+
+@bp.route('/api/events')
+def change_event_stream():
+    """
+    Server-Sent Events stream of the changes made to the selected database.
+    Events: "elements" ({changed: [{element_key, fields}], deleted: [element_key]}),
+    "reference" (refetch the reference data), "reload" (too much changed to send) and
+    "resync" (events were missed while disconnected; reload).
+    """
+    try:
+        return change_events.event_stream_response(db_file_from_params(request.args))
+    except missions.NoMissionSelected as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in change_event_stream")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-def import_xml_file(xml_file_path, mission_dir, db_file_path, element_type='type', overwrite_all=False, skip_all=False, decisions=None):
+@bp.route('/api/missions', methods=['GET'])
+def list_missions():
+    """Configured missions and the ones this process has open, most recently used first."""
+    return jsonify({'success': True, 'missions': missions.list_missions(), 'default': missions.registry.default})
+
+
+def build_element_record(cursor, row):
     """
-    Import elements from an XML file into the database.
-    Returns statistics about the import operation.
+    The /api/elements record of one type_elements row (element_key, name, source_file,
+    source_folder, export): its fields plus the linked categories, flags etc.
     """
-    if decisions is None:
-        decisions = {}
+    element_key = row['element_key']
     
-    try:
-        # Get database connection
-        if db_file_path:
-            conn = get_db_connection(db_file_path=db_file_path)
-        else:
-            mission_dir = mission_dir or current_mission_dir
-            conn = get_db_connection(mission_dir)
-        cursor = conn.cursor()
-        
-        # Parse XML file
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        elements = extract_element_data(root, element_type)
-        
-        # Get existing element keys
-        cursor.execute('SELECT element_key FROM type_elements')
-        existing_keys = {row['element_key'] for row in cursor.fetchall()}
-        
-        added_count = 0
-        updated_count = 0
-        skipped_count = 0
-        errors = []
-        
-        source_file = Path(xml_file_path).name
-        source_folder = 'imported'
+    # Load fields from type_element_fields
+    cursor.execute('''
+        SELECT field_name, field_value, data_type, field_order, attributes_json
+        FROM type_element_fields
+        WHERE element_key = ?
+        ORDER BY field_name, field_order
+    ''', (element_key,))
+    
+    data = {}
+    # Add name from type_elements table
+    if row['name']:
+        data['name'] = row['name']
+    
+    for field_row in cursor.fetchall():
+        field_name = field_row['field_name']
+        field_value = field_row['field_value']
+        field_order = field_row['field_order']
+        attributes_json = field_row['attributes_json']
         
-        for elem in elements:
-            try:
-                name_value = elem.get('name')
-                if not name_value:
-                    continue
-                
-                element_key = str(name_value)
-                is_duplicate = element_key in existing_keys
-                
-                # Determine action for duplicates
-                if is_duplicate:
-                    if skip_all:
-                        skipped_count += 1
-                        continue
-                    elif overwrite_all:
-                        action = 'overwrite'
-                    elif element_key in decisions:
-                        action = decisions[element_key]
-                    else:
-                        # Should not happen if client sent decisions correctly
-                        skipped_count += 1
-                        continue
-                    
-                    if action == 'skip':
-                        skipped_count += 1
-                        continue
-                    elif action == 'overwrite':
-                        # Delete existing element first (CASCADE will handle related tables)
-                        cursor.execute('DELETE FROM type_elements WHERE element_key = ?', (element_key,))
-                        updated_count += 1
-                
-                # Insert or update element (preserve export on update - DB-only field)
-                cursor.execute('''
-                    INSERT INTO type_elements 
-                    (element_key, name, source_file, source_folder, export, updated_at)
-                    VALUES (?, ?, ?, ?, 1, ?)
-                    ON CONFLICT(element_key) DO UPDATE SET
-                        name = excluded.name,
-                        source_file = excluded.source_file,
-                        source_folder = excluded.source_folder,
-                        updated_at = excluded.updated_at
-                ''', (element_key, name_value, source_file, source_folder, datetime.now().isoformat()))
-                
-                # Delete existing fields for this element
-                cursor.execute('DELETE FROM type_element_fields WHERE element_key = ?', (element_key,))
-                
-                # Process and save fields to normalized table
-                # First, handle relationships (categories, tags, usageflags, valueflags, flags)
-                relationship_fields = ['category', 'tag', 'usage', 'value', 'flags']
-                for field_name, field_value in elem.items():
-                    if field_name == 'name' or field_name.startswith('_'):
-                        continue
-                    
-                    # Skip relationship fields - they'll be handled separately
-                    if field_name in relationship_fields:
-                        continue
-                    
-                    # Handle different field types
-                    if isinstance(field_value, list):
-                        for idx, item in enumerate(field_value):
-                            if isinstance(item, dict):
-                                # Store as field with attributes
-                                attributes_json = json.dumps({k: v for k, v in item.items() if k != '_text'})
-                                text_value = item.get('_text')
-                                cursor.execute('''
-                                    INSERT INTO type_element_fields 
-                                    (element_key, field_name, field_value, data_type, field_order, attributes_json)
-                                    VALUES (?, ?, ?, ?, ?, ?)
-                                ''', (element_key, field_name, text_value, infer_data_type(text_value), idx, attributes_json))
-                            else:
-                                # Simple list item
-                                cursor.execute('''
-                                    INSERT INTO type_element_fields 
-                                    (element_key, field_name, field_value, data_type, field_order)
-                                    VALUES (?, ?, ?, ?, ?)
-                                ''', (element_key, field_name, str(item), infer_data_type(item), idx))
-                    elif isinstance(field_value, dict):
-                        # Store as single field with attributes
-                        attributes_json = json.dumps({k: v for k, v in field_value.items() if k != '_text'})
-                        text_value = field_value.get('_text')
-                        cursor.execute('''
-                            INSERT INTO type_element_fields 
-                            (element_key, field_name, field_value, data_type, attributes_json)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (element_key, field_name, text_value, infer_data_type(text_value), attributes_json))
-                    else:
-                        # Simple value
-                        cursor.execute('''
-                            INSERT INTO type_element_fields 
-                            (element_key, field_name, field_value, data_type)
-                            VALUES (?, ?, ?, ?)
-                        ''', (element_key, field_name, str(field_value), infer_data_type(field_value)))
-                
-                # Handle categories, tags, usageflags, valueflags, flags relationships
-                for field_name, field_value in elem.items():
-                    if field_name == 'name' or field_name.startswith('_'):
-                        continue
-                    
-                    # Handle categories
-                    if field_name == 'category':
-                        if isinstance(field_value, dict) and 'name' in field_value:
-                            cat_name = field_value['name']
-                            cursor.execute('SELECT id FROM categories WHERE name = ?', (cat_name,))
-                            cat_row = cursor.fetchone()
-                            if cat_row:
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO element_categories (element_key, category_id)
-                                    VALUES (?, ?)
-                                ''', (element_key, cat_row['id']))
-                        elif isinstance(field_value, list):
-                            for cat_item in field_value:
-                                if isinstance(cat_item, dict) and 'name' in cat_item:
-                                    cat_name = cat_item['name']
-                                    cursor.execute('SELECT id FROM categories WHERE name = ?', (cat_name,))
-                                    cat_row = cursor.fetchone()
-                                    if cat_row:
-                                        cursor.execute('''
-                                            INSERT OR REPLACE INTO element_categories (element_key, category_id)
-                                            VALUES (?, ?)
-                                        ''', (element_key, cat_row['id']))
-                        continue
-                    
-                    # Handle tags
-                    if field_name == 'tag':
-                        tag_names = []
-                        if isinstance(field_value, dict) and 'name' in field_value:
-                            tag_names = [field_value['name']]
-                        elif isinstance(field_value, list):
-                            tag_names = [item.get('name') for item in field_value if isinstance(item, dict) and 'name' in item]
-                        
-                        for tag_name in tag_names:
-                            cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-                            tag_row = cursor.fetchone()
-                            if tag_row:
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO element_tags (element_key, tag_id)
-                                    VALUES (?, ?)
-                                ''', (element_key, tag_row['id']))
-                        continue
-                    
-                    # Handle usage
-                    if field_name == 'usage':
-                        usage_names = []
-                        if isinstance(field_value, dict) and 'name' in field_value:
-                            usage_names = [field_value['name']]
-                        elif isinstance(field_value, list):
-                            usage_names = [item.get('name') for item in field_value if isinstance(item, dict) and 'name' in item]
-                        
-                        for usage_name in usage_names:
-                            cursor.execute('SELECT id FROM usageflags WHERE name = ?', (usage_name,))
-                            usage_row = cursor.fetchone()
-                            if usage_row:
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO element_usageflags (element_key, usageflag_id)
-                                    VALUES (?, ?)
-                                ''', (element_key, usage_row['id']))
-                        continue
-                    
-                    # Handle value
-                    if field_name == 'value':
-                        value_names = []
-                        if isinstance(field_value, dict) and 'name' in field_value:
-                            value_names = [field_value['name']]
-                        elif isinstance(field_value, list):
-                            value_names = [item.get('name') for item in field_value if isinstance(item, dict) and 'name' in item]
-                        
-                        for value_name in value_names:
-                            cursor.execute('SELECT id FROM valueflags WHERE name = ?', (value_name,))
-                            value_row = cursor.fetchone()
-                            if value_row:
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO element_valueflags (element_key, valueflag_id)
-                                    VALUES (?, ?)
-                                ''', (element_key, value_row['id']))
-                        continue
-                    
-                    # Handle flags - extract attributes as boolean flags
-                    if field_name == 'flags':
-                        flags_dict = None
-                        if isinstance(field_value, dict):
-                            flags_dict = field_value
-                        elif isinstance(field_value, list) and len(field_value) > 0:
-                            flags_dict = {}
-                            for item in field_value:
-                                if isinstance(item, dict):
-                                    flags_dict.update(item)
-                        
-                        if flags_dict:
-                            for flag_name, flag_value in flags_dict.items():
-                                # Get or create flag
-                                cursor.execute('SELECT id FROM flags WHERE name = ?', (flag_name,))
-                                flag_row = cursor.fetchone()
-                                if not flag_row:
-                                    cursor.execute('INSERT INTO flags (name) VALUES (?)', (flag_name,))
-                                    flag_id = cursor.lastrowid
-                                else:
-                                    flag_id = flag_row['id']
-                                
-                                # Store flag value (0 or 1)
-                                flag_val = 1 if str(flag_value).strip() in ('1', 'true', 'True') else 0
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO element_flags (element_key, flag_id, value)
-                                    VALUES (?, ?, ?)
-                                ''', (element_key, flag_id, flag_val))
-                        continue
+        if field_order is not None:
+            # Array field
+            if field_name not in data:
+                data[field_name] = []
+            if attributes_json:
+                attrs = json.loads(attributes_json)
+                if field_value:
+                    attrs['_text'] = field_value
+                data[field_name].append(attrs)
+            else:
+                data[field_name].append(field_value)
+        else:
+            # Single value
+            if attributes_json:
+                attrs = json.loads(attributes_json)
+                if field_value:
+                    attrs['_text'] = field_value
+                data[field_name] = attrs
+            else:
+                data[field_name] = field_value
+    
+    # Get categories
+    cursor.execute('''
+        SELECT c.id, c.name
+        FROM categories c
+        JOIN element_categories ec ON c.id = ec.category_id
+        WHERE ec.element_key = ?
+    ''', (element_key,))
+    categories = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_categories'] = categories
+    data['_category_names'] = [c['name'] for c in categories]
+    
+    # Get tags
+    cursor.execute('''
+        SELECT t.id, t.name
+        FROM tags t
+        JOIN element_tags et ON t.id = et.tag_id
+        WHERE et.element_key = ?
+    ''', (element_key,))
+    tags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_tags'] = tags
+    data['_tag_names'] = [t['name'] for t in tags]
+    
+    # Get usageflags
+    cursor.execute('''
+        SELECT u.id, u.name
+        FROM usageflags u
+        JOIN element_usageflags eu ON u.id = eu.usageflag_id
+        WHERE eu.element_key = ?
+    ''', (element_key,))
+    usageflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_usageflags'] = usageflags
+    data['_usageflag_names'] = [u['name'] for u in usageflags]
+    
+    # Get valueflags
+    cursor.execute('''
+        SELECT v.id, v.name
+        FROM valueflags v
+        JOIN element_valueflags ev ON v.id = ev.valueflag_id
+        WHERE ev.element_key = ?
+    ''', (element_key,))
+    valueflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_valueflags'] = valueflags
+    data['_valueflag_names'] = [v['name'] for v in valueflags]
+    
+    # Get itemclass (always set, even if None)
+    cursor.execute('''
+        SELECT ic.id, ic.name
+        FROM itemclasses ic
+        JOIN element_itemclasses eic ON ic.id = eic.itemclass_id
+        WHERE eic.element_key = ?
+    ''', (element_key,))
+    itemclass_row = cursor.fetchone()
+    data['_itemclass_id'] = itemclass_row['id'] if itemclass_row else None
+    data['_itemclass_name'] = itemclass_row['name'] if itemclass_row else None
+    
+    # Get itemtags
+    cursor.execute('''
+        SELECT it.id, it.name
+        FROM itemtags it
+        JOIN element_itemtags eit ON it.id = eit.itemtag_id
+        WHERE eit.element_key = ?
+    ''', (element_key,))
+    itemtags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_itemtags'] = itemtags
+    data['_itemtag_names'] = [it['name'] for it in itemtags]
+    
+    # Get flags
+    cursor.execute('''
+        SELECT f.id, f.name
+        FROM flags f
+        JOIN element_flags ef ON f.id = ef.flag_id
+        WHERE ef.element_key = ? AND ef.value = 1
+    ''', (element_key,))
+    flags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+    data['_flags'] = flags
+    data['_flag_names'] = [f['name'] for f in flags]
+    
+    # Add metadata (export is DB-only, not in XML)
+    data['_export'] = bool(row['export'])
+    data['_element_key'] = element_key
+    data['_source_file'] = row['source_file']
+    data['_source_folder'] = row['source_folder']
+    folder_name = row['source_folder'] if row['source_folder'] else ''
+    source_file = row['source_file'] if row['source_file'] else ''
+    data['source'] = f"{folder_name}/{source_file}" if folder_name else source_file
+    
+    return data
+
+
+@bp.route('/api/elements')
+def get_elements():
+    """Get all type elements from database."""
+    try:
+        mission_dir = missions.expand(request.args.get('mission_dir'))
+        db_file_path = request.args.get('db_file_path')
+        
+        etag = db_etag(mission_dir, db_file_path)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        if db_file_path:
+            conn = get_db_connection(db_file_path=db_file_path)
+        else:
+            mission_dir = missions.require(mission_dir)
+            conn = get_db_connection(mission_dir)
+        
+        # Ensure count_in_hoarder flag exists and is set for all elements
+        ensure_count_in_hoarder_flag(conn)
+        
+        cursor = conn.cursor()
+        
+        # Check if table exists, if not initialize schema
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_elements'")
+        if not cursor.fetchone():
+            conn.close()
+            # Initialize schema
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
+            # Reconnect
+            if db_file_path:
+                conn = get_db_connection(db_file_path=db_file_path)
+            else:
+                conn = get_db_connection(mission_dir)
+            # Ensure count_in_hoarder flag exists
+            ensure_count_in_hoarder_flag(conn)
+            cursor = conn.cursor()
+        
+        # Ensure export column, typed core table and change journal exist (migration for existing DBs)
+        ensure_export_column(cursor)
+        ensure_type_element_core(cursor)
+        change_journal.ensure_schema(cursor)
+        conn.commit()
+        
+        # Get all elements
+        cursor.execute('''
+            SELECT element_key, name, source_file, source_folder, COALESCE(export, 1) AS export
+            FROM type_elements
+            ORDER BY name
+        ''')
+        
+        elements = []
+        for row in cursor.fetchall():
+            elements.append(build_element_record(cursor, row))
+        
+        conn.close()
+        
+        # Schema/flag migrations above may have touched the file; tag the settled state
+        return http_cache.with_etag(jsonify({
+            'success': True,
+            'elements': elements,
+            'total': len(elements)
+        }), db_etag(mission_dir, db_file_path))
+    except Exception as e:
+        logger.exception("Unhandled error in get_elements")
+        return jsonify({'error': str(e)}), 500
+
+
+ELEMENT_QUERY_OPERATORS = {'>': '>', '>=': '>=', '<': '<', '<=': '<=', '=': '=', '!=': '<>'}
+ELEMENT_QUERY_MAX_LIMIT = 5000
+_CORE_FILTER_RE = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def parse_core_filters(filters):
+    """
+    Parse filter expressions such as ["nominal>50", "lifetime<3600"] into a SQL
+    WHERE fragment over type_element_core (c) and its parameters.
+    Raises ValueError for unknown fields or malformed expressions.
+    """
+    clauses = []
+    params = []
+    for expression in filters:
+        match = _CORE_FILTER_RE.match(expression)
+        if not match:
+            raise ValueError(f"Invalid filter '{expression}' (expected e.g. nominal>50)")
+        field, operator, value = match.groups()
+        if field not in TYPE_CORE_FIELDS:
+            raise ValueError(f"Unknown filter field '{field}' (choose from {', '.join(TYPE_CORE_FIELDS)})")
+        clauses.append(f'c."{field}" {ELEMENT_QUERY_OPERATORS[operator]} ?')
+        params.append(float(value) if '.' in value else int(value))
+    return ' AND '.join(clauses), params
+
+
+@bp.route('/api/elements/query')
+def query_elements():
+    """
+    Filter and sort elements on the typed core fields inside SQLite.
+    Args: filter (repeatable, e.g. filter=nominal>50&filter=lifetime<3600),
+    sort (a core field or 'name'), order (asc/desc), limit, offset.
+    """
+    try:
+        mission_dir = missions.expand(request.args.get('mission_dir'))
+        db_file_path = request.args.get('db_file_path')
+        
+        try:
+            where_sql, params = parse_core_filters(request.args.getlist('filter'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        sort = request.args.get('sort', 'name')
+        if sort != 'name' and sort not in TYPE_CORE_FIELDS:
+            return jsonify({'success': False, 'error': f"Unknown sort field '{sort}'"}), 400
+        order = 'DESC' if request.args.get('order', 'asc').lower() == 'desc' else 'ASC'
+        try:
+            limit = min(max(int(request.args.get('limit', 500)), 1), ELEMENT_QUERY_MAX_LIMIT)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit and offset must be integers'}), 400
+        
+        etag = db_etag(mission_dir, db_file_path)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        if db_file_path:
+            conn = get_db_connection(db_file_path=db_file_path)
+        else:
+            conn = get_db_connection(mission_dir)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_elements'")
+        if not cursor.fetchone():
+            conn.close()
+            return jsonify({'success': True, 'total': 0, 'elements': []})
+        ensure_type_element_core(cursor)
+        conn.commit()
+        
+        where = f'WHERE {where_sql}' if where_sql else ''
+        cursor.execute(f'SELECT COUNT(*) FROM type_element_core c {where}', params)
+        total = cursor.fetchone()[0]
+        
+        if sort == 'name':
+            parts = [('', f'e.name {order}')]
+        else:
+            # Non-numeric (NULL) values sort last in both orders. Each part is read in
+            # idx_core_<sort>_key order, so SQLite pages through the index without sorting.
+            column = f'c."{sort}"'
+            parts = [
+                (f'{column} IS NOT NULL', f'{column} {order}, c.element_key {order}'),
+                (f'{column} IS NULL', f'c.element_key {order}'),
+            ]
+        core_columns = ', '.join(f'c."{field}"' for field in TYPE_CORE_FIELDS)
+        rows = []
+        skip = offset
+        for condition, order_by in parts:
+            part_where = ' AND '.join(clause for clause in (where_sql, condition) if clause)
+            part_where = f'WHERE {part_where}' if part_where else ''
+            cursor.execute(f'''
+                SELECT c.element_key, e.name, e.source_folder, e.source_file, {core_columns}
+                FROM type_element_core c
+                JOIN type_elements e ON e.element_key = c.element_key
+                {part_where}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            ''', (*params, limit - len(rows), skip))
+            part_rows = cursor.fetchall()
+            rows.extend(part_rows)
+            if len(rows) >= limit:
+                break
+            if part_rows:
+                skip = 0
+            elif skip:
+                # The page starts past this part; skip over its rows in the next one
+                cursor.execute(f'SELECT COUNT(*) FROM type_element_core c {part_where}', params)
+                skip = max(skip - cursor.fetchone()[0], 0)
+        
+        elements = []
+        for row in rows:
+            element = {
+                'element_key': row['element_key'],
+                'name': row['name'],
+                'source': f"{row['source_folder']}/{row['source_file']}" if row['source_folder'] else row['source_file'],
+            }
+            for field in TYPE_CORE_FIELDS:
+                element[field] = row[field]
+            elements.append(element)
+        conn.close()
+        
+        return http_cache.with_etag(jsonify({
+            'success': True,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'elements': elements
+        }), etag)
+    except Exception as e:
+        logger.exception("Unhandled error in query_elements")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+ELEMENT_SEARCH_MAX_LIMIT = 500
+# bm25 column weights, in ELEMENT_SEARCH_COLUMNS order: name matches rank first
+ELEMENT_SEARCH_WEIGHTS = (10.0, 2.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+_SEARCH_TOKEN_RE = re.compile(r'(\w+:)?"([^"]*)"?|(\S+)')
+_SEARCH_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def build_search_query(text):
+    """
+    Turn user search input into an FTS5 MATCH expression.
+    
+    Every word is a prefix match and words are ANDed, so "ammo_ 762" finds
+    Ammo_762x39. Upper-case AND/OR/NOT combine terms, "quoted text" is a phrase
+    and column:word restricts a term to one column (e.g. usageflags:military).
+    Raises ValueError when the input has no searchable terms or misplaced operators.
+    """
+    parts = []
+    expect_term = True
+    for match in _SEARCH_TOKEN_RE.finditer(text):
+        column, phrase, word = match.groups()
+        if word in ('AND', 'OR', 'NOT'):
+            if expect_term:
+                raise ValueError(f"'{word}' must sit between two search terms")
+            parts.append(word)
+            expect_term = True
+            continue
+        if word is not None and ':' in word:
+            column, _, word = word.partition(':')
+            column += ':'
+        if column and column[:-1] not in ELEMENT_SEARCH_COLUMNS:
+            raise ValueError(f"Unknown search column '{column[:-1]}' (choose from {', '.join(ELEMENT_SEARCH_COLUMNS)})")
+        words = _SEARCH_WORD_RE.findall(phrase if phrase is not None else word)
+        if not words:
+            continue
+        term = '"' + ' '.join(words) + '"' + ('' if phrase is not None else '*')
+        parts.append(f'{column[:-1]} : {term}' if column else term)
+        expect_term = False
+    if not parts:
+        raise ValueError('Enter at least one search term')
+    if expect_term:
+        raise ValueError(f"'{parts[-1]}' must sit between two search terms")
+    return ' '.join(parts)
+
+
+@bp.route('/api/elements/search')
+def search_elements():
+    """
+    Ranked full-text search over element names, sources and linked reference names.
+    Args: q (see build_search_query), limit, offset.
+    """
+    try:
+        mission_dir = missions.expand(request.args.get('mission_dir'))
+        db_file_path = request.args.get('db_file_path')
+    
+        try:
+            match = build_search_query(request.args.get('q', ''))
+            limit = min(max(int(request.args.get('limit', 50)), 1), ELEMENT_SEARCH_MAX_LIMIT)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
+        etag = db_etag(mission_dir, db_file_path)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+    
+        if db_file_path:
+            conn = get_db_connection(db_file_path=db_file_path)
+        else:
+            conn = get_db_connection(mission_dir)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='type_elements'")
+        if not cursor.fetchone():
+            conn.close()
+            return jsonify({'success': True, 'query': match, 'total': 0, 'elements': []})
+        if not ensure_element_search(cursor):
+            conn.close()
+            return jsonify({'success': False, 'error': 'This SQLite build does not support full-text search (FTS5)'}), 501
+        sync_element_search(cursor)
+        conn.commit()
+    
+        try:
+            cursor.execute('SELECT COUNT(*) FROM type_elements_fts WHERE type_elements_fts MATCH ?', (match,))
+            total = cursor.fetchone()[0]
+            weights = ', '.join(str(weight) for weight in ELEMENT_SEARCH_WEIGHTS)
+            cursor.execute(f'''
+                SELECT e.element_key, e.name, e.source_folder, e.source_file,
+                       bm25(type_elements_fts, {weights}) AS rank
+                FROM type_elements_fts
+                JOIN type_elements e ON e.id = type_elements_fts.rowid
+                WHERE type_elements_fts MATCH ?
+                ORDER BY rank, e.name
+                LIMIT ? OFFSET ?
+            ''', (match, limit, offset))
+        except sqlite3.OperationalError as e:
+            conn.close()
+            return jsonify({'success': False, 'error': f'Invalid search query: {e}'}), 400
+    
+        elements = [{
+            'element_key': row['element_key'],
+            'name': row['name'],
+            'source': f"{row['source_folder']}/{row['source_file']}" if row['source_folder'] else row['source_file'],
+            'rank': round(row['rank'], 4),
+        } for row in cursor.fetchall()]
+        conn.close()
+    
+        return http_cache.with_etag(jsonify({
+            'success': True,
+            'query': match,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'elements': elements
+        }), etag)
+    except Exception as e:
+        logger.exception("Unhandled error in search_elements")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/elements/delete', methods=['POST'])
+def delete_elements():
+    """Delete one or more elements from the database."""
+    try:
+        data = request.json
+        element_keys = data.get('element_keys', [])
+        mission_dir = missions.expand(data.get('mission_dir'))
+        db_file_path = data.get('db_file_path')
+        
+        if not element_keys:
+            return jsonify({'success': False, 'error': 'No elements specified for deletion'}), 400
+        
+        if db_file_path:
+            conn = get_db_connection(db_file_path=db_file_path)
+        else:
+            mission_dir = missions.require(mission_dir)
+            conn = get_db_connection(mission_dir)
+        cursor = conn.cursor()
+        
+        # One set-based delete; foreign keys cascade it to the field and link tables
+        keys_json = json.dumps([str(key) for key in element_keys])
+        cursor.execute('''
+            SELECT value FROM json_each(?)
+            WHERE value NOT IN (SELECT element_key FROM type_elements)
+        ''', (keys_json,))
+        errors = [f"Element '{row[0]}' not found" for row in cursor.fetchall()]
+        cursor.execute('DELETE FROM type_elements WHERE element_key IN (SELECT value FROM json_each(?))', (keys_json,))
+        deleted_count = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        
+        if errors and deleted_count == 0:
+            return jsonify({'success': False, 'error': 'Failed to delete elements', 'errors': errors}), 500
+        
+        return jsonify({
+            'success': True,
+            'deleted_count': deleted_count,
+            'errors': errors if errors else None
+        })
+    except Exception as e:
+        logger.exception("Unhandled error in delete_elements")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/elements/create', methods=['POST'])
+def create_element():
+    """Create a new element in the database."""
+    try:
+        data = request.json
+        element_key = data.get('element_key')
+        name = data.get('name')
+        mission_dir = missions.expand(data.get('mission_dir'))
+        db_file_path = data.get('db_file_path')
+        
+        if not element_key:
+            return jsonify({'success': False, 'error': 'element_key is required'}), 400
+        
+        if db_file_path:
+            conn = get_db_connection(db_file_path=db_file_path)
+        else:
+            mission_dir = missions.require(mission_dir)
+            conn = get_db_connection(mission_dir)
+        cursor = conn.cursor()
+        
+        # Check if element already exists
+        cursor.execute('SELECT element_key FROM type_elements WHERE element_key = ?', (element_key,))
+        if cursor.fetchone():
+            conn.close()
+            return jsonify({'success': False, 'error': f'Element with key "{element_key}" already exists'}), 400
+        
+        # Insert new element (export defaults to true)
+        cursor.execute('''
+            INSERT INTO type_elements 
+            (element_key, name, source_file, source_folder, export, created_at, updated_at)
+            VALUES (?, ?, NULL, NULL, 1, ?, ?)
+        ''', (element_key, name, datetime.now().isoformat(), datetime.now().isoformat()))
+        
+        # Handle itemclass (single selection)
+        itemclass_id = data.get('itemclass_id')
+        if itemclass_id:
+            cursor.execute('''
+                INSERT INTO element_itemclasses (element_key, itemclass_id)
+                VALUES (?, ?)
+            ''', (element_key, itemclass_id))
+        
+        # Handle itemtags (multiple)
+        itemtag_ids = data.get('itemtag_ids', [])
+        for itemtag_id in itemtag_ids:
+            cursor.execute('''
+                INSERT INTO element_itemtags (element_key, itemtag_id)
+                VALUES (?, ?)
+            ''', (element_key, itemtag_id))
+        
+        # Handle categories (multiple)
+        category_ids = data.get('category_ids', [])
+        for category_id in category_ids:
+            cursor.execute('''
+                INSERT INTO element_categories (element_key, category_id)
+                VALUES (?, ?)
+            ''', (element_key, category_id))
+        
+        # Handle tags (multiple)
+        tag_ids = data.get('tag_ids', [])
+        for tag_id in tag_ids:
+            cursor.execute('''
+                INSERT INTO element_tags (element_key, tag_id)
+                VALUES (?, ?)
+            ''', (element_key, tag_id))
+        
+        # Handle usageflags (multiple)
+        usageflag_ids = data.get('usageflag_ids', [])
+        for usageflag_id in usageflag_ids:
+            cursor.execute('''
+                INSERT INTO element_usageflags (element_key, usageflag_id)
+                VALUES (?, ?)
+            ''', (element_key, usageflag_id))
+        
+        # Handle valueflags (multiple)
+        valueflag_ids = data.get('valueflag_ids', [])
+        for valueflag_id in valueflag_ids:
+            cursor.execute('''
+                INSERT INTO element_valueflags (element_key, valueflag_id)
+                VALUES (?, ?)
+            ''', (element_key, valueflag_id))
+        
+        # Handle flags (multiple)
+        flag_ids = data.get('flag_ids', [])
+        for flag_id in flag_ids:
+            cursor.execute('''
+                INSERT INTO element_flags (element_key, flag_id, value)
+                VALUES (?, ?, 1)
+            ''', (element_key, flag_id))
+        
+        # Handle custom fields (from JSON)
+        custom_fields = data.get('custom_fields', {})
+        if isinstance(custom_fields, dict):
+            for field_name, field_value in custom_fields.items():
+                if field_name.startswith('_'):
+                    continue  # Skip metadata fields
                 
-                if not is_duplicate:
-                    added_count += 1
-                    
-            except Exception as e:
-                errors.append(f"Error processing element '{elem.get('name', 'unknown')}': {str(e)}")
+                data_type = infer_data_type(field_value)
+                cursor.execute('''
+                    INSERT INTO type_element_fields 
+                    (element_key, field_name, field_value, data_type, field_order, attributes_json)
+                    VALUES (?, ?, ?, ?, NULL, NULL)
+                ''', (element_key, field_name, str(field_value), data_type))
+        
+        conn.commit()
+        conn.close()
         
+        return jsonify({
+            'success': True,
+            'element_key': element_key,
+            'message': f'Element "{element_key}" created successfully'
+        })
+    except sqlite3.IntegrityError as e:
+        return jsonify({'success': False, 'error': f'Element references an unknown id: {e}'}), 400
+    except Exception as e:
+        logger.exception("Unhandled error in create_element")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# Children of an element that are imported as links to reference data instead of fields
+IMPORT_LINK_TABLES = {
+    'category': ('element_categories', 'category_id', 'categories'),
+    'tag': ('element_tags', 'tag_id', 'tags'),
+    'usage': ('element_usageflags', 'usageflag_id', 'usageflags'),
+    'value': ('element_valueflags', 'valueflag_id', 'valueflags'),
+}
+# Uncommitted import sessions older than this are discarded when a new one starts
+IMPORT_SESSION_MAX_AGE_HOURS = 24
+# Staged elements written per executemany batch while parsing
+IMPORT_STAGING_BATCH = 500
+
+
+def ensure_import_staging(cursor):
+    """
+    Ensure the import session and staging tables exist.
+    
+    An import session holds one parsed upload: import_staging has a row per element,
+    import_staging_fields/import_staging_links the rows it will write. Deleting the
+    session row removes its staged rows.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_sessions (
+            session_id TEXT PRIMARY KEY,
+            filename TEXT,
+            element_type TEXT,
+            element_count INTEGER DEFAULT 0,
+            errors_json TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_staging (
+            session_id TEXT NOT NULL,
+            element_key TEXT NOT NULL,
+            name TEXT,
+            action TEXT,
+            PRIMARY KEY (session_id, element_key),
+            FOREIGN KEY (session_id) REFERENCES import_sessions(session_id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_staging_fields (
+            session_id TEXT NOT NULL,
+            element_key TEXT NOT NULL,
+            field_name TEXT NOT NULL,
+            field_value TEXT,
+            data_type TEXT,
+            field_order INTEGER,
+            attributes_json TEXT,
+            FOREIGN KEY (session_id) REFERENCES import_sessions(session_id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_staging_links (
+            session_id TEXT NOT NULL,
+            element_key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER,
+            FOREIGN KEY (session_id) REFERENCES import_sessions(session_id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_staging_fields_element ON import_staging_fields(session_id, element_key)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_staging_links_element ON import_staging_links(session_id, element_key)')
+
+
+def _link_names(field_value):
+    """Names of category/tag/usage/value children (dicts with a 'name')."""
+    items = field_value if isinstance(field_value, list) else [field_value]
+    return [item['name'] for item in items if isinstance(item, dict) and 'name' in item]
+
+
+def import_rows(elem):
+    """
+    Split extracted element data into field rows
+    (field_name, field_value, data_type, field_order, attributes_json)
+    and link rows (kind, name, value) for categories, tags, usage, value and flags.
+    """
+    fields = []
+    links = []
+    for field_name, field_value in elem.items():
+        if field_name == 'name' or field_name.startswith('_'):
+            continue
+        if field_name in IMPORT_LINK_TABLES:
+            links.extend((field_name, name, None) for name in _link_names(field_value))
+        elif field_name == 'flags':
+            # Flag attributes become boolean flags
+            flags_dict = {}
+            for item in (field_value if isinstance(field_value, list) else [field_value]):
+                if isinstance(item, dict):
+                    flags_dict.update(item)
+            for flag_name, flag_value in flags_dict.items():
+                links.append(('flags', flag_name, 1 if str(flag_value).strip() in ('1', 'true', 'True') else 0))
+        elif isinstance(field_value, list):
+            for idx, item in enumerate(field_value):
+                if isinstance(item, dict):
+                    # Field with attributes
+                    text_value = item.get('_text')
+                    attributes_json = json.dumps({k: v for k, v in item.items() if k != '_text'})
+                    fields.append((field_name, text_value, infer_data_type(text_value), idx, attributes_json))
+                else:
+                    fields.append((field_name, str(item), infer_data_type(item), idx, None))
+        elif isinstance(field_value, dict):
+            text_value = field_value.get('_text')
+            attributes_json = json.dumps({k: v for k, v in field_value.items() if k != '_text'})
+            fields.append((field_name, text_value, infer_data_type(text_value), None, attributes_json))
+        else:
+            fields.append((field_name, str(field_value), infer_data_type(field_value), None, None))
+    return fields, links
+
+
+def stage_import(conn, source, filename, element_type='type', job=None):
+    """
+    Parse an XML file path or stream into a new import session and return its id.
+    
+    Elements are parsed incrementally and written to the staging tables in batches, so
+    the upload is never held in memory as a whole. A later element with the same name
+    replaces an earlier one. The caller commits (or rolls back on ET.ParseError, or on
+    JobCancelled when a background job is cancelled between batches).
+    """
+    cursor = conn.cursor()
+    ensure_import_staging(cursor)
+    cursor.execute("DELETE FROM import_sessions WHERE created_at < datetime('now', ?)",
+                   (f'-{IMPORT_SESSION_MAX_AGE_HOURS} hours',))
+    session_id = uuid.uuid4().hex
+    cursor.execute('INSERT INTO import_sessions (session_id, filename, element_type) VALUES (?, ?, ?)',
+                   (session_id, filename, element_type))
+    
+    staged, fields, links = [], [], []
+    
+    def flush():
+        cursor.executemany('INSERT OR REPLACE INTO import_staging (session_id, element_key, name) VALUES (?, ?, ?)', staged)
+        cursor.executemany('''
+            INSERT INTO import_staging_fields
+            (session_id, element_key, field_name, field_value, data_type, field_order, attributes_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', fields)
+        cursor.executemany('INSERT INTO import_staging_links (session_id, element_key, kind, name, value) VALUES (?, ?, ?, ?, ?)', links)
+        staged.clear()
+        fields.clear()
+        links.clear()
+        if job is not None:
+            job.update(elements_parsed=element_count)
+            job.check_cancelled()
+    
+    seen = set()
+    errors = []
+    element_count = 0
+    with instrumentation.span('parse'):
+        for elem in iter_xml_elements(source, element_type):
+            element_count += 1
+            name_value = elem.get('name')
+            if not name_value:
+                continue
+            element_key = str(name_value)
+            try:
+                field_rows, link_rows = import_rows(elem)
+            except Exception as e:
+                errors.append(f"Error processing element '{name_value}': {str(e)}")
+                continue
+            if element_key in seen:
+                flush()
+                cursor.execute('DELETE FROM import_staging_fields WHERE session_id = ? AND element_key = ?', (session_id, element_key))
+                cursor.execute('DELETE FROM import_staging_links WHERE session_id = ? AND element_key = ?', (session_id, element_key))
+            seen.add(element_key)
+            staged.append((session_id, element_key, name_value))
+            fields.extend((session_id, element_key) + row for row in field_rows)
+            links.extend((session_id, element_key) + row for row in link_rows)
+            if len(staged) >= IMPORT_STAGING_BATCH:
+                flush()
+        flush()
+    cursor.execute('UPDATE import_sessions SET element_count = ?, errors_json = ? WHERE session_id = ?',
+                   (element_count, json.dumps(errors) if errors else None, session_id))
+    return session_id
+
+
+def import_session_summary(cursor, session_id):
+    """Staged elements of a session split into duplicates of existing elements and new ones; None if unknown."""
+    cursor.execute('SELECT filename, element_count FROM import_sessions WHERE session_id = ?', (session_id,))
+    session = cursor.fetchone()
+    if session is None:
+        return None
+    cursor.execute('''
+        SELECT s.element_key, s.name, t.name AS existing_name, t.id IS NOT NULL AS is_duplicate
+        FROM import_staging s
+        LEFT JOIN type_elements t ON t.element_key = s.element_key
+        WHERE s.session_id = ?
+        ORDER BY s.rowid
+    ''', (session_id,))
+    duplicates = []
+    new_elements = []
+    for row in cursor.fetchall():
+        if row['is_duplicate']:
+            duplicates.append({'element_key': row['element_key'], 'name': row['name'], 'existing_name': row['existing_name']})
+        else:
+            new_elements.append({'element_key': row['element_key'], 'name': row['name']})
+    return {
+        'session_id': session_id,
+        'filename': session['filename'],
+        'duplicates': duplicates,
+        'new_elements': new_elements,
+        'total': session['element_count'],
+        'duplicate_count': len(duplicates),
+        'new_count': len(new_elements)
+    }
+
+
+def apply_import_session(conn, session_id, overwrite_all=False, skip_all=False, decisions=None):
+    """
+    Write a staged import into the element tables and discard the session.
+    
+    Each staged element is marked add (no existing element), skip or overwrite (from
+    skip_all, overwrite_all or decisions[element_key]; undecided duplicates are skipped).
+    Overwritten elements are deleted first (CASCADE clears their rows), then elements,
+    fields and links are copied from staging with INSERT ... SELECT. The caller commits.
+    Returns the import statistics, or None if the session does not exist.
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT filename, element_count, errors_json FROM import_sessions WHERE session_id = ?', (session_id,))
+    session = cursor.fetchone()
+    if session is None:
+        return None
+    cursor.execute('''
+        UPDATE import_staging SET action = CASE
+            WHEN NOT EXISTS (SELECT 1 FROM type_elements t WHERE t.element_key = import_staging.element_key) THEN 'add'
+            WHEN :skip_all THEN 'skip'
+            WHEN :overwrite_all THEN 'overwrite'
+            ELSE COALESCE((SELECT d.value FROM json_each(:decisions) d
+                           WHERE d.key = import_staging.element_key AND d.value IN ('overwrite', 'skip')), 'skip')
+        END
+        WHERE session_id = :session_id
+    ''', {'skip_all': int(skip_all), 'overwrite_all': int(overwrite_all),
+          'decisions': json.dumps(decisions or {}), 'session_id': session_id})
+    cursor.execute('SELECT action, COUNT(*) FROM import_staging WHERE session_id = ? GROUP BY action', (session_id,))
+    counts = {row[0]: row[1] for row in cursor.fetchall()}
+    
+    imported = "SELECT element_key FROM import_staging WHERE session_id = :session_id AND action IN ('add', 'overwrite')"
+    params = {'session_id': session_id}
+    cursor.execute('''
+        DELETE FROM type_elements WHERE element_key IN
+            (SELECT element_key FROM import_staging WHERE session_id = :session_id AND action = 'overwrite')
+    ''', params)
+    cursor.execute('''
+        INSERT INTO type_elements (element_key, name, source_file, source_folder, export, updated_at)
+        SELECT element_key, name, :source_file, 'imported', 1, :updated_at
+        FROM import_staging
+        WHERE session_id = :session_id AND action IN ('add', 'overwrite')
+        ORDER BY rowid
+    ''', dict(params, source_file=session['filename'], updated_at=datetime.now().isoformat()))
+    cursor.execute(f'''
+        INSERT INTO type_element_fields (element_key, field_name, field_value, data_type, field_order, attributes_json)
+        SELECT element_key, field_name, field_value, data_type, field_order, attributes_json
+        FROM import_staging_fields
+        WHERE session_id = :session_id AND element_key IN ({imported})
+        ORDER BY rowid
+    ''', params)
+    for kind, (link_table, link_column, ref_table) in IMPORT_LINK_TABLES.items():
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO {link_table} (element_key, {link_column})
+            SELECT DISTINCT l.element_key, r.id
+            FROM import_staging_links l JOIN {ref_table} r ON r.name = l.name
+            WHERE l.session_id = :session_id AND l.kind = :kind AND l.element_key IN ({imported})
+        ''', dict(params, kind=kind))
+    # Flags are created on first use
+    cursor.execute(f'''
+        INSERT INTO flags (name)
+        SELECT DISTINCT l.name FROM import_staging_links l
+        WHERE l.session_id = :session_id AND l.kind = 'flags' AND l.element_key IN ({imported})
+          AND NOT EXISTS (SELECT 1 FROM flags f WHERE f.name = l.name)
+    ''', params)
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO element_flags (element_key, flag_id, value)
+        SELECT l.element_key, f.id, l.value
+        FROM import_staging_links l JOIN flags f ON f.name = l.name
+        WHERE l.session_id = :session_id AND l.kind = 'flags' AND l.element_key IN ({imported})
+        ORDER BY l.rowid
+    ''', params)
+    
+    cursor.execute('DELETE FROM import_sessions WHERE session_id = ?', (session_id,))
+    return {
+        'success': True,
+        'added_count': counts.get('add', 0),
+        'updated_count': counts.get('overwrite', 0),
+        'skipped_count': counts.get('skip', 0),
+        'errors': json.loads(session['errors_json']) if session['errors_json'] else None,
+        'total_processed': session['element_count']
+    }
+
+
+def _snapshot_before_import(cursor, filename):
+    """Snapshot the journal position before an import; restoring it undoes the import."""
+    change_journal.ensure_schema(cursor)
+    snapshot = change_journal.create_snapshot(
+        cursor, f"Before import of {filename} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})"
+    )
+    return snapshot['name']
+
+
+def _import_connection(params):
+    """Connection with the staging tables, from mission_dir/db_file_path request params."""
+    db_file_path = params.get('db_file_path')
+    if db_file_path:
+        conn = get_db_connection(db_file_path=db_file_path)
+    else:
+        conn = get_db_connection(params.get('mission_dir'))
+    ensure_import_staging(conn.cursor())
+    return conn
+
+
+def run_import(params, filename, overwrite_all=False, skip_all=False, decisions=None,
+               session_id=None, source=None, element_type='type', job=None, journal_label=None):
+    """
+    Stage source (or take the staged import session_id), snapshot the journal and apply
+    the import in one transaction. Returns the import statistics with the snapshot name,
+    or None when session_id does not exist. A background job journals its writes under
+    journal_label itself, as connect_db only does that inside a request.
+    """
+    conn = _import_connection(params)
+    try:
+        cursor = conn.cursor()
+        batch_id = None
+        if job is not None:
+            change_journal.ensure_schema(cursor)
+            batch_id = change_journal.new_batch_id()
+            change_journal.install_triggers(conn, db_file_from_params(params), batch_id, journal_label)
+        if session_id is None:
+            session_id = stage_import(conn, source, filename, element_type, job)
+        else:
+            cursor.execute('SELECT filename FROM import_sessions WHERE session_id = ?', (session_id,))
+            session = cursor.fetchone()
+            if session is None:
+                return None
+            filename = session['filename']
+        if job is not None:
+            job.check_cancelled()
+        snapshot = _snapshot_before_import(cursor, filename)
+        result = apply_import_session(conn, session_id, overwrite_all, skip_all, decisions)
         conn.commit()
+    finally:
         conn.close()
+    if job is not None:
+        job.update(elements_written=result['added_count'] + result['updated_count'])
+        publish_element_changes(db_file_from_params(params), [batch_id])
+    result['snapshot'] = snapshot
+    return result
+
+
+def _stage_upload(conn):
+    """Stage request.files['file']; returns (session_id, None) or (None, error response)."""
+    file = request.files.get('file')
+    if file is None:
+        return None, (jsonify({'success': False, 'error': 'No file provided'}), 400)
+    if file.filename == '':
+        return None, (jsonify({'success': False, 'error': 'No file selected'}), 400)
+    try:
+        return stage_import(conn, file.stream, file.filename, request.form.get('element_type', 'type')), None
+    except ET.ParseError as e:
+        conn.rollback()
+        return None, (jsonify({'success': False, 'error': f'Invalid XML: {e}'}), 400)
+
+
+@bp.route('/api/import-sessions', methods=['POST'])
+def create_import_session():
+    """
+    Parse an uploaded XML file into a new import session.
+    Returns the session id with the duplicate/new split for the decisions dialog.
+    """
+    try:
+        conn = _import_connection(request.form)
+        try:
+            session_id, error = _stage_upload(conn)
+            if error:
+                return error
+            conn.commit()
+            return jsonify({'success': True, **import_session_summary(conn.cursor(), session_id)})
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.exception("Unhandled error in create_import_session")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/import-sessions/<session_id>', methods=['GET', 'DELETE'])
+def import_session(session_id):
+    """Show an import session's duplicate/new split, or discard the session."""
+    try:
+        conn = _import_connection(request.args)
+        try:
+            cursor = conn.cursor()
+            if request.method == 'DELETE':
+                cursor.execute('DELETE FROM import_sessions WHERE session_id = ?', (session_id,))
+                conn.commit()
+                if cursor.rowcount == 0:
+                    return jsonify({'success': False, 'error': f'Import session not found: {session_id}'}), 404
+                return jsonify({'success': True})
+            summary = import_session_summary(cursor, session_id)
+            if summary is None:
+                return jsonify({'success': False, 'error': f'Import session not found: {session_id}'}), 404
+            return jsonify({'success': True, **summary})
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.exception("Unhandled error in import_session")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/import-sessions/<session_id>/commit', methods=['POST'])
+def commit_import_session(session_id):
+    """
+    Apply an import session with the user's duplicate decisions:
+    {overwrite_all, skip_all, decisions: {element_key: 'overwrite' | 'skip'}}.
+    The change journal is snapshotted first, so the import can be undone.
+    With "async": true the import runs as a background job (202 with its job_id).
+    """
+    try:
+        data = request.json or {}
+        decisions = data.get('decisions') or {}
+        if not isinstance(decisions, dict):
+            return jsonify({'success': False, 'error': 'decisions must be an object'}), 400
+        overwrite_all = bool(data.get('overwrite_all'))
+        skip_all = bool(data.get('skip_all'))
+        
+        if wants_async(data):
+            journal_label = f'{request.method} {request.path}'
+            
+            def commit_session(job):
+                result = run_import(data, None, overwrite_all, skip_all, decisions, session_id=session_id,
+                                    job=job, journal_label=journal_label)
+                if result is None:
+                    raise LookupError(f'Import session not found: {session_id}')
+                return result
+            
+            job = jobs.submit('import', db_file_from_params(data), commit_session, label=f'Import session {session_id}')
+            return job_accepted(job)
         
-        return {
-            'success': True,
-            'added_count': added_count,
-            'updated_count': updated_count,
-            'skipped_count': skipped_count,
-            'errors': errors if errors else None,
-            'total_processed': len(elements)
-        }
+        result = run_import(data, None, overwrite_all, skip_all, decisions, session_id=session_id)
+        if result is None:
+            return jsonify({'success': False, 'error': f'Import session not found: {session_id}'}), 404
+        return jsonify(result)
+    except Exception as e:
+        logger.exception("Unhandled error in commit_import_session")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/import-xml', methods=['POST'])
+def import_xml():
+    """
+    Import elements from a user-specified XML file in one request
+    (stage and commit an import session with the decisions from the form).
+    With async=true the import runs as a background job (202 with its job_id).
+    """
+    try:
+        file = request.files.get('file')
+        if file is None:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+        if file.filename == '':
+            return jsonify({'success': False, 'error': 'No file selected'}), 400
+        filename = file.filename
+        element_type = request.form.get('element_type', 'type')
+        
+        # Get decisions from form data (overwrite_all, skip_all, or individual decisions)
+        overwrite_all = request.form.get('overwrite_all', 'false').lower() == 'true'
+        skip_all = request.form.get('skip_all', 'false').lower() == 'true'
+        try:
+            decisions = json.loads(request.form.get('decisions') or '{}')
+        except ValueError:
+            decisions = {}
+        if not isinstance(decisions, dict):
+            decisions = {}
+        
+        if wants_async(request.form):
+            params = request.form.to_dict()
+            journal_label = f'{request.method} {request.path}'
+            # The upload only lives as long as the request; the job reads a copy
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as tmp_file:
+                file.save(tmp_file)
+                tmp_path = tmp_file.name
+            
+            def import_upload(job):
+                try:
+                    return run_import(params, filename, overwrite_all, skip_all, decisions, source=tmp_path,
+                                      element_type=element_type, job=job, journal_label=journal_label)
+                finally:
+                    os.unlink(tmp_path)
+            
+            job = jobs.submit('import', db_file_from_params(params), import_upload, label=f'Import of {filename}')
+            return job_accepted(job)
+        
+        try:
+            result = run_import(request.form, filename, overwrite_all, skip_all, decisions,
+                                source=file.stream, element_type=element_type)
+        except ET.ParseError as e:
+            return jsonify({'success': False, 'error': f'Invalid XML: {e}'}), 400
+        return jsonify(result)
+    except Exception as e:
+        logger.exception("Unhandled error in import_xml")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/import-xml/check-duplicates', methods=['POST'])
+def check_import_duplicates():
+    """Check which elements in an XML file would be duplicates (nothing is kept)."""
+    try:
+        conn = _import_connection(request.form)
+        try:
+            session_id, error = _stage_upload(conn)
+            if error:
+                return error
+            summary = import_session_summary(conn.cursor(), session_id)
+            conn.rollback()
+        finally:
+            conn.close()
+        del summary['session_id']
+        return jsonify({'success': True, **summary})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return {
-            'success': False,
-            'error': str(e),
-            'added_count': 0,
-            'updated_count': 0,
-            'skipped_count': 0
-        }
-
-
-@app.route('/api/itemclasses', methods=['GET', 'POST'])
+        logger.exception("Unhandled error in check_import_duplicates")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/itemclasses', methods=['GET', 'POST'])
 def manage_itemclasses():
     """Get all itemclasses or create a new itemclass."""
     try:
-        if request.method == 'POST':
-            mission_dir = request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None)
-            db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
-        else:
-            mission_dir = request.args.get('mission_dir')
-            db_file_path = request.args.get('db_file_path')
+        if request.method == 'GET':
+            return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'), 'itemclasses')
+        
+        mission_dir = missions.expand(request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None))
+        db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1666,57 +2717,50 @@ def manage_itemclasses():
         if not cursor.fetchone():
             conn.close()
             # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
             # Reconnect
             if db_file_path:
                 conn = get_db_connection(db_file_path=db_file_path)
             else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
+                conn = get_db_connection(mission_dir)
             cursor = conn.cursor()
         
-        if request.method == 'POST':
-            data = request.json
-            name = data.get('name', '').strip()
-            
-            if not name:
-                conn.close()
-                return jsonify({'error': 'Itemclass name is required'}), 400
-            
-            try:
-                cursor.execute('''
-                    INSERT INTO itemclasses (name)
-                    VALUES (?)
-                ''', (name,))
-                conn.commit()
-                itemclass_id = cursor.lastrowid
-                conn.close()
-                return jsonify({'success': True, 'id': itemclass_id, 'name': name})
-            except sqlite3.IntegrityError:
-                conn.close()
-                return jsonify({'error': 'Itemclass name already exists'}), 400
-        else:
-            cursor.execute('SELECT id, name FROM itemclasses ORDER BY name')
-            itemclasses = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+        data = request.json
+        name = data.get('name', '').strip()
+        
+        if not name:
+            conn.close()
+            return jsonify({'error': 'Itemclass name is required'}), 400
+        
+        try:
+            cursor.execute('''
+                INSERT INTO itemclasses (name)
+                VALUES (?)
+            ''', (name,))
+            conn.commit()
+            itemclass_id = cursor.lastrowid
+            conn.close()
+            return jsonify({'success': True, 'id': itemclass_id, 'name': name})
+        except sqlite3.IntegrityError:
             conn.close()
-            return jsonify({'success': True, 'itemclasses': itemclasses})
+            return jsonify({'error': 'Itemclass name already exists'}), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in manage_itemclasses")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/itemclasses/<int:itemclass_id>', methods=['DELETE'])
+@bp.route('/api/itemclasses/<int:itemclass_id>', methods=['DELETE'])
 def delete_itemclass(itemclass_id):
     """Delete an itemclass."""
     try:
         # DELETE requests use query parameters, not JSON body
-        mission_dir = request.args.get('mission_dir')
+        mission_dir = missions.expand(request.args.get('mission_dir'))
         db_file_path = request.args.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1736,21 +2780,20 @@ def delete_itemclass(itemclass_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/itemtags', methods=['GET', 'POST'])
+@bp.route('/api/itemtags', methods=['GET', 'POST'])
 def manage_itemtags():
     """Get all itemtags or create a new itemtag."""
     try:
-        if request.method == 'POST':
-            mission_dir = request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None)
-            db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
-        else:
-            mission_dir = request.args.get('mission_dir')
-            db_file_path = request.args.get('db_file_path')
+        if request.method == 'GET':
+            return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'), 'itemtags')
+        
+        mission_dir = missions.expand(request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None))
+        db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1759,55 +2802,49 @@ def manage_itemtags():
         if not cursor.fetchone():
             conn.close()
             # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
             # Reconnect
             if db_file_path:
                 conn = get_db_connection(db_file_path=db_file_path)
             else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
+                conn = get_db_connection(mission_dir)
             cursor = conn.cursor()
         
-        if request.method == 'POST':
-            data = request.json
-            name = data.get('name', '').strip()
-            
-            if not name:
-                conn.close()
-                return jsonify({'error': 'Itemtag name is required'}), 400
-            
-            try:
-                cursor.execute('''
-                    INSERT INTO itemtags (name)
-                    VALUES (?)
-                ''', (name,))
-                conn.commit()
-                itemtag_id = cursor.lastrowid
-                conn.close()
-                return jsonify({'success': True, 'id': itemtag_id, 'name': name})
-            except sqlite3.IntegrityError:
-                conn.close()
-                return jsonify({'error': 'Itemtag name already exists'}), 400
-        else:
-            cursor.execute('SELECT id, name FROM itemtags ORDER BY name')
-            itemtags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+        data = request.json
+        name = data.get('name', '').strip()
+        
+        if not name:
+            conn.close()
+            return jsonify({'error': 'Itemtag name is required'}), 400
+        
+        try:
+            cursor.execute('''
+                INSERT INTO itemtags (name)
+                VALUES (?)
+            ''', (name,))
+            conn.commit()
+            itemtag_id = cursor.lastrowid
             conn.close()
-            return jsonify({'success': True, 'itemtags': itemtags})
+            return jsonify({'success': True, 'id': itemtag_id, 'name': name})
+        except sqlite3.IntegrityError:
+            conn.close()
+            return jsonify({'error': 'Itemtag name already exists'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/itemtags/<int:itemtag_id>', methods=['DELETE'])
+@bp.route('/api/itemtags/<int:itemtag_id>', methods=['DELETE'])
 def delete_itemtag(itemtag_id):
     """Delete an itemtag."""
     try:
         # DELETE requests use query parameters, not JSON body
-        mission_dir = request.args.get('mission_dir')
+        mission_dir = missions.expand(request.args.get('mission_dir'))
         db_file_path = request.args.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1827,21 +2864,20 @@ def delete_itemtag(itemtag_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/usageflags', methods=['GET', 'POST'])
+@bp.route('/api/usageflags', methods=['GET', 'POST'])
 def manage_usageflags():
     """Get all usageflags or create a new usageflag."""
     try:
-        if request.method == 'POST':
-            mission_dir = request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None)
-            db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
-        else:
-            mission_dir = request.args.get('mission_dir')
-            db_file_path = request.args.get('db_file_path')
+        if request.method == 'GET':
+            return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'), 'usageflags')
+        
+        mission_dir = missions.expand(request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None))
+        db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1850,62 +2886,55 @@ def manage_usageflags():
         if not cursor.fetchone():
             conn.close()
             # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
             # Reconnect
             if db_file_path:
                 conn = get_db_connection(db_file_path=db_file_path)
             else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
+                conn = get_db_connection(mission_dir)
             cursor = conn.cursor()
         
-        if request.method == 'POST':
-            data = request.json
-            name = data.get('name', '').strip()
+        data = request.json
+        name = data.get('name', '').strip()
+        
+        if not name:
+            conn.close()
+            return jsonify({'error': 'Usageflag name is required'}), 400
+        
+        try:
+            cursor.execute('''
+                INSERT INTO usageflags (name)
+                VALUES (?)
+            ''', (name,))
+            conn.commit()
+            usageflag_id = cursor.lastrowid
+            conn.close()
             
-            if not name:
-                conn.close()
-                return jsonify({'error': 'Usageflag name is required'}), 400
+            # Update cfglimitsdefinition.xml
+            if mission_dir:
+                update_cfglimitsdefinition_xml(mission_dir, db_file_path)
             
-            try:
-                cursor.execute('''
-                    INSERT INTO usageflags (name)
-                    VALUES (?)
-                ''', (name,))
-                conn.commit()
-                usageflag_id = cursor.lastrowid
-                conn.close()
-                
-                # Update cfglimitsdefinition.xml
-                if mission_dir:
-                    update_cfglimitsdefinition_xml(mission_dir, db_file_path)
-                
-                return jsonify({'success': True, 'id': usageflag_id, 'name': name})
-            except sqlite3.IntegrityError:
-                conn.close()
-                return jsonify({'error': 'Usageflag name already exists'}), 400
-        else:
-            cursor.execute('SELECT id, name FROM usageflags ORDER BY name')
-            usageflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+            return jsonify({'success': True, 'id': usageflag_id, 'name': name})
+        except sqlite3.IntegrityError:
             conn.close()
-            return jsonify({'success': True, 'usageflags': usageflags})
+            return jsonify({'error': 'Usageflag name already exists'}), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in manage_usageflags")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/usageflags/<int:usageflag_id>', methods=['DELETE'])
+@bp.route('/api/usageflags/<int:usageflag_id>', methods=['DELETE'])
 def delete_usageflag(usageflag_id):
     """Delete a usageflag."""
     try:
         # DELETE requests use query parameters, not JSON body
-        mission_dir = request.args.get('mission_dir')
+        mission_dir = missions.expand(request.args.get('mission_dir'))
         db_file_path = request.args.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1929,21 +2958,20 @@ def delete_usageflag(usageflag_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/valueflags', methods=['GET', 'POST'])
+@bp.route('/api/valueflags', methods=['GET', 'POST'])
 def manage_valueflags():
     """Get all valueflags or create a new valueflag."""
     try:
-        if request.method == 'POST':
-            mission_dir = request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None)
-            db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
-        else:
-            mission_dir = request.args.get('mission_dir')
-            db_file_path = request.args.get('db_file_path')
+        if request.method == 'GET':
+            return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'), 'valueflags')
+        
+        mission_dir = missions.expand(request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None))
+        db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -1952,62 +2980,55 @@ def manage_valueflags():
         if not cursor.fetchone():
             conn.close()
             # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
             # Reconnect
             if db_file_path:
                 conn = get_db_connection(db_file_path=db_file_path)
             else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
+                conn = get_db_connection(mission_dir)
             cursor = conn.cursor()
         
-        if request.method == 'POST':
-            data = request.json
-            name = data.get('name', '').strip()
+        data = request.json
+        name = data.get('name', '').strip()
+        
+        if not name:
+            conn.close()
+            return jsonify({'error': 'Valueflag name is required'}), 400
+        
+        try:
+            cursor.execute('''
+                INSERT INTO valueflags (name)
+                VALUES (?)
+            ''', (name,))
+            conn.commit()
+            valueflag_id = cursor.lastrowid
+            conn.close()
             
-            if not name:
-                conn.close()
-                return jsonify({'error': 'Valueflag name is required'}), 400
+            # Update cfglimitsdefinition.xml
+            if mission_dir:
+                update_cfglimitsdefinition_xml(mission_dir, db_file_path)
             
-            try:
-                cursor.execute('''
-                    INSERT INTO valueflags (name)
-                    VALUES (?)
-                ''', (name,))
-                conn.commit()
-                valueflag_id = cursor.lastrowid
-                conn.close()
-                
-                # Update cfglimitsdefinition.xml
-                if mission_dir:
-                    update_cfglimitsdefinition_xml(mission_dir, db_file_path)
-                
-                return jsonify({'success': True, 'id': valueflag_id, 'name': name})
-            except sqlite3.IntegrityError:
-                conn.close()
-                return jsonify({'error': 'Valueflag name already exists'}), 400
-        else:
-            cursor.execute('SELECT id, name FROM valueflags ORDER BY name')
-            valueflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+            return jsonify({'success': True, 'id': valueflag_id, 'name': name})
+        except sqlite3.IntegrityError:
             conn.close()
-            return jsonify({'success': True, 'valueflags': valueflags})
+            return jsonify({'error': 'Valueflag name already exists'}), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in manage_valueflags")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/valueflags/<int:valueflag_id>', methods=['DELETE'])
+@bp.route('/api/valueflags/<int:valueflag_id>', methods=['DELETE'])
 def delete_valueflag(valueflag_id):
     """Delete a valueflag."""
     try:
         # DELETE requests use query parameters, not JSON body
-        mission_dir = request.args.get('mission_dir')
+        mission_dir = missions.expand(request.args.get('mission_dir'))
         db_file_path = request.args.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -2031,21 +3052,20 @@ def delete_valueflag(valueflag_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/categories', methods=['GET', 'POST'])
+@bp.route('/api/categories', methods=['GET', 'POST'])
 def manage_categories():
     """Get all categories or create a new category."""
     try:
-        if request.method == 'POST':
-            mission_dir = request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None)
-            db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
-        else:
-            mission_dir = request.args.get('mission_dir')
-            db_file_path = request.args.get('db_file_path')
+        if request.method == 'GET':
+            return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'), 'categories')
+        
+        mission_dir = missions.expand(request.args.get('mission_dir') or (request.json.get('mission_dir') if request.json else None))
+        db_file_path = request.args.get('db_file_path') or (request.json.get('db_file_path') if request.json else None)
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -2054,62 +3074,55 @@ def manage_categories():
         if not cursor.fetchone():
             conn.close()
             # Initialize schema
-            init_database_for_file(db_file_path if db_file_path else get_db_path(mission_dir or current_mission_dir), mission_dir)
+            init_database_for_file(db_file_path if db_file_path else get_db_path(missions.require(mission_dir)), mission_dir)
             # Reconnect
             if db_file_path:
                 conn = get_db_connection(db_file_path=db_file_path)
             else:
-                conn = get_db_connection(mission_dir or current_mission_dir)
+                conn = get_db_connection(mission_dir)
             cursor = conn.cursor()
         
-        if request.method == 'POST':
-            data = request.json
-            name = data.get('name', '').strip()
+        data = request.json
+        name = data.get('name', '').strip()
+        
+        if not name:
+            conn.close()
+            return jsonify({'error': 'Category name is required'}), 400
+        
+        try:
+            cursor.execute('''
+                INSERT INTO categories (name)
+                VALUES (?)
+            ''', (name,))
+            conn.commit()
+            category_id = cursor.lastrowid
+            conn.close()
             
-            if not name:
-                conn.close()
-                return jsonify({'error': 'Category name is required'}), 400
+            # Update cfglimitsdefinition.xml
+            if mission_dir:
+                update_cfglimitsdefinition_xml(mission_dir, db_file_path)
             
-            try:
-                cursor.execute('''
-                    INSERT INTO categories (name)
-                    VALUES (?)
-                ''', (name,))
-                conn.commit()
-                category_id = cursor.lastrowid
-                conn.close()
-                
-                # Update cfglimitsdefinition.xml
-                if mission_dir:
-                    update_cfglimitsdefinition_xml(mission_dir, db_file_path)
-                
-                return jsonify({'success': True, 'id': category_id, 'name': name})
-            except sqlite3.IntegrityError:
-                conn.close()
-                return jsonify({'error': 'Category name already exists'}), 400
-        else:
-            cursor.execute('SELECT id, name FROM categories ORDER BY name')
-            categories = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+            return jsonify({'success': True, 'id': category_id, 'name': name})
+        except sqlite3.IntegrityError:
             conn.close()
-            return jsonify({'success': True, 'categories': categories})
+            return jsonify({'error': 'Category name already exists'}), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in manage_categories")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/categories/<int:category_id>', methods=['DELETE'])
+@bp.route('/api/categories/<int:category_id>', methods=['DELETE'])
 def delete_category(category_id):
     """Delete a category."""
     try:
         # DELETE requests use query parameters, not JSON body
-        mission_dir = request.args.get('mission_dir')
+        mission_dir = missions.expand(request.args.get('mission_dir'))
         db_file_path = request.args.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -2133,64 +3146,102 @@ def delete_category(category_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/reference-data')
-def get_reference_data():
-    """Get all reference data (categories, tags, usageflags, valueflags, itemclasses, itemtags)."""
+# Reference data per database: version keyed by the file's signature, tables keyed by version
+_REFERENCE_VERSIONS = ParsedFileCache()
+_REFERENCE_SNAPSHOTS = ParsedFileCache()
+
+
+def _read_reference_version(db_file, mission_dir=None):
+    conn = connect_db(db_file)
     try:
-        mission_dir = request.args.get('mission_dir')
-        db_file_path = request.args.get('db_file_path')
-        
-        if db_file_path:
-            conn = get_db_connection(db_file_path=db_file_path)
-        else:
-            mission_dir = mission_dir or current_mission_dir
-            conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
-        
-        # Get all reference tables
-        cursor.execute('SELECT id, name FROM categories ORDER BY name')
-        categories = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name FROM tags ORDER BY name')
-        tags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name FROM usageflags ORDER BY name')
-        usageflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name FROM valueflags ORDER BY name')
-        valueflags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name, description FROM itemclasses ORDER BY name')
-        itemclasses = [{'id': r['id'], 'name': r['name'], 'description': r['description']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name, description FROM itemtags ORDER BY name')
-        itemtags = [{'id': r['id'], 'name': r['name'], 'description': r['description']} for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, name FROM flags ORDER BY name')
-        flags = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
-        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='itemclasses'")
+        if not cursor.fetchone():
+            conn.close()
+            init_database_for_file(db_file, mission_dir)
+            conn = connect_db(db_file)
+            cursor = conn.cursor()
+        ensure_reference_version(cursor)
+        conn.commit()
+        cursor.execute('SELECT generation, version FROM reference_data_version')
+        generation, version = cursor.fetchone()
+        return f'{generation}.{version}'
+    finally:
         conn.close()
-        
-        return jsonify({
-            'success': True,
-            'categories': categories,
-            'tags': tags,
-            'usageflags': usageflags,
-            'valueflags': valueflags,
-            'itemclasses': itemclasses,
-            'itemtags': itemtags,
-            'flags': flags
-        })
+
+
+def _read_reference_tables(db_file):
+    conn = connect_db(db_file)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.cursor()
+        data = {}
+        for table in REFERENCE_TABLES:
+            if table in ('itemclasses', 'itemtags'):
+                cursor.execute(f'SELECT id, name, description FROM {table} ORDER BY name')
+                data[table] = [{'id': r['id'], 'name': r['name'], 'description': r['description']} for r in cursor.fetchall()]
+            else:
+                cursor.execute(f'SELECT id, name FROM {table} ORDER BY name')
+                data[table] = [{'id': r['id'], 'name': r['name']} for r in cursor.fetchall()]
+        return data
+    finally:
+        conn.close()
+
+
+def reference_data_snapshot(db_file, mission_dir=None):
+    """
+    (version, data) for the reference tables of db_file, served from memory.
+
+    The database is only opened when its file (or WAL) changed since the last call, and
+    the tables are only re-read when reference_data_version moved, so element edits cost
+    one version lookup and unchanged databases none. data must be treated as read-only.
+    """
+    db_file = str(db_file)
+    signature = (file_signature(db_file), file_signature(f'{db_file}-wal'))
+    version = _REFERENCE_VERSIONS.get(db_file, lambda path: _read_reference_version(path, mission_dir), signature)
+    return version, _REFERENCE_SNAPSHOTS.get(db_file, _read_reference_tables, version)
+
+
+def reference_data_response(mission_dir, db_file_path, table=None):
+    """
+    GET response with every reference table (or the id/name list of one table),
+    with the reference data version as its ETag.
+    """
+    if db_file_path:
+        db_file = Path(db_file_path)
+        if not db_file.exists():
+            raise FileNotFoundError(f"Database file not found: {db_file_path}")
+    else:
+        mission_dir = missions.require(mission_dir)
+        db_file = get_db_path(mission_dir)
+    version, data = reference_data_snapshot(db_file, mission_dir)
+    etag = http_cache.make_etag('reference-data', table, path_key(db_file), version)
+    cached = http_cache.not_modified(etag)
+    if cached is not None:
+        return cached
+    if table is None:
+        payload = {'success': True, 'version': version, **data}
+    else:
+        payload = {'success': True, table: [{'id': r['id'], 'name': r['name']} for r in data[table]]}
+    return http_cache.with_etag(jsonify(payload), etag)
+
+
+@bp.route('/api/reference-data')
+def get_reference_data():
+    """Get all reference data (categories, tags, usageflags, valueflags, itemclasses, itemtags, flags)."""
+    try:
+        return reference_data_response(missions.expand(request.args.get('mission_dir')), request.args.get('db_file_path'))
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        logger.exception("Unhandled error in get_reference_data")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/cfglimitsdefinition/save', methods=['POST'])
+@bp.route('/api/cfglimitsdefinition/save', methods=['POST'])
 def save_cfglimitsdefinition():
     """Save cfglimitsdefinition.xml file with current database state."""
     try:
         data = request.json
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not mission_dir:
@@ -2203,8 +3254,7 @@ def save_cfglimitsdefinition():
         else:
             return jsonify({'success': False, 'error': result.get('error', 'Failed to update cfglimitsdefinition.xml')}), 500
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_cfglimitsdefinition")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -2355,7 +3405,8 @@ def update_cfglimitsdefinition_xml(mission_dir, db_file_path=None):
         
         # Create or update XML file
         if xml_file.exists():
-            tree = ET.parse(xml_file)
+            with instrumentation.span('parse'):
+                tree = ET.parse(xml_file)
             root = tree.getroot()
         else:
             root = ET.Element('cfglimitsdefinition')
@@ -2406,20 +3457,22 @@ def update_cfglimitsdefinition_xml(mission_dir, db_file_path=None):
         # Write to file with XML declaration
         with open(xml_file, 'wb') as f:
             f.write('<?xml version="1.0" encoding="UTF-8"?>\n'.encode('utf-8'))
-            tree.write(f, encoding='utf-8', xml_declaration=False)
+            with instrumentation.span('write'):
+                tree.write(f, encoding='utf-8', xml_declaration=False)
         
         return {'success': True}
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_cfglimitsdefinition_xml")
         return {'success': False, 'error': str(e)}
 
 
-def export_database_to_xml(mission_dir, export_by_itemclass=False, export_subfolder='exported-types', db_file_path=None):
+def export_database_to_xml(mission_dir, export_by_itemclass=False, export_subfolder='exported-types', db_file_path=None, job=None):
     """
     Export database contents back to XML files.
     Supports both normal export and export by itemclass.
     Only elements with export=1 are written to XML.
+    When run as a background job, reports elements_read/files_written/bytes_written;
+    cancellation takes effect while elements are read, before any types file is written.
     """
     if db_file_path:
         conn = get_db_connection(db_file_path=db_file_path)
@@ -2441,9 +3494,10 @@ def export_database_to_xml(mission_dir, export_by_itemclass=False, export_subfol
         return {'success': False, 'error': f"Failed to update cfglimitsdefinition.xml: {update_result.get('error')}"}
     
     if export_by_itemclass:
-        result = export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, mission_path, db_file_path)
-        conn.close()
-        return result
+        try:
+            return export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, mission_path, db_file_path, job)
+        finally:
+            conn.close()
     
     # Normal export - write only types with export=1 to missionfolder/db/types.xml
     cursor.execute('''
@@ -2454,14 +3508,18 @@ def export_database_to_xml(mission_dir, export_by_itemclass=False, export_subfol
     ''')
     
     all_elements = []
-    for row in cursor.fetchall():
-        element_key = row['element_key']
-        # Load element data
-        data = load_element_data(cursor, element_key)
-        all_elements.append(data)
-    
-    # Close connection after normal export
-    conn.close()
+    rows = cursor.fetchall()
+    try:
+        for row in rows:
+            element_key = row['element_key']
+            # Load element data
+            data = load_element_data(cursor, element_key)
+            all_elements.append(data)
+            if job is not None and (len(all_elements) % EXPORT_PROGRESS_EVERY == 0 or len(all_elements) == len(rows)):
+                report_export_read(job, len(all_elements), len(rows))
+    finally:
+        # Close connection after normal export
+        conn.close()
     
     # Export to single file: missionfolder/db/types.xml
     db_folder = mission_path / 'db'
@@ -2484,10 +3542,13 @@ def export_database_to_xml(mission_dir, export_by_itemclass=False, export_subfol
         
         with open(xml_file, 'wb') as f:
             f.write('<?xml version="1.0" encoding="UTF-8"?>\n'.encode('utf-8'))
-            tree.write(f, encoding='utf-8', xml_declaration=False)
+            with instrumentation.span('write'):
+                tree.write(f, encoding='utf-8', xml_declaration=False)
         
         exported_count = 1
         exported_files.append('db/types.xml')
+        if job is not None:
+            job.update(files_written=1, bytes_written=xml_file.stat().st_size)
     except Exception as e:
         error_count = 1
         errors.append({'file': str(xml_file), 'error': str(e)})
@@ -2611,7 +3672,17 @@ def load_element_data(cursor, element_key):
     return data
 
 
-def export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, mission_path, db_file_path=None):
+# Elements read between export progress reports / cancellation checks
+EXPORT_PROGRESS_EVERY = 200
+
+
+def report_export_read(job, read, total):
+    """Report export read progress (the first 80%); raises JobCancelled once cancelled."""
+    job.update(percent=80.0 * read / total, elements_read=read, elements_total=total)
+    job.check_cancelled()
+
+
+def export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, mission_path, db_file_path=None, job=None):
     """Export elements grouped by itemclass."""
     # Get all elements with itemclasses (only those marked for export)
     cursor.execute('''
@@ -2626,11 +3697,14 @@ def export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, miss
     itemclass_data = defaultdict(list)
     unassigned_elements = []
     
-    for row in cursor.fetchall():
+    rows = cursor.fetchall()
+    for index, row in enumerate(rows, 1):
         element_key = row['element_key']
         itemclass_name = row['itemclass_name']
         
         data = load_element_data(cursor, element_key)
+        if job is not None and (index % EXPORT_PROGRESS_EVERY == 0 or index == len(rows)):
+            report_export_read(job, index, len(rows))
         
         if itemclass_name:
             safe_name = sanitize_filename(itemclass_name)
@@ -2666,10 +3740,13 @@ def export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, miss
             
             with open(xml_file, 'wb') as f:
                 f.write('<?xml version="1.0" encoding="UTF-8"?>\n'.encode('utf-8'))
-                tree.write(f, encoding='utf-8', xml_declaration=False)
+                with instrumentation.span('write'):
+                    tree.write(f, encoding='utf-8', xml_declaration=False)
             
             exported_count += 1
             exported_files.append(filename)
+            if job is not None:
+                job.advance(files_written=1, bytes_written=xml_file.stat().st_size)
         except Exception as e:
             error_count += 1
             errors.append({'file': str(xml_file), 'error': str(e)})
@@ -2688,10 +3765,13 @@ def export_by_itemclass_to_xml(mission_dir, export_subfolder, conn, cursor, miss
             
             with open(xml_file, 'wb') as f:
                 f.write('<?xml version="1.0" encoding="UTF-8"?>\n'.encode('utf-8'))
-                tree.write(f, encoding='utf-8', xml_declaration=False)
+                with instrumentation.span('write'):
+                    tree.write(f, encoding='utf-8', xml_declaration=False)
             
             exported_count += 1
             exported_files.append('misc.xml')
+            if job is not None:
+                job.advance(files_written=1, bytes_written=xml_file.stat().st_size)
         except Exception as e:
             error_count += 1
             errors.append({'file': str(xml_file), 'error': str(e)})
@@ -2731,7 +3811,8 @@ def update_cfgeconomycore_xml(mission_path, export_subfolder, exported_files):
         
         # Parse as XML to properly handle structure
         try:
-            tree = ET.parse(cfgeconomycore_file)
+            with instrumentation.span('parse'):
+                tree = ET.parse(cfgeconomycore_file)
             root = tree.getroot()
             
             # Find or create economycore element
@@ -2782,7 +3863,8 @@ def update_cfgeconomycore_xml(mission_path, export_subfolder, exported_files):
             
             # Write back with proper formatting
             ET.indent(tree, space='    ')
-            tree.write(cfgeconomycore_file, encoding='utf-8', xml_declaration=True)
+            with instrumentation.span('write'):
+                tree.write(cfgeconomycore_file, encoding='utf-8', xml_declaration=True)
             
             return True
         except ET.ParseError:
@@ -2790,9 +3872,7 @@ def update_cfgeconomycore_xml(mission_path, export_subfolder, exported_files):
             return update_cfgeconomycore_xml_text_based(cfgeconomycore_file, export_subfolder, exported_files, content)
         
     except Exception as e:
-        print(f"Error updating cfgeconomycore.xml: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating cfgeconomycore.xml: %s", e)
         return False
 
 
@@ -2874,11 +3954,11 @@ def update_cfgeconomycore_xml_text_based(cfgeconomycore_file, export_subfolder,
         
         return True
     except Exception as e:
-        print(f"Error in text-based update of cfgeconomycore.xml: {e}")
+        logger.error("Error in text-based update of cfgeconomycore.xml: %s", e)
         return False
 
 
-@app.route('/api/elements/<element_key>/itemclass', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/itemclass', methods=['PUT'])
 def update_element_itemclass(element_key):
     """Update itemclass for an element (single itemclass only)."""
     try:
@@ -2890,13 +3970,13 @@ def update_element_itemclass(element_key):
         
         data = request.json
         itemclass_id = data.get('itemclass_id')
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -2935,12 +4015,11 @@ def update_element_itemclass(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_itemclass")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/itemtags', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/itemtags', methods=['PUT'])
 def update_element_itemtags(element_key):
     """Update itemtags for an element (multiple itemtags allowed)."""
     try:
@@ -2952,7 +4031,7 @@ def update_element_itemtags(element_key):
         
         data = request.json
         itemtag_ids = data.get('itemtag_ids', [])
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not isinstance(itemtag_ids, list):
@@ -2961,7 +4040,7 @@ def update_element_itemtags(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3007,12 +4086,11 @@ def update_element_itemtags(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_itemtags")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/categories', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/categories', methods=['PUT'])
 def update_element_categories(element_key):
     """Update categories for an element."""
     try:
@@ -3024,7 +4102,7 @@ def update_element_categories(element_key):
         
         data = request.json
         category_ids = data.get('category_ids', [])
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not isinstance(category_ids, list):
@@ -3033,7 +4111,7 @@ def update_element_categories(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3079,12 +4157,11 @@ def update_element_categories(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_categories")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/valueflags', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/valueflags', methods=['PUT'])
 def update_element_valueflags(element_key):
     """Update valueflags for an element."""
     try:
@@ -3096,7 +4173,7 @@ def update_element_valueflags(element_key):
         
         data = request.json
         valueflag_ids = data.get('valueflag_ids', [])
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not isinstance(valueflag_ids, list):
@@ -3105,7 +4182,7 @@ def update_element_valueflags(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3151,12 +4228,11 @@ def update_element_valueflags(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_valueflags")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/usageflags', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/usageflags', methods=['PUT'])
 def update_element_usageflags(element_key):
     """Update usageflags for an element."""
     try:
@@ -3168,7 +4244,7 @@ def update_element_usageflags(element_key):
         
         data = request.json
         usageflag_ids = data.get('usageflag_ids', [])
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not isinstance(usageflag_ids, list):
@@ -3177,7 +4253,7 @@ def update_element_usageflags(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3223,12 +4299,11 @@ def update_element_usageflags(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_usageflags")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/flags', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/flags', methods=['PUT'])
 def update_element_flags(element_key):
     """Update flags for an element."""
     try:
@@ -3240,7 +4315,7 @@ def update_element_flags(element_key):
         
         data = request.json
         flag_ids = data.get('flag_ids', [])
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if not isinstance(flag_ids, list):
@@ -3249,7 +4324,7 @@ def update_element_flags(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         
         # Ensure count_in_hoarder flag exists
@@ -3299,12 +4374,11 @@ def update_element_flags(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_flags")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/export', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/export', methods=['PUT'])
 def update_element_export(element_key):
     """Update the Export (DB-only) flag for an element."""
     try:
@@ -3316,7 +4390,7 @@ def update_element_export(element_key):
         
         data = request.json
         value = data.get('value')
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if value is None:
@@ -3327,7 +4401,7 @@ def update_element_export(element_key):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3350,12 +4424,11 @@ def update_element_export(element_key):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_element_export")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/elements/<element_key>/field/<field_name>', methods=['PUT'])
+@bp.route('/api/elements/<element_key>/field/<field_name>', methods=['PUT'])
 def update_field(element_key, field_name):
     """Update a field value for an element."""
     try:
@@ -3367,7 +4440,7 @@ def update_field(element_key, field_name):
         
         data = request.json
         new_value = data.get('value')
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         db_file_path = data.get('db_file_path')
         
         if new_value is None:
@@ -3376,7 +4449,7 @@ def update_field(element_key, field_name):
         if db_file_path:
             conn = get_db_connection(db_file_path=db_file_path)
         else:
-            mission_dir = mission_dir or current_mission_dir
+            mission_dir = missions.require(mission_dir)
             conn = get_db_connection(mission_dir)
         cursor = conn.cursor()
         
@@ -3432,17 +4505,27 @@ def update_field(element_key, field_name):
         
         return jsonify({'success': True})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in update_field")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/export', methods=['POST'])
+def export_mission_data(mission_dir, export_by_itemclass=False, export_subfolder='exported-types', db_file_path=None, job=None):
+    """Export the database to XML (the /api/export payload)."""
+    result = export_database_to_xml(mission_dir, export_by_itemclass, export_subfolder, db_file_path, job)
+    # Exported types/cfgeconomycore.xml replace what both tools have parsed
+    mission_data.invalidate()
+    return result
+
+
+@bp.route('/api/export', methods=['POST'])
 def export_to_xml():
-    """Export database to XML files."""
+    """
+    Export database to XML files.
+    With "async": true the export runs as a background job (202 with its job_id).
+    """
     try:
         data = request.json
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.expand(data.get('mission_dir'))
         export_by_itemclass = data.get('export_by_itemclass', False)
         export_subfolder = data.get('export_subfolder', 'exported-types')
         db_file_path = data.get('db_file_path')
@@ -3450,18 +4533,34 @@ def export_to_xml():
         if not mission_dir:
             return jsonify({'success': False, 'error': 'Mission directory is required'}), 400
         
-        result = export_database_to_xml(mission_dir, export_by_itemclass, export_subfolder, db_file_path)
+        if wants_async(data):
+            job = jobs.submit('export', db_file_from_params(data),
+                              lambda job: export_mission_data(mission_dir, export_by_itemclass, export_subfolder, db_file_path, job),
+                              label=f'Export of {Path(mission_dir).name}')
+            return job_accepted(job)
         
-        return jsonify(result)
+        return jsonify(export_mission_data(mission_dir, export_by_itemclass, export_subfolder, db_file_path))
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in export_to_xml")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def create_app():
+    """Standalone Economy Editor app; combined_app mounts the same blueprint under /economy."""
+    app_logging.configure()
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    http_cache.init_app(app)
+    instrumentation.init_app(app)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     print("Economy Editor starting...")
-    print(f"Default mission directory: {DEFAULT_MISSION_DIR}")
+    print(f"Default mission: {missions.registry.default or '(none, pass mission_dir)'}")
     print(f"Open your browser to http://localhost:5004")
     app.run(debug=True, host='0.0.0.0', port=5004)
 
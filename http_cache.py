@@ -0,0 +1,116 @@
+"""Conditional-GET and response compression helpers shared by the Flask apps."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import time
+from typing import Any, Iterable, Optional
+
+from flask import Flask, Response, request
+
+from mission_files import file_signature
+
+try:
+    import brotli  # optional; gzip is used when it is not installed
+except ImportError:
+    brotli = None
+
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+})
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Payload shapes can change between releases while the source files stay the
+# same, so every ETag is salted with a per-process token.
+_PROCESS_TOKEN = f"{os.getpid():x}.{time.time_ns():x}"
+
+
+def make_etag(*parts: Any) -> str:
+    """Hash arbitrary parts into an opaque ETag value."""
+    joined = "|".join("" if p is None else str(p) for p in (_PROCESS_TOKEN, *parts))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:24]
+
+
+def source_etag(*paths: Any, extra: Iterable[Any] = ()) -> str:
+    """ETag derived from the mtime/size of every source file that feeds a response."""
+    return make_etag(*(file_signature(p) for p in paths), *extra)
+
+
+def sqlite_etag(db_file_path: Any, extra: Iterable[Any] = ()) -> str:
+    """ETag for a SQLite database; includes the WAL file so uncheckpointed writes count."""
+    db_file_path = str(db_file_path)
+    return source_etag(db_file_path, f"{db_file_path}-wal", extra=extra)
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """Return a 304 response when the client already holds ``etag``, else None."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach a revalidation ETag to a successful response."""
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def mark_immutable(response: Response, max_age: int = IMMUTABLE_MAX_AGE) -> Response:
+    """Cache headers for content-addressed resources that never change."""
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, immutable"
+    return response
+
+
+def _pick_encoding() -> Optional[str]:
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: gzip/brotli-encode large textual bodies."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or not 200 <= response.status_code < 300
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    encoding = _pick_encoding()
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    else:
+        body = gzip.compress(body, compresslevel=6)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Register response compression on a Flask app."""
+    app.after_request(compress_response)
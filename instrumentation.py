@@ -0,0 +1,263 @@
+"""Request timing spans, Server-Timing headers and per-route latency metrics.
+
+Code anywhere in the request path can wrap a stage in ``span("parse")`` (or decorate a
+function with ``timed("write")``); outside a request the span is a no-op. Spans with the
+same name are summed and nested spans of the same name are only counted once, so a
+builder that parses inside another parse does not double count.
+
+``init_app`` times every request, reports the stages in a ``Server-Timing`` header
+(visible in the browser's network panel) and aggregates them per route for
+``GET /api/_metrics``. Stages:
+
+    parse    XML/JSON files read through mission_files.ParsedFileCache
+    db       SQLite statements on connections from ``connect``
+    jsonify  JSON serialization of API responses
+    write    mission file writes (mission_files.atomic_write_*)
+    build    everything else the handler did, mostly building the payload
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+METRICS_PATH = "/api/_metrics"
+
+
+class _RequestTimings:
+    __slots__ = ("start", "spans", "active", "token")
+
+    def __init__(self) -> None:
+        self.token: Optional[contextvars.Token] = None
+        self.start = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.active: Set[str] = set()
+
+
+_current: contextvars.ContextVar[Optional[_RequestTimings]] = contextvars.ContextVar(
+    "instrumentation_request", default=None
+)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the time spent in the block to stage ``name`` of the current request."""
+    timings = _current.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.spans[name] = timings.spans.get(name, 0.0) + (time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of ``span``."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports execute/fetch time to the ``db`` stage."""
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        with span("db"):
+            return super().execute(*args, **kwargs)
+
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        with span("db"):
+            return super().executemany(*args, **kwargs)
+
+    def executescript(self, *args: Any, **kwargs: Any) -> Any:
+        with span("db"):
+            return super().executescript(*args, **kwargs)
+
+    def fetchone(self) -> Any:
+        with span("db"):
+            return super().fetchone()
+
+    def fetchmany(self, *args: Any, **kwargs: Any) -> Any:
+        with span("db"):
+            return super().fetchmany(*args, **kwargs)
+
+    def fetchall(self) -> Any:
+        with span("db"):
+            return super().fetchall()
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including ``conn.execute`` shortcuts) are timed."""
+
+    def cursor(self, factory: Any = TimedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return self.cursor().execute(*args, **kwargs)
+
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        return self.cursor().executemany(*args, **kwargs)
+
+    def executescript(self, *args: Any, **kwargs: Any) -> Any:
+        return self.cursor().executescript(*args, **kwargs)
+
+    def commit(self) -> None:
+        with span("db"):
+            super().commit()
+
+
+def connect(database: Any, **kwargs: Any) -> sqlite3.Connection:
+    """``sqlite3.connect`` returning a connection timed under the ``db`` stage."""
+    kwargs.setdefault("factory", TimedConnection)
+    return sqlite3.connect(database, **kwargs)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that times ``jsonify`` serialization."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        with span("jsonify"):
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        with span("jsonify"):
+            return super().response(*args, **kwargs)
+
+
+class _RouteStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets", "stages_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.stages_ms: Dict[str, float] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        bounds: List[Any] = [*LATENCY_BUCKETS_MS, "inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "totalMs": round(self.total_ms, 2),
+            "meanMs": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "maxMs": round(self.max_ms, 2),
+            "histogram": [{"le": le, "count": n} for le, n in zip(bounds, self.buckets)],
+            "stagesMs": {name: round(ms, 2) for name, ms in sorted(self.stages_ms.items())},
+        }
+
+
+class MetricsRegistry:
+    """Per-route request counters and latency histograms, safe across worker threads."""
+
+    def __init__(self) -> None:
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, method: str, route: str, status: int, total_ms: float, stages_ms: Dict[str, float]) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.count += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.total_ms += total_ms
+            stats.max_ms = max(stats.max_ms, total_ms)
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, total_ms)] += 1
+            for name, ms in stages_ms.items():
+                stats.stages_ms[name] = stats.stages_ms.get(name, 0.0) + ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = [
+                {"method": method, "route": route, **stats.as_dict()}
+                for (method, route), stats in sorted(self._routes.items(), key=lambda item: (item[0][1], item[0][0]))
+            ]
+        return {"uptimeSeconds": round(time.time() - self.started, 1), "bucketsMs": list(LATENCY_BUCKETS_MS), "routes": routes}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+def _stage_durations(timings: _RequestTimings, total: float) -> Dict[str, float]:
+    stages = {name: seconds * 1000 for name, seconds in timings.spans.items()}
+    stages["build"] = max(total * 1000 - sum(stages.values()), 0.0)
+    return stages
+
+
+def server_timing_header(stages_ms: Dict[str, float], total_ms: float) -> str:
+    parts = [f"{name};dur={ms:.1f}" for name, ms in stages_ms.items()]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+def init_app(app: Flask) -> MetricsRegistry:
+    """Time every request of ``app`` and expose the aggregates at ``/api/_metrics``.
+
+    Register it after the blueprints so the metrics route does not shadow theirs.
+    Set ``INSTRUMENTATION_SERVER_TIMING = False`` to keep the header off responses.
+    """
+    registry = MetricsRegistry()
+    app.extensions["instrumentation"] = registry
+    app.json = TimedJSONProvider(app)
+    app.config.setdefault("INSTRUMENTATION_SERVER_TIMING", True)
+
+    def start_timing() -> None:
+        timings = _RequestTimings()
+        timings.token = _current.set(timings)
+
+    def finish_timing(response: Response) -> Response:
+        timings = _current.get()
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.start
+        stages_ms = _stage_durations(timings, total)
+        total_ms = total * 1000
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        if rule != METRICS_PATH:
+            registry.record(request.method, rule, response.status_code, total_ms, stages_ms)
+        if app.config["INSTRUMENTATION_SERVER_TIMING"]:
+            response.headers["Server-Timing"] = server_timing_header(stages_ms, total_ms)
+        return response
+
+    def end_timing(exc: Optional[BaseException]) -> None:
+        timings = _current.get()
+        if timings is not None and timings.token is not None:
+            _current.reset(timings.token)
+
+    def metrics() -> Response:
+        if request.args.get("reset") in ("1", "true"):
+            snapshot = registry.snapshot()
+            registry.reset()
+            return jsonify(snapshot)
+        return jsonify(registry.snapshot())
+
+    # before_request runs ahead of the blueprints' hooks, after_request after them
+    app.before_request_funcs.setdefault(None, []).insert(0, start_timing)
+    app.after_request_funcs.setdefault(None, []).insert(0, finish_timing)
+    app.teardown_request(end_timing)
+    app.add_url_rule(METRICS_PATH, "instrumentation_metrics", metrics)
+    return registry
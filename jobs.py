@@ -0,0 +1,192 @@
+"""Background jobs for long-running editor operations (load, import, export, backup).
+
+``submit`` returns a ``Job`` at once and runs ``fn(job)`` on a worker thread. Jobs with
+the same key (the database they use) run one at a time in submission order while
+holding ``file_lock(key)`` and their mission (``missions.hold``, so its caches are not
+evicted mid-job); jobs on different databases run in parallel.
+
+``fn`` reports progress with ``job.update(...)``/``job.advance(...)`` and should call
+``job.check_cancelled()`` between units of work: a cancelled job stops there with
+``JobCancelled`` and ends in the ``cancelled`` state, so work must only be committed
+after the last check. The return value of ``fn`` becomes ``job.result``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import missions
+from mission_files import file_lock, path_key
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 50
+
+
+class JobCancelled(Exception):
+    """Raised by ``Job.check_cancelled`` once cancellation was requested."""
+
+
+class Job:
+    """One background operation; ``as_dict`` is the payload of the status endpoints.
+
+    Progress counters passed to ``update`` are reported next to the state fields.
+    """
+
+    def __init__(self, kind: str, key: str, label: Optional[str] = None,
+                 progress: Optional[Dict[str, Any]] = None) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.label = label or kind
+        self.state = "pending"
+        self.percent: Optional[float] = None
+        self.progress: Dict[str, Any] = dict(progress or {})
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finished; False on timeout."""
+        return self._done.wait(timeout)
+
+    def update(self, percent: Optional[float] = None, **progress: Any) -> None:
+        """Record progress counters (and optionally the completion percentage)."""
+        with self._lock:
+            if percent is not None:
+                self.percent = round(min(max(percent, 0.0), 100.0), 1)
+            self.progress.update(progress)
+
+    def advance(self, **amounts: int) -> None:
+        """Add to progress counters."""
+        with self._lock:
+            for name, amount in amounts.items():
+                self.progress[name] = self.progress.get(name, 0) + amount
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled(f"{self.label} was cancelled")
+
+    def cancel(self) -> bool:
+        """Ask the job to stop; False if it already finished."""
+        if self.finished:
+            return False
+        self._cancel.set()
+        return True
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            progress = dict(self.progress)
+        if self.state == "done":
+            percent = 100.0
+        else:
+            percent = self.percent or 0.0
+        return {
+            **progress,
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "state": self.state,
+            "percent": percent,
+            "cancel_requested": self.cancel_requested,
+            "result": self.result,
+            "error": self.error,
+            "elapsed_seconds": round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3),
+        }
+
+    def _run(self, fn: Callable[["Job"], Any]) -> None:
+        if self.cancel_requested:
+            self.state = "cancelled"
+            self.finished_at = time.time()
+            self._done.set()
+            return
+        try:
+            # Holding the mission keeps its caches from being evicted mid-job
+            with file_lock(self.key), missions.hold(self.key):
+                self.state = "running"
+                self.started_at = time.time()
+                self.result = fn(self)
+            self.state = "done"
+            logger.info("%s finished in %.2fs", self.label, time.time() - self.started_at)
+        except JobCancelled as e:
+            self.state = "cancelled"
+            self.error = str(e)
+            logger.info("%s cancelled", self.label)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.exception("%s failed", self.label)
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+
+_JOBS: Dict[str, Job] = {}
+_QUEUES: Dict[str, Deque[Tuple[Job, Callable[[Job], Any]]]] = {}
+_LOCK = threading.Lock()
+
+
+def _work(key: str) -> None:
+    while True:
+        with _LOCK:
+            queue = _QUEUES[key]
+            if not queue:
+                del _QUEUES[key]
+                return
+            job, fn = queue.popleft()
+        job._run(fn)
+
+
+def submit(kind: str, key: Any, fn: Callable[[Job], Any], label: Optional[str] = None,
+           progress: Optional[Dict[str, Any]] = None) -> Job:
+    """Queue ``fn(job)`` behind the other jobs for ``key`` (a database path) and return the job."""
+    key = path_key(key)
+    job = Job(kind, key, label, progress)
+    with _LOCK:
+        finished = [j for j in _JOBS.values() if j.finished]
+        for old in sorted(finished, key=lambda j: j.created_at)[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del _JOBS[old.id]
+        _JOBS[job.id] = job
+        queue = _QUEUES.get(key)
+        start_worker = queue is None
+        if start_worker:
+            queue = _QUEUES[key] = deque()
+        queue.append((job, fn))
+    if start_worker:
+        threading.Thread(target=_work, args=(key,), name=f"jobs {Path(key).name}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _LOCK:
+        return _JOBS.get(job_id)
+
+
+def list_jobs(key: Any = None) -> List[Job]:
+    """Known jobs, newest first; only those for database ``key`` when given."""
+    with _LOCK:
+        found = list(_JOBS.values())
+    if key is not None:
+        key = path_key(key)
+        found = [job for job in found if job.key == key]
+    return sorted(found, key=lambda job: job.created_at, reverse=True)
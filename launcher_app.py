@@ -4,21 +4,31 @@ Launcher application for XML Data Viewer tools.
 Provides a unified entry point to access both Economy Editor and Map Viewer.
 """
 
-from flask import Flask, render_template
+from flask import Blueprint, Flask, current_app, render_template
 
-app = Flask(__name__)
+bp = Blueprint('launcher', __name__)
 
-# URLs for the two applications
+# URLs for the two applications (combined_app overrides these via app.config)
 ECONOMY_EDITOR_URL = "http://localhost:5004"
 MAP_VIEWER_URL = "http://localhost:5003"
 
 
-@app.route('/')
+@bp.route('/')
 def index():
     """Main launcher page."""
     return render_template('launcher.html', 
-                         economy_editor_url=ECONOMY_EDITOR_URL,
-                         map_viewer_url=MAP_VIEWER_URL)
+                         economy_editor_url=current_app.config.get('ECONOMY_EDITOR_URL', ECONOMY_EDITOR_URL),
+                         map_viewer_url=current_app.config.get('MAP_VIEWER_URL', MAP_VIEWER_URL))
+
+
+def create_app():
+    """Standalone launcher app that iframes the two tools on their own ports."""
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    return app
+
+
+app = create_app()
 
 
 if __name__ == '__main__':
@@ -4,13 +4,21 @@ Flask application for displaying markers in 2D space from mapgrouppos.xml.
 """
 
 import os
+import copy
 import json
 import hashlib
+import logging
+import atexit
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import lru_cache
 import xml.etree.ElementTree as ET
 import uuid
 import shutil
 from pathlib import Path
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Blueprint, Flask, render_template, jsonify, request, send_file, url_for
 from werkzeug.utils import secure_filename
 from map_data_adapters import (
     GROUPS_ADAPTER,
@@ -18,21 +26,32 @@ from map_data_adapters import (
     EFFECT_AREAS_ADAPTER,
     TERRITORY_ZONES_ADAPTER,
     PLAYER_SPAWNS_ADAPTER,
+    AI_PATROLS_ADAPTER,
+    ChangesetError,
+    changeset_conflicts,
     indexed_identity_parts,
+    split_changeset,
 )
+import app_logging
+import change_events
+import missions
+import http_cache
+import instrumentation
+import mission_data
+import mission_files
+from app_logging import LoadSummary
 
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('map_viewer', __name__)
 
 # Allow iframe embedding for launcher (remove X-Frame-Options if set)
-@app.after_request
+@bp.after_request
 def set_frame_options(response):
     # Remove X-Frame-Options to allow embedding from launcher
     response.headers.pop('X-Frame-Options', None)
     return response
 
-# Default mission directory
-DEFAULT_MISSION_DIR = r"E:\DayZ_Servers\Nyheim_Server\mpmissions\dayzOffline.nyheim"
-
 # Directory to store uploaded background images
 UPLOAD_FOLDER = Path('uploads/background_images')
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -83,6 +102,7 @@ def get_marker_color_config_path():
     return _map_viewer_data_dir() / 'marker_colors.json'
 
 
+@lru_cache(maxsize=4096)
 def _hash_to_color(key, salt='map-viewer'):
     raw = f'{salt}|{key}'.encode('utf-8')
     digest = hashlib.sha1(raw).hexdigest()
@@ -93,6 +113,8 @@ def _hash_to_color(key, salt='map-viewer'):
 
 
 def _assign_missing_colors(names, target_map, *, unique_within=False, salt='map-viewer'):
+    """Give every name without a colour one; returns how many colours were assigned."""
+    assigned = 0
     normalized = [str(n).strip() for n in (names or []) if str(n).strip()]
     if unique_within:
         used = {v for v in target_map.values() if isinstance(v, str) and v.strip()}
@@ -117,6 +139,8 @@ def _assign_missing_colors(names, target_map, *, unique_within=False, salt='map-
             used.add(chosen)
         else:
             target_map[name] = _hash_to_color(name, salt=salt)
+        assigned += 1
+    return assigned
 
 
 def load_marker_color_config():
@@ -130,7 +154,8 @@ def load_marker_color_config():
         return default_config
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            raw = json.load(f)
+            with instrumentation.span('parse'):
+                raw = json.load(f)
         if not isinstance(raw, dict):
             return default_config
         cfg = {
@@ -140,14 +165,75 @@ def load_marker_color_config():
         }
         return cfg
     except Exception as e:
-        print(f"Failed to load marker color config: {e}")
+        logger.error("Failed to load marker color config: %s", e)
         return default_config
 
 
 def save_marker_color_config(config):
     config_path = get_marker_color_config_path()
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    mission_files.atomic_write_json(config_path, config, indent=2)
+
+
+# In-memory marker colour config. Syncs only mutate this copy; changes are written back
+# MARKER_COLOR_SAVE_DELAY seconds after the last change (and at exit). The version is
+# bumped on every change so clients can skip re-applying an unchanged config.
+MARKER_COLOR_SAVE_DELAY = 2.0
+_marker_color_lock = threading.RLock()
+_marker_color_state = {
+    'config': None,
+    'signature': None,
+    'version': 0,
+    'dirty': False,
+    'timer': None
+}
+
+
+def get_marker_color_config():
+    """Return (config, version); reloads marker_colors.json only if it was edited externally."""
+    with _marker_color_lock:
+        state = _marker_color_state
+        signature = mission_files.file_signature(get_marker_color_config_path())
+        if state['config'] is None or (not state['dirty'] and signature != state['signature']):
+            state['config'] = load_marker_color_config()
+            state['signature'] = signature
+            # Millisecond clock start keeps versions increasing across restarts
+            state['version'] = max(state['version'] + 1, int(time.time() * 1000))
+        return state['config'], state['version']
+
+
+def flush_marker_color_config():
+    """Write the in-memory marker colour config to disk if it has unsaved changes."""
+    with _marker_color_lock:
+        state = _marker_color_state
+        if state['timer'] is not None:
+            state['timer'].cancel()
+            state['timer'] = None
+        if not state['dirty']:
+            return False
+        try:
+            save_marker_color_config(state['config'])
+        except Exception as e:
+            logger.error("Failed to save marker color config: %s", e)
+            return False
+        state['dirty'] = False
+        state['signature'] = mission_files.file_signature(get_marker_color_config_path())
+        return True
+
+
+def _mark_marker_colors_changed():
+    with _marker_color_lock:
+        state = _marker_color_state
+        state['version'] += 1
+        state['dirty'] = True
+        if state['timer'] is not None:
+            state['timer'].cancel()
+        timer = threading.Timer(MARKER_COLOR_SAVE_DELAY, flush_marker_color_config)
+        timer.daemon = True
+        state['timer'] = timer
+        timer.start()
+
+
+atexit.register(flush_marker_color_config)
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
@@ -176,11 +262,12 @@ def load_proto_groups(proto_file_path):
     proto_groups = {}
     
     if not proto_file_path or not Path(proto_file_path).exists():
-        print(f"Proto XML file does not exist: {proto_file_path}")
+        logger.warning("Proto XML file does not exist: %s", proto_file_path)
         return proto_groups
     
     try:
-        tree = ET.parse(proto_file_path)
+        with instrumentation.span('parse'):
+            tree = ET.parse(proto_file_path)
         root = tree.getroot()
         
         # Try different XPath expressions to find groups
@@ -190,8 +277,6 @@ def load_proto_groups(proto_file_path):
         if len(group_elements) == 0:
             group_elements = root.findall('group')
         
-        print(f"Found {len(group_elements)} group prototypes in mapgroupproto.xml")
-        
         for group in group_elements:
             name = group.get('name', '')
             if name:
@@ -226,11 +311,9 @@ def load_proto_groups(proto_file_path):
                     'children': child_data
                 }
         
-        print(f"Successfully loaded {len(proto_groups)} group prototypes")
+        logger.info("Loaded %d group prototypes from %d elements", len(proto_groups), len(group_elements))
     except Exception as e:
-        import traceback
-        print(f"Error loading proto groups: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading proto groups: %s", e)
     
     return proto_groups
 
@@ -242,7 +325,7 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
     Note: z coordinate will be reversed in the frontend to place origin at lower left.
     """
     if not xml_file_path or not Path(xml_file_path).exists():
-        print(f"XML file does not exist: {xml_file_path}")
+        logger.warning("XML file does not exist: %s", xml_file_path)
         return []
     
     # Load proto groups if proto file path is provided
@@ -251,7 +334,8 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
         proto_groups = load_proto_groups(proto_file_path)
     
     try:
-        tree = ET.parse(xml_file_path)
+        with instrumentation.span('parse'):
+            tree = ET.parse(xml_file_path)
         root = tree.getroot()
         
         groups = []
@@ -265,8 +349,8 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
             # Try direct children
             group_elements = root.findall('group')
         
-        print(f"Found {len(group_elements)} group elements")
-        
+        summary = LoadSummary(logger, 'groups')
+        identity_rows = []
         for group in group_elements:
             name = group.get('name', '')
             
@@ -284,7 +368,7 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
                 pos_str = group.get('position')
             
             if pos_str is None:
-                print(f"Skipping group '{name}': no position found")
+                summary.skip('no_position', "Skipping group '%s': no position found", name)
                 continue
             
             # mapgrouppos.xml group positions are typically "x z" or "x y z"
@@ -294,7 +378,7 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
             
             # Skip if position is invalid (all zeros)
             if x == 0.0 and y == 0.0 and z == 0.0:
-                print(f"Skipping group '{name}': invalid position")
+                summary.skip('invalid_position', "Skipping group '%s': invalid position", name)
                 continue
             
             # Get usage from group if available
@@ -315,10 +399,7 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
                 'usage': usage,
                 'xml': xml_string  # Store original XML element from mapgrouppos.xml
             }
-            GROUPS_ADAPTER.add_source_id(
-                group_data,
-                *indexed_identity_parts(name, x, y, z, index_chain=(len(groups),))
-            )
+            identity_rows.append(indexed_identity_parts(name, x, y, z, index_chain=(len(groups),)))
             
             # Try to find matching proto group and store its data
             if name in proto_groups:
@@ -326,7 +407,8 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
                 group_data['proto_xml'] = proto_data['xml']
                 group_data['proto_attributes'] = proto_data['attributes']
                 group_data['proto_children'] = proto_data['children']
-                print(f"Found matching proto for group '{name}'")
+                summary.add('matched_proto')
+                summary.detail("Found matching proto for group '%s'", name)
             else:
                 group_data['proto_xml'] = None
                 group_data['proto_attributes'] = {}
@@ -334,28 +416,74 @@ def load_groups_from_xml(xml_file_path, proto_file_path=None):
             
             groups.append(group_data)
         
-        print(f"Successfully loaded {len(groups)} groups")
-        matched_count = sum(1 for g in groups if g.get('proto_xml') is not None)
-        print(f"Matched {matched_count} groups with prototypes")
+        GROUPS_ADAPTER.add_source_ids(groups, identity_rows)
+        summary.log("Loaded %d of %d groups", len(groups), len(group_elements))
         return groups
     except Exception as e:
-        import traceback
-        print(f"Error loading groups: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading groups: %s", e)
         return []
 
 
-@app.route('/')
+def publish_layer_changes(mission_path, layer, changes=None, result=None):
+    """
+    Publish a saved layer to the other map viewers open on the mission (see change_events).
+    A sourceId-keyed changeset is sent as applied: modified items under the sourceIds they
+    were saved with, then the ID renames (source_ids/source_indices), added items with their
+    new sourceIds, and deleted sourceIds. Saves without one publish {"reload": true}.
+    The saving page's X-Editor-Client header is passed on as "origin" so it can skip its own.
+    """
+    if not change_events.is_watched(mission_path):
+        return
+    event = {'layer': layer, 'origin': request.headers.get('X-Editor-Client')}
+    if not changes:
+        event['reload'] = True
+    else:
+        added = changes.get('added') or []
+        event.update(
+            modified=changes.get('modified') or [],
+            added=[dict(item, sourceId=source_id) for item, source_id in zip(added, result.get('added_source_ids', []))],
+            deleted=changes.get('deleted') or [],
+            source_ids=result.get('source_ids', {}),
+            source_indices=result.get('source_indices', {})
+        )
+    change_events.publish(mission_path, 'layer', event)
+
+
+@bp.route('/api/missions')
+def list_missions():
+    """Configured missions and the ones this process has open, most recently used first."""
+    return api_ok(missions=missions.list_missions(), default=missions.registry.default)
+
+
+@bp.route('/api/events')
+def change_event_stream():
+    """
+    Server-Sent Events stream of the layers saved on a mission (mission_dir).
+    Events: "layer" (see publish_layer_changes) and "resync" (events were missed while
+    disconnected; reload the layers).
+    """
+    try:
+        error, mission_path = resolve_mission_path(missions.resolve(request.args.get('mission_dir')))
+        if error:
+            return error
+        return change_events.event_stream_response(mission_path)
+    except Exception as e:
+        logger.exception("Unhandled error in change_event_stream")
+        return api_error(str(e), 500)
+
+
+@bp.route('/')
 def index():
     """Main page."""
-    return render_template('map_viewer.html')
+    # '' standalone, '/map' when mounted by combined_app
+    return render_template('map_viewer.html', api_base=url_for('.index').rstrip('/'))
 
 
-@app.route('/api/groups')
+@bp.route('/api/groups')
 def get_groups():
     """Get group data from mapgrouppos.xml."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         err_response, mission_path = resolve_mission_path(mission_dir)
         if err_response:
             return err_response
@@ -369,12 +497,17 @@ def get_groups():
         mapgroupproto_file = mission_path / 'mapgroupproto.xml'
         proto_file_path = str(mapgroupproto_file) if mapgroupproto_file.exists() else None
         
+        etag = http_cache.source_etag(mapgrouppos_file, mapgroupproto_file)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
         if proto_file_path:
-            print(f"Found mapgroupproto.xml, will match groups by name")
+            logger.debug("Found mapgroupproto.xml, will match groups by name")
         else:
-            print(f"mapgroupproto.xml not found, loading groups without proto matching")
+            logger.debug("mapgroupproto.xml not found, loading groups without proto matching")
         
-        print(f"Loading groups from: {mapgrouppos_file}")
+        logger.info("Loading groups from: %s", mapgrouppos_file)
         groups = load_groups_from_xml(str(mapgrouppos_file), proto_file_path)
         
         if len(groups) == 0:
@@ -384,10 +517,9 @@ def get_groups():
                 warning='No groups found in XML file. Check XML structure.'
             )
         
-        return api_ok(groups=groups, count=len(groups))
+        return http_cache.with_etag(api_ok(groups=groups, count=len(groups)), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_groups")
         return api_error(str(e), 500)
 
 
@@ -400,7 +532,8 @@ def save_groups(mapgrouppos_file_path, groups_data):
         return {'success': False, 'error': f'File does not exist: {mapgrouppos_file_path}'}
 
     try:
-        tree = ET.parse(mapgrouppos_file_path)
+        with instrumentation.span('parse'):
+            tree = ET.parse(mapgrouppos_file_path)
         root = tree.getroot()
 
         # Remove every existing <group> node from the document before rebuilding.
@@ -459,7 +592,8 @@ def save_groups(mapgrouppos_file_path, groups_data):
             kept_count += 1
 
         ET.indent(tree, space='    ')
-        tree.write(mapgrouppos_file_path, encoding='utf-8', xml_declaration=True)
+        with instrumentation.span('write'):
+            tree.write(mapgrouppos_file_path, encoding='utf-8', xml_declaration=True)
         return {
             'success': True,
             'count': kept_count,
@@ -467,12 +601,11 @@ def save_groups(mapgrouppos_file_path, groups_data):
             'deleted': deleted_count
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_groups")
         return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/groups/save', methods=['POST'])
+@bp.route('/api/groups/save', methods=['POST'])
 def save_groups_endpoint():
     """Save group marker edits to mapgrouppos.xml."""
     try:
@@ -480,7 +613,7 @@ def save_groups_endpoint():
         if not data:
             return api_error('No data provided', 400)
 
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
 
@@ -499,6 +632,7 @@ def save_groups_endpoint():
         result = save_groups(str(mapgrouppos_file), groups_data)
         if not result.get('success'):
             return api_error(result.get('error', 'Unknown error'), 500)
+        publish_layer_changes(mission_path, 'groups')
 
         return api_ok(
             count=result.get('count', 0),
@@ -507,14 +641,13 @@ def save_groups_endpoint():
             message=f"Saved groups: {result.get('updated', 0)} updated, {result.get('deleted', 0)} deleted"
         )
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_groups_endpoint")
         return api_error(str(e), 500)
 
 
 
 
-@app.route('/api/upload-background-image', methods=['POST'])
+@bp.route('/api/upload-background-image', methods=['POST'])
 def upload_background_image():
     """Upload and save background image to server."""
     try:
@@ -536,16 +669,15 @@ def upload_background_image():
         # Save file
         file.save(file_path)
         
-        print(f"Background image saved: {file_path}")
+        logger.info("Background image saved: %s", file_path)
         
         return api_ok(image_id=unique_filename, message='Image uploaded successfully')
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in upload_background_image")
         return api_error(str(e), 500)
 
 
-@app.route('/api/background-image/<image_id>')
+@bp.route('/api/background-image/<image_id>')
 def get_background_image(image_id):
     """Retrieve background image from server."""
     try:
@@ -568,17 +700,18 @@ def get_background_image(image_id):
                 'error': 'Invalid image path'
             }), 403
         
-        return send_file(file_path)
+        # Image IDs are freshly generated UUIDs, so the content behind a URL never changes
+        response = send_file(file_path, max_age=http_cache.IMMUTABLE_MAX_AGE)
+        return http_cache.mark_immutable(response)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_background_image")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
-@app.route('/api/delete-background-image/<image_id>', methods=['DELETE'])
+@bp.route('/api/delete-background-image/<image_id>', methods=['DELETE'])
 def delete_background_image(image_id):
     """Delete background image from server."""
     try:
@@ -602,22 +735,21 @@ def delete_background_image(image_id):
             }), 403
         
         file_path.unlink()
-        print(f"Background image deleted: {file_path}")
+        logger.info("Background image deleted: %s", file_path)
         
         return jsonify({
             'success': True,
             'message': 'Image deleted successfully'
         })
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in delete_background_image")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
-@app.route('/api/export-map', methods=['POST'])
+@bp.route('/api/export-map', methods=['POST'])
 def export_map():
     """Save exported map PNG to a path (default: mission folder)."""
     import base64
@@ -625,7 +757,7 @@ def export_map():
         data = parse_json_body()
         if not data:
             return api_error('No JSON data', 400)
-        mission_dir = data.get('mission_dir') or ''
+        mission_dir = missions.resolve(data.get('mission_dir')) or ''
         path_input = (data.get('path') or '').strip()
         image_b64 = data.get('image') or ''
         if not image_b64:
@@ -654,12 +786,11 @@ def export_map():
         path_obj.write_bytes(raw)
         return api_ok(path=str(path_obj), message=f'Saved to {path_obj}')
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in export_map")
         return api_error(str(e), 500)
 
 
-@app.route('/api/marker-colors/sync', methods=['POST'])
+@bp.route('/api/marker-colors/sync', methods=['POST'])
 def sync_marker_colors():
     """Sync marker color configuration based on currently available marker/event/territory types."""
     try:
@@ -668,130 +799,164 @@ def sync_marker_colors():
         territory_type_names = data.get('territoryTypeNames', []) if isinstance(data, dict) else []
         event_spawn_type_names = data.get('eventSpawnTypeNames', []) if isinstance(data, dict) else []
 
-        config = load_marker_color_config()
+        client_version = data.get('version') if isinstance(data, dict) else None
 
-        _assign_missing_colors(
-            marker_type_keys,
-            config['markerTypes'],
-            unique_within=False,
-            salt='marker-type'
-        )
-        _assign_missing_colors(
-            event_spawn_type_names,
-            config['eventSpawnTypes'],
-            unique_within=False,
-            salt='event-spawn-type'
-        )
-        _assign_missing_colors(
-            territory_type_names,
-            config['territoryTypes'],
-            unique_within=True,
-            salt='territory-type'
-        )
+        with _marker_color_lock:
+            config, version = get_marker_color_config()
+
+            assigned = _assign_missing_colors(
+                marker_type_keys,
+                config['markerTypes'],
+                unique_within=False,
+                salt='marker-type'
+            )
+            assigned += _assign_missing_colors(
+                event_spawn_type_names,
+                config['eventSpawnTypes'],
+                unique_within=False,
+                salt='event-spawn-type'
+            )
+            assigned += _assign_missing_colors(
+                territory_type_names,
+                config['territoryTypes'],
+                unique_within=True,
+                salt='territory-type'
+            )
 
-        save_marker_color_config(config)
-        return api_ok(config=config)
+            if assigned:
+                _mark_marker_colors_changed()
+                version = _marker_color_state['version']
+            if client_version == version:
+                return api_ok(version=version, unchanged=True)
+            return api_ok(config=config, version=version, unchanged=False)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in sync_marker_colors")
         return api_error(str(e), 500)
 
 
+def parse_effect_area(area_data, idx):
+    """
+    Normalize one entry of the cfgeffectarea.json Areas list.
+    Returns the area payload (with sourceId) or None when the entry has no usable position/radius.
+    """
+    if not isinstance(area_data, dict):
+        logger.debug("Skipping area at index %d: not a dict", idx)
+        return None
+    
+    # Get area name
+    area_name = area_data.get('AreaName') or area_data.get('areaName') or area_data.get('Name') or area_data.get('name') or f"Area_{idx}"
+    
+    # Get Data object which contains Pos and Radius
+    data_obj = area_data.get('Data') or area_data.get('data')
+    if not data_obj or not isinstance(data_obj, dict):
+        logger.debug("Area '%s' (index %d): No Data object found. Keys: %s", area_name, idx, list(area_data.keys()))
+        return None
+    
+    # Get position from Data.Pos - expecting [x, y, z] array
+    pos = data_obj.get('Pos') or data_obj.get('pos')
+    
+    if pos is None:
+        logger.debug("Area '%s': No Pos found in Data. Data keys: %s", area_name, list(data_obj.keys()))
+        return None
+    
+    # Parse position - handle array [x, y, z]
+    if isinstance(pos, list):
+        if len(pos) >= 3:
+            x = float(pos[0]) if pos[0] is not None else 0.0
+            y = float(pos[1]) if pos[1] is not None else 0.0
+            z = float(pos[2]) if pos[2] is not None else 0.0
+            has_y = pos[1] is not None
+        else:
+            logger.debug("Area '%s': Pos array too short: %s", area_name, pos)
+            return None
+    elif isinstance(pos, dict):
+        x = float(pos.get('x', 0)) if pos.get('x') is not None else 0.0
+        y = float(pos.get('y', 0)) if pos.get('y') is not None else 0.0
+        z = float(pos.get('z', 0)) if pos.get('z') is not None else 0.0
+        has_y = ('y' in pos) and (pos.get('y') is not None)
+    else:
+        logger.debug("Area '%s': invalid Pos format (type: %s): %s", area_name, type(pos), pos)
+        return None
+    
+    # Get radius from Data.Radius
+    radius = data_obj.get('Radius') or data_obj.get('radius')
+    if radius is None:
+        logger.debug("Area '%s': No Radius found in Data. Data keys: %s", area_name, list(data_obj.keys()))
+        return None
+    
+    try:
+        radius = float(radius)
+    except (ValueError, TypeError) as e:
+        logger.debug("Area '%s': invalid Radius '%s' (type: %s): %s", area_name, radius, type(radius), e)
+        return None
+    
+    area_info = {
+        'name': area_name,
+        'x': x,
+        'y': y,
+        'z': z,
+        'hasY': has_y,
+        'radius': radius
+    }
+    return EFFECT_AREAS_ADAPTER.add_source_id(
+        area_info,
+        *indexed_identity_parts(area_name, x, y, z, radius, index_chain=(idx,))
+    )
+
+
+# Parsed cfgeffectarea.json (raw data, per-entry payloads and a sourceId -> Areas index map),
+# shared by the loader and the changeset saver.
+EFFECT_AREA_MODELS = mission_files.ParsedFileCache()
+
+
+def _effect_area_model(data, areas_key, areas_list, parsed):
+    """Model for one cfgeffectarea.json; parsed[i] is parse_effect_area() of areas_list[i] (None if unusable)."""
+    ids = [area_info['sourceId'] if area_info else None for area_info in parsed]
+    return {
+        'data': data,
+        'areas_key': areas_key,
+        'areas_list': areas_list,
+        'parsed': parsed,
+        'ids': ids,
+        'key_by_id': {source_id: idx for idx, source_id in enumerate(ids) if source_id}
+    }
+
+
+def _build_effect_area_model(effect_area_file_path):
+    with open(effect_area_file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError('cfgeffectarea.json is not a JSON object')
+    areas_key = 'Areas' if 'Areas' in data else ('areas' if 'areas' in data else 'Areas')
+    areas_list = data.get(areas_key)
+    if not isinstance(areas_list, list):
+        areas_list = []
+    parsed = [parse_effect_area(area_json, idx) for idx, area_json in enumerate(areas_list)]
+    return _effect_area_model(data, areas_key, areas_list, parsed)
+
+
 def load_effect_areas(effect_area_file_path):
     """
     Load effect areas from cfgeffectarea.json.
     Returns list of area dictionaries with position and radius data.
     """
     if not effect_area_file_path or not Path(effect_area_file_path).exists():
-        print(f"Effect area JSON file does not exist: {effect_area_file_path}")
+        logger.warning("Effect area JSON file does not exist: %s", effect_area_file_path)
         return []
     
     try:
-        with open(effect_area_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        areas = []
-        
-        # Look for "Areas" list in the JSON
-        areas_list = data.get('Areas') or data.get('areas')
+        model = EFFECT_AREA_MODELS.get(effect_area_file_path, _build_effect_area_model)
         
-        if areas_list and isinstance(areas_list, list):
-            print(f"Found Areas list with {len(areas_list)} entries")
-            for idx, area_data in enumerate(areas_list):
-                if not isinstance(area_data, dict):
-                    print(f"Skipping area at index {idx}: not a dict")
-                    continue
-                
-                # Get area name
-                area_name = area_data.get('AreaName') or area_data.get('areaName') or area_data.get('Name') or area_data.get('name') or f"Area_{idx}"
-                
-                # Get Data object which contains Pos and Radius
-                data_obj = area_data.get('Data') or area_data.get('data')
-                if not data_obj or not isinstance(data_obj, dict):
-                    print(f"Area '{area_name}' (index {idx}): No Data object found. Keys: {list(area_data.keys())}")
-                    continue
-                
-                # Get position from Data.Pos - expecting [x, y, z] array
-                pos = data_obj.get('Pos') or data_obj.get('pos')
-                
-                if pos is None:
-                    print(f"Area '{area_name}': No Pos found in Data. Data keys: {list(data_obj.keys())}")
-                    continue
-                
-                # Parse position - handle array [x, y, z]
-                if isinstance(pos, list):
-                    if len(pos) >= 3:
-                        x = float(pos[0]) if pos[0] is not None else 0.0
-                        y = float(pos[1]) if pos[1] is not None else 0.0
-                        z = float(pos[2]) if pos[2] is not None else 0.0
-                        has_y = pos[1] is not None
-                    else:
-                        print(f"Area '{area_name}': Pos array too short: {pos}")
-                        continue
-                elif isinstance(pos, dict):
-                    x = float(pos.get('x', 0)) if pos.get('x') is not None else 0.0
-                    y = float(pos.get('y', 0)) if pos.get('y') is not None else 0.0
-                    z = float(pos.get('z', 0)) if pos.get('z') is not None else 0.0
-                    has_y = ('y' in pos) and (pos.get('y') is not None)
-                else:
-                    print(f"Area '{area_name}': invalid Pos format (type: {type(pos)}): {pos}")
-                    continue
-                
-                # Get radius from Data.Radius
-                radius = data_obj.get('Radius') or data_obj.get('radius')
-                if radius is None:
-                    print(f"Area '{area_name}': No Radius found in Data. Data keys: {list(data_obj.keys())}")
-                    continue
-                
-                try:
-                    radius = float(radius)
-                except (ValueError, TypeError) as e:
-                    print(f"Area '{area_name}': invalid Radius '{radius}' (type: {type(radius)}): {e}")
-                    continue
-                
-                area_info = {
-                    'name': area_name,
-                    'x': x,
-                    'y': y,
-                    'z': z,
-                    'hasY': has_y,
-                    'radius': radius
-                }
-                EFFECT_AREAS_ADAPTER.add_source_id(
-                    area_info,
-                    *indexed_identity_parts(area_name, x, y, z, radius, index_chain=(idx,))
-                )
-                print(f"Added effect area: {area_info}")
-                areas.append(area_info)
-        else:
-            print(f"Areas not found or not a list. Type: {type(areas_list)}")
+        summary = LoadSummary(logger, 'effect areas')
+        if not model['areas_list']:
+            logger.warning("Areas not found, empty or not a list in %s", effect_area_file_path)
+        areas = [area_info for area_info in model['parsed'] if area_info is not None]
+        summary.add('skipped_invalid', len(model['parsed']) - len(areas))
         
-        print(f"Successfully loaded {len(areas)} effect areas")
+        summary.log("Loaded %d effect areas", len(areas))
         return areas
     except Exception as e:
-        import traceback
-        print(f"Error loading effect areas: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading effect areas: %s", e)
         return []
 
 
@@ -808,24 +973,100 @@ def guess_profile_dir_from_mission_dir(mission_dir):
     return ''
 
 
+# Loadout directory listings keyed by the directory's mtime (adding, removing or renaming
+# a file bumps it) and per-file loadout summaries keyed by each file's mtime/size.
+# Checked with a stat per request rather than a watchdog observer: that needs no observer
+# thread per profile folder and also sees changes on network shares, where file system
+# events are often not delivered.
+LOADOUT_INDEXES = mission_files.ParsedFileCache()
+LOADOUT_SUMMARIES = mission_files.ParsedFileCache()
+
+
+def get_loadouts_path(profile_dir):
+    """Return profile/ExpansionMod/Loadouts for a profile folder, or None."""
+    if not profile_dir:
+        return None
+    return Path(profile_dir) / 'ExpansionMod' / 'Loadouts'
+
+
+def _scan_loadout_dir(loadouts_path):
+    """Map loadout name -> file path for every file in the loadouts folder."""
+    files = {}
+    for p in sorted(Path(loadouts_path).iterdir(), key=lambda entry: entry.name):
+        # Prefer the .json file when several files share a stem
+        if p.stem and p.is_file() and (p.stem not in files or p.suffix.lower() == '.json'):
+            files[p.stem] = str(p)
+    return {'names': sorted(files), 'files': files}
+
+
+def get_loadout_index(profile_dir):
+    """Return the cached {'names', 'files'} index of the profile's loadouts, or None."""
+    loadouts_path = get_loadouts_path(profile_dir)
+    if loadouts_path is None or not loadouts_path.is_dir():
+        return None
+    return LOADOUT_INDEXES.get(loadouts_path, _scan_loadout_dir)
+
+
 def list_loadout_names(profile_dir):
     """Return loadout names (filenames without extension) from profile/ExpansionMod/Loadouts."""
     if not profile_dir:
         return None
     try:
-        loadouts_path = Path(profile_dir) / 'ExpansionMod' / 'Loadouts'
-        if not loadouts_path.exists() or not loadouts_path.is_dir():
+        index = get_loadout_index(profile_dir)
+        if index is None:
             return None
-        names = sorted({
-            p.stem for p in loadouts_path.iterdir()
-            if p.is_file() and p.stem
-        })
-        return names
+        return list(index['names'])
     except Exception as e:
-        print(f"Error listing loadouts from profile folder '{profile_dir}': {e}")
+        logger.error("Error listing loadouts from profile folder '%s': %s", profile_dir, e)
         return None
 
 
+def summarize_loadout(data):
+    """
+    Summarize an Expansion loadout: total item count (nested attachments/cargo/sets
+    included), top-level attachment slots, cargo entries and sets.
+    """
+    def count_items(entry):
+        if not isinstance(entry, dict):
+            return 0
+        total = 1 if entry.get('ClassName') else 0
+        for slot in entry.get('InventoryAttachments') or []:
+            if isinstance(slot, dict):
+                total += sum(count_items(item) for item in slot.get('Items') or [])
+        total += sum(count_items(item) for item in entry.get('InventoryCargo') or [])
+        total += sum(count_items(item) for item in entry.get('Sets') or [])
+        return total
+
+    if not isinstance(data, dict):
+        return {'itemCount': 0, 'attachments': 0, 'cargo': 0, 'sets': 0}
+    return {
+        'itemCount': count_items(data),
+        'attachments': len(data.get('InventoryAttachments') or []),
+        'cargo': len(data.get('InventoryCargo') or []),
+        'sets': len(data.get('Sets') or []),
+    }
+
+
+def _build_loadout_summary(loadout_file_path):
+    try:
+        with open(loadout_file_path, 'r', encoding='utf-8') as f:
+            return summarize_loadout(json.load(f))
+    except Exception as e:
+        logger.error("Error reading loadout '%s': %s", loadout_file_path, e)
+        return {'error': str(e)}
+
+
+def list_loadout_summaries(profile_dir):
+    """Return {name: summary} for every loadout, parsing only files that changed."""
+    index = get_loadout_index(profile_dir)
+    if index is None:
+        return {}
+    return {
+        name: LOADOUT_SUMMARIES.get(path, _build_loadout_summary)
+        for name, path in index['files'].items()
+    }
+
+
 def get_ai_patrol_options_catalog_path():
     """Get path to app-local AI patrol option catalog file."""
     app_data_dir = Path(__file__).resolve().parent / 'data'
@@ -894,53 +1135,72 @@ AI_PATROL_OVERRIDE_DEFAULT_FALLBACKS = {
 }
 
 
-def extract_ai_patrol_options_from_patrols(patrols):
-    """Extract option lists from patrol data (used for first-time catalog bootstrap)."""
-    factions = set()
-    behaviours = set()
-    formations = set()
-    stances = set()
-    speeds = set()
-    looting_behaviours = set()
+AI_PATROL_OPTION_KEYS = ['factions', 'behaviours', 'formations', 'stances', 'speeds', 'lootingBehaviours']
+
+
+def extract_ai_patrol_catalog_from_patrols(patrols):
+    """
+    Infer option lists and override defaults from patrol data in a single pass.
+    Returns {'options': {...}, 'overrideDefaults': {...}}; override defaults are the
+    most common non-empty value per field (first seen wins ties).
+    """
+    option_sets = {key: set() for key in AI_PATROL_OPTION_KEYS}
+    field_counts = {field: {} for field in AI_PATROL_OVERRIDE_FIELDS}
 
     for p in patrols:
         if not isinstance(p, dict):
             continue
         faction = p.get('Faction')
         if faction:
-            factions.add(str(faction))
+            option_sets['factions'].add(str(faction))
         behaviour = p.get('Behaviour')
         if behaviour:
-            behaviours.add(str(behaviour))
+            option_sets['behaviours'].add(str(behaviour))
         formation = p.get('Formation')
         if formation:
-            formations.add(str(formation))
+            option_sets['formations'].add(str(formation))
         stance = p.get('DefaultStance')
         if stance:
-            stances.add(str(stance))
+            option_sets['stances'].add(str(stance))
         speed = p.get('Speed')
         if speed:
-            speeds.add(str(speed))
+            option_sets['speeds'].add(str(speed))
         utspeed = p.get('UnderThreatSpeed')
         if utspeed:
-            speeds.add(str(utspeed))
+            option_sets['speeds'].add(str(utspeed))
         loot = p.get('LootingBehaviour')
         if loot is not None and str(loot) != '':
             for token in str(loot).split('|'):
                 token = token.strip()
                 if token:
-                    looting_behaviours.add(token)
+                    option_sets['lootingBehaviours'].add(token)
+
+        for field, counts in field_counts.items():
+            raw = p.get(field)
+            if raw is None:
+                continue
+            value = str(raw).strip()
+            if value:
+                counts[value] = counts.get(value, 0) + 1
+
+    override_defaults = {}
+    for field, counts in field_counts.items():
+        if counts:
+            override_defaults[field] = max(counts.items(), key=lambda item: item[1])[0]
+        else:
+            override_defaults[field] = AI_PATROL_OVERRIDE_DEFAULT_FALLBACKS.get(field, '-1')
 
     return {
-        'factions': sorted(factions),
-        'behaviours': sorted(behaviours),
-        'formations': sorted(formations),
-        'stances': sorted(stances),
-        'speeds': sorted(speeds),
-        'lootingBehaviours': sorted(looting_behaviours),
+        'options': {key: sorted(values) for key, values in option_sets.items()},
+        'overrideDefaults': override_defaults,
     }
 
 
+def extract_ai_patrol_options_from_patrols(patrols):
+    """Extract option lists from patrol data (used for first-time catalog bootstrap)."""
+    return extract_ai_patrol_catalog_from_patrols(patrols)['options']
+
+
 def _normalize_option_values(values):
     """Normalize option list values into unique strings while preserving order."""
     if not isinstance(values, list):
@@ -959,24 +1219,7 @@ def _normalize_option_values(values):
 
 def extract_ai_patrol_override_defaults_from_patrols(patrols):
     """Infer default override values from patrols (most common non-empty value per field)."""
-    defaults = {}
-    for field in AI_PATROL_OVERRIDE_FIELDS:
-        counts = {}
-        for patrol in patrols:
-            if not isinstance(patrol, dict):
-                continue
-            raw = patrol.get(field)
-            if raw is None:
-                continue
-            value = str(raw).strip()
-            if not value:
-                continue
-            counts[value] = counts.get(value, 0) + 1
-        if not counts:
-            defaults[field] = AI_PATROL_OVERRIDE_DEFAULT_FALLBACKS.get(field, '-1')
-            continue
-        defaults[field] = max(counts.items(), key=lambda item: item[1])[0]
-    return defaults
+    return extract_ai_patrol_catalog_from_patrols(patrols)['overrideDefaults']
 
 
 def _normalize_override_defaults(values):
@@ -990,64 +1233,135 @@ def _normalize_override_defaults(values):
     return normalized
 
 
-def load_or_init_ai_patrol_option_catalog(settings_file_path, patrols):
-    """
-    Load app-local AI patrol option catalog.
-    If missing/invalid, bootstrap from current patrol settings and write the file.
+# Parsed AIPatrolSettings.json (raw data + inferred catalog) and parsed option catalog
+# files, each reused until the file's mtime/size change.
+AI_PATROL_SETTINGS_MODELS = mission_files.ParsedFileCache()
+AI_PATROL_CATALOG_FILES = mission_files.ParsedFileCache()
+
+
+def _ai_patrol_source_ids(patrols):
+    """One ID per patrol from its Name and how many earlier patrols share that name.
+
+    Inserting, deleting or renaming a patrol only renumbers later patrols of the same name.
     """
-    catalog_path = get_ai_patrol_options_catalog_path()
-    keys = ['factions', 'behaviours', 'formations', 'stances', 'speeds', 'lootingBehaviours']
-    inferred_override_defaults = extract_ai_patrol_override_defaults_from_patrols(patrols)
+    seen = Counter()
+    rows = []
+    for patrol in patrols:
+        name = patrol.get('Name') if isinstance(patrol, dict) else None
+        rows.append(indexed_identity_parts(name, index_chain=(seen[name],)))
+        seen[name] += 1
+    return AI_PATROLS_ADAPTER.source_ids(rows)
+
+
+def _ai_patrol_settings_model(data, patrols, chunks=None):
+    """Model for one AIPatrolSettings.json: raw data, patrols, their IDs and cached JSON chunks."""
+    ids = _ai_patrol_source_ids(patrols)
+    return {
+        'data': data,
+        'patrols': patrols,
+        'ids': ids,
+        'key_by_id': {source_id: idx for idx, source_id in enumerate(ids)},
+        # Serialized patrols for serialize_ai_patrol_settings; None until first needed
+        'chunks': chunks if chunks is not None else [None] * len(patrols),
+        'inferred': extract_ai_patrol_catalog_from_patrols(patrols)
+    }
 
-    if catalog_path.exists():
-        try:
-            with open(catalog_path, 'r', encoding='utf-8') as f:
-                raw = json.load(f)
-            source = raw.get('options', raw) if isinstance(raw, dict) else {}
-            options = {k: _normalize_option_values(source.get(k, [])) for k in keys}
-            source_override_defaults = source.get('overrideDefaults', {}) if isinstance(source, dict) else {}
+
+def _build_ai_patrol_settings_model(settings_file_path):
+    with open(settings_file_path, 'r', encoding='utf-8') as f:
+        with instrumentation.span('parse'):
+            data = json.load(f)
+    patrols = data.get('Patrols', []) if isinstance(data, dict) else []
+    if not isinstance(patrols, list):
+        patrols = []
+    return _ai_patrol_settings_model(data, patrols)
+
+
+def _read_ai_patrol_catalog_file(catalog_path):
+    """Return the raw catalog JSON, or None when it is missing or unreadable."""
+    if not Path(catalog_path).exists():
+        return None
+    try:
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            with instrumentation.span('parse'):
+                return json.load(f)
+    except Exception as e:
+        logger.warning("AI patrol option catalog is invalid, ignoring: %s", e)
+        return None
+
+
+def _merge_ai_patrol_option_catalog(raw, inferred):
+    """
+    Combine a raw catalog file with options inferred from patrols.
+    Returns (options, complete) where complete is False when the catalog is missing,
+    invalid or lacks override defaults that had to be backfilled from the patrols.
+    """
+    if isinstance(raw, dict):
+        source = raw.get('options', raw)
+        if isinstance(source, dict):
+            options = {k: _normalize_option_values(source.get(k, [])) for k in AI_PATROL_OPTION_KEYS}
+            source_override_defaults = source.get('overrideDefaults', {})
+            if not isinstance(source_override_defaults, dict):
+                source_override_defaults = {}
             override_defaults = _normalize_override_defaults(source_override_defaults)
-            needs_write = False
-            # Backfill/update catalog defaults if any keys are missing.
+            complete = True
+            # Backfill catalog defaults if any keys are missing.
             for field in AI_PATROL_OVERRIDE_FIELDS:
                 if field not in source_override_defaults:
-                    override_defaults[field] = inferred_override_defaults.get(field, '-1.0')
-                    needs_write = True
+                    override_defaults[field] = inferred['overrideDefaults'].get(field, '-1.0')
+                    complete = False
             options['overrideDefaults'] = override_defaults
-            if needs_write:
-                if not isinstance(raw, dict):
-                    raw = {}
-                raw['generatedFrom'] = str(settings_file_path)
-                raw['options'] = {**options}
-                with open(catalog_path, 'w', encoding='utf-8') as f:
-                    json.dump(raw, f, indent=4, ensure_ascii=False)
-            return options
-        except Exception as e:
-            print(f"AI patrol option catalog is invalid, recreating: {e}")
+            return options, complete
 
-    options = extract_ai_patrol_options_from_patrols(patrols)
-    options['overrideDefaults'] = _normalize_override_defaults(inferred_override_defaults)
-    try:
-        with open(catalog_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'generatedFrom': str(settings_file_path),
-                'options': options
-            }, f, indent=4, ensure_ascii=False)
-        print(f"Created AI patrol option catalog: {catalog_path}")
-    except Exception as e:
-        print(f"Failed to write AI patrol option catalog '{catalog_path}': {e}")
+    options = {k: list(v) for k, v in inferred['options'].items()}
+    options['overrideDefaults'] = _normalize_override_defaults(inferred['overrideDefaults'])
+    return options, False
+
+
+def load_ai_patrol_option_catalog(inferred):
+    """
+    Load the app-local AI patrol option catalog, falling back to options inferred from
+    the current patrols when it does not exist yet. Never writes; see
+    persist_ai_patrol_option_catalog.
+    """
+    catalog_path = get_ai_patrol_options_catalog_path()
+    raw = AI_PATROL_CATALOG_FILES.get(catalog_path, _read_ai_patrol_catalog_file)
+    options, _ = _merge_ai_patrol_option_catalog(raw, inferred)
     return options
 
 
+def persist_ai_patrol_option_catalog(settings_file_path, inferred):
+    """Create or backfill the catalog file from inferred options; called from saves only."""
+    catalog_path = get_ai_patrol_options_catalog_path()
+    with mission_files.file_lock(catalog_path):
+        raw = _read_ai_patrol_catalog_file(catalog_path)
+        options, complete = _merge_ai_patrol_option_catalog(raw, inferred)
+        if complete:
+            return False
+        if not isinstance(raw, dict):
+            raw = {}
+        raw['generatedFrom'] = str(settings_file_path)
+        raw['options'] = {**options}
+        try:
+            mission_files.atomic_write_json(catalog_path, raw, indent=4)
+            logger.info("Updated AI patrol option catalog: %s", catalog_path)
+        except Exception as e:
+            logger.error("Failed to write AI patrol option catalog '%s': %s", catalog_path, e)
+            return False
+        AI_PATROL_CATALOG_FILES.invalidate(catalog_path)
+    return True
+
+
 def load_ai_patrol_settings(settings_file_path, loadout_names=None):
     """
     Load AI patrol settings from AIPatrolSettings.json.
     Returns a dict with global options and patrol list.
     """
     if not settings_file_path or not Path(settings_file_path).exists():
-        print(f"AI patrol settings file does not exist: {settings_file_path}")
+        logger.warning("AI patrol settings file does not exist: %s", settings_file_path)
         return {
             'patrols': [],
+            'patrol_ids': [],
             'options': {
                 'factions': [],
                 'behaviours': [],
@@ -1060,16 +1374,12 @@ def load_ai_patrol_settings(settings_file_path, loadout_names=None):
         }
     
     try:
-        with open(settings_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        model = AI_PATROL_SETTINGS_MODELS.get(settings_file_path, _build_ai_patrol_settings_model)
+        patrols = model['patrols']
         
-        patrols = data.get('Patrols', [])
-        if not isinstance(patrols, list):
-            patrols = []
-        
-        # Use app-local option catalog for canonical lists. On first run this
-        # catalog is bootstrapped from current patrol settings.
-        catalog_options = load_or_init_ai_patrol_option_catalog(settings_file_path, patrols)
+        # Use app-local option catalog for canonical lists. Until the first save
+        # creates it, options are inferred from the current patrol settings.
+        catalog_options = load_ai_patrol_option_catalog(model['inferred'])
         options = {
             'factions': list(catalog_options.get('factions', [])),
             'loadouts': list(loadout_names) if loadout_names is not None else [],
@@ -1084,14 +1394,14 @@ def load_ai_patrol_settings(settings_file_path, loadout_names=None):
         # Return patrols as-is; frontend will decide which fields to expose/edit
         return {
             'patrols': patrols,
+            'patrol_ids': list(model['ids']),
             'options': options
         }
     except Exception as e:
-        import traceback
-        print(f"Error loading AI patrol settings: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading AI patrol settings: %s", e)
         return {
             'patrols': [],
+            'patrol_ids': [],
             'options': {
                 'factions': [],
                 'loadouts': [],
@@ -1110,23 +1420,156 @@ def save_ai_patrol_settings(settings_file_path, patrols):
     if not settings_file_path or not Path(settings_file_path).exists():
         return {'success': False, 'error': f'File does not exist: {settings_file_path}'}
     try:
-        with open(settings_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        data['Patrols'] = patrols if isinstance(patrols, list) else []
-        with open(settings_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        return {'success': True, 'count': len(data['Patrols'])}
+        with mission_files.file_lock(settings_file_path):
+            with open(settings_file_path, 'r', encoding='utf-8') as f:
+                with instrumentation.span('parse'):
+                    data = json.load(f)
+            data['Patrols'] = patrols if isinstance(patrols, list) else []
+            mission_files.atomic_write_text(settings_file_path, json.dumps(data, indent=4, ensure_ascii=False))
+            AI_PATROL_SETTINGS_MODELS.invalidate(settings_file_path)
+        # Bootstrap/backfill the option catalog here rather than on GET
+        persist_ai_patrol_option_catalog(settings_file_path, extract_ai_patrol_catalog_from_patrols(data['Patrols']))
+        patrol_ids = _ai_patrol_source_ids(data['Patrols'])
+        return {'success': True, 'count': len(data['Patrols']), 'patrol_ids': patrol_ids}
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_ai_patrol_settings")
         return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/effect-areas')
+def _ai_patrol_json_chunk(patrol):
+    """One patrol as it appears inside the Patrols array of a json.dump(indent=4) file."""
+    return '        ' + json.dumps(patrol, indent=4, ensure_ascii=False).replace('\n', '\n        ')
+
+
+def serialize_ai_patrol_settings(data, patrol_chunks):
+    """
+    Serialize AIPatrolSettings.json byte-for-byte like json.dumps(data, indent=4,
+    ensure_ascii=False), reusing pre-serialized patrol chunks (see _ai_patrol_json_chunk)
+    so that only edited patrols are re-encoded. Key order is preserved.
+    """
+    if not isinstance(data, dict) or not data:
+        return json.dumps(data, indent=4, ensure_ascii=False)
+    lines = []
+    for key, value in data.items():
+        if key == 'Patrols' and isinstance(value, list) and value:
+            body = '[\n' + ',\n'.join(patrol_chunks) + '\n    ]'
+        else:
+            body = json.dumps(value, indent=4, ensure_ascii=False).replace('\n', '\n    ')
+        lines.append(f"    {json.dumps(key, ensure_ascii=False)}: {body}")
+    return '{\n' + ',\n'.join(lines) + '\n}'
+
+
+def _apply_ai_patrol_modification(patrol, item):
+    """Return a copy of patrol with a modified-entry's fields/waypoints applied."""
+    patrol = dict(patrol)
+    fields = item.get('fields') or {}
+    if not isinstance(fields, dict):
+        raise ValueError('fields must be an object')
+    patrol.update(fields)
+    for field in item.get('removedFields') or []:
+        patrol.pop(field, None)
+    waypoints = item.get('waypoints') or {}
+    if waypoints:
+        current = patrol.get('Waypoints')
+        if not isinstance(current, list):
+            raise ValueError(f"Patrol '{patrol.get('Name', '')}' has no Waypoints to patch")
+        current = list(current)
+        for key, coords in waypoints.items():
+            waypoint_idx = int(key)
+            if not 0 <= waypoint_idx < len(current):
+                raise ValueError(f"Waypoint index {waypoint_idx} out of range for patrol '{patrol.get('Name', '')}'")
+            current[waypoint_idx] = coords
+        patrol['Waypoints'] = current
+    return patrol
+
+
+def _changeset_conflict(file_name, conflicts):
+    """Failed-save result for a changeset whose source IDs no longer resolve (answered with 409)."""
+    return {
+        'success': False,
+        'error': f'{file_name} changed since it was loaded; reload and reapply the edits',
+        'conflicts': conflicts
+    }
+
+
+def apply_ai_patrol_changes(settings_file_path, changes):
+    """
+    Apply a patrol changeset to AIPatrolSettings.json.
+    changes is {'modified': [{sourceId, fields?, removedFields?, waypoints?}], 'added': [patrol, ...],
+    'deleted': [sourceId, ...]} where fields is a partial patrol object and waypoints maps a
+    waypoint index to its new [x, y, z]. Unchanged patrols are written from their cached JSON,
+    so only edited patrols are re-encoded. Unresolvable source IDs abort the save.
+    """
+    if not settings_file_path or not Path(settings_file_path).exists():
+        return {'success': False, 'error': f'File does not exist: {settings_file_path}'}
+    
+    modified, added, deleted_ids = split_changeset(changes)
+    
+    with mission_files.file_lock(settings_file_path):
+        model = AI_PATROL_SETTINGS_MODELS.get(settings_file_path, _build_ai_patrol_settings_model)
+        if not isinstance(model['data'], dict):
+            return {'success': False, 'error': 'AIPatrolSettings.json is not a JSON object'}
+        key_by_id = model['key_by_id']
+        
+        conflicts = changeset_conflicts(modified, deleted_ids, key_by_id)
+        if conflicts:
+            return _changeset_conflict('AIPatrolSettings.json', conflicts)
+        
+        # Copy-on-write so readers holding the cached model never see a half-applied save
+        patrols = list(model['patrols'])
+        chunks = list(model['chunks'])
+        updated_count = 0
+        for item in modified:
+            if item['sourceId'] in deleted_ids:
+                continue
+            patrol_idx = key_by_id[item['sourceId']]
+            try:
+                patrols[patrol_idx] = _apply_ai_patrol_modification(patrols[patrol_idx], item)
+            except (TypeError, ValueError) as e:
+                return {'success': False, 'error': str(e)}
+            chunks[patrol_idx] = None
+            updated_count += 1
+        
+        deleted_idx = {key_by_id[source_id] for source_id in deleted_ids}
+        kept = [idx for idx in range(len(patrols)) if idx not in deleted_idx]
+        old_ids = [model['ids'][idx] for idx in kept] + [None] * len(added)
+        patrols = [patrols[idx] for idx in kept] + added
+        chunks = [chunks[idx] for idx in kept] + [None] * len(added)
+        chunks = [chunk if chunk is not None else _ai_patrol_json_chunk(patrol) for chunk, patrol in zip(chunks, patrols)]
+        
+        data = dict(model['data'])
+        data['Patrols'] = patrols
+        mission_files.atomic_write_text(settings_file_path, serialize_ai_patrol_settings(data, chunks))
+        new_model = _ai_patrol_settings_model(data, patrols, chunks)
+        AI_PATROL_SETTINGS_MODELS.store(settings_file_path, new_model)
+    
+    # IDs embed the patrol name and its occurrence among same-named patrols; report every ID that moved
+    source_ids = {
+        old_id: new_id for old_id, new_id in zip(old_ids, new_model['ids'])
+        if old_id and old_id != new_id
+    }
+    added_source_ids = new_model['ids'][len(kept):]
+    persist_ai_patrol_option_catalog(settings_file_path, new_model['inferred'])
+    
+    total_changes = updated_count + len(deleted_idx) + len(added)
+    logger.info("Successfully saved AI patrols: %d updated, %d added, %d deleted", updated_count, len(added), len(deleted_idx))
+    return {
+        'success': True,
+        'count': total_changes,
+        'updated': updated_count,
+        'added': len(added),
+        'deleted': len(deleted_idx),
+        'total': len(patrols),
+        'source_ids': source_ids,
+        'added_source_ids': added_source_ids
+    }
+
+
+@bp.route('/api/effect-areas')
 def get_effect_areas():
     """Get effect area data from cfgeffectarea.json."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         
         if not mission_dir:
             return jsonify({'error': 'No mission directory specified'}), 400
@@ -1148,28 +1591,32 @@ def get_effect_areas():
                 'message': f'cfgeffectarea.json not found at: {effect_area_file}'
             })
         
-        print(f"Loading effect areas from: {effect_area_file}")
+        etag = http_cache.source_etag(effect_area_file)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        logger.info("Loading effect areas from: %s", effect_area_file)
         areas = load_effect_areas(str(effect_area_file))
         
-        return jsonify({
+        return http_cache.with_etag(jsonify({
             'success': True,
             'areas': areas,
             'count': len(areas)
-        })
+        }), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_effect_areas")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
-@app.route('/api/ai-patrols')
+@bp.route('/api/ai-patrols')
 def get_ai_patrols():
     """Get AI patrol settings (Patrols + option lists) from AIPatrolSettings.json."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         if not mission_dir:
             return jsonify({'success': False, 'error': 'No mission directory specified'}), 400
         
@@ -1184,30 +1631,73 @@ def get_ai_patrols():
         profile_dir = request.args.get('profile_dir', '').strip()
         if not profile_dir:
             profile_dir = guess_profile_dir_from_mission_dir(mission_dir)
+        loadouts_dir = get_loadouts_path(profile_dir)
+        etag = http_cache.source_etag(
+            settings_path,
+            get_ai_patrol_options_catalog_path(),
+            loadouts_dir,
+            extra=(profile_dir,)
+        )
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
         loadout_names = list_loadout_names(profile_dir)
-        print(f"Loading AI patrol settings from: {settings_path}")
+        logger.info("Loading AI patrol settings from: %s", settings_path)
         result = load_ai_patrol_settings(str(settings_path), loadout_names=loadout_names)
         
-        return jsonify({
+        return http_cache.with_etag(jsonify({
             'success': True,
             'patrols': result['patrols'],
+            'patrol_ids': result['patrol_ids'],
             'options': result['options'],
             'profile_dir': profile_dir
-        })
+        }), etag)
+    except Exception as e:
+        logger.exception("Unhandled error in get_ai_patrols")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/api/ai-patrols/loadouts')
+def get_ai_patrol_loadouts():
+    """Get per-loadout summaries (item/attachment/cargo/set counts) for the profile's loadouts."""
+    try:
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
+        profile_dir = request.args.get('profile_dir', '').strip()
+        if not profile_dir and mission_dir:
+            profile_dir = guess_profile_dir_from_mission_dir(mission_dir)
+        if not profile_dir:
+            return jsonify({'success': False, 'error': 'No profile directory specified'}), 400
+        
+        index = get_loadout_index(profile_dir)
+        if index is None:
+            return jsonify({'success': True, 'loadouts': {}, 'count': 0, 'profile_dir': profile_dir})
+        
+        etag = http_cache.source_etag(get_loadouts_path(profile_dir), *index['files'].values(), extra=(profile_dir,))
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        summaries = list_loadout_summaries(profile_dir)
+        return http_cache.with_etag(jsonify({
+            'success': True,
+            'loadouts': summaries,
+            'count': len(summaries),
+            'profile_dir': profile_dir
+        }), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_ai_patrol_loadouts")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/ai-patrols/save', methods=['POST'])
+@bp.route('/api/ai-patrols/save', methods=['POST'])
 def save_ai_patrols():
     """Save Patrols array to AIPatrolSettings.json."""
     try:
         data = parse_json_body()
         if not data:
             return api_error('No data provided', 400)
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
         mission_path = Path(mission_dir)
@@ -1218,10 +1708,62 @@ def save_ai_patrols():
         result = save_ai_patrol_settings(str(settings_path), patrols)
         if not result.get('success'):
             return api_error(result.get('error', 'Save failed'), 500)
-        return api_ok(count=result.get('count', 0), message=f"Saved {result.get('count', 0)} patrols")
+        publish_layer_changes(mission_path, 'ai-patrols')
+        return api_ok(
+            count=result.get('count', 0),
+            message=f"Saved {result.get('count', 0)} patrols",
+            patrol_ids=result.get('patrol_ids', [])
+        )
+    except Exception as e:
+        logger.exception("Unhandled error in save_ai_patrols")
+        return api_error(str(e), 500)
+
+
+@bp.route('/api/ai-patrols/patch', methods=['POST'])
+def patch_ai_patrols():
+    """Apply a sourceId-keyed patrol changeset (only changed patrols/waypoints) to AIPatrolSettings.json."""
+    try:
+        data = parse_json_body()
+        if not data:
+            return api_error('No data provided', 400)
+        mission_dir = missions.resolve(data.get('mission_dir'))
+        if not mission_dir:
+            return api_error('No mission directory specified', 400)
+        mission_path = Path(mission_dir)
+        if not mission_path.exists():
+            return api_error(f'Mission directory does not exist: {mission_dir}', 404)
+        changes = data.get('changes')
+        if not isinstance(changes, dict):
+            return api_error('No changes provided', 400)
+        settings_path = mission_path / 'expansion' / 'settings' / 'AIPatrolSettings.json'
+        result = apply_ai_patrol_changes(str(settings_path), changes)
+        if result.get('conflicts'):
+            return api_error(result['error'], 409, conflicts=result['conflicts'])
+        if not result.get('success'):
+            return api_error(result.get('error', 'Save failed'), 400)
+        # Patrol waypoints are applied by reloading the layer
+        publish_layer_changes(mission_path, 'ai-patrols')
+        
+        message_parts = []
+        if result.get('updated', 0) > 0:
+            message_parts.append(f"{result['updated']} updated")
+        if result.get('added', 0) > 0:
+            message_parts.append(f"{result['added']} added")
+        if result.get('deleted', 0) > 0:
+            message_parts.append(f"{result['deleted']} deleted")
+        message = f"Saved: {', '.join(message_parts)}" if message_parts else "No changes"
+        
+        return api_ok(
+            count=result['count'],
+            total=result['total'],
+            message=message,
+            source_ids=result['source_ids'],
+            added_source_ids=result['added_source_ids']
+        )
+    except ChangesetError as e:
+        return api_error(str(e), 400)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in patch_ai_patrols")
         return api_error(str(e), 500)
 
 
@@ -1241,113 +1783,214 @@ def save_effect_areas(effect_area_file_path, effect_areas_data, deleted_indices=
         new_indices = []
     
     try:
-        # Load existing JSON
-        with open(effect_area_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get Areas list
-        areas_list = data.get('Areas') or data.get('areas')
-        if not areas_list:
-            areas_list = []
-            data['Areas'] = areas_list
-        
-        # Create sets for quick lookup
-        deleted_set = set(deleted_indices)
-        new_set = set(new_indices)
-        
-        # Remove deleted areas (in reverse order to maintain indices)
-        for idx in sorted(deleted_indices, reverse=True):
-            if idx < len(areas_list):
-                areas_list.pop(idx)
-        
-        # Update existing areas (skip deleted and new ones)
-        data_index = 0
-        json_index = 0
-        updated_count = 0
-        
-        while data_index < len(effect_areas_data) and json_index < len(areas_list):
-            area_data = effect_areas_data[data_index]
+        with mission_files.file_lock(effect_area_file_path):
+            # Load existing JSON
+            with open(effect_area_file_path, 'r', encoding='utf-8') as f:
+                with instrumentation.span('parse'):
+                    data = json.load(f)
             
-            # Skip deleted areas in data
-            if data_index in deleted_set or area_data.get('isDeleted', False):
-                data_index += 1
-                continue
-            
-            # Skip new areas in data (they'll be added later)
-            if data_index in new_set or area_data.get('isNew', False):
-                data_index += 1
-                continue
+            # Get Areas list
+            areas_list = data.get('Areas') or data.get('areas')
+            if not areas_list:
+                areas_list = []
+                data['Areas'] = areas_list
             
-            # Update this area
-            area_json = areas_list[json_index]
+            # Create sets for quick lookup
+            deleted_set = set(deleted_indices)
+            new_set = set(new_indices)
             
-            # Ensure Data object exists
-            if 'Data' not in area_json:
-                area_json['Data'] = {}
-            if 'data' not in area_json and 'Data' not in area_json:
-                area_json['Data'] = {}
+            # Remove deleted areas in one pass (indices refer to the list as loaded)
+            if deleted_set:
+                areas_list[:] = [area for idx, area in enumerate(areas_list) if idx not in deleted_set]
             
-            data_obj = area_json.get('Data') or area_json.get('data', {})
+            # Update existing areas (skip deleted and new ones)
+            data_index = 0
+            json_index = 0
+            updated_count = 0
             
-            # Round to 2 decimal places
-            x = round(float(area_data.get('x', 0)), 2)
-            y = round(float(area_data.get('y', 0)), 2)
-            z = round(float(area_data.get('z', 0)), 2)
-            radius = round(float(area_data.get('radius', 50)), 2)
-            
-            # Update position and radius
-            data_obj['Pos'] = [x, y, z]
-            data_obj['Radius'] = radius
-            
-            # Update area name if provided
-            if 'name' in area_data:
-                area_json['AreaName'] = area_data['name']
-            
-            updated_count += 1
-            data_index += 1
-            json_index += 1
-        
-        # Add new areas
-        added_count = 0
-        for idx in sorted(new_indices):
-            if idx < len(effect_areas_data):
-                area_data = effect_areas_data[idx]
+            while data_index < len(effect_areas_data) and json_index < len(areas_list):
+                area_data = effect_areas_data[data_index]
                 
-                if area_data.get('isDeleted', False):
+                # Skip deleted areas in data
+                if data_index in deleted_set or area_data.get('isDeleted', False):
+                    data_index += 1
                     continue
                 
+                # Skip new areas in data (they'll be added later)
+                if data_index in new_set or area_data.get('isNew', False):
+                    data_index += 1
+                    continue
+                
+                # Update this area
+                area_json = areas_list[json_index]
+                
+                # Ensure Data object exists
+                if 'Data' not in area_json:
+                    area_json['Data'] = {}
+                if 'data' not in area_json and 'Data' not in area_json:
+                    area_json['Data'] = {}
+                
+                data_obj = area_json.get('Data') or area_json.get('data', {})
+                
                 # Round to 2 decimal places
                 x = round(float(area_data.get('x', 0)), 2)
                 y = round(float(area_data.get('y', 0)), 2)
                 z = round(float(area_data.get('z', 0)), 2)
                 radius = round(float(area_data.get('radius', 50)), 2)
                 
-                # Create new area
-                new_area = {
-                    'AreaName': area_data.get('name', f'Area_{idx}'),
-                    'Data': {
-                        'Pos': [x, y, z],
-                        'Radius': radius
+                # Update position and radius
+                data_obj['Pos'] = [x, y, z]
+                data_obj['Radius'] = radius
+                
+                # Update area name if provided
+                if 'name' in area_data:
+                    area_json['AreaName'] = area_data['name']
+                
+                updated_count += 1
+                data_index += 1
+                json_index += 1
+            
+            # Add new areas
+            added_count = 0
+            for idx in sorted(new_indices):
+                if idx < len(effect_areas_data):
+                    area_data = effect_areas_data[idx]
+                    
+                    if area_data.get('isDeleted', False):
+                        continue
+                    
+                    # Round to 2 decimal places
+                    x = round(float(area_data.get('x', 0)), 2)
+                    y = round(float(area_data.get('y', 0)), 2)
+                    z = round(float(area_data.get('z', 0)), 2)
+                    radius = round(float(area_data.get('radius', 50)), 2)
+                    
+                    # Create new area
+                    new_area = {
+                        'AreaName': area_data.get('name', f'Area_{idx}'),
+                        'Data': {
+                            'Pos': [x, y, z],
+                            'Radius': radius
+                        }
                     }
-                }
-                areas_list.append(new_area)
-                added_count += 1
-        
-        # Write back to file
-        with open(effect_area_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        total_changes = updated_count + added_count + len(deleted_indices)
-        print(f"Successfully saved effect areas: {updated_count} updated, {added_count} added, {len(deleted_indices)} deleted")
-        return {'success': True, 'count': total_changes, 'updated': updated_count, 'added': added_count, 'deleted': len(deleted_indices)}
+                    areas_list.append(new_area)
+                    added_count += 1
+            
+            # Write back to file
+            mission_files.atomic_write_json(effect_area_file_path, data, indent=2)
+            EFFECT_AREA_MODELS.invalidate(effect_area_file_path)
+            
+            total_changes = updated_count + added_count + len(deleted_indices)
+            logger.info("Successfully saved effect areas: %d updated, %d added, %d deleted", updated_count, added_count, len(deleted_indices))
+            return {'success': True, 'count': total_changes, 'updated': updated_count, 'added': added_count, 'deleted': len(deleted_indices)}
+            
+    except Exception as e:
+        logger.exception("Unhandled error in save_effect_areas")
+        return {'success': False, 'error': str(e)}
+
+
+def _effect_area_json_from_change(area_data, area_json=None):
+    """Apply name/position/radius from a client change onto an Areas entry (new one if None)."""
+    # Round to 2 decimal places
+    x = round(float(area_data.get('x', 0)), 2)
+    y = round(float(area_data.get('y', 0)), 2)
+    z = round(float(area_data.get('z', 0)), 2)
+    radius = round(float(area_data.get('radius', 50)), 2)
+    
+    if area_json is None:
+        return {
+            'AreaName': area_data.get('name') or 'Area',
+            'Data': {
+                'Pos': [x, y, z],
+                'Radius': radius
+            }
+        }
+    
+    data_obj = area_json.get('Data') or area_json.get('data')
+    if not isinstance(data_obj, dict):
+        data_obj = area_json['Data'] = {}
+    data_obj['Pos'] = [x, y, z]
+    data_obj['Radius'] = radius
+    if area_data.get('name'):
+        area_json['AreaName'] = area_data['name']
+    return area_json
+
+
+def apply_effect_area_changes(effect_area_file_path, changes):
+    """
+    Apply a sourceId-keyed changeset to cfgeffectarea.json.
+    changes is {'modified': [{sourceId, name, x, y, z, radius}], 'added': [{name, x, y, z, radius}],
+    'deleted': [sourceId, ...]}. Source IDs are matched against the file as it is on disk now; if any
+    of them no longer resolve (the file was edited elsewhere since the client loaded it) nothing is
+    written and the unresolved IDs are returned as conflicts.
+    """
+    if not effect_area_file_path or not Path(effect_area_file_path).exists():
+        return {'success': False, 'error': f'File does not exist: {effect_area_file_path}'}
+    
+    modified, added, deleted_ids = split_changeset(changes)
+    
+    try:
+        with mission_files.file_lock(effect_area_file_path):
+            model = EFFECT_AREA_MODELS.get(effect_area_file_path, _build_effect_area_model)
+            key_by_id = model['key_by_id']
+            
+            conflicts = changeset_conflicts(modified, deleted_ids, key_by_id)
+            if conflicts:
+                return _changeset_conflict('cfgeffectarea.json', conflicts)
+            
+            # Copy-on-write so readers holding the cached model never see a half-applied save
+            areas_list = list(model['areas_list'])
+            changed_idx = set()
+            for item in modified:
+                if item['sourceId'] in deleted_ids:
+                    continue
+                area_idx = key_by_id[item['sourceId']]
+                areas_list[area_idx] = _effect_area_json_from_change(item, copy.deepcopy(areas_list[area_idx]))
+                changed_idx.add(area_idx)
+            
+            deleted_idx = {key_by_id[source_id] for source_id in deleted_ids}
+            kept = [idx for idx in range(len(areas_list)) if idx not in deleted_idx]
+            old_ids = [model['ids'][idx] for idx in kept] + [None] * len(added)
+            areas_list = [areas_list[idx] for idx in kept] + [_effect_area_json_from_change(item) for item in added]
+            # IDs embed the list index, so only entries that were edited or moved are parsed again
+            parsed = [
+                model['parsed'][idx] if idx == new_idx and idx not in changed_idx
+                else parse_effect_area(areas_list[new_idx], new_idx)
+                for new_idx, idx in enumerate(kept)
+            ]
+            parsed += [parse_effect_area(areas_list[idx], idx) for idx in range(len(kept), len(areas_list))]
+            
+            data = dict(model['data'])
+            data[model['areas_key']] = areas_list
+            mission_files.atomic_write_json(effect_area_file_path, data, indent=2)
+            new_model = _effect_area_model(data, model['areas_key'], areas_list, parsed)
+            EFFECT_AREA_MODELS.store(effect_area_file_path, new_model)
+        
+        # IDs embed position and list index, so report every ID that moved
+        source_ids = {
+            old_id: new_id for old_id, new_id in zip(old_ids, new_model['ids'])
+            if old_id and old_id != new_id
+        }
+        added_source_ids = new_model['ids'][len(kept):]
         
+        updated_count = len(changed_idx)
+        total_changes = updated_count + len(added) + len(deleted_idx)
+        logger.info("Successfully saved effect areas: %d updated, %d added, %d deleted", updated_count, len(added), len(deleted_idx))
+        return {
+            'success': True,
+            'count': total_changes,
+            'updated': updated_count,
+            'added': len(added),
+            'deleted': len(deleted_idx),
+            'source_ids': source_ids,
+            'added_source_ids': added_source_ids
+        }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in apply_effect_area_changes")
         return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/effect-areas/save', methods=['POST'])
+@bp.route('/api/effect-areas/save', methods=['POST'])
 def save_effect_areas_endpoint():
     """Save effect area data to cfgeffectarea.json."""
     try:
@@ -1356,7 +1999,7 @@ def save_effect_areas_endpoint():
         if not data:
             return api_error('No data provided', 400)
         
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
         
@@ -1364,8 +2007,9 @@ def save_effect_areas_endpoint():
         if not mission_path.exists():
             return api_error(f'Mission directory does not exist: {mission_dir}', 404)
         
+        changes = data.get('changes')
         effect_areas_data = data.get('effect_areas', [])
-        if not effect_areas_data:
+        if not changes and not effect_areas_data:
             return api_error('No effect areas data provided', 400)
         
         deleted_indices = data.get('deleted_indices', [])
@@ -1376,8 +2020,13 @@ def save_effect_areas_endpoint():
         if not effect_area_file.exists():
             return api_error(f'cfgeffectarea.json not found at: {effect_area_file}', 404)
         
-        print(f"Saving effect areas to: {effect_area_file}")
-        result = save_effect_areas(str(effect_area_file), effect_areas_data, deleted_indices, new_indices)
+        logger.info("Saving effect areas to: %s", effect_area_file)
+        if changes:
+            result = apply_effect_area_changes(str(effect_area_file), changes)
+            if result.get('conflicts'):
+                return api_error(result['error'], 409, conflicts=result['conflicts'])
+        else:
+            result = save_effect_areas(str(effect_area_file), effect_areas_data, deleted_indices, new_indices)
         
         if result['success']:
             message_parts = []
@@ -1388,79 +2037,117 @@ def save_effect_areas_endpoint():
             if result.get('deleted', 0) > 0:
                 message_parts.append(f"{result['deleted']} deleted")
             message = f"Saved: {', '.join(message_parts)}" if message_parts else "No changes"
+            publish_layer_changes(mission_path, 'effect-areas', changes, result)
             
-            return api_ok(count=result['count'], message=message)
+            return api_ok(
+                count=result['count'],
+                message=message,
+                source_ids=result.get('source_ids', {}),
+                added_source_ids=result.get('added_source_ids', [])
+            )
         else:
             return api_error(result.get('error', 'Unknown error'), 500)
             
+    except ChangesetError as e:
+        return api_error(str(e), 400)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_effect_areas_endpoint")
         return api_error(str(e), 500)
 
 
+def list_economycore_type_files(economycore_file_path):
+    """
+    Return the existing types files referenced by <ce> entries in cfgeconomycore.xml.
+    """
+    return [ref.path for ref in mission_data.economycore_type_files(economycore_file_path) if ref.path.exists()]
+
+
 def load_type_categories(economycore_file_path):
     """
     Load type categories from cfgeconomycore.xml.
     Returns a dictionary mapping type names to their categories.
+    Parsed once per process and shared with the economy editor (see mission_data); do not mutate.
     """
-    type_categories = {}
-    
     if not economycore_file_path or not Path(economycore_file_path).exists():
-        print(f"Economy core XML file does not exist: {economycore_file_path}")
-        return type_categories
+        logger.warning("Economy core XML file does not exist: %s", economycore_file_path)
+        return {}
     
     try:
-        tree = ET.parse(economycore_file_path)
-        root = tree.getroot()
-        
-        # Find all type files referenced in ce elements
-        mission_path = Path(economycore_file_path).parent
-        
-        for ce_element in root.findall('.//ce'):
-            ce_folder_attr = ce_element.get('folder')
-            if not ce_folder_attr:
-                continue
-            
-            ce_folder_attr = ce_folder_attr.replace('\\', '/').strip('/')
-            ce_folder_path = mission_path / ce_folder_attr
-            
-            for file_element in ce_element.findall('.//file'):
-                file_type = file_element.get('type')
-                file_name = file_element.get('name')
-                if file_type == 'types' and file_name:
-                    full_file_path = ce_folder_path / file_name
-                    if full_file_path.exists():
-                        try:
-                            type_tree = ET.parse(full_file_path)
-                            type_root = type_tree.getroot()
-                            
-                            # Find all type elements
-                            for type_elem in type_root.findall('.//type'):
-                                type_name = type_elem.get('name')
-                                if not type_name:
-                                    continue
-                                
-                                # Find category elements
-                                categories = []
-                                for cat_elem in type_elem.findall('category'):
-                                    cat_name = cat_elem.get('name')
-                                    if cat_name:
-                                        categories.append(cat_name)
-                                
-                                if categories:
-                                    type_categories[type_name] = categories
-                        except Exception as e:
-                            print(f"Error parsing type file {full_file_path}: {e}")
-                            continue
-        
-        print(f"Loaded categories for {len(type_categories)} types")
+        type_categories = mission_data.type_categories(economycore_file_path)
+        logger.debug("Loaded categories for %d types", len(type_categories))
+        return type_categories
     except Exception as e:
-        import traceback
-        print(f"Error loading type categories: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading type categories: %s", e)
+        return {}
+
+
+def _strip_ns(tag):
+    # Handles tags like "{namespace}event"
+    return tag.split('}', 1)[1] if '}' in tag else tag
+
+
+# Parsed cfgeventspawns.xml trees with per-event pos lists and a sourceId -> (eventIndex, posIndex)
+# index, shared by the loader and the changeset saver.
+EVENT_SPAWN_MODELS = mission_files.ParsedFileCache()
+
+
+def _event_pos_source_id(event_name, pos_elem, event_idx, pos_idx):
+    """sourceId for one <pos>, derived exactly as load_event_spawns() does (None if unparseable)."""
+    x_raw = pos_elem.get('x')
+    z_raw = pos_elem.get('z')
+    if x_raw is None or z_raw is None:
+        return None
+    y_raw = pos_elem.get('y')
+    a_raw = pos_elem.get('a')
+    try:
+        x_val = float(x_raw)
+        y_val = float(y_raw) if y_raw is not None else 0.0
+        z_val = float(z_raw)
+        a_val = float(a_raw) if a_raw is not None else 0.0
+    except (ValueError, TypeError):
+        return None
+    return EVENT_SPAWNS_ADAPTER.source_id(
+        *indexed_identity_parts(event_name, x_val, y_val, z_val, a_val, index_chain=(event_idx, pos_idx))
+    )
+
+
+def _index_event_positions(model, event_idx):
+    """(Re)build the pos list and sourceId entries for one event of an event-spawn model."""
+    event_elem = model['events'][event_idx]
+    event_name = event_elem.get('name', '')
+    for source_id in model['ids'].get(event_idx, ()):
+        if source_id and model['key_by_id'].get(source_id, (None,))[0] == event_idx:
+            del model['key_by_id'][source_id]
     
-    return type_categories
+    pos_elems = [p for p in event_elem.iter() if _strip_ns(p.tag).lower() == 'pos']
+    ids = []
+    for pos_idx, pos_elem in enumerate(pos_elems):
+        source_id = _event_pos_source_id(event_name, pos_elem, event_idx, pos_idx)
+        ids.append(source_id)
+        if source_id:
+            model['key_by_id'][source_id] = (event_idx, pos_idx)
+    model['positions'][event_idx] = pos_elems
+    model['ids'][event_idx] = ids
+
+
+def _build_event_spawn_model(event_spawns_file_path):
+    with instrumentation.span('parse'):
+        tree = ET.parse(event_spawns_file_path)
+    root = tree.getroot()
+    model = {
+        'tree': tree,
+        'root': root,
+        # <event> elements in document order (namespace-agnostic)
+        'events': [e for e in root.iter() if _strip_ns(e.tag).lower() == 'event'],
+        'events_by_name': {},
+        'positions': {},
+        'ids': {},
+        'key_by_id': {}
+    }
+    for event_idx, event_elem in enumerate(model['events']):
+        model['events_by_name'].setdefault(event_elem.get('name', ''), event_idx)
+        _index_event_positions(model, event_idx)
+    return model
 
 
 def load_event_spawns(event_spawns_file_path, economycore_file_path):
@@ -1469,7 +2156,7 @@ def load_event_spawns(event_spawns_file_path, economycore_file_path):
     Returns list of event spawn dictionaries with position and category data.
     """
     if not event_spawns_file_path or not Path(event_spawns_file_path).exists():
-        print(f"Event spawns XML file does not exist: {event_spawns_file_path}")
+        logger.warning("Event spawns XML file does not exist: %s", event_spawns_file_path)
         return []
     
     # Load type categories (with error handling to prevent crashes)
@@ -1477,120 +2164,106 @@ def load_event_spawns(event_spawns_file_path, economycore_file_path):
     try:
         type_categories = load_type_categories(economycore_file_path)
     except Exception as cat_error:
-        import traceback
-        print(f"Error loading type categories (continuing without them): {cat_error}")
-        traceback.print_exc()
+        logger.exception("Error loading type categories (continuing without them): %s", cat_error)
         type_categories = {}
     
     try:
-        tree = ET.parse(event_spawns_file_path)
-        root = tree.getroot()
-        
-        print(f"Root element: {root.tag}")
-        print(f"Root attributes: {root.attrib}")
-        print(f"Root children: {[child.tag for child in root]}")
-        
-        event_spawns = []
-        
-        def _strip_ns(tag: str) -> str:
-            # Handles tags like "{namespace}event"
-            return tag.split('}', 1)[1] if '}' in tag else tag
+        with mission_files.file_lock(event_spawns_file_path):
+            model = EVENT_SPAWN_MODELS.get(event_spawns_file_path, _build_event_spawn_model)
+            return _event_spawns_from_model(model, type_categories)
+    except Exception as e:
+        logger.exception("Error loading event spawns: %s", e)
+        return []
+
+
+def _event_spawns_from_model(model, type_categories):
+    """Build the /api/event-spawns payload from a parsed event-spawn model."""
+    root = model['root']
+    
+    event_spawns = []
+    summary = LoadSummary(logger, 'event spawns')
+    
+    # All event elements (namespace-agnostic, in document order)
+    event_elements = model['events']
+    
+    # If no events found, log all element tags for debugging
+    if len(event_elements) == 0:
+        logger.warning("No event elements found under <%s>", root.tag)
+        if logger.isEnabledFor(logging.DEBUG):
+            for elem in root.iter():
+                logger.debug("  - %s (attributes: %s)", elem.tag, elem.attrib)
+    
+    for event_idx, event in enumerate(event_elements):
+        event_name = event.get('name', '')
+        if not event_name:
+            summary.skip('no_name', "Skipping event %d: no name attribute", event_idx)
+            continue
         
-        # Find all event elements (namespace-agnostic, in document order)
-        event_elements = []
-        for elem in root.iter():
-            if _strip_ns(elem.tag).lower() == 'event':
-                event_elements.append(elem)
+        # Match event name with type name to get category (do this once per event)
+        categories = type_categories.get(event_name, [])
         
-        print(f"Found {len(event_elements)} event elements")
+        # ALL pos elements for this event - each pos is a separate spawn location
+        all_pos_elems = model['positions'][event_idx]
         
-        # If still no events found, print all element tags for debugging
-        if len(event_elements) == 0:
-            print("No event elements found. All element tags in file:")
-            for elem in root.iter():
-                print(f"  - {elem.tag} (attributes: {elem.attrib})")
+        if len(all_pos_elems) == 0:
+            summary.skip('no_pos', "Event '%s': no pos elements found", event_name)
+            continue
         
-        for event_idx, event in enumerate(event_elements):
-            event_name = event.get('name', '')
-            if not event_name:
-                print(f"Skipping event: no name attribute")
-                continue
+        # Process each pos element as a separate spawn location
+        for pos_idx, pos_elem in enumerate(all_pos_elems):
+            # Valid pos elements have x and z attributes (a is optional)
+            x_attr = pos_elem.get('x')
+            z_attr = pos_elem.get('z')
+            a_attr = pos_elem.get('a')
+            y_attr = pos_elem.get('y')
             
-            # Match event name with type name to get category (do this once per event)
-            categories = type_categories.get(event_name, [])
+            # Skip if required attributes are missing
+            if x_attr is None or z_attr is None:
+                summary.skip('missing_xz', "Event '%s' pos[%d]: missing required x or z attribute, skipping", event_name, pos_idx)
+                continue
             
-            # Find ALL pos elements for this event - each pos is a separate spawn location
-            all_pos_elems = []
-            for pos_elem in event.iter():
-                if _strip_ns(pos_elem.tag).lower() == 'pos':
-                    all_pos_elems.append(pos_elem)
+            try:
+                x = float(x_attr)
+                z = float(z_attr)
+                has_y = y_attr is not None
+                y = float(y_attr) if y_attr is not None else 0.0
+                a = float(a_attr) if a_attr is not None else 0.0
+            except (ValueError, TypeError):
+                summary.skip('invalid_xz', "Event '%s' pos[%d]: invalid x or z value (x='%s', z='%s'), skipping", event_name, pos_idx, x_attr, z_attr)
+                continue
             
-            if len(all_pos_elems) == 0:
-                print(f"Event '{event_name}': no pos elements found")
+            # Skip if position is invalid (all zeros)
+            if x == 0.0 and z == 0.0:
+                summary.skip('zero_position', "Event '%s' pos[%d]: invalid position (x and z are both zero), skipping", event_name, pos_idx)
                 continue
             
-            # Process each pos element as a separate spawn location
-            for pos_idx, pos_elem in enumerate(all_pos_elems):
-                # Valid pos elements have x and z attributes (a is optional)
-                x_attr = pos_elem.get('x')
-                z_attr = pos_elem.get('z')
-                a_attr = pos_elem.get('a')
-                y_attr = pos_elem.get('y')
-                
-                # Skip if required attributes are missing
-                if x_attr is None or z_attr is None:
-                    print(f"Event '{event_name}' pos[{pos_idx}]: missing required x or z attribute, skipping")
-                    continue
-                
-                try:
-                    x = float(x_attr)
-                    z = float(z_attr)
-                    has_y = y_attr is not None
-                    y = float(y_attr) if y_attr is not None else 0.0
-                    a = float(a_attr) if a_attr is not None else 0.0
-                except (ValueError, TypeError):
-                    print(f"Event '{event_name}' pos[{pos_idx}]: invalid x or z value (x='{x_attr}', z='{z_attr}'), skipping")
-                    continue
-                
-                # Skip if position is invalid (all zeros)
-                if x == 0.0 and z == 0.0:
-                    print(f"Event '{event_name}' pos[{pos_idx}]: invalid position (x and z are both zero), skipping")
-                    continue
-                
-                # Store the pos element XML (not the entire event) for this specific location
-                pos_xml_string = ET.tostring(pos_elem, encoding='unicode')
-                pos_xml_string = pos_xml_string.strip()
-                
-                event_data = {
-                    'id': len(event_spawns),
-                    'name': event_name,
-                    'x': x,
-                    'y': y,
-                    'z': z,  # Frontend will reverse this
-                    'hasY': has_y,
-                    'a': a,
-                    # Stable identifiers for editing/saving without re-grouping:
-                    'eventIndex': event_idx,
-                    'posIndex': pos_idx,
-                    'categories': categories,
-                    'xml': pos_xml_string  # Store just the pos element XML
-                }
-                EVENT_SPAWNS_ADAPTER.add_source_id(
-                    event_data,
-                    *indexed_identity_parts(event_name, x, y, z, a, index_chain=(event_idx, pos_idx))
-                )
-                
-                event_spawns.append(event_data)
-        
-        print(f"Successfully loaded {len(event_spawns)} event spawns")
-        matched_count = sum(1 for e in event_spawns if e.get('categories'))
-        print(f"Matched {matched_count} event spawns with categories")
-        return event_spawns
-    except Exception as e:
-        import traceback
-        print(f"Error loading event spawns: {e}")
-        traceback.print_exc()
-        return []
+            # Store the pos element XML (not the entire event) for this specific location
+            pos_xml_string = ET.tostring(pos_elem, encoding='unicode')
+            pos_xml_string = pos_xml_string.strip()
+            
+            event_data = {
+                'id': len(event_spawns),
+                'name': event_name,
+                'x': x,
+                'y': y,
+                'z': z,  # Frontend will reverse this
+                'hasY': has_y,
+                'a': a,
+                # Stable identifiers for editing/saving without re-grouping:
+                'eventIndex': event_idx,
+                'posIndex': pos_idx,
+                'categories': categories,
+                'xml': pos_xml_string,  # Store just the pos element XML
+                # Computed once per file version when the model was indexed
+                'sourceId': model['ids'][event_idx][pos_idx]
+            }
+            
+            event_spawns.append(event_data)
+            if categories:
+                summary.add('matched_categories')
+    
+    summary.log("Loaded %d event spawns from %d events", len(event_spawns), len(event_elements))
+    return event_spawns
 
 
 def save_event_spawns(event_spawns_file_path, event_spawns_data, deleted_indices=None, new_indices=None):
@@ -1606,171 +2279,291 @@ def save_event_spawns(event_spawns_file_path, event_spawns_data, deleted_indices
     if new_indices is None:
         new_indices = []
     
-    def _strip_ns(tag: str) -> str:
-        return tag.split('}', 1)[1] if '}' in tag else tag
-    
     try:
-        tree = ET.parse(event_spawns_file_path)
-        root = tree.getroot()
-        
-        # Collect <event> elements in document order (namespace-agnostic)
-        event_elements = [e for e in root.iter() if _strip_ns(e.tag).lower() == 'event']
-        
-        # Build a mapping from (eventIndex, posIndex) -> pos element (by document order within each event)
-        pos_map = {}
-        source_id_key_map = {}
-        for event_idx, event_elem in enumerate(event_elements):
-            event_name = event_elem.get('name', '')
-            pos_elems = [p for p in event_elem.iter() if _strip_ns(p.tag).lower() == 'pos']
-            for pos_idx, pos_elem in enumerate(pos_elems):
-                pos_map[(event_idx, pos_idx)] = (event_elem, pos_elem)
-                try:
-                    x_raw = pos_elem.get('x')
-                    z_raw = pos_elem.get('z')
-                    if x_raw is None or z_raw is None:
+        with mission_files.file_lock(event_spawns_file_path):
+            with instrumentation.span('parse'):
+                tree = ET.parse(event_spawns_file_path)
+            root = tree.getroot()
+            
+            # Collect <event> elements in document order (namespace-agnostic)
+            event_elements = [e for e in root.iter() if _strip_ns(e.tag).lower() == 'event']
+            
+            # Build a mapping from (eventIndex, posIndex) -> pos element (by document order within each event)
+            pos_map = {}
+            source_id_key_map = {}
+            for event_idx, event_elem in enumerate(event_elements):
+                event_name = event_elem.get('name', '')
+                pos_elems = [p for p in event_elem.iter() if _strip_ns(p.tag).lower() == 'pos']
+                for pos_idx, pos_elem in enumerate(pos_elems):
+                    pos_map[(event_idx, pos_idx)] = (event_elem, pos_elem)
+                    try:
+                        x_raw = pos_elem.get('x')
+                        z_raw = pos_elem.get('z')
+                        if x_raw is None or z_raw is None:
+                            continue
+                        y_raw = pos_elem.get('y')
+                        a_raw = pos_elem.get('a')
+                        x_val = float(x_raw)
+                        y_val = float(y_raw) if y_raw is not None else 0.0
+                        z_val = float(z_raw)
+                        a_val = float(a_raw) if a_raw is not None else 0.0
+                        payload = {'name': event_name, 'x': x_val, 'y': y_val, 'z': z_val, 'a': a_val}
+                        EVENT_SPAWNS_ADAPTER.add_source_id(
+                            payload,
+                            *indexed_identity_parts(event_name, x_val, y_val, z_val, a_val, index_chain=(event_idx, pos_idx))
+                        )
+                        source_id_key_map[payload['sourceId']] = (event_idx, pos_idx)
+                    except Exception:
                         continue
-                    y_raw = pos_elem.get('y')
-                    a_raw = pos_elem.get('a')
-                    x_val = float(x_raw)
-                    y_val = float(y_raw) if y_raw is not None else 0.0
-                    z_val = float(z_raw)
-                    a_val = float(a_raw) if a_raw is not None else 0.0
-                    payload = {'name': event_name, 'x': x_val, 'y': y_val, 'z': z_val, 'a': a_val}
-                    EVENT_SPAWNS_ADAPTER.add_source_id(
-                        payload,
-                        *indexed_identity_parts(event_name, x_val, y_val, z_val, a_val, index_chain=(event_idx, pos_idx))
-                    )
-                    source_id_key_map[payload['sourceId']] = (event_idx, pos_idx)
-                except Exception:
+            
+            deleted_set = set(deleted_indices)
+            new_set = set(new_indices)
+            
+            updated_count = 0
+            deleted_count = 0
+            added_count = 0
+            
+            # Update existing positions (preserve grouping by updating in-place)
+            for data_index, spawn_data in enumerate(event_spawns_data):
+                if data_index in deleted_set or spawn_data.get('isDeleted', False):
                     continue
-        
-        deleted_set = set(deleted_indices)
-        new_set = set(new_indices)
-        
-        updated_count = 0
-        deleted_count = 0
-        added_count = 0
-        
-        # Update existing positions (preserve grouping by updating in-place)
-        for data_index, spawn_data in enumerate(event_spawns_data):
-            if data_index in deleted_set or spawn_data.get('isDeleted', False):
-                continue
-            if data_index in new_set or spawn_data.get('isNew', False):
-                continue
+                if data_index in new_set or spawn_data.get('isNew', False):
+                    continue
+                
+                event_idx = spawn_data.get('eventIndex')
+                pos_idx = spawn_data.get('posIndex')
+                if event_idx is None or pos_idx is None:
+                    source_id = spawn_data.get('sourceId')
+                    key_from_source = source_id_key_map.get(source_id) if source_id else None
+                    if key_from_source is None:
+                        # Without stable identifiers, skip (cannot reliably preserve grouping)
+                        continue
+                    event_idx, pos_idx = key_from_source
+                
+                key = (int(event_idx), int(pos_idx))
+                if key not in pos_map:
+                    continue
+                
+                _, pos_elem = pos_map[key]
+                
+                x_val = spawn_data.get('x')
+                z_val = spawn_data.get('z')
+                a_val = spawn_data.get('a', 0.0)
+                if x_val is None or z_val is None:
+                    continue
+                
+                x = round(float(x_val), 2)
+                z = round(float(z_val), 2)
+                a = round(float(a_val) if a_val is not None else 0.0, 2)
+                
+                pos_elem.set('x', str(x))
+                pos_elem.set('z', str(z))
+                # Keep a if it existed originally or if client provides it
+                pos_elem.set('a', str(a))
+                updated_count += 1
             
-            event_idx = spawn_data.get('eventIndex')
-            pos_idx = spawn_data.get('posIndex')
-            if event_idx is None or pos_idx is None:
-                source_id = spawn_data.get('sourceId')
-                key_from_source = source_id_key_map.get(source_id) if source_id else None
-                if key_from_source is None:
-                    # Without stable identifiers, skip (cannot reliably preserve grouping)
+            # Remove deleted positions (by stable IDs, removing element refs)
+            # Remove in descending posIndex per eventIndex to avoid surprises (though we use element refs).
+            to_remove = []
+            for data_index, spawn_data in enumerate(event_spawns_data):
+                if not (data_index in deleted_set or spawn_data.get('isDeleted', False)):
                     continue
-                event_idx, pos_idx = key_from_source
+                event_idx = spawn_data.get('eventIndex')
+                pos_idx = spawn_data.get('posIndex')
+                if event_idx is None or pos_idx is None:
+                    source_id = spawn_data.get('sourceId')
+                    key_from_source = source_id_key_map.get(source_id) if source_id else None
+                    if key_from_source is None:
+                        continue
+                    event_idx, pos_idx = key_from_source
+                key = (int(event_idx), int(pos_idx))
+                if key in pos_map:
+                    event_elem, pos_elem = pos_map[key]
+                    to_remove.append((int(event_idx), int(pos_idx), event_elem, pos_elem))
             
-            key = (int(event_idx), int(pos_idx))
-            if key not in pos_map:
-                continue
+            to_remove.sort(key=lambda t: (t[0], t[1]), reverse=True)
+            for _, __, event_elem, pos_elem in to_remove:
+                try:
+                    event_elem.remove(pos_elem)
+                    deleted_count += 1
+                except Exception:
+                    pass
             
-            _, pos_elem = pos_map[key]
+            # Add new positions (append under their event by name; create event if missing)
+            events_by_name = {}
+            for ev in event_elements:
+                events_by_name.setdefault(ev.get('name', ''), ev)
             
-            x_val = spawn_data.get('x')
-            z_val = spawn_data.get('z')
-            a_val = spawn_data.get('a', 0.0)
-            if x_val is None or z_val is None:
-                continue
+            for idx in sorted(new_indices):
+                if idx < 0 or idx >= len(event_spawns_data):
+                    continue
+                spawn_data = event_spawns_data[idx]
+                if spawn_data.get('isDeleted', False):
+                    continue
+                
+                name = spawn_data.get('name') or 'NewEvent'
+                x_val = spawn_data.get('x')
+                z_val = spawn_data.get('z')
+                a_val = spawn_data.get('a', 0.0)
+                if x_val is None or z_val is None:
+                    continue
+                
+                x = round(float(x_val), 2)
+                z = round(float(z_val), 2)
+                a = round(float(a_val) if a_val is not None else 0.0, 2)
+                
+                event_elem = events_by_name.get(name)
+                if event_elem is None:
+                    event_elem = ET.SubElement(root, 'event')
+                    event_elem.set('name', name)
+                    event_elements.append(event_elem)
+                    events_by_name[name] = event_elem
+                
+                new_pos = ET.SubElement(event_elem, 'pos')
+                new_pos.set('x', str(x))
+                new_pos.set('z', str(z))
+                new_pos.set('a', str(a))
+                added_count += 1
             
-            x = round(float(x_val), 2)
-            z = round(float(z_val), 2)
-            a = round(float(a_val) if a_val is not None else 0.0, 2)
+            ET.indent(tree, space='    ')
+            mission_files.atomic_write_xml(tree, event_spawns_file_path)
+            EVENT_SPAWN_MODELS.invalidate(event_spawns_file_path)
             
-            pos_elem.set('x', str(x))
-            pos_elem.set('z', str(z))
-            # Keep a if it existed originally or if client provides it
-            pos_elem.set('a', str(a))
-            updated_count += 1
+            return {
+                'success': True,
+                'count': updated_count + deleted_count + added_count,
+                'updated': updated_count,
+                'deleted': deleted_count,
+                'added': added_count
+            }
+    except Exception as e:
+        logger.exception("Unhandled error in save_event_spawns")
+        return {'success': False, 'error': str(e)}
+
+
+def _set_event_pos_attrs(pos_elem, spawn_data):
+    x = round(float(spawn_data['x']), 2)
+    z = round(float(spawn_data['z']), 2)
+    a_val = spawn_data.get('a', 0.0)
+    a = round(float(a_val) if a_val is not None else 0.0, 2)
+    pos_elem.set('x', str(x))
+    pos_elem.set('z', str(z))
+    pos_elem.set('a', str(a))
+
+
+def apply_event_spawn_changes(event_spawns_file_path, changes):
+    """
+    Apply a sourceId-keyed changeset to cfgeventspawns.xml using the cached, indexed tree.
+    changes is {'modified': [{sourceId, x, z, a}], 'added': [{name, x, z, a}], 'deleted': [sourceId, ...]}.
+    Only events that were touched are re-indented and re-indexed; the file is written once, atomically.
+    Unresolvable source IDs (file edited elsewhere since load) abort the save and come back as conflicts.
+    """
+    if not event_spawns_file_path or not Path(event_spawns_file_path).exists():
+        return {'success': False, 'error': f'File does not exist: {event_spawns_file_path}'}
+    
+    modified, added, deleted_ids = split_changeset(changes)
+    modified = [item for item in modified if item.get('x') is not None and item.get('z') is not None]
+    added = [item for item in added if item.get('x') is not None and item.get('z') is not None]
+    
+    with mission_files.file_lock(event_spawns_file_path):
+        model = EVENT_SPAWN_MODELS.get(event_spawns_file_path, _build_event_spawn_model)
+        key_by_id = model['key_by_id']
+        
+        conflicts = changeset_conflicts(modified, deleted_ids, key_by_id)
+        if conflicts:
+            return _changeset_conflict('cfgeventspawns.xml', conflicts)
+        
+        touched_events = set()
+        old_id_by_elem = {}
+        added_elems = []
+        created_event = False
+        
+        def _touch(event_idx):
+            if event_idx not in touched_events:
+                touched_events.add(event_idx)
+                for pos_elem, source_id in zip(model['positions'][event_idx], model['ids'][event_idx]):
+                    if source_id:
+                        old_id_by_elem[pos_elem] = source_id
         
-        # Remove deleted positions (by stable IDs, removing element refs)
-        # Remove in descending posIndex per eventIndex to avoid surprises (though we use element refs).
-        to_remove = []
-        for data_index, spawn_data in enumerate(event_spawns_data):
-            if not (data_index in deleted_set or spawn_data.get('isDeleted', False)):
-                continue
-            event_idx = spawn_data.get('eventIndex')
-            pos_idx = spawn_data.get('posIndex')
-            if event_idx is None or pos_idx is None:
-                source_id = spawn_data.get('sourceId')
-                key_from_source = source_id_key_map.get(source_id) if source_id else None
-                if key_from_source is None:
+        try:
+            updated_count = 0
+            for item in modified:
+                if item['sourceId'] in deleted_ids:
                     continue
-                event_idx, pos_idx = key_from_source
-            key = (int(event_idx), int(pos_idx))
-            if key in pos_map:
-                event_elem, pos_elem = pos_map[key]
-                to_remove.append((int(event_idx), int(pos_idx), event_elem, pos_elem))
-        
-        to_remove.sort(key=lambda t: (t[0], t[1]), reverse=True)
-        for _, __, event_elem, pos_elem in to_remove:
-            try:
-                event_elem.remove(pos_elem)
-                deleted_count += 1
-            except Exception:
-                pass
-        
-        # Add new positions (append under their event by name; create event if missing)
-        def find_event_by_name(name: str):
-            for ev in event_elements:
-                if ev.get('name', '') == name:
-                    return ev
-            return None
-        
-        for idx in sorted(new_indices):
-            if idx < 0 or idx >= len(event_spawns_data):
-                continue
-            spawn_data = event_spawns_data[idx]
-            if spawn_data.get('isDeleted', False):
-                continue
+                event_idx, pos_idx = key_by_id[item['sourceId']]
+                _touch(event_idx)
+                _set_event_pos_attrs(model['positions'][event_idx][pos_idx], item)
+                updated_count += 1
             
-            name = spawn_data.get('name') or 'NewEvent'
-            x_val = spawn_data.get('x')
-            z_val = spawn_data.get('z')
-            a_val = spawn_data.get('a', 0.0)
-            if x_val is None or z_val is None:
-                continue
+            deleted_count = 0
+            for source_id in deleted_ids:
+                event_idx, pos_idx = key_by_id[source_id]
+                _touch(event_idx)
+                try:
+                    model['events'][event_idx].remove(model['positions'][event_idx][pos_idx])
+                    deleted_count += 1
+                except ValueError:
+                    pass
             
-            x = round(float(x_val), 2)
-            z = round(float(z_val), 2)
-            a = round(float(a_val) if a_val is not None else 0.0, 2)
+            for item in added:
+                name = item.get('name') or 'NewEvent'
+                event_idx = model['events_by_name'].get(name)
+                if event_idx is None:
+                    event_elem = ET.SubElement(model['root'], 'event')
+                    event_elem.set('name', name)
+                    model['events'].append(event_elem)
+                    event_idx = len(model['events']) - 1
+                    model['events_by_name'][name] = event_idx
+                    model['positions'][event_idx] = []
+                    model['ids'][event_idx] = []
+                    created_event = True
+                _touch(event_idx)
+                new_pos = ET.SubElement(model['events'][event_idx], 'pos')
+                _set_event_pos_attrs(new_pos, item)
+                added_elems.append(new_pos)
             
-            event_elem = find_event_by_name(name)
-            if event_elem is None:
-                event_elem = ET.SubElement(root, 'event')
-                event_elem.set('name', name)
-                event_elements.append(event_elem)
+            if created_event:
+                ET.indent(model['tree'], space='    ')
+            else:
+                for event_idx in touched_events:
+                    ET.indent(model['events'][event_idx], space='    ', level=1)
             
-            new_pos = ET.SubElement(event_elem, 'pos')
-            new_pos.set('x', str(x))
-            new_pos.set('z', str(z))
-            new_pos.set('a', str(a))
-            added_count += 1
-        
-        ET.indent(tree, space='    ')
-        tree.write(event_spawns_file_path, encoding='utf-8', xml_declaration=True)
-        
-        return {
-            'success': True,
-            'count': updated_count + deleted_count + added_count,
-            'updated': updated_count,
-            'deleted': deleted_count,
-            'added': added_count
-        }
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return {'success': False, 'error': str(e)}
+            mission_files.atomic_write_xml(model['tree'], event_spawns_file_path)
+        except Exception:
+            EVENT_SPAWN_MODELS.invalidate(event_spawns_file_path)
+            raise
+        
+        for event_idx in touched_events:
+            _index_event_positions(model, event_idx)
+        EVENT_SPAWN_MODELS.store(event_spawns_file_path, model)
+        
+        # IDs embed coordinates and (eventIndex, posIndex); report every ID that moved
+        source_ids = {}
+        source_indices = {}
+        new_id_by_elem = {}
+        for event_idx in touched_events:
+            for pos_idx, (pos_elem, source_id) in enumerate(zip(model['positions'][event_idx], model['ids'][event_idx])):
+                new_id_by_elem[pos_elem] = source_id
+                old_id = old_id_by_elem.get(pos_elem)
+                if source_id and old_id != source_id:
+                    source_indices[source_id] = [event_idx, pos_idx]
+                    if old_id:
+                        source_ids[old_id] = source_id
+        added_source_ids = [new_id_by_elem.get(pos_elem) for pos_elem in added_elems]
+    
+    return {
+        'success': True,
+        'count': updated_count + deleted_count + len(added_elems),
+        'updated': updated_count,
+        'deleted': deleted_count,
+        'added': len(added_elems),
+        'source_ids': source_ids,
+        'added_source_ids': added_source_ids,
+        'source_indices': source_indices
+    }
 
 
-@app.route('/api/event-spawns/save', methods=['POST'])
+@bp.route('/api/event-spawns/save', methods=['POST'])
 def save_event_spawns_endpoint():
     """Save event spawn data back to cfgeventspawns.xml."""
     try:
@@ -1778,7 +2571,7 @@ def save_event_spawns_endpoint():
         if not data:
             return api_error('No data provided', 400)
         
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
         
@@ -1786,8 +2579,9 @@ def save_event_spawns_endpoint():
         if not mission_path.exists():
             return api_error(f'Mission directory does not exist: {mission_dir}', 404)
         
+        changes = data.get('changes')
         event_spawns_data = data.get('event_spawns', [])
-        if event_spawns_data is None:
+        if changes is None and event_spawns_data is None:
             return api_error('No event spawns data provided', 400)
         
         deleted_indices = data.get('deleted_indices', [])
@@ -1797,8 +2591,13 @@ def save_event_spawns_endpoint():
         if not event_spawns_file.exists():
             return api_error(f'cfgeventspawns.xml not found at: {event_spawns_file}', 404)
         
-        print(f"Saving event spawns to: {event_spawns_file}")
-        result = save_event_spawns(str(event_spawns_file), event_spawns_data, deleted_indices, new_indices)
+        logger.info("Saving event spawns to: %s", event_spawns_file)
+        if changes is not None:
+            result = apply_event_spawn_changes(str(event_spawns_file), changes)
+            if result.get('conflicts'):
+                return api_error(result['error'], 409, conflicts=result['conflicts'])
+        else:
+            result = save_event_spawns(str(event_spawns_file), event_spawns_data, deleted_indices, new_indices)
         
         if result.get('success'):
             message_parts = []
@@ -1809,21 +2608,29 @@ def save_event_spawns_endpoint():
             if result.get('deleted', 0) > 0:
                 message_parts.append(f"{result['deleted']} deleted")
             message = f"Saved: {', '.join(message_parts)}" if message_parts else "No changes"
+            publish_layer_changes(mission_path, 'event-spawns', changes, result)
             
-            return api_ok(count=result.get('count', 0), message=message)
+            return api_ok(
+                count=result.get('count', 0),
+                message=message,
+                source_ids=result.get('source_ids', {}),
+                added_source_ids=result.get('added_source_ids', []),
+                source_indices=result.get('source_indices', {})
+            )
         
         return api_error(result.get('error', 'Unknown error'), 500)
+    except ChangesetError as e:
+        return api_error(str(e), 400)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_event_spawns_endpoint")
         return api_error(str(e), 500)
 
 
-@app.route('/api/event-spawns')
+@bp.route('/api/event-spawns')
 def get_event_spawns():
     """Get event spawn data from cfgeventspawns.xml."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         
         if not mission_dir:
             return jsonify({'error': 'No mission directory specified'}), 400
@@ -1849,13 +2656,20 @@ def get_event_spawns():
         economycore_file = mission_path / 'cfgeconomycore.xml'
         economycore_file_path = str(economycore_file) if economycore_file.exists() else None
         
-        print(f"Loading event spawns from: {event_spawns_file}")
+        etag = http_cache.source_etag(
+            event_spawns_file,
+            economycore_file,
+            *list_economycore_type_files(economycore_file_path)
+        )
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        logger.info("Loading event spawns from: %s", event_spawns_file)
         try:
             event_spawns = load_event_spawns(str(event_spawns_file), economycore_file_path)
         except Exception as load_error:
-            import traceback
-            print(f"Error in load_event_spawns: {load_error}")
-            traceback.print_exc()
+            logger.exception("Error in load_event_spawns: %s", load_error)
             # Return empty list instead of crashing
             event_spawns = []
         
@@ -1868,15 +2682,14 @@ def get_event_spawns():
             'event_spawns_count': len(event_spawns)
         }
         
-        return jsonify({
+        return http_cache.with_etag(jsonify({
             'success': True,
             'event_spawns': event_spawns,
             'count': len(event_spawns),
             'diagnostic': diagnostic
-        })
+        }), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_event_spawns")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -2040,24 +2853,143 @@ def calculate_bounding_circle(zone_positions):
     return (center_x, center_z, max_radius)
 
 
-def load_territories(mission_dir):
+def parse_territory_zone(zone, zone_idx):
     """
-    Load territory data from XML files in mpmissions/env directory.
-    Returns list of territory data with zones and bounding circles.
+    Parse the attributes of one <zone> the way the map viewer presents them.
+    Returns {name, x, y, z, hasY, radius, dmin, dmax} or None when the zone has no usable position.
     """
-    mission_path = Path(mission_dir)
-    env_dir = mission_path / 'env'
+    # Zones have x, z attributes directly on the zone element
+    x_attr = zone.get('x')
+    z_attr = zone.get('z')
+    r_attr = zone.get('r')  # Get radius parameter
+    y_attr = zone.get('y')
+    dmin_attr = zone.get('dmin')
+    dmax_attr = zone.get('dmax')
     
-    if not env_dir.exists():
-        print(f"Environment directory does not exist: {env_dir}")
-        return []
+    if x_attr is None or z_attr is None:
+        logger.debug("Zone %d missing x or z attribute, skipping", zone_idx)
+        return None
     
-    territories = []
-    territory_files = sorted(env_dir.glob('*.xml'), key=lambda p: p.name)  # Sort by filename for consistent ordering
+    try:
+        x = float(x_attr)
+        z = float(z_attr)
+        has_y = y_attr is not None
+        y = float(y_attr) if y_attr is not None else 0.0
+    except (ValueError, TypeError) as e:
+        logger.debug("Invalid position in zone %d: x='%s', z='%s', error: %s", zone_idx, x_attr, z_attr, e)
+        return None
     
-    print(f"Found {len(territory_files)} XML files in {env_dir}")
-    if len(territory_files) == 0:
-        print(f"No XML files found in {env_dir}. Looking for files matching pattern: *.xml")
+    # Parse radius, default to 50.0 if not provided
+    radius = 50.0
+    if r_attr is not None:
+        try:
+            radius = float(r_attr)
+            if radius <= 0:
+                logger.debug("Zone %d has invalid radius (%s), using default 50.0", zone_idx, r_attr)
+                radius = 50.0
+        except (ValueError, TypeError):
+            logger.debug("Zone %d has invalid radius value (%s), using default 50.0", zone_idx, r_attr)
+            radius = 50.0
+
+    dmin = None
+    if dmin_attr is not None and str(dmin_attr).strip() != '':
+        try:
+            dmin = float(dmin_attr)
+        except (ValueError, TypeError):
+            logger.debug("Zone %d has invalid dmin value (%s), ignoring", zone_idx, dmin_attr)
+            dmin = None
+
+    dmax = None
+    if dmax_attr is not None and str(dmax_attr).strip() != '':
+        try:
+            dmax = float(dmax_attr)
+        except (ValueError, TypeError):
+            logger.debug("Zone %d has invalid dmax value (%s), ignoring", zone_idx, dmax_attr)
+            dmax = None
+    
+    # Skip if position is invalid (both zeros)
+    if x == 0.0 and z == 0.0:
+        logger.debug("Zone %d has invalid position (0, 0), skipping", zone_idx)
+        return None
+    
+    return {
+        'name': zone.get('name', f'Zone_{zone_idx}'),
+        'x': x,
+        'y': y,
+        'z': z,
+        'hasY': has_y,
+        'radius': radius,
+        'dmin': dmin,
+        'dmax': dmax
+    }
+
+
+def _territory_zone_elements(territory):
+    zone_elements = territory.findall('zone')
+    if len(zone_elements) == 0:
+        zone_elements = territory.findall('.//zone')
+    return zone_elements
+
+
+def _territory_elements(root):
+    # Territory elements are children of the territory-type root
+    territory_elements = root.findall('.//territory')
+    if len(territory_elements) == 0:
+        territory_elements = root.findall('territory')
+    return territory_elements
+
+
+def _list_territory_files(env_dir):
+    # Sort by filename for consistent ordering
+    return sorted(Path(env_dir).glob('*.xml'), key=lambda p: p.name)
+
+
+def _territory_env_signature(env_dir):
+    """Signature of the env directory and every territory file in it."""
+    return (
+        mission_files.file_signature(env_dir),
+        *(mission_files.file_signature(f) for f in _list_territory_files(env_dir))
+    )
+
+
+# Per env directory: the global territory index used by the client mapped to its file,
+# its index within that file and the parsed original values (with sourceId) of each zone.
+TERRITORY_INDEXES = mission_files.ParsedFileCache()
+
+
+def _territory_zone_source_id(territory_type, territory_idx, zone_values, zone_idx):
+    return TERRITORY_ZONES_ADAPTER.source_id(
+        *indexed_identity_parts(
+            territory_type,
+            territory_idx,
+            zone_values['name'],
+            zone_values['x'],
+            zone_values['y'],
+            zone_values['z'],
+            zone_values['radius'],
+            index_chain=(zone_idx,)
+        )
+    )
+
+
+def _territory_zone_source_ids(territory_type, territory_idx, territory_elem):
+    """sourceId of each zone of a territory element (None for zones without a usable position)."""
+    ids = []
+    for zone_idx, zone in enumerate(_territory_zone_elements(territory_elem)):
+        zone_values = parse_territory_zone(zone, zone_idx)
+        ids.append(_territory_zone_source_id(territory_type, territory_idx, zone_values, zone_idx) if zone_values else None)
+    return ids
+
+
+def _scan_territories(env_dir):
+    """Parse every env/*.xml file; returns (territories payload, territory index)."""
+    territories = []
+    index = {'territories': []}
+    territory_files = _list_territory_files(env_dir)
+    summary = LoadSummary(logger, 'territories')
+    
+    if len(territory_files) == 0:
+        logger.warning("No XML files found in %s. Looking for files matching pattern: *.xml", env_dir)
     
     # Color palette for different territory types (files)
     colors = [
@@ -2071,122 +3003,45 @@ def load_territories(mission_dir):
         color = colors[file_idx % len(colors)]
         
         try:
-            tree = ET.parse(territory_file)
+            with instrumentation.span('parse'):
+                tree = ET.parse(territory_file)
             root = tree.getroot()
             
-            # Find all territory elements (they are children of territory-type root)
-            territory_elements = root.findall('.//territory')
-            if len(territory_elements) == 0:
-                territory_elements = root.findall('territory')
-            
-            print(f"Found {len(territory_elements)} territories in {territory_file.name}")
+            territory_elements = _territory_elements(root)
+            summary.detail("Found %d territories in %s", len(territory_elements), territory_file.name)
             
             for territory_idx, territory in enumerate(territory_elements):
                 # Name territories as: filename_index (e.g., "infected_0", "infected_1")
                 territory_name = f"{territory_type}_{territory_idx}"
                 
                 # Find all zone elements within this territory
-                zone_elements = territory.findall('zone')
-                if len(zone_elements) == 0:
-                    zone_elements = territory.findall('.//zone')
+                zone_elements = _territory_zone_elements(territory)
                 
                 if len(zone_elements) == 0:
-                    print(f"Territory {territory_idx} has no zones, skipping")
+                    summary.skip('no_zones', "Territory %d in %s has no zones, skipping", territory_idx, territory_file.name)
                     continue
                 
-                zone_positions = []
                 zones = []
+                original_zones = {}
                 
                 for zone_idx, zone in enumerate(zone_elements):
-                    # Zones have x, z attributes directly on the zone element
-                    x_attr = zone.get('x')
-                    z_attr = zone.get('z')
-                    r_attr = zone.get('r')  # Get radius parameter
-                    y_attr = zone.get('y')
-                    dmin_attr = zone.get('dmin')
-                    dmax_attr = zone.get('dmax')
-                    
-                    if x_attr is None or z_attr is None:
-                        print(f"Zone {zone_idx} missing x or z attribute, skipping")
+                    zone_values = parse_territory_zone(zone, zone_idx)
+                    if zone_values is None:
+                        summary.add('skipped_zones')
                         continue
+                    source_id = _territory_zone_source_id(territory_type, territory_idx, zone_values, zone_idx)
+                    original_zones[zone_idx] = {**zone_values, 'sourceId': source_id}
                     
-                    try:
-                        x = float(x_attr)
-                        z = float(z_attr)
-                        has_y = y_attr is not None
-                        y = float(y_attr) if y_attr is not None else 0.0
-                        
-                        # Parse radius, default to 50.0 if not provided
-                        radius = 50.0
-                        if r_attr is not None:
-                            try:
-                                radius = float(r_attr)
-                                if radius <= 0:
-                                    print(f"Zone {zone_idx} has invalid radius ({r_attr}), using default 50.0")
-                                    radius = 50.0
-                            except (ValueError, TypeError):
-                                print(f"Zone {zone_idx} has invalid radius value ({r_attr}), using default 50.0")
-                                radius = 50.0
-
-                        dmin = None
-                        if dmin_attr is not None and str(dmin_attr).strip() != '':
-                            try:
-                                dmin = float(dmin_attr)
-                            except (ValueError, TypeError):
-                                print(f"Zone {zone_idx} has invalid dmin value ({dmin_attr}), ignoring")
-                                dmin = None
-
-                        dmax = None
-                        if dmax_attr is not None and str(dmax_attr).strip() != '':
-                            try:
-                                dmax = float(dmax_attr)
-                            except (ValueError, TypeError):
-                                print(f"Zone {zone_idx} has invalid dmax value ({dmax_attr}), ignoring")
-                                dmax = None
-                        
-                        # Skip if position is invalid (both zeros)
-                        if x == 0.0 and z == 0.0:
-                            print(f"Zone {zone_idx} has invalid position (0, 0), skipping")
-                            continue
-                        
-                        pos = (x, y, z)
-                        zone_positions.append(pos)
-                        
-                        # Store zone data
-                        zone_xml = ET.tostring(zone, encoding='unicode').strip()
-                        zone_name = zone.get('name', f'Zone_{zone_idx}')
-                        zone_payload = {
-                            'id': len(zones),
-                            'name': zone_name,
-                            'x': x,
-                            'y': y,
-                            'z': z,
-                            'hasY': has_y,
-                            'radius': radius,  # Store radius with zone
-                            'dmin': dmin,
-                            'dmax': dmax,
-                            'xml': zone_xml
-                        }
-                        TERRITORY_ZONES_ADAPTER.add_source_id(
-                            zone_payload,
-                            *indexed_identity_parts(
-                                territory_type,
-                                territory_idx,
-                                zone_name,
-                                x,
-                                y,
-                                z,
-                                radius,
-                                index_chain=(zone_idx,)
-                            )
-                        )
-                        zones.append(zone_payload)
-                    except (ValueError, TypeError) as e:
-                        print(f"Invalid position in zone {zone_idx}: x='{x_attr}', z='{z_attr}', error: {e}")
-                        continue
+                    # Store zone data
+                    zones.append({
+                        'id': len(zones),
+                        **zone_values,
+                        'xml': ET.tostring(zone, encoding='unicode').strip(),
+                        'sourceId': source_id
+                    })
                 
-                if not zone_positions:
-                    print(f"Territory {territory_idx} has no valid zone positions, skipping")
+                if not zones:
+                    summary.skip('no_valid_zones', "Territory %d in %s has no valid zone positions, skipping", territory_idx, territory_file.name)
                     continue
                 
                 # Store territory XML
@@ -2202,24 +3057,49 @@ def load_territories(mission_dir):
                 }
                 
                 territories.append(territory_data)
+                summary.add('zones', len(zones))
+                index['territories'].append({
+                    'file': territory_file,
+                    'index_in_file': territory_idx,
+                    'territory_type': territory_type,
+                    'zones': original_zones
+                })
         
         except Exception as e:
-            import traceback
-            print(f"Error loading territory file {territory_file}: {e}")
-            traceback.print_exc()
+            logger.exception("Error loading territory file %s: %s", territory_file, e)
+            summary.add('failed_files')
             continue
     
-    print(f"Successfully loaded {len(territories)} territories from {len(territory_files)} files")
+    summary.log("Loaded %d territories from %d files in %s", len(territories), len(territory_files), env_dir)
     if len(territories) == 0 and len(territory_files) > 0:
-        print(f"Warning: Found {len(territory_files)} XML files but no territories were parsed. Check XML structure.")
+        logger.warning("Found %d XML files but no territories were parsed. Check XML structure.", len(territory_files))
+    return territories, index
+
+
+def load_territories(mission_dir):
+    """
+    Load territory data from XML files in mpmissions/env directory.
+    Returns list of territory data with zones and bounding circles.
+    """
+    mission_path = Path(mission_dir)
+    env_dir = mission_path / 'env'
+    
+    if not env_dir.exists():
+        logger.warning("Environment directory does not exist: %s", env_dir)
+        return []
+    
+    signature = _territory_env_signature(env_dir)
+    territories, index = _scan_territories(env_dir)
+    # Keep the zone originals the client is about to edit, for change detection on save
+    TERRITORY_INDEXES.store(env_dir, index, signature=signature)
     return territories
 
 
-@app.route('/api/territories')
+@bp.route('/api/territories')
 def get_territories():
     """Get territory data from XML files in mpmissions/env directory."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         
         if not mission_dir:
             return jsonify({'error': 'No mission directory specified'}), 400
@@ -2231,26 +3111,31 @@ def get_territories():
                 'error': f'Mission directory does not exist: {mission_dir}'
             }), 404
         
-        print(f"Loading territories from: {mission_path / 'env'}")
+        env_dir = mission_path / 'env'
+        env_files = sorted(env_dir.glob('*.xml')) if env_dir.exists() else []
+        etag = http_cache.source_etag(env_dir, *env_files)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        logger.info("Loading territories from: %s", env_dir)
         territories = load_territories(mission_dir)
         
-        env_dir = mission_path / 'env'
         diagnostic = {
             'env_dir_exists': env_dir.exists(),
             'env_dir_path': str(env_dir),
-            'xml_files_found': len(list(env_dir.glob('*.xml'))) if env_dir.exists() else 0,
+            'xml_files_found': len(env_files),
             'territories_loaded': len(territories)
         }
         
-        return jsonify({
+        return http_cache.with_etag(jsonify({
             'success': True,
             'territories': territories,
             'count': len(territories),
             'diagnostic': diagnostic
-        })
+        }), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_territories")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -2310,18 +3195,277 @@ def _format_zone_dmin_dmax_attr(value, territory_file):
     return str(round(n, 2))
 
 
-def save_territories(mission_dir, zones_data, deleted_indices=None, new_indices=None):
+def _optional_zone_float(value):
+    if value is None or str(value).strip() == '':
+        return None
+    return float(value)
+
+
+def _zone_differs(zone_data, original):
+    """True if a client zone differs from the zone's parsed original values (or there is no original)."""
+    if original is None:
+        return True
+    try:
+        if float(zone_data.get('x', 0)) != original['x']:
+            return True
+        if float(zone_data.get('z', 0)) != original['z']:
+            return True
+        if float(zone_data.get('radius', 50)) != original['radius']:
+            return True
+        if 'dmin' in zone_data and _optional_zone_float(zone_data.get('dmin')) != original['dmin']:
+            return True
+        if 'dmax' in zone_data and _optional_zone_float(zone_data.get('dmax')) != original['dmax']:
+            return True
+    except (ValueError, TypeError):
+        return True
+    return 'name' in zone_data and zone_data['name'] != original['name']
+
+
+def _apply_zone_attributes(zone_elem, zone_data, territory_file, is_new=False):
+    # Round to 2 decimal places
+    x = round(float(zone_data.get('x', 0)), 2)
+    z = round(float(zone_data.get('z', 0)), 2)
+    r = round(float(zone_data.get('radius', 50)), 2)
+    
+    zone_elem.set('x', str(x))
+    zone_elem.set('z', str(z))
+    zone_elem.set('r', str(r))
+    
+    # Update name if provided
+    if 'name' in zone_data:
+        zone_elem.set('name', zone_data['name'])
+    
+    # Update dmin/dmax if provided; remove attribute when null/blank.
+    for attr in ('dmin', 'dmax'):
+        if attr not in zone_data and not is_new:
+            continue
+        value = zone_data.get(attr)
+        if value is None or str(value).strip() == '':
+            zone_elem.attrib.pop(attr, None)
+        else:
+            zone_elem.set(attr, _format_zone_dmin_dmax_attr(value, territory_file))
+
+
+def _apply_territory_changes(env_dir, modified_zones, new_zones, deleted_zones):
+    """Apply a territory changeset to the env XML files; the caller holds file_lock(env_dir).
+
+    Zones are addressed by (territoryIndex, zoneIndex). Modified and deleted zones that carry a
+    sourceId must still be the zone at that position, otherwise nothing is written and the
+    stale IDs come back as conflicts. Each file is locked from parse to write. Returns the
+    save_territories result, with the new IDs of zones that moved and of the added zones.
+    """
+    index = TERRITORY_INDEXES.get(
+        env_dir,
+        lambda path: _scan_territories(path)[1],
+        signature=_territory_env_signature(env_dir)
+    )
+    indexed_territories = index['territories']
+    
+    def _original_zone(zone_data):
+        territory_index = zone_data.get('territoryIndex')
+        zone_index = zone_data.get('zoneIndex')
+        if territory_index is None or zone_index is None:
+            return None
+        territory_index = int(territory_index)
+        if not 0 <= territory_index < len(indexed_territories):
+            return None
+        return indexed_territories[territory_index]['zones'].get(int(zone_index))
+    
+    conflicts = [
+        zone_data['sourceId'] for zone_data in modified_zones + deleted_zones
+        if zone_data.get('sourceId') and (_original_zone(zone_data) or {}).get('sourceId') != zone_data['sourceId']
+    ]
+    if conflicts:
+        return _changeset_conflict('env/*.xml', conflicts)
+    
+    unchanged_count = 0
+    changed_zones = []
+    for zone_data in modified_zones:
+        if _zone_differs(zone_data, _original_zone(zone_data)):
+            changed_zones.append(zone_data)
+        else:
+            unchanged_count += 1
+    
+    # Group changes by territory
+    territory_updates = {}  # Map<territoryIndex, {zones: [], deleted_zone_indices: set, new_zones: []}>
+    
+    def _updates_for(zone_data):
+        territory_index = zone_data.get('territoryIndex')
+        if territory_index is None:
+            return None
+        territory_index = int(territory_index)
+        if territory_index not in territory_updates:
+            territory_updates[territory_index] = {
+                'zones': [],
+                'deleted_zone_indices': set(),
+                'new_zones': [],
+                'territory_type': zone_data.get('territoryType')  # Territory type for new territories
+            }
+        return territory_updates[territory_index]
+    
+    for zone_data in deleted_zones:
+        updates = _updates_for(zone_data)
+        if updates is not None and zone_data.get('zoneIndex') is not None:
+            updates['deleted_zone_indices'].add(int(zone_data['zoneIndex']))
+    for added_position, zone_data in enumerate(new_zones):
+        updates = _updates_for(zone_data)
+        if updates is not None:
+            updates['new_zones'].append((added_position, zone_data))
+    for zone_data in changed_zones:
+        updates = _updates_for(zone_data)
+        if updates is not None:
+            updates['zones'].append(zone_data)
+    
+    logger.debug("Processing %d territories with changes (%d unchanged zones ignored)", len(territory_updates), unchanged_count)
+    
+    updated_count = 0
+    added_count = 0
+    deleted_count = 0
+    open_files = {}  # Map<territory_file, {tree, root, territory_elements}>
+    with ExitStack() as locks:
+        def _open_territory_file(territory_file, territory_type):
+            if territory_file not in open_files:
+                # Held until the file is written, so a concurrent save cannot interleave
+                locks.enter_context(mission_files.file_lock(territory_file))
+                if territory_file.exists():
+                    with instrumentation.span('parse'):
+                        tree = ET.parse(territory_file)
+                else:
+                    # New territory type: start a file with the type as root element
+                    tree = ET.ElementTree(ET.Element(territory_type))
+                    logger.info("Creating new territory file: %s", territory_file)
+                root = tree.getroot()
+                open_files[territory_file] = {
+                    'tree': tree,
+                    'root': root,
+                    'territory_elements': _territory_elements(root)
+                }
+            return open_files[territory_file]
+        
+        new_territory_elems = {}
+        touched = {}  # Map<territory_elem, (territory_file, territory_type)>
+        old_id_by_zone = {}  # Map<zone_elem, sourceId as loaded>
+        added_by_zone = {}  # Map<zone_elem, position in new_zones>
+        for territory_index, updates in territory_updates.items():
+            if territory_index < len(indexed_territories):
+                entry = indexed_territories[territory_index]
+                territory_file = entry['file']
+                opened = _open_territory_file(territory_file, entry['territory_type'])
+                territory_idx_in_file = entry['index_in_file']
+                if territory_idx_in_file >= len(opened['territory_elements']):
+                    logger.warning("Territory index %d out of range (file has %d territories)", territory_idx_in_file, len(opened['territory_elements']))
+                    continue
+                territory_elem = opened['territory_elements'][territory_idx_in_file]
+                for zone_index, zone_elem in enumerate(_territory_zone_elements(territory_elem)):
+                    old_id_by_zone[zone_elem] = entry['zones'].get(zone_index, {}).get('sourceId')
+                territory_type = entry['territory_type']
+            else:
+                # This is a new territory - create it in the file for its type
+                territory_type = updates.get('territory_type')
+                if not territory_type and updates['new_zones']:
+                    territory_type = updates['new_zones'][0][1].get('territoryType')
+                if not territory_type:
+                    logger.error("Territory index %d not found and no territory_type provided", territory_index)
+                    continue
+                territory_file = env_dir / f"{territory_type}.xml"
+                opened = _open_territory_file(territory_file, territory_type)
+                territory_elem = new_territory_elems.get(territory_index)
+                if territory_elem is None:
+                    territory_elem = ET.SubElement(opened['root'], 'territory')
+                    new_territory_elems[territory_index] = territory_elem
+        
+            # Resolve zone elements by their original index before removing anything
+            zone_elements = _territory_zone_elements(territory_elem)
+            deleted_set = updates['deleted_zone_indices']
+        
+            for zone_data in updates['zones']:
+                zone_index = zone_data.get('zoneIndex')
+                if zone_index is None or int(zone_index) in deleted_set:
+                    continue
+                zone_index = int(zone_index)
+                if 0 <= zone_index < len(zone_elements):
+                    _apply_zone_attributes(zone_elements[zone_index], zone_data, territory_file)
+                    updated_count += 1
+        
+            for zone_index in deleted_set:
+                if 0 <= zone_index < len(zone_elements):
+                    try:
+                        territory_elem.remove(zone_elements[zone_index])
+                        deleted_count += 1
+                    except ValueError:
+                        logger.warning("Zone %d is not a direct child of its territory, cannot delete", zone_index)
+        
+            for added_position, zone_data in updates['new_zones']:
+                new_zone = ET.SubElement(territory_elem, 'zone')
+                _apply_zone_attributes(new_zone, zone_data, territory_file, is_new=True)
+                added_by_zone[new_zone] = added_position
+                added_count += 1
+            touched[territory_elem] = (territory_file, territory_type)
+        
+        # IDs embed the zone's values and its index in the territory; report every ID that moved
+        source_ids = {}
+        added_source_ids = [None] * len(new_zones)
+        for territory_elem, (territory_file, territory_type) in touched.items():
+            territory_idx = _territory_elements(open_files[territory_file]['root']).index(territory_elem)
+            zone_elements = _territory_zone_elements(territory_elem)
+            new_ids = _territory_zone_source_ids(territory_type, territory_idx, territory_elem)
+            for zone_elem, new_id in zip(zone_elements, new_ids):
+                if zone_elem in added_by_zone:
+                    added_source_ids[added_by_zone[zone_elem]] = new_id
+                old_id = old_id_by_zone.get(zone_elem)
+                if old_id and new_id != old_id:
+                    source_ids[old_id] = new_id
+        
+        written_files = []
+        failed_files = []
+        for territory_file, opened in open_files.items():
+            try:
+                reorder_all_zone_elements_in_tree(opened['root'])
+                # Format XML with proper indentation
+                ET.indent(opened['tree'], space='    ')
+                mission_files.atomic_write_xml(opened['tree'], territory_file)
+                written_files.append(territory_file.name)
+                logger.debug("Saved territory file: %s", territory_file)
+            except Exception as e:
+                logger.exception("Error saving territory file %s: %s", territory_file, e)
+                failed_files.append(territory_file.name)
+        
+        if failed_files:
+            return {
+                'success': False,
+                'error': f"Could not write territory files: {', '.join(failed_files)}",
+                'files': written_files,
+                'failed_files': failed_files
+            }
+        
+        total_changes = updated_count + added_count + deleted_count
+        logger.info("Saved territory zones to %d files: %d updated, %d added, %d deleted",
+                    len(written_files), updated_count, added_count, deleted_count)
+        return {
+            'success': True,
+            'count': total_changes,
+            'updated': updated_count,
+            'added': added_count,
+            'deleted': deleted_count,
+            'unchanged': unchanged_count,
+            'files': written_files,
+            'source_ids': source_ids,
+            'added_source_ids': added_source_ids
+        }
+
+
+def save_territories(mission_dir, zones_data, deleted_indices=None, new_indices=None, changes=None):
     """
     Save territory zones to XML files in mpmissions/env directory.
     zones_data is a list of {territoryIndex, zoneIndex, name, x, y, z, radius, isNew, isDeleted} objects.
     deleted_indices is a list of flattened indices that should be removed.
     new_indices is a list of flattened indices that are newly added zones.
-    """
-    if deleted_indices is None:
-        deleted_indices = []
-    if new_indices is None:
-        new_indices = []
+    changes, when given, is an explicit {'modified': [...], 'added': [...], 'deleted': [...]} changeset of
+    zone objects and replaces zones_data/deleted_indices/new_indices.
     
+    Modified zones are compared against the cached original zone values, so unchanged zones are
+    ignored and only files with real changes are rewritten.
+    """
     try:
         mission_path = Path(mission_dir)
         env_dir = mission_path / 'env'
@@ -2329,297 +3473,33 @@ def save_territories(mission_dir, zones_data, deleted_indices=None, new_indices=
         if not env_dir.exists():
             return {'success': False, 'error': f'Environment directory does not exist: {env_dir}'}
         
-        # Group zones by territory - only process zones that have actual changes
-        territory_updates = {}  # Map<territoryIndex, {zones: [], deleted_zone_indices: [], new_zones: []}>
-        
-        # Track which territories have changes
-        territories_with_changes_set = set()
-        
-        for zone_data in zones_data:
-            territory_index = zone_data.get('territoryIndex')
-            territory_type = zone_data.get('territoryType')  # Get territory type from zone data
-            if territory_index is None:
-                continue
-            
-            flattened_index = zone_data.get('index')
-            is_deleted = flattened_index in deleted_indices or zone_data.get('isDeleted', False)
-            is_new = flattened_index in new_indices or zone_data.get('isNew', False)
-            is_modified = flattened_index not in deleted_indices and flattened_index not in new_indices
-            
-            # Only process if this zone has changes
-            if is_deleted or is_new or is_modified:
-                territories_with_changes_set.add(territory_index)
-                
-                if territory_index not in territory_updates:
-                    territory_updates[territory_index] = {
-                        'zones': [],
-                        'deleted_zone_indices': [],
-                        'new_zones': [],
-                        'territory_type': territory_type  # Store territory type for new territories
-                    }
-                
-                if is_deleted:
-                    zone_index = zone_data.get('zoneIndex')
-                    if zone_index is not None:
-                        territory_updates[territory_index]['deleted_zone_indices'].append(zone_index)
-                elif is_new:
-                    territory_updates[territory_index]['new_zones'].append(zone_data)
-                elif is_modified:
-                    territory_updates[territory_index]['zones'].append(zone_data)
-        
-        # Get list of territory files
-        territory_files = list(env_dir.glob('*.xml'))
-        territory_files_by_type = {}
-        for tf in territory_files:
-            territory_files_by_type[tf.stem] = tf
-        
-        # Load current territories to get file mappings
-        # We need to rebuild the mapping by loading territories the same way as load_territories does
-        current_territories = load_territories(mission_dir)
-        territory_file_map = {}  # Map<territoryIndex, {file_path, territory_index_in_file}>
-        territory_index_in_file_map = {}  # Map<territoryIndex, territory_index_within_file>
-        
-        print(f"Found {len(current_territories)} territories")
-        print(f"Found {len(territory_files_by_type)} territory files: {list(territory_files_by_type.keys())}")
-        
-        # Rebuild the mapping by iterating through files in the same order as load_territories
-        global_territory_index = 0
-        for territory_type, territory_file in sorted(territory_files_by_type.items()):
-            try:
-                tree = ET.parse(territory_file)
-                root = tree.getroot()
-                territory_elements = root.findall('.//territory')
-                if len(territory_elements) == 0:
-                    territory_elements = root.findall('territory')
-                
-                for territory_idx_in_file, territory_elem in enumerate(territory_elements):
-                    # Check if this territory has zones (same check as in load_territories)
-                    zone_elements = territory_elem.findall('zone')
-                    if len(zone_elements) == 0:
-                        zone_elements = territory_elem.findall('.//zone')
-                    
-                    if len(zone_elements) == 0:
-                        continue  # Skip territories without zones
-                    
-                    # Map global index to file and territory index within file
-                    territory_file_map[global_territory_index] = territory_file
-                    territory_index_in_file_map[global_territory_index] = territory_idx_in_file
-                    print(f"Territory {global_territory_index}: type='{territory_type}', file='{territory_file.name}', index_in_file={territory_idx_in_file}")
-                    global_territory_index += 1
-            except Exception as e:
-                print(f"Error processing file {territory_file} for mapping: {e}")
-                continue
-        
-        updated_count = 0
-        added_count = 0
-        deleted_count = 0
-        
-        # Process each territory that has changes
-        # Only process territories that have actual changes (deletions, additions, or modifications)
-        territories_with_changes = {}
-        for territory_index, updates in territory_updates.items():
-            has_changes = (len(updates['deleted_zone_indices']) > 0 or 
-                          len(updates['new_zones']) > 0 or 
-                          len(updates['zones']) > 0)
-            if has_changes:
-                territories_with_changes[territory_index] = updates
-        
-        print(f"\nProcessing {len(territories_with_changes)} territories with actual changes (out of {len(territory_updates)} total)")
-        print(f"Territory updates keys: {list(territory_updates.keys())}")
-        print(f"Territories with changes: {list(territories_with_changes.keys())}")
-        print(f"Territory file map keys: {list(territory_file_map.keys())}")
-        
-        for territory_index, updates in territories_with_changes.items():
-            print(f"\nTerritory {territory_index}:")
-            print(f"  Zones to update: {len(updates['zones'])}")
-            print(f"  Zones to delete: {len(updates['deleted_zone_indices'])}")
-            print(f"  Zones to add: {len(updates['new_zones'])}")
-            
-            # Check if this territory exists in the file map
-            # If not, it's a new territory that needs to be created
-            territory_type = updates.get('territory_type')
-            if territory_index not in territory_file_map:
-                # This is a new territory - need to create it
-                if not territory_type:
-                    # Try to get territory type from first new zone
-                    if updates['new_zones']:
-                        territory_type = updates['new_zones'][0].get('territoryType')
-                    if not territory_type:
-                        print(f"ERROR: Territory index {territory_index} not found and no territory_type provided")
-                        continue
-                
-                # Check if file for this territory type exists
-                territory_file = env_dir / f"{territory_type}.xml"
-                if not territory_file.exists():
-                    # Create new file with root element
-                    root = ET.Element(territory_type)
-                    tree = ET.ElementTree(root)
-                    # Format XML with proper indentation
-                    ET.indent(tree, space='    ')
-                    tree.write(territory_file, encoding='utf-8', xml_declaration=True)
-                    print(f"Created new territory file: {territory_file}")
-                
-                # Parse the file
-                tree = ET.parse(territory_file)
-                root = tree.getroot()
-                
-                # Find existing territories to determine index
-                territory_elements = root.findall('.//territory')
-                if len(territory_elements) == 0:
-                    territory_elements = root.findall('territory')
-                territory_idx_in_file = len(territory_elements)
-                
-                # Create new territory element
-                territory_elem = ET.SubElement(root, 'territory')
-                
-                print(f"Created new territory in file: {territory_file}, index: {territory_idx_in_file}")
-            else:
-                territory_file = territory_file_map[territory_index]
-                territory_idx_in_file = territory_index_in_file_map.get(territory_index, 0)
-            print(f"  Target file: {territory_file}")
-            print(f"  Full path: {territory_file.resolve()}")
-            print(f"  Territory index within file: {territory_idx_in_file}")
-            
-            try:
-                tree = ET.parse(territory_file)
-                root = tree.getroot()
-                
-                # Find the territory element
-                territory_elements = root.findall('.//territory')
-                if len(territory_elements) == 0:
-                    territory_elements = root.findall('territory')
-                
-                # Find the specific territory by index within the file
-                if territory_idx_in_file < len(territory_elements):
-                    territory_elem = territory_elements[territory_idx_in_file]
+        if changes is not None:
+            modified_zones = list(changes.get('modified') or [])
+            new_zones = list(changes.get('added') or [])
+            deleted_zones = list(changes.get('deleted') or [])
+        else:
+            deleted_set = set(deleted_indices or [])
+            new_set = set(new_indices or [])
+            modified_zones, new_zones, deleted_zones = [], [], []
+            for zone_data in zones_data or []:
+                flattened_index = zone_data.get('index')
+                if flattened_index in deleted_set or zone_data.get('isDeleted', False):
+                    deleted_zones.append(zone_data)
+                elif flattened_index in new_set or zone_data.get('isNew', False):
+                    new_zones.append(zone_data)
                 else:
-                    print(f"Warning: Territory index {territory_idx_in_file} out of range (file has {len(territory_elements)} territories)")
-                    continue
-                
-                # Find all zone elements
-                zone_elements = territory_elem.findall('zone')
-                if len(zone_elements) == 0:
-                    zone_elements = territory_elem.findall('.//zone')
-                
-                # Remove deleted zones (in reverse order)
-                for zone_idx in sorted(updates['deleted_zone_indices'], reverse=True):
-                    if zone_idx < len(zone_elements):
-                        territory_elem.remove(zone_elements[zone_idx])
-                        deleted_count += 1
-                
-                # Re-collect zone elements after deletions
-                zone_elements = territory_elem.findall('zone')
-                if len(zone_elements) == 0:
-                    zone_elements = territory_elem.findall('.//zone')
-                
-                # Create a mapping of original zone indices to current XML elements
-                # We need to track which zones were deleted to adjust indices
-                deleted_set = set(updates['deleted_zone_indices'])
-                
-                # Update existing zones - match by original zoneIndex
-                for zone_data in updates['zones']:
-                    zone_index = zone_data.get('zoneIndex')
-                    if zone_index is None:
-                        continue
-                    
-                    # Skip if this zone was deleted
-                    if zone_index in deleted_set:
-                        continue
-                    
-                    # Calculate the current XML index accounting for deletions before this zone
-                    # Count how many zones before this one were deleted
-                    deleted_before = sum(1 for idx in deleted_set if idx < zone_index)
-                    current_xml_index = zone_index - deleted_before
-                    
-                    # Find corresponding zone element
-                    if 0 <= current_xml_index < len(zone_elements):
-                        zone_elem = zone_elements[current_xml_index]
-                        
-                        # Round to 2 decimal places
-                        x = round(float(zone_data.get('x', 0)), 2)
-                        z = round(float(zone_data.get('z', 0)), 2)
-                        r = round(float(zone_data.get('radius', 50)), 2)
-                        
-                        # Update zone attributes
-                        zone_elem.set('x', str(x))
-                        zone_elem.set('z', str(z))
-                        zone_elem.set('r', str(r))
-                        
-                        # Update name if provided
-                        if 'name' in zone_data:
-                            zone_elem.set('name', zone_data['name'])
-
-                        # Update dmin/dmax if provided; remove attribute when null/blank.
-                        if 'dmin' in zone_data:
-                            dmin = zone_data.get('dmin')
-                            if dmin is None or str(dmin).strip() == '':
-                                zone_elem.attrib.pop('dmin', None)
-                            else:
-                                zone_elem.set('dmin', _format_zone_dmin_dmax_attr(dmin, territory_file))
-                        if 'dmax' in zone_data:
-                            dmax = zone_data.get('dmax')
-                            if dmax is None or str(dmax).strip() == '':
-                                zone_elem.attrib.pop('dmax', None)
-                            else:
-                                zone_elem.set('dmax', _format_zone_dmin_dmax_attr(dmax, territory_file))
-                        
-                        updated_count += 1
-                
-                # Add new zones
-                for zone_data in updates['new_zones']:
-                    # Round to 2 decimal places
-                    x = round(float(zone_data.get('x', 0)), 2)
-                    z = round(float(zone_data.get('z', 0)), 2)
-                    r = round(float(zone_data.get('radius', 50)), 2)
-                    
-                    # Create new zone element
-                    new_zone = ET.SubElement(territory_elem, 'zone')
-                    new_zone.set('x', str(x))
-                    new_zone.set('z', str(z))
-                    new_zone.set('r', str(r))
-                    
-                    if 'name' in zone_data:
-                        new_zone.set('name', zone_data['name'])
-
-                    dmin = zone_data.get('dmin')
-                    if dmin is not None and str(dmin).strip() != '':
-                        new_zone.set('dmin', _format_zone_dmin_dmax_attr(dmin, territory_file))
-                    dmax = zone_data.get('dmax')
-                    if dmax is not None and str(dmax).strip() != '':
-                        new_zone.set('dmax', _format_zone_dmin_dmax_attr(dmax, territory_file))
-                    
-                    added_count += 1
-                
-                # Write back to file
-                print(f"Saving territory file: {territory_file}")
-                print(f"  Updated: {updated_count} zones")
-                print(f"  Added: {len(updates['new_zones'])} zones")
-                print(f"  Deleted: {len(updates['deleted_zone_indices'])} zones")
-                
-                reorder_all_zone_elements_in_tree(root)
-                
-                # Format XML with proper indentation
-                ET.indent(tree, space='    ')
-                tree.write(territory_file, encoding='utf-8', xml_declaration=True)
-                print(f"Successfully wrote {territory_file}")
-                
-            except Exception as e:
-                import traceback
-                print(f"Error saving territory file {territory_file}: {e}")
-                traceback.print_exc()
-                continue
+                    modified_zones.append(zone_data)
         
-        total_changes = updated_count + added_count + deleted_count
-        print(f"Successfully saved territory zones: {updated_count} updated, {added_count} added, {deleted_count} deleted")
-        return {'success': True, 'count': total_changes, 'updated': updated_count, 'added': added_count, 'deleted': deleted_count}
+        # One save at a time per env directory, so the cached index matches the files
+        with mission_files.file_lock(env_dir):
+            return _apply_territory_changes(env_dir, modified_zones, new_zones, deleted_zones)
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_territories")
         return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/territories/save', methods=['POST'])
+@bp.route('/api/territories/save', methods=['POST'])
 def save_territories_endpoint():
     """Save territory zone data to XML files in mpmissions/env directory."""
     try:
@@ -2628,7 +3508,7 @@ def save_territories_endpoint():
         if not data:
             return api_error('No data provided', 400)
         
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
         
@@ -2636,15 +3516,18 @@ def save_territories_endpoint():
         if not mission_path.exists():
             return api_error(f'Mission directory does not exist: {mission_dir}', 404)
         
+        changes = data.get('changes')
         zones_data = data.get('zones', [])
-        if not zones_data:
+        if not changes and not zones_data:
             return api_error('No zones data provided', 400)
         
         deleted_indices = data.get('deleted_indices', [])
         new_indices = data.get('new_indices', [])
         
-        print(f"Saving territory zones to: {mission_path / 'env'}")
-        result = save_territories(mission_dir, zones_data, deleted_indices, new_indices)
+        logger.info("Saving territory zones to: %s", mission_path / 'env')
+        result = save_territories(mission_dir, zones_data, deleted_indices, new_indices, changes=changes)
+        if result.get('conflicts'):
+            return api_error(result['error'], 409, conflicts=result['conflicts'])
         
         if result['success']:
             message_parts = []
@@ -2655,151 +3538,219 @@ def save_territories_endpoint():
             if result.get('deleted', 0) > 0:
                 message_parts.append(f"{result['deleted']} deleted")
             message = f"Saved: {', '.join(message_parts)}" if message_parts else "No changes"
+            # Zones are addressed by (territory, zone) index, so other viewers reload the layer
+            publish_layer_changes(mission_path, 'territories')
             
-            return api_ok(count=result['count'], message=message)
+            return api_ok(
+                count=result['count'],
+                message=message,
+                source_ids=result.get('source_ids', {}),
+                added_source_ids=result.get('added_source_ids', [])
+            )
         else:
-            return api_error(result.get('error', 'Unknown error'), 500)
+            if result.get('files'):
+                publish_layer_changes(mission_path, 'territories')
+            return api_error(result.get('error', 'Unknown error'), 500,
+                             files=result.get('files', []), failed_files=result.get('failed_files', []))
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_territories_endpoint")
         return api_error(str(e), 500)
 
 
+# Parsed cfgplayerspawnpoints.xml: <fresh>, its grid size, the generator_posbubbles elements with
+# their <pos> lists and a sourceId -> (posbubbleIndex, posIndex) index. Shared by loader and saver.
+PLAYER_SPAWN_MODELS = mission_files.ParsedFileCache()
+
+
+def _find_fresh_element(root):
+    fresh_elem = root.find('fresh')
+    if fresh_elem is None:
+        # Try case-insensitive search
+        for elem in root:
+            if elem.tag.lower() == 'fresh':
+                fresh_elem = elem
+                break
+    return fresh_elem
+
+
+def _player_spawn_grid_size(fresh_elem):
+    """Read width/height from generator_params grid_width/grid_height (defaults 100.0)."""
+    generator_params = fresh_elem.find('generator_params')
+    width = 100.0  # Default width
+    height = 100.0  # Default height
+    
+    if generator_params is not None:
+        # Look for grid_width and grid_height child elements
+        grid_width_elem = generator_params.find('grid_width')
+        grid_height_elem = generator_params.find('grid_height')
+        
+        if grid_width_elem is not None:
+            width_text = grid_width_elem.text
+            if width_text:
+                try:
+                    width = float(width_text.strip())
+                except (ValueError, TypeError):
+                    logger.debug("Invalid grid_width value: %s, using default 100.0", width_text)
+        
+        if grid_height_elem is not None:
+            height_text = grid_height_elem.text
+            if height_text:
+                try:
+                    height = float(height_text.strip())
+                except (ValueError, TypeError):
+                    logger.debug("Invalid grid_height value: %s, using default 100.0", height_text)
+    return width, height
+
+
+def _parse_player_spawn_pos(pos_elem):
+    """Return (x, y, z, has_y) for a <pos> given as attributes or as "x y z" text; None if unusable."""
+    x_attr = pos_elem.get('x')
+    z_attr = pos_elem.get('z')
+    y_attr = pos_elem.get('y')
+    
+    # Also try text content
+    if x_attr is None or z_attr is None:
+        if not pos_elem.text:
+            return None
+        # Parse position string
+        parts = pos_elem.text.strip().split() if isinstance(pos_elem.text, str) else []
+        x, y, z = parse_group_pos(pos_elem.text)
+        return x, y, z, len(parts) >= 3
+    try:
+        x = float(x_attr)
+        z = float(z_attr)
+        y = float(y_attr) if y_attr is not None else 0.0
+    except (ValueError, TypeError):
+        return None
+    return x, y, z, y_attr is not None
+
+
+def _index_posbubble(model, posbubble_idx):
+    """(Re)build the pos list and sourceId entries for one generator_posbubbles element."""
+    for source_id in model['ids'].get(posbubble_idx, ()):
+        if source_id and model['key_by_id'].get(source_id, (None,))[0] == posbubble_idx:
+            del model['key_by_id'][source_id]
+    
+    posbubble = model['posbubbles'][posbubble_idx]
+    pos_elements = posbubble.findall('pos')
+    if len(pos_elements) == 0:
+        pos_elements = posbubble.findall('.//pos')
+    
+    ids = []
+    for pos_idx, pos_elem in enumerate(pos_elements):
+        parsed = _parse_player_spawn_pos(pos_elem)
+        source_id = None
+        if parsed is not None:
+            x, y, z, _ = parsed
+            source_id = PLAYER_SPAWNS_ADAPTER.source_id(
+                *indexed_identity_parts(x, y, z, model['width'], model['height'], index_chain=(posbubble_idx, pos_idx))
+            )
+            model['key_by_id'][source_id] = (posbubble_idx, pos_idx)
+        ids.append(source_id)
+    model['positions'][posbubble_idx] = pos_elements
+    model['ids'][posbubble_idx] = ids
+
+
+def _build_player_spawn_model(spawn_points_file_path):
+    with instrumentation.span('parse'):
+        tree = ET.parse(spawn_points_file_path)
+    root = tree.getroot()
+    model = {
+        'tree': tree,
+        'root': root,
+        'fresh': _find_fresh_element(root),
+        'width': 100.0,
+        'height': 100.0,
+        'posbubbles': [],
+        # Depth of the posbubbles below the root when they are direct children of <fresh>
+        'posbubble_level': None,
+        'positions': {},
+        'ids': {},
+        'key_by_id': {}
+    }
+    fresh_elem = model['fresh']
+    if fresh_elem is None:
+        return model
+    
+    model['width'], model['height'] = _player_spawn_grid_size(fresh_elem)
+    posbubbles = fresh_elem.findall('generator_posbubbles')
+    if len(posbubbles) > 0 and fresh_elem in list(root):
+        model['posbubble_level'] = 2
+    if len(posbubbles) == 0:
+        posbubbles = fresh_elem.findall('.//generator_posbubbles')
+    model['posbubbles'] = posbubbles
+    for posbubble_idx in range(len(posbubbles)):
+        _index_posbubble(model, posbubble_idx)
+    return model
+
+
 def load_player_spawn_points(spawn_points_file_path):
     """
     Load player spawn points from cfgplayerspawnpoints.xml.
     Returns list of spawn point dictionaries with position and rectangle data.
     """
     if not spawn_points_file_path or not Path(spawn_points_file_path).exists():
-        print(f"Player spawn points XML file does not exist: {spawn_points_file_path}")
+        logger.warning("Player spawn points XML file does not exist: %s", spawn_points_file_path)
         return []
     
     try:
-        tree = ET.parse(spawn_points_file_path)
-        root = tree.getroot()
-        
-        spawn_points = []
-        
-        # Find the <fresh> element
-        fresh_elem = root.find('fresh')
-        if fresh_elem is None:
-            # Try case-insensitive search
-            for elem in root:
-                if elem.tag.lower() == 'fresh':
-                    fresh_elem = elem
-                    break
-        
-        if fresh_elem is None:
-            print("No <fresh> element found in cfgplayerspawnpoints.xml")
-            return []
-        
-        # Get generator_params for width and height from grid_width and grid_height elements
-        generator_params = fresh_elem.find('generator_params')
-        width = 100.0  # Default width
-        height = 100.0  # Default height
-        
-        if generator_params is not None:
-            # Look for grid_width and grid_height child elements
-            grid_width_elem = generator_params.find('grid_width')
-            grid_height_elem = generator_params.find('grid_height')
+        with mission_files.file_lock(spawn_points_file_path):
+            model = PLAYER_SPAWN_MODELS.get(spawn_points_file_path, _build_player_spawn_model)
             
-            if grid_width_elem is not None:
-                width_text = grid_width_elem.text
-                if width_text:
-                    try:
-                        width = float(width_text.strip())
-                    except (ValueError, TypeError):
-                        print(f"Invalid grid_width value: {width_text}, using default 100.0")
+            spawn_points = []
             
-            if grid_height_elem is not None:
-                height_text = grid_height_elem.text
-                if height_text:
-                    try:
-                        height = float(height_text.strip())
-                    except (ValueError, TypeError):
-                        print(f"Invalid grid_height value: {height_text}, using default 100.0")
-        
-        # Find all generator_posbubbles elements
-        posbubbles = fresh_elem.findall('generator_posbubbles')
-        if len(posbubbles) == 0:
-            posbubbles = fresh_elem.findall('.//generator_posbubbles')
-        
-        print(f"Found {len(posbubbles)} generator_posbubbles elements")
-        
-        for posbubble_idx, posbubble in enumerate(posbubbles):
-            # Find all <pos> elements within this generator_posbubbles
-            pos_elements = posbubble.findall('pos')
-            if len(pos_elements) == 0:
-                pos_elements = posbubble.findall('.//pos')
+            if model['fresh'] is None:
+                logger.warning("No <fresh> element found in cfgplayerspawnpoints.xml")
+                return []
             
-            print(f"Found {len(pos_elements)} pos elements in generator_posbubbles[{posbubble_idx}]")
+            width = model['width']
+            height = model['height']
             
-            for pos_idx, pos_elem in enumerate(pos_elements):
-                # Try to get position from pos element
-                x_attr = pos_elem.get('x')
-                z_attr = pos_elem.get('z')
-                y_attr = pos_elem.get('y')
+            summary = LoadSummary(logger, 'player spawn points')
+            for posbubble_idx in range(len(model['posbubbles'])):
+                pos_elements = model['positions'][posbubble_idx]
+                source_ids = model['ids'][posbubble_idx]
                 
-                # Also try text content
-                if x_attr is None or z_attr is None:
-                    if pos_elem.text:
-                        # Parse position string
-                        parts = pos_elem.text.strip().split() if isinstance(pos_elem.text, str) else []
-                        has_y = len(parts) >= 3
-                        x, y, z = parse_group_pos(pos_elem.text)
-                    else:
-                        print(f"Posbubble[{posbubble_idx}] pos[{pos_idx}]: no position found, skipping")
+                for pos_idx, pos_elem in enumerate(pos_elements):
+                    parsed = _parse_player_spawn_pos(pos_elem)
+                    if parsed is None:
+                        summary.skip('no_position', "Posbubble[%d] pos[%d]: no valid position found, skipping", posbubble_idx, pos_idx)
                         continue
-                else:
-                    try:
-                        x = float(x_attr)
-                        z = float(z_attr)
-                        has_y = y_attr is not None
-                        y = float(y_attr) if y_attr is not None else 0.0
-                    except (ValueError, TypeError):
-                        print(f"Posbubble[{posbubble_idx}] pos[{pos_idx}]: invalid x or z value (x='{x_attr}', z='{z_attr}'), skipping")
+                    x, y, z, has_y = parsed
+                    
+                    # Skip if position is invalid (all zeros)
+                    if x == 0.0 and z == 0.0:
+                        summary.skip('zero_position', "Posbubble[%d] pos[%d]: invalid position (x and z are both zero), skipping", posbubble_idx, pos_idx)
                         continue
-                
-                # Skip if position is invalid (all zeros)
-                if x == 0.0 and z == 0.0:
-                    print(f"Posbubble[{posbubble_idx}] pos[{pos_idx}]: invalid position (x and z are both zero), skipping")
-                    continue
-                
-                # Store the pos element XML (not the entire posbubble)
-                pos_xml = ET.tostring(pos_elem, encoding='unicode').strip()
-                
-                spawn_point_data = {
-                    'id': len(spawn_points),
-                    'x': x,
-                    'y': y,
-                    'z': z,  # Frontend will reverse this
-                    'hasY': has_y,
-                    'width': width,
-                    'height': height,
-                    'xml': pos_xml
-                }
-                PLAYER_SPAWNS_ADAPTER.add_source_id(
-                    spawn_point_data,
-                    *indexed_identity_parts(x, y, z, width, height, index_chain=(posbubble_idx, pos_idx))
-                )
-                
-                spawn_points.append(spawn_point_data)
-        
-        print(f"Successfully loaded {len(spawn_points)} player spawn points")
-        return spawn_points
+                    
+                    # Store the pos element XML (not the entire posbubble)
+                    pos_xml = ET.tostring(pos_elem, encoding='unicode').strip()
+                    
+                    spawn_points.append({
+                        'id': len(spawn_points),
+                        'x': x,
+                        'y': y,
+                        'z': z,  # Frontend will reverse this
+                        'hasY': has_y,
+                        'width': width,
+                        'height': height,
+                        'xml': pos_xml,
+                        'sourceId': source_ids[pos_idx]
+                    })
+            
+            summary.log("Loaded %d player spawn points from %d generator_posbubbles", len(spawn_points), len(model['posbubbles']))
+            return spawn_points
     except Exception as e:
-        import traceback
-        print(f"Error loading player spawn points: {e}")
-        traceback.print_exc()
+        logger.exception("Error loading player spawn points: %s", e)
         return []
 
 
-@app.route('/api/player-spawn-points')
+@bp.route('/api/player-spawn-points')
 def get_player_spawn_points():
     """Get player spawn point data from cfgplayerspawnpoints.xml."""
     try:
-        mission_dir = request.args.get('mission_dir', DEFAULT_MISSION_DIR)
+        mission_dir = missions.resolve(request.args.get('mission_dir'))
         
         if not mission_dir:
             return jsonify({'error': 'No mission directory specified'}), 400
@@ -2821,17 +3772,21 @@ def get_player_spawn_points():
                 'message': f'cfgplayerspawnpoints.xml not found at: {spawn_points_file}'
             })
         
-        print(f"Loading player spawn points from: {spawn_points_file}")
+        etag = http_cache.source_etag(spawn_points_file)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        logger.info("Loading player spawn points from: %s", spawn_points_file)
         spawn_points = load_player_spawn_points(str(spawn_points_file))
         
-        return jsonify({
+        return http_cache.with_etag(jsonify({
             'success': True,
             'spawn_points': spawn_points,
             'count': len(spawn_points)
-        })
+        }), etag)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in get_player_spawn_points")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -2854,151 +3809,273 @@ def save_player_spawn_points(spawn_points_file_path, spawn_points_data, deleted_
         new_indices = []
     
     try:
-        tree = ET.parse(spawn_points_file_path)
-        root = tree.getroot()
-        
-        # Find the <fresh> element
-        fresh_elem = root.find('fresh')
-        if fresh_elem is None:
-            # Try case-insensitive search
-            for elem in root:
-                if elem.tag.lower() == 'fresh':
-                    fresh_elem = elem
-                    break
-        
-        if fresh_elem is None:
-            return {'success': False, 'error': 'No <fresh> element found in cfgplayerspawnpoints.xml'}
-        
-        # Find all generator_posbubbles elements
-        posbubbles = fresh_elem.findall('generator_posbubbles')
-        if len(posbubbles) == 0:
-            posbubbles = fresh_elem.findall('.//generator_posbubbles')
-        
-        if len(posbubbles) == 0:
-            # Create a generator_posbubbles element if none exists
-            posbubble = ET.SubElement(fresh_elem, 'generator_posbubbles')
-            posbubbles = [posbubble]
-        
-        # Use the first generator_posbubbles for all operations
-        posbubble = posbubbles[0]
-        
-        # Collect all pos elements
-        pos_elements = posbubble.findall('pos')
-        if len(pos_elements) == 0:
-            pos_elements = posbubble.findall('.//pos')
-        
-        # Create a set of deleted indices for quick lookup
-        deleted_set = set(deleted_indices)
-        new_set = set(new_indices)
-        
-        # First, remove deleted pos elements (in reverse order to maintain indices)
-        for idx in sorted(deleted_indices, reverse=True):
-            if idx < len(pos_elements):
-                posbubble.remove(pos_elements[idx])
-        
-        # Re-collect pos elements after deletions
-        pos_elements = posbubble.findall('pos')
-        if len(pos_elements) == 0:
-            pos_elements = posbubble.findall('.//pos')
-        
-        # Update existing pos elements
-        # Match by original index: iterate through spawn_points_data and update corresponding pos elements
-        # Skip deleted and new spawn points in the data
-        updated_count = 0
-        xml_index = 0
-        
-        for data_index in range(len(spawn_points_data)):
-            spawn_data = spawn_points_data[data_index]
+        with mission_files.file_lock(spawn_points_file_path):
+            with instrumentation.span('parse'):
+                tree = ET.parse(spawn_points_file_path)
+            root = tree.getroot()
             
-            # Skip deleted spawn points in data
-            if data_index in deleted_set or spawn_data.get('isDeleted', False):
-                continue
+            # Find the <fresh> element
+            fresh_elem = _find_fresh_element(root)
             
-            # Skip new spawn points in data (they'll be added later)
-            if data_index in new_set or spawn_data.get('isNew', False):
-                continue
+            if fresh_elem is None:
+                return {'success': False, 'error': 'No <fresh> element found in cfgplayerspawnpoints.xml'}
             
-            # Update corresponding pos element (xml_index tracks position in remaining pos_elements)
-            if xml_index >= len(pos_elements):
-                # More spawn points than pos elements - this shouldn't happen, but handle gracefully
-                break
+            # Find all generator_posbubbles elements
+            posbubbles = fresh_elem.findall('generator_posbubbles')
+            if len(posbubbles) == 0:
+                posbubbles = fresh_elem.findall('.//generator_posbubbles')
             
-            pos_elem = pos_elements[xml_index]
+            if len(posbubbles) == 0:
+                # Create a generator_posbubbles element if none exists
+                posbubble = ET.SubElement(fresh_elem, 'generator_posbubbles')
+                posbubbles = [posbubble]
             
-            # Round to 2 decimal places, handle None values
-            x_val = spawn_data.get('x')
-            y_val = spawn_data.get('y', 0)
-            z_val = spawn_data.get('z')
+            # Use the first generator_posbubbles for all operations
+            posbubble = posbubbles[0]
             
-            if x_val is None or z_val is None:
-                print(f"Warning: spawn point at index {data_index} has None for x or z, skipping")
-                continue
+            # Collect all pos elements
+            pos_elements = posbubble.findall('pos')
+            if len(pos_elements) == 0:
+                pos_elements = posbubble.findall('.//pos')
             
-            x = round(float(x_val), 2)
-            y = round(float(y_val) if y_val is not None else 0, 2)
-            z = round(float(z_val), 2)
+            # Create a set of deleted indices for quick lookup
+            deleted_set = set(deleted_indices)
+            new_set = set(new_indices)
             
-            # Update position attributes or text
-            if pos_elem.get('x') is not None or pos_elem.get('z') is not None:
-                # Update attributes
-                pos_elem.set('x', str(x))
-                pos_elem.set('z', str(z))
-            elif pos_elem.text:
-                # Update text content
-                pos_elem.text = f"{x} {y} {z}"
-            else:
-                # Set attributes if neither exists
-                pos_elem.set('x', str(x))
-                pos_elem.set('z', str(z))
+            # First, remove deleted pos elements (element refs, so order does not matter)
+            for idx in deleted_set:
+                if idx < len(pos_elements):
+                    posbubble.remove(pos_elements[idx])
             
-            updated_count += 1
-            xml_index += 1
-        
-        # Add new spawn points
-        added_count = 0
-        for idx in sorted(new_indices):
-            if idx < len(spawn_points_data):
-                spawn_data = spawn_points_data[idx]
+            # Re-collect pos elements after deletions
+            pos_elements = posbubble.findall('pos')
+            if len(pos_elements) == 0:
+                pos_elements = posbubble.findall('.//pos')
+            
+            # Update existing pos elements
+            # Match by original index: iterate through spawn_points_data and update corresponding pos elements
+            # Skip deleted and new spawn points in the data
+            updated_count = 0
+            xml_index = 0
+            
+            for data_index in range(len(spawn_points_data)):
+                spawn_data = spawn_points_data[data_index]
                 
-                # Skip if marked as deleted (shouldn't happen, but be safe)
-                if spawn_data.get('isDeleted', False):
+                # Skip deleted spawn points in data
+                if data_index in deleted_set or spawn_data.get('isDeleted', False):
+                    continue
+                
+                # Skip new spawn points in data (they'll be added later)
+                if data_index in new_set or spawn_data.get('isNew', False):
                     continue
                 
+                # Update corresponding pos element (xml_index tracks position in remaining pos_elements)
+                if xml_index >= len(pos_elements):
+                    # More spawn points than pos elements - this shouldn't happen, but handle gracefully
+                    break
+                
+                pos_elem = pos_elements[xml_index]
+                
                 # Round to 2 decimal places, handle None values
                 x_val = spawn_data.get('x')
                 y_val = spawn_data.get('y', 0)
                 z_val = spawn_data.get('z')
                 
                 if x_val is None or z_val is None:
-                    print(f"Warning: new spawn point at index {idx} has None for x or z, skipping")
+                    logger.warning("Spawn point at index %s has None for x or z, skipping", data_index)
                     continue
                 
                 x = round(float(x_val), 2)
                 y = round(float(y_val) if y_val is not None else 0, 2)
                 z = round(float(z_val), 2)
                 
-                # Create new pos element
-                new_pos = ET.SubElement(posbubble, 'pos')
-                new_pos.set('x', str(x))
-                new_pos.set('z', str(z))
+                # Update position attributes or text
+                if pos_elem.get('x') is not None or pos_elem.get('z') is not None:
+                    # Update attributes
+                    pos_elem.set('x', str(x))
+                    pos_elem.set('z', str(z))
+                elif pos_elem.text:
+                    # Update text content
+                    pos_elem.text = f"{x} {y} {z}"
+                else:
+                    # Set attributes if neither exists
+                    pos_elem.set('x', str(x))
+                    pos_elem.set('z', str(z))
                 
-                added_count += 1
+                updated_count += 1
+                xml_index += 1
+            
+            # Add new spawn points
+            added_count = 0
+            for idx in sorted(new_indices):
+                if idx < len(spawn_points_data):
+                    spawn_data = spawn_points_data[idx]
+                    
+                    # Skip if marked as deleted (shouldn't happen, but be safe)
+                    if spawn_data.get('isDeleted', False):
+                        continue
+                    
+                    # Round to 2 decimal places, handle None values
+                    x_val = spawn_data.get('x')
+                    y_val = spawn_data.get('y', 0)
+                    z_val = spawn_data.get('z')
+                    
+                    if x_val is None or z_val is None:
+                        logger.warning("New spawn point at index %s has None for x or z, skipping", idx)
+                        continue
+                    
+                    x = round(float(x_val), 2)
+                    y = round(float(y_val) if y_val is not None else 0, 2)
+                    z = round(float(z_val), 2)
+                    
+                    # Create new pos element
+                    new_pos = ET.SubElement(posbubble, 'pos')
+                    new_pos.set('x', str(x))
+                    new_pos.set('z', str(z))
+                    
+                    added_count += 1
+            
+            # Write back to file with proper formatting
+            ET.indent(tree, space='    ')
+            mission_files.atomic_write_xml(tree, spawn_points_file_path)
+            PLAYER_SPAWN_MODELS.invalidate(spawn_points_file_path)
+            
+            total_changes = updated_count + added_count + len(deleted_indices)
+            logger.info("Successfully saved player spawn points: %d updated, %d added, %d deleted", updated_count, added_count, len(deleted_indices))
+            return {'success': True, 'count': total_changes, 'updated': updated_count, 'added': added_count, 'deleted': len(deleted_indices)}
+            
+    except Exception as e:
+        logger.exception("Unhandled error in save_player_spawn_points")
+        return {'success': False, 'error': str(e)}
+
+
+def _set_player_spawn_pos(pos_elem, spawn_data):
+    # Round to 2 decimal places
+    x = round(float(spawn_data['x']), 2)
+    y_val = spawn_data.get('y', 0)
+    y = round(float(y_val) if y_val is not None else 0, 2)
+    z = round(float(spawn_data['z']), 2)
+    
+    # Update position attributes or text, whichever form the element uses
+    if pos_elem.get('x') is None and pos_elem.get('z') is None and pos_elem.text:
+        pos_elem.text = f"{x} {y} {z}"
+    else:
+        pos_elem.set('x', str(x))
+        pos_elem.set('z', str(z))
+
+
+def apply_player_spawn_changes(spawn_points_file_path, changes):
+    """
+    Apply a sourceId-keyed changeset to cfgplayerspawnpoints.xml using the cached, indexed model.
+    changes is {'modified': [{sourceId, x, y, z}], 'added': [{x, y, z, posbubbleIndex?}], 'deleted': [sourceId, ...]}.
+    New points go to the given posbubble (the first one by default). Only touched posbubbles are
+    re-indented and re-indexed, and the file is written once, atomically. Unresolvable source IDs
+    abort the save and are returned as conflicts.
+    """
+    if not spawn_points_file_path or not Path(spawn_points_file_path).exists():
+        return {'success': False, 'error': f'File does not exist: {spawn_points_file_path}'}
+    
+    modified, added, deleted_ids = split_changeset(changes)
+    modified = [item for item in modified if item.get('x') is not None and item.get('z') is not None]
+    added = [item for item in added if item.get('x') is not None and item.get('z') is not None]
+    
+    with mission_files.file_lock(spawn_points_file_path):
+        model = PLAYER_SPAWN_MODELS.get(spawn_points_file_path, _build_player_spawn_model)
+        if model['fresh'] is None:
+            return {'success': False, 'error': 'No <fresh> element found in cfgplayerspawnpoints.xml'}
+        key_by_id = model['key_by_id']
         
-        # Write back to file with proper formatting
-        ET.indent(tree, space='    ')
-        tree.write(spawn_points_file_path, encoding='utf-8', xml_declaration=True)
+        conflicts = changeset_conflicts(modified, deleted_ids, key_by_id)
+        if conflicts:
+            return _changeset_conflict('cfgplayerspawnpoints.xml', conflicts)
         
-        total_changes = updated_count + added_count + len(deleted_indices)
-        print(f"Successfully saved player spawn points: {updated_count} updated, {added_count} added, {len(deleted_indices)} deleted")
-        return {'success': True, 'count': total_changes, 'updated': updated_count, 'added': added_count, 'deleted': len(deleted_indices)}
+        touched = set()
+        old_id_by_elem = {}
+        added_elems = []
+        created_posbubble = False
         
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return {'success': False, 'error': str(e)}
+        def _touch(posbubble_idx):
+            if posbubble_idx not in touched:
+                touched.add(posbubble_idx)
+                for pos_elem, source_id in zip(model['positions'][posbubble_idx], model['ids'][posbubble_idx]):
+                    if source_id:
+                        old_id_by_elem[pos_elem] = source_id
+        
+        try:
+            updated_count = 0
+            for item in modified:
+                if item['sourceId'] in deleted_ids:
+                    continue
+                posbubble_idx, pos_idx = key_by_id[item['sourceId']]
+                _touch(posbubble_idx)
+                _set_player_spawn_pos(model['positions'][posbubble_idx][pos_idx], item)
+                updated_count += 1
+            
+            deleted_count = 0
+            for source_id in deleted_ids:
+                posbubble_idx, pos_idx = key_by_id[source_id]
+                _touch(posbubble_idx)
+                try:
+                    model['posbubbles'][posbubble_idx].remove(model['positions'][posbubble_idx][pos_idx])
+                    deleted_count += 1
+                except ValueError:
+                    pass
+            
+            if added and not model['posbubbles']:
+                # Create a generator_posbubbles element if none exists
+                model['posbubbles'].append(ET.SubElement(model['fresh'], 'generator_posbubbles'))
+                model['positions'][0] = []
+                model['ids'][0] = []
+                created_posbubble = True
+            for item in added:
+                posbubble_idx = item.get('posbubbleIndex')
+                if not isinstance(posbubble_idx, int) or not 0 <= posbubble_idx < len(model['posbubbles']):
+                    posbubble_idx = 0
+                _touch(posbubble_idx)
+                new_pos = ET.SubElement(model['posbubbles'][posbubble_idx], 'pos')
+                _set_player_spawn_pos(new_pos, item)
+                added_elems.append(new_pos)
+            
+            if created_posbubble or model['posbubble_level'] is None:
+                ET.indent(model['tree'], space='    ')
+            else:
+                for posbubble_idx in touched:
+                    ET.indent(model['posbubbles'][posbubble_idx], space='    ', level=model['posbubble_level'])
+            
+            mission_files.atomic_write_xml(model['tree'], spawn_points_file_path)
+        except Exception:
+            PLAYER_SPAWN_MODELS.invalidate(spawn_points_file_path)
+            raise
+        
+        for posbubble_idx in touched:
+            _index_posbubble(model, posbubble_idx)
+        PLAYER_SPAWN_MODELS.store(spawn_points_file_path, model)
+        
+        # IDs embed coordinates and (posbubbleIndex, posIndex); report every ID that moved
+        source_ids = {}
+        new_id_by_elem = {}
+        for posbubble_idx in touched:
+            for pos_elem, source_id in zip(model['positions'][posbubble_idx], model['ids'][posbubble_idx]):
+                new_id_by_elem[pos_elem] = source_id
+                old_id = old_id_by_elem.get(pos_elem)
+                if old_id and source_id and old_id != source_id:
+                    source_ids[old_id] = source_id
+        added_source_ids = [new_id_by_elem.get(pos_elem) for pos_elem in added_elems]
+    
+    total_changes = updated_count + deleted_count + len(added_elems)
+    logger.info("Successfully saved player spawn points: %d updated, %d added, %d deleted", updated_count, len(added_elems), deleted_count)
+    return {
+        'success': True,
+        'count': total_changes,
+        'updated': updated_count,
+        'added': len(added_elems),
+        'deleted': deleted_count,
+        'source_ids': source_ids,
+        'added_source_ids': added_source_ids
+    }
 
 
-@app.route('/api/player-spawn-points/save', methods=['POST'])
+@bp.route('/api/player-spawn-points/save', methods=['POST'])
 def save_player_spawn_points_endpoint():
     """Save player spawn point data to cfgplayerspawnpoints.xml."""
     try:
@@ -3007,7 +4084,7 @@ def save_player_spawn_points_endpoint():
         if not data:
             return api_error('No data provided', 400)
         
-        mission_dir = data.get('mission_dir')
+        mission_dir = missions.resolve(data.get('mission_dir'))
         if not mission_dir:
             return api_error('No mission directory specified', 400)
         
@@ -3015,8 +4092,9 @@ def save_player_spawn_points_endpoint():
         if not mission_path.exists():
             return api_error(f'Mission directory does not exist: {mission_dir}', 404)
         
+        changes = data.get('changes')
         spawn_points_data = data.get('spawn_points', [])
-        if not spawn_points_data:
+        if not changes and not spawn_points_data:
             return api_error('No spawn points data provided', 400)
         
         deleted_indices = data.get('deleted_indices', [])
@@ -3027,8 +4105,13 @@ def save_player_spawn_points_endpoint():
         if not spawn_points_file.exists():
             return api_error(f'cfgplayerspawnpoints.xml not found at: {spawn_points_file}', 404)
         
-        print(f"Saving player spawn points to: {spawn_points_file}")
-        result = save_player_spawn_points(str(spawn_points_file), spawn_points_data, deleted_indices, new_indices)
+        logger.info("Saving player spawn points to: %s", spawn_points_file)
+        if changes:
+            result = apply_player_spawn_changes(str(spawn_points_file), changes)
+            if result.get('conflicts'):
+                return api_error(result['error'], 409, conflicts=result['conflicts'])
+        else:
+            result = save_player_spawn_points(str(spawn_points_file), spawn_points_data, deleted_indices, new_indices)
         
         if result['success']:
             message_parts = []
@@ -3039,20 +4122,40 @@ def save_player_spawn_points_endpoint():
             if result.get('deleted', 0) > 0:
                 message_parts.append(f"{result['deleted']} deleted")
             message = f"Saved: {', '.join(message_parts)}" if message_parts else "No changes"
+            publish_layer_changes(mission_path, 'player-spawn-points', changes, result)
             
-            return api_ok(count=result['count'], message=message)
+            return api_ok(
+                count=result['count'],
+                message=message,
+                source_ids=result.get('source_ids', {}),
+                added_source_ids=result.get('added_source_ids', [])
+            )
         else:
             return api_error(result.get('error', 'Unknown error'), 500)
             
+    except ChangesetError as e:
+        return api_error(str(e), 400)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in save_player_spawn_points_endpoint")
         return api_error(str(e), 500)
 
 
+def create_app():
+    """Standalone Map Viewer app; combined_app mounts the same blueprint under /map."""
+    app_logging.configure()
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    http_cache.init_app(app)
+    instrumentation.init_app(app)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     print(f"Map Viewer starting...")
-    print(f"Default mission directory: {DEFAULT_MISSION_DIR}")
+    print(f"Default mission: {missions.registry.default or '(none, pass mission_dir)'}")
     print(f"Open your browser to http://localhost:5003")
     app.run(debug=True, host='0.0.0.0', port=5003)
 
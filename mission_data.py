@@ -0,0 +1,108 @@
+"""Parsed cfgeconomycore.xml / types.xml state shared by the map viewer and economy editor.
+
+Both tools read the same type files: the map viewer for event-spawn categories, the
+economy editor when loading a mission into SQLite. Parsed results live here once per
+process, keyed by file signatures, so a mission opened in both tools is parsed once and
+an edit to any of its files invalidates every derived view together.
+"""
+
+from __future__ import annotations
+
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from mission_files import ParsedFileCache, file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class TypeFileRef(NamedTuple):
+    """A types file declared in cfgeconomycore.xml (``path`` may not exist)."""
+
+    source_folder: str
+    source_file: str
+    path: Path
+
+
+_ECONOMYCORE_TYPE_FILES = ParsedFileCache()
+_TYPES_ROOTS = ParsedFileCache()
+_TYPE_CATEGORIES = ParsedFileCache()
+
+
+def _parse_economycore_type_files(economycore_file_path: Any) -> List[TypeFileRef]:
+    refs: List[TypeFileRef] = []
+    try:
+        root = ET.parse(economycore_file_path).getroot()
+    except ET.ParseError as e:
+        logger.error("Error parsing economy core XML %s: %s", economycore_file_path, e)
+        return refs
+
+    mission_path = Path(economycore_file_path).parent
+    for ce_element in root.findall('.//ce'):
+        ce_folder_attr = ce_element.get('folder')
+        if not ce_folder_attr:
+            continue
+
+        ce_folder_attr = ce_folder_attr.replace('\\', '/').strip('/')
+        ce_folder_path = mission_path / ce_folder_attr
+
+        for file_element in ce_element.findall('.//file'):
+            file_type = file_element.get('type')
+            file_name = file_element.get('name')
+            if file_type == 'types' and file_name:
+                refs.append(TypeFileRef(ce_folder_attr, file_name, ce_folder_path / file_name))
+    return refs
+
+
+def economycore_type_files(economycore_file_path: Any) -> List[TypeFileRef]:
+    """Return every ``type="types"`` file declared by <ce> entries, in declaration order."""
+    if not economycore_file_path or not Path(economycore_file_path).exists():
+        return []
+    return list(_ECONOMYCORE_TYPE_FILES.get(economycore_file_path, _parse_economycore_type_files))
+
+
+def types_root(types_file_path: Any) -> ET.Element:
+    """Parsed root of a types XML file. Shared between callers: treat it as read-only."""
+    return _TYPES_ROOTS.get(types_file_path, lambda path: ET.parse(path).getroot())
+
+
+def _collect_type_categories(economycore_file_path: Any) -> Dict[str, List[str]]:
+    type_categories: Dict[str, List[str]] = {}
+    for ref in economycore_type_files(economycore_file_path):
+        if not ref.path.exists():
+            continue
+        try:
+            root = types_root(ref.path)
+        except Exception as e:
+            logger.error("Error parsing type file %s: %s", ref.path, e)
+            continue
+        for type_elem in root.findall('.//type'):
+            type_name = type_elem.get('name')
+            if not type_name:
+                continue
+            categories = [c.get('name') for c in type_elem.findall('category') if c.get('name')]
+            if categories:
+                type_categories[type_name] = categories
+    return type_categories
+
+
+def type_categories(economycore_file_path: Any) -> Dict[str, List[str]]:
+    """Map type name -> category names across all types files of cfgeconomycore.xml.
+
+    The result is shared between callers and must not be mutated.
+    """
+    if not economycore_file_path or not Path(economycore_file_path).exists():
+        return {}
+    signature = (
+        file_signature(economycore_file_path),
+        tuple(file_signature(ref.path) for ref in economycore_type_files(economycore_file_path)),
+    )
+    return _TYPE_CATEGORIES.get(economycore_file_path, _collect_type_categories, signature=signature)
+
+
+def invalidate(path: Optional[Any] = None) -> None:
+    """Drop cached state for one file (or everything), e.g. after exporting types."""
+    for cache in (_ECONOMYCORE_TYPE_FILES, _TYPES_ROOTS, _TYPE_CATEGORIES):
+        cache.invalidate(path)
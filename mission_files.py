@@ -0,0 +1,145 @@
+"""File-level helpers for mission data: signatures, parsed-file caches, locks and atomic writes."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from instrumentation import span
+
+
+T = TypeVar("T")
+
+
+# Locks live as long as someone holds a reference, so the table only keeps files in use
+_LOCKS: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+_LOCKS_GUARD = threading.Lock()
+_CACHES: "weakref.WeakSet[ParsedFileCache]" = weakref.WeakSet()
+
+
+def path_key(path: Any) -> str:
+    """Normalized key so the same file maps to one lock/cache entry on every OS."""
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def is_under(key: str, directory_key: str) -> bool:
+    """True if path key ``key`` is ``directory_key`` or inside it."""
+    return key == directory_key or key.startswith(directory_key.rstrip(os.sep) + os.sep)
+
+
+def file_signature(path: Any) -> Tuple[str, Optional[int], Optional[int]]:
+    """Return (path, mtime_ns, size) for a file, with None values when it is missing."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return (str(path), None, None)
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+class ParsedFileCache:
+    """One parsed model per file, reused while the file's mtime/size are unchanged.
+
+    Models built from several files (a directory of XMLs, say) pass their own
+    ``signature``. Callers that mutate a cached model must hold ``file_lock(path)``,
+    call ``store`` after writing the file back, and ``invalidate`` if the write fails.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        _CACHES.add(self)
+
+    def get(self, path: Any, builder: Callable[[Any], T], signature: Any = None) -> T:
+        key = path_key(path)
+        if signature is None:
+            signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with span("parse"):
+            value = builder(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def store(self, path: Any, value: Any, signature: Any = None) -> None:
+        """Record ``value`` as the model for the file as it is on disk now."""
+        if signature is None:
+            signature = file_signature(path)
+        with self._lock:
+            self._entries[path_key(path)] = (signature, value)
+
+    def invalidate(self, path: Any = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path_key(path), None)
+
+    def invalidate_under(self, directory: Any) -> None:
+        """Drop the models of every file inside ``directory``."""
+        directory_key = path_key(directory)
+        with self._lock:
+            for key in [key for key in self._entries if is_under(key, directory_key)]:
+                del self._entries[key]
+
+
+def forget_directory(directory: Any) -> None:
+    """Drop what every ParsedFileCache holds for files inside ``directory``."""
+    for cache in list(_CACHES):
+        cache.invalidate_under(directory)
+
+
+def file_lock(path: Any) -> threading.RLock:
+    """Return the process-wide lock that serializes writers of ``path``."""
+    key = path_key(path)
+    with _LOCKS_GUARD:
+        lock = _LOCKS.get(key)
+        if lock is None:
+            lock = _LOCKS[key] = threading.RLock()
+    return lock
+
+
+def atomic_write_bytes(path: Any, data: bytes) -> None:
+    """Write ``data`` to a temp file next to ``path`` and rename it into place."""
+    path = Path(path)
+    with span("write"):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def atomic_write_text(path: Any, text: str, encoding: str = "utf-8") -> None:
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_write_json(path: Any, data: Any, indent: int = 2) -> None:
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+def atomic_write_xml(tree: ET.ElementTree, path: Any) -> None:
+    """Serialize an ElementTree the same way ``tree.write`` does, then swap it in atomically."""
+    buffer = io.BytesIO()
+    tree.write(buffer, encoding="utf-8", xml_declaration=True)
+    atomic_write_bytes(path, buffer.getvalue())
@@ -0,0 +1,214 @@
+"""Registry of the missions one editor process serves.
+
+A process can serve several DayZ missions at once (Chernarus, Livonia, Namalsk, ...).
+Requests pick one with their ``mission_dir`` parameter: a mission directory, or a name
+from ``XML_VIEWER_MISSIONS`` (``chernarus=E:\\...\\dayzOffline.chernarusplus;livonia=...``,
+separated by ``os.pathsep``). Requests without one get ``XML_VIEWER_DEFAULT_MISSION``
+(a path or name), or the configured mission when there is exactly one.
+
+What the apps build for a mission lives in process-wide caches keyed by file path:
+parsed files (every ``ParsedFileCache``), the editor database's reference snapshot and
+journal triggers, change event channels. The registry remembers which missions were
+used last; when more than ``XML_VIEWER_MAX_MISSIONS`` (default 4) are registered, the
+least recently used idle one is evicted and the ``on_evict`` hooks drop everything
+cached under its directory. A mission is busy while a job holds it (``hold``); requests
+only mark it used, which keeps it at the recent end of the LRU order.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import mission_files
+from mission_files import is_under, path_key
+
+DEFAULT_MAX_MISSIONS = 4
+
+
+class NoMissionSelected(ValueError):
+    """A request named no mission and no default mission is configured."""
+
+
+class Mission:
+    __slots__ = ("key", "path", "name", "last_used", "holders")
+
+    def __init__(self, path: str, name: Optional[str] = None) -> None:
+        self.key = path_key(path)
+        self.path = path
+        self.name = name
+        self.last_used = time.time()
+        self.holders = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "last_used": self.last_used,
+            "busy": self.holders > 0,
+        }
+
+
+_HOOKS: List[Callable[[str], None]] = []
+
+
+def on_evict(hook: Callable[[str], None]) -> Callable[[str], None]:
+    """Call ``hook(directory_key)`` when a mission is evicted, to drop its cached state."""
+    _HOOKS.append(hook)
+    return hook
+
+
+class MissionRegistry:
+    def __init__(self, named: Optional[Dict[str, str]] = None, default: Optional[str] = None,
+                 max_missions: int = DEFAULT_MAX_MISSIONS) -> None:
+        self.named = dict(named or {})
+        if default is None and len(self.named) == 1:
+            default = next(iter(self.named))
+        self.default = default
+        self.max_missions = max(max_missions, 1)
+        self._missions: "OrderedDict[str, Mission]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MissionRegistry":
+        named = {}
+        for entry in os.environ.get("XML_VIEWER_MISSIONS", "").split(os.pathsep):
+            name, sep, path = entry.partition("=")
+            if sep and name.strip() and path.strip():
+                named[name.strip()] = path.strip()
+        try:
+            max_missions = int(os.environ.get("XML_VIEWER_MAX_MISSIONS", DEFAULT_MAX_MISSIONS))
+        except ValueError:
+            max_missions = DEFAULT_MAX_MISSIONS
+        return cls(named, os.environ.get("XML_VIEWER_DEFAULT_MISSION") or None, max_missions)
+
+    def expand(self, value: Optional[str]) -> Optional[str]:
+        """Directory of a configured mission name; paths and empty values are returned as is."""
+        return self.named.get((value or "").strip(), value)
+
+    def resolve(self, value: Optional[str]) -> Optional[str]:
+        """Mission directory selected by a ``mission_dir`` parameter (None if none is)."""
+        value = (value or "").strip() or self.default
+        if not value:
+            return None
+        path = self.named.get(value, value)
+        if Path(path).is_dir():
+            self.touch(path, value if value in self.named else None)
+        return path
+
+    def require(self, value: Optional[str]) -> str:
+        path = self.resolve(value)
+        if path is None:
+            raise NoMissionSelected(
+                "No mission directory specified (pass mission_dir, or set XML_VIEWER_DEFAULT_MISSION)"
+            )
+        return path
+
+    def touch(self, path: Any, name: Optional[str] = None) -> Mission:
+        """Register ``path`` as the most recently used mission; evicts idle ones over the limit."""
+        key = path_key(path)
+        with self._lock:
+            mission = self._missions.get(key)
+            if mission is None:
+                mission = self._missions[key] = Mission(str(path), name)
+            mission.name = mission.name or name
+            mission.last_used = time.time()
+            self._missions.move_to_end(key)
+            evicted = self._pop_idle()
+        for old in evicted:
+            self._forget(old)
+        return mission
+
+    def _pop_idle(self) -> List[Mission]:
+        evicted = []
+        for key in list(self._missions):
+            if len(self._missions) <= self.max_missions:
+                break
+            # The newest mission is the one being used right now
+            if self._missions[key].holders == 0 and key != next(reversed(self._missions)):
+                evicted.append(self._missions.pop(key))
+        return evicted
+
+    def use(self, path: Any) -> Mission:
+        """Mark the mission owning ``path`` (a mission file or directory) as used."""
+        key = path_key(path)
+        with self._lock:
+            owners = [m for m in self._missions.values() if is_under(key, m.key)]
+        if owners:
+            owner = max(owners, key=lambda m: len(m.key))
+            return self.touch(owner.path)
+        # A database opened by path belongs to its directory
+        return self.touch(path if Path(path).is_dir() else Path(path).parent)
+
+    @contextmanager
+    def hold(self, path: Any) -> Iterator[Mission]:
+        """Keep the mission owning ``path`` (a mission file or directory) from being evicted."""
+        mission = self.use(path)
+        with self._lock:
+            mission.holders += 1
+        try:
+            yield mission
+        finally:
+            with self._lock:
+                mission.holders -= 1
+                mission.last_used = time.time()
+                evicted = self._pop_idle()
+            for old in evicted:
+                self._forget(old)
+
+    def evict(self, path: Any) -> bool:
+        """Drop an idle mission's cached state now; False if it is unknown or busy."""
+        with self._lock:
+            mission = self._missions.get(path_key(path))
+            if mission is None or mission.holders:
+                return False
+            del self._missions[mission.key]
+        self._forget(mission)
+        return True
+
+    def _forget(self, mission: Mission) -> None:
+        mission_files.forget_directory(mission.key)
+        for hook in list(_HOOKS):
+            hook(mission.key)
+
+    def missions(self) -> List[Dict[str, Any]]:
+        """Configured missions and the ones in use, most recently used first."""
+        with self._lock:
+            active = [m.as_dict() for m in reversed(self._missions.values())]
+        listed = {path_key(m["path"]) for m in active}
+        for name, path in self.named.items():
+            if path_key(path) not in listed:
+                active.append({"name": name, "path": path, "last_used": None, "busy": False})
+        return active
+
+
+registry = MissionRegistry.from_env()
+
+
+def expand(value: Optional[str]) -> Optional[str]:
+    return registry.expand(value)
+
+
+def resolve(value: Optional[str]) -> Optional[str]:
+    return registry.resolve(value)
+
+
+def require(value: Optional[str]) -> str:
+    return registry.require(value)
+
+
+def use(path: Any) -> Mission:
+    return registry.use(path)
+
+
+def hold(path: Any):
+    return registry.hold(path)
+
+
+def list_missions() -> List[Dict[str, Any]]:
+    return registry.missions()
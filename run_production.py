@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Production run script: serves the Launcher, Map Viewer and Economy Editor from one process.
+
+By default the combined app (combined_app.py) runs on a single multi-threaded waitress
+server on port 5000: the launcher at /, the map viewer at /map/ and the economy editor at
+/economy/. Every request shares one worker pool and one set of parsed-file caches, with
+no debugger or reloader. --separate serves each app on its usual port instead (5000,
+5003, 5004), one waitress server per app in the same process.
+
+Every open /api/events stream keeps a thread busy, so at most half of the threads (or
+XML_VIEWER_MAX_EVENT_STREAMS) serve streams; editors beyond that get 503 and retry.
+"""
+
+import argparse
+import os
+import threading
+
+from waitress.server import create_server as create_waitress_server
+
+DEFAULT_THREADS = 16
+
+
+class WaitressServer:
+    """A waitress server for one app that can be stopped from another thread."""
+
+    def __init__(self, app, host, port, threads=DEFAULT_THREADS):
+        self._server = create_waitress_server(app, host=host, port=port, threads=threads, ident='dayz-economy-tools')
+
+    def serve_forever(self):
+        self._server.run()
+
+    def shutdown(self):
+        self._server.close()
+
+
+def load_apps(names):
+    """Import the requested apps lazily so a subset can be served without loading the rest."""
+    apps = []
+    if 'launcher' in names:
+        from launcher_app import app as launcher_app
+        apps.append(('Launcher', launcher_app, 5000))
+    if 'economy' in names:
+        from economy_editor_app import app as economy_editor_app
+        apps.append(('Economy Editor', economy_editor_app, 5004))
+    if 'map' in names:
+        from map_viewer_app import app as map_viewer_app
+        apps.append(('Map Viewer', map_viewer_app, 5003))
+    return apps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve all XML Data Viewer apps with a production WSGI server.')
+    parser.add_argument('--host', default=os.environ.get('XML_VIEWER_HOST', '0.0.0.0'),
+                        help='Interface to bind (default: 0.0.0.0)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('XML_VIEWER_THREADS', DEFAULT_THREADS)),
+                        help=f'Worker threads per server (default: {DEFAULT_THREADS})')
+    parser.add_argument('--separate', action='store_true',
+                        help='Serve each app on its own port (5000, 5003, 5004) instead of one combined app')
+    parser.add_argument('--apps', nargs='+', choices=['launcher', 'map', 'economy'],
+                        default=['launcher', 'map', 'economy'], help='Apps to serve with --separate (default: all)')
+    args = parser.parse_args(argv)
+    if not args.separate and args.apps != parser.get_default('apps'):
+        parser.error('--apps requires --separate')
+    # Read by change_events when the apps are imported below
+    os.environ.setdefault('XML_VIEWER_MAX_EVENT_STREAMS', str(max(args.threads // 2, 1)))
+
+    servers = []
+    print("=" * 60)
+    print("XML Data Viewer (production)")
+    print("=" * 60)
+    if args.separate:
+        apps = load_apps(args.apps)
+    else:
+        from combined_app import app as combined_app, DEFAULT_PORT, ECONOMY_EDITOR_PREFIX, MAP_VIEWER_PREFIX
+        apps = [('XML Data Viewer', combined_app, DEFAULT_PORT)]
+    for name, app, port in apps:
+        server = WaitressServer(app, args.host, port, threads=args.threads)
+        thread = threading.Thread(target=server.serve_forever, name=f'{name} server', daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        print(f"{name}: http://localhost:{port}")
+    if not args.separate:
+        print(f"Map Viewer: http://localhost:{DEFAULT_PORT}{MAP_VIEWER_PREFIX}/")
+        print(f"Economy Editor: http://localhost:{DEFAULT_PORT}{ECONOMY_EDITOR_PREFIX}/")
+    print("=" * 60)
+    print("Press Ctrl+C to stop")
+
+    try:
+        # join() with a timeout keeps Ctrl+C responsive on Windows
+        while any(thread.is_alive() for _, thread in servers):
+            for _, thread in servers:
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        for server, _ in servers:
+            try:
+                server.shutdown()
+            except Exception as e:
+                print(f"Error stopping server: {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,13 @@
 // Economy Editor JavaScript
 
+// API path prefix injected by the page template: '' when served standalone,
+// the blueprint mount point (e.g. '/map') when served by combined_app.py.
+const API_BASE = (window.APP_API_BASE || '').replace(/\/$/, '');
+
+function apiUrl(path) {
+    return `${API_BASE}${path}`;
+}
+
 let currentMissionDir = '';
 let currentDbFilePath = ''; // Direct database file path
 let tableData = [];
@@ -86,6 +94,21 @@ function setupEventListeners() {
             }
         });
     }
+    
+    // Ctrl+Z / Ctrl+Y (or Ctrl+Shift+Z) step through the server-side change journal
+    document.addEventListener('keydown', (e) => {
+        if (!(e.ctrlKey || e.metaKey) || e.target.matches('input, textarea, select, [contenteditable="true"]')) {
+            return;
+        }
+        const key = e.key.toLowerCase();
+        if (key === 'z' && !e.shiftKey) {
+            e.preventDefault();
+            stepChangeJournal('undo');
+        } else if (key === 'y' || (key === 'z' && e.shiftKey)) {
+            e.preventDefault();
+            stepChangeJournal('redo');
+        }
+    });
     document.getElementById('addItemclassBtn').addEventListener('click', addItemclass);
     document.getElementById('addItemtagBtn').addEventListener('click', addItemtag);
     document.getElementById('addUsageflagBtn').addEventListener('click', addUsageflag);
@@ -416,7 +439,7 @@ async function loadDatabase() {
     try {
         updateStatus('Loading database...');
         
-        const response = await fetch('/api/load-database', {
+        const response = await fetch(apiUrl('/api/load-database'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -448,6 +471,69 @@ async function loadDatabase() {
     }
 }
 
+/**
+ * Start an online backup of the current database and poll its status until it
+ * finishes. Returns the final status ({state, backup_path, percent, error, ...}).
+ */
+async function waitForJob(jobId, statusText) {
+    // Poll a background job (/api/jobs/<id>) until it finishes; returns its final status
+    while (true) {
+        const response = await fetch(apiUrl(`/api/jobs/${jobId}`));
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error || 'Lost track of background job');
+        }
+        const status = data.status;
+        if (status.state === 'done') {
+            return status;
+        }
+        if (status.state !== 'pending' && status.state !== 'running') {
+            throw new Error(status.error || `${status.label} ${status.state}`);
+        }
+        updateStatus(`${statusText}... ${Math.round(status.percent)}%`);
+        await new Promise(resolve => setTimeout(resolve, 250));
+    }
+}
+
+async function runJob(path, body, statusText) {
+    // Run a load/import/export as a background job; resolves to the payload of the synchronous call
+    const response = await fetch(apiUrl(path), {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ ...body, async: true })
+    });
+    
+    const data = await response.json();
+    if (!data.success) {
+        throw new Error(data.error || `${statusText} failed`);
+    }
+    
+    const status = await waitForJob(data.job_id, statusText);
+    return status.result;
+}
+
+async function runDatabaseBackup() {
+    const response = await fetch(apiUrl('/api/backup-database'), {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            db_file_path: currentDbFilePath
+        })
+    });
+    
+    const data = await response.json();
+    if (!data.success) {
+        throw new Error(data.error || 'Failed to create backup');
+    }
+    
+    // Backups run as background jobs
+    return waitForJob(data.backup_id, 'Creating backup');
+}
+
 async function backupDatabase() {
     if (!currentDbFilePath) {
         alert('Please load a database first');
@@ -457,27 +543,45 @@ async function backupDatabase() {
     try {
         updateStatus('Creating backup...');
         
-        const response = await fetch('/api/backup-database', {
+        const status = await runDatabaseBackup();
+        updateStatus(`Backup created: ${status.backup_path}`);
+        alert(`Backup created successfully!\n\nLocation: ${status.backup_path}`);
+    } catch (error) {
+        console.error('Error creating backup:', error);
+        alert(`Error creating backup: ${error.message}`);
+        updateStatus('Failed to create backup');
+    }
+}
+
+async function stepChangeJournal(direction) {
+    if (!currentDbFilePath && !currentMissionDir) {
+        return;
+    }
+    
+    try {
+        const response = await fetch(apiUrl(`/api/journal/${direction}`), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                db_file_path: currentDbFilePath
+                mission_dir: currentMissionDir || '',
+                db_file_path: currentDbFilePath || ''
             })
         });
         
         const data = await response.json();
-        if (data.success) {
-            updateStatus(`Backup created: ${data.backup_path}`);
-            alert(`Backup created successfully!\n\nLocation: ${data.backup_path}`);
-        } else {
-            throw new Error(data.error || 'Failed to create backup');
+        if (!data.success) {
+            updateStatus(data.error || `Nothing to ${direction}`);
+            return;
         }
+        
+        await loadElements();
+        const verb = direction === 'undo' ? 'Undid' : 'Redid';
+        updateStatus(`${verb} ${data.result.label || 'change'} (${data.result.changes} row changes)`);
     } catch (error) {
-        console.error('Error creating backup:', error);
-        alert(`Error creating backup: ${error.message}`);
-        updateStatus('Failed to create backup');
+        console.error(`Error during ${direction}:`, error);
+        updateStatus(`Failed to ${direction}`);
     }
 }
 
@@ -495,18 +599,10 @@ async function loadXMLData() {
     updateStatus('Loading XML data into database...');
     
     try {
-        const response = await fetch('/api/load', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                mission_dir: missionDir,
-                element_type: 'type'
-            })
-        });
-        
-        const data = await response.json();
+        const data = await runJob('/api/load', {
+            mission_dir: missionDir,
+            element_type: 'type'
+        }, 'Loading XML data into database');
         
         if (data.success) {
             updateStatus(`Loaded ${data.element_count} elements from ${data.file_count} files`);
@@ -526,9 +622,9 @@ async function loadReferenceData() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/reference-data?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/reference-data?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/reference-data?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/reference-data?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         const data = await response.json();
@@ -548,12 +644,14 @@ async function loadReferenceData() {
 }
 
 async function loadElements() {
+    // Subscribe before loading so edits made meanwhile by other editors are not missed
+    connectChangeEvents();
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/elements?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/elements?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/elements?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/elements?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         const data = await response.json();
@@ -586,6 +684,83 @@ async function loadElements() {
     }
 }
 
+// Change events (/api/events): edits made by other editors open on the same database
+let changeEventSource = null;
+let changeEventUrl = '';
+let changeEventLastId = '';
+let changeEventRetryTimer = null;
+
+function connectChangeEvents(retry = false) {
+    const url = currentDbFilePath
+        ? apiUrl(`/api/events?db_file_path=${encodeURIComponent(currentDbFilePath)}`)
+        : apiUrl(`/api/events?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
+    if (changeEventSource && changeEventUrl === url && !retry) return;
+    if (changeEventSource) changeEventSource.close();
+    clearTimeout(changeEventRetryTimer);
+    if (changeEventUrl !== url) changeEventLastId = '';
+    changeEventUrl = url;
+    const resume = changeEventLastId ? `&last_event_id=${encodeURIComponent(changeEventLastId)}` : '';
+    const source = new EventSource(url + resume);
+    changeEventSource = source;
+    const on = (type, handler) => source.addEventListener(type, event => {
+        changeEventLastId = event.lastEventId || changeEventLastId;
+        handler(event);
+    });
+    on('elements', event => applyElementChanges(JSON.parse(event.data)));
+    on('reference', () => loadReferenceData());
+    on('reload', () => loadElements());
+    on('resync', () => {
+        loadReferenceData();
+        loadElements();
+    });
+    // A server at its stream limit answers 503, which EventSource does not retry by itself
+    source.onerror = () => {
+        if (source === changeEventSource && source.readyState === EventSource.CLOSED) {
+            changeEventRetryTimer = setTimeout(() => connectChangeEvents(true), 5000 + Math.random() * 5000);
+        }
+    };
+}
+
+// Apply an "elements" event ({changed: [{element_key, fields}], deleted}) to tableData.
+// Own edits come back too; applying them again is harmless.
+function applyElementChanges(data) {
+    const recordsByKey = new Map(tableData.map(record => [record._element_key, record]));
+    const fieldUpdates = new Map(); // field name -> element keys to redraw
+    let needsRedraw = false;
+    
+    (data.changed || []).forEach(change => {
+        const record = recordsByKey.get(change.element_key);
+        if (!record) {
+            tableData.push(Object.assign({ _element_key: change.element_key }, change.fields));
+            needsRedraw = true;
+            return;
+        }
+        Object.entries(change.fields).forEach(([fieldName, value]) => {
+            record[fieldName] = value;
+            if (!fieldName.startsWith('_') && !tableColumns.includes(fieldName)) {
+                tableColumns.push(fieldName);
+                tableColumns.sort();
+                needsRedraw = true;
+            }
+            if (!fieldUpdates.has(fieldName)) fieldUpdates.set(fieldName, []);
+            fieldUpdates.get(fieldName).push(change.element_key);
+        });
+    });
+    
+    const deleted = new Set(data.deleted || []);
+    if (deleted.size > 0) {
+        tableData = tableData.filter(record => !deleted.has(record._element_key));
+        deleted.forEach(key => selectedRows.delete(key));
+        needsRedraw = true;
+    }
+    
+    if (needsRedraw) {
+        displayTable();
+    } else {
+        fieldUpdates.forEach((elementKeys, fieldName) => updateCellDisplays(elementKeys, fieldName));
+    }
+}
+
 function getSortValue(record, key) {
     const value = record[key];
     
@@ -1010,7 +1185,7 @@ function displayTable() {
                 : [elementKey];
             try {
                 const promises = elementKeysToUpdate.map(key =>
-                    fetch(`/api/elements/${encodeURIComponent(key)}/export`, {
+                    fetch(apiUrl(`/api/elements/${encodeURIComponent(key)}/export`), {
                         method: 'PUT',
                         headers: { 'Content-Type': 'application/json' },
                         body: JSON.stringify({
@@ -1274,7 +1449,7 @@ async function saveValueflags() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/valueflags`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/valueflags`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1409,7 +1584,7 @@ async function saveUsageflags() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/usageflags`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/usageflags`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1566,7 +1741,7 @@ async function saveFlags() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/flags`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/flags`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1710,7 +1885,7 @@ async function saveCategories() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/categories`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/categories`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1834,7 +2009,7 @@ async function saveItemclass() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/itemclass`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/itemclass`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1969,7 +2144,7 @@ async function saveItemtags() {
     try {
         // Apply to all selected elements
         const promises = elementKeys.map(elementKey => 
-            fetch(`/api/elements/${encodeURIComponent(elementKey)}/itemtags`, {
+            fetch(apiUrl(`/api/elements/${encodeURIComponent(elementKey)}/itemtags`), {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -2538,7 +2713,7 @@ function makeCellEditable(cell) {
         try {
             // Apply to all selected elements
             const promises = elementKeys.map(key => 
-                fetch(`/api/elements/${encodeURIComponent(key)}/field/${fieldName}`, {
+                fetch(apiUrl(`/api/elements/${encodeURIComponent(key)}/field/${fieldName}`), {
                     method: 'PUT',
                     headers: {
                         'Content-Type': 'application/json'
@@ -2849,20 +3024,12 @@ async function exportToXML() {
     updateStatus('Exporting to XML files...');
     
     try {
-        const response = await fetch('/api/export', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                mission_dir: missionDir,
-                db_file_path: currentDbFilePath || '',
-                export_by_itemclass: exportByItemclass,
-                export_subfolder: exportSubfolder
-            })
-        });
-        
-        const data = await response.json();
+        const data = await runJob('/api/export', {
+            mission_dir: missionDir,
+            db_file_path: currentDbFilePath || '',
+            export_by_itemclass: exportByItemclass,
+            export_subfolder: exportSubfolder
+        }, 'Exporting to XML files');
         
         if (data.success) {
             let statusMsg = `Exported ${data.exported_count} file(s) successfully`;
@@ -2922,9 +3089,9 @@ async function loadItemclasses() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/itemclasses?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/itemclasses?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/itemclasses?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/itemclasses?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         
@@ -2986,7 +3153,7 @@ async function addItemclass() {
     }
     
     try {
-        const response = await fetch('/api/itemclasses', {
+        const response = await fetch(apiUrl('/api/itemclasses'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3021,9 +3188,9 @@ async function deleteItemclass(itemclassId) {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/itemclasses/${itemclassId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/itemclasses/${itemclassId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/itemclasses/${itemclassId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/itemclasses/${itemclassId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url, {
             method: 'DELETE'
@@ -3059,9 +3226,9 @@ async function loadItemtags() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/itemtags?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/itemtags?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/itemtags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/itemtags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         
@@ -3123,7 +3290,7 @@ async function addItemtag() {
     }
     
     try {
-        const response = await fetch('/api/itemtags', {
+        const response = await fetch(apiUrl('/api/itemtags'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3158,9 +3325,9 @@ async function deleteItemtag(itemtagId) {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/itemtags/${itemtagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/itemtags/${itemtagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/itemtags/${itemtagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/itemtags/${itemtagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url, {
             method: 'DELETE'
@@ -3214,7 +3381,7 @@ async function saveUsageflagsToFile() {
         
         updateStatus('Saving cfglimitsdefinition.xml...');
         
-        const response = await fetch('/api/cfglimitsdefinition/save', {
+        const response = await fetch(apiUrl('/api/cfglimitsdefinition/save'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3250,9 +3417,9 @@ async function loadUsageflags() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/usageflags?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/usageflags?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/usageflags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/usageflags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         const data = await response.json();
@@ -3310,7 +3477,7 @@ async function addUsageflag() {
     }
     
     try {
-        const response = await fetch('/api/usageflags', {
+        const response = await fetch(apiUrl('/api/usageflags'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3345,9 +3512,9 @@ async function deleteUsageflag(usageflagId) {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/usageflags/${usageflagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/usageflags/${usageflagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/usageflags/${usageflagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/usageflags/${usageflagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url, {
             method: 'DELETE'
@@ -3401,7 +3568,7 @@ async function saveValueflagsToFile() {
         
         updateStatus('Saving cfglimitsdefinition.xml...');
         
-        const response = await fetch('/api/cfglimitsdefinition/save', {
+        const response = await fetch(apiUrl('/api/cfglimitsdefinition/save'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3437,9 +3604,9 @@ async function loadValueflags() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/valueflags?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/valueflags?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/valueflags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/valueflags?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         const data = await response.json();
@@ -3497,7 +3664,7 @@ async function addValueflag() {
     }
     
     try {
-        const response = await fetch('/api/valueflags', {
+        const response = await fetch(apiUrl('/api/valueflags'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3532,9 +3699,9 @@ async function deleteValueflag(valueflagId) {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/valueflags/${valueflagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/valueflags/${valueflagId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/valueflags/${valueflagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/valueflags/${valueflagId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url, {
             method: 'DELETE'
@@ -3588,7 +3755,7 @@ async function saveCategoriesToFile() {
         
         updateStatus('Saving cfglimitsdefinition.xml...');
         
-        const response = await fetch('/api/cfglimitsdefinition/save', {
+        const response = await fetch(apiUrl('/api/cfglimitsdefinition/save'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3624,9 +3791,9 @@ async function loadCategories() {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/categories?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/categories?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/categories?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/categories?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url);
         const data = await response.json();
@@ -3684,7 +3851,7 @@ async function addCategory() {
     }
     
     try {
-        const response = await fetch('/api/categories', {
+        const response = await fetch(apiUrl('/api/categories'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3719,9 +3886,9 @@ async function deleteCategory(categoryId) {
     try {
         let url;
         if (currentDbFilePath) {
-            url = `/api/categories/${categoryId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`;
+            url = apiUrl(`/api/categories/${categoryId}?db_file_path=${encodeURIComponent(currentDbFilePath)}`);
         } else {
-            url = `/api/categories/${categoryId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`;
+            url = apiUrl(`/api/categories/${categoryId}?mission_dir=${encodeURIComponent(currentMissionDir || '')}`);
         }
         const response = await fetch(url, {
             method: 'DELETE'
@@ -3762,7 +3929,7 @@ async function deleteSelectedElements() {
     updateStatus(`Deleting ${count} element(s)...`);
     
     try {
-        const response = await fetch('/api/elements/delete', {
+        const response = await fetch(apiUrl('/api/elements/delete'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -3822,14 +3989,14 @@ async function importXmlFile() {
     updateStatus('Checking for duplicates...');
     
     try {
-        // First, check for duplicates
+        // Upload and parse the file once; the server keeps it staged as an import session
         const formData = new FormData();
         formData.append('file', selectedXmlFile);
         formData.append('mission_dir', currentMissionDir || '');
         formData.append('db_file_path', currentDbFilePath || '');
         formData.append('element_type', 'type');
         
-        const checkResponse = await fetch('/api/import-xml/check-duplicates', {
+        const checkResponse = await fetch(apiUrl('/api/import-sessions'), {
             method: 'POST',
             body: formData
         });
@@ -3839,7 +4006,7 @@ async function importXmlFile() {
             throw new Error(checkData.error || 'Failed to check duplicates');
         }
         
-        const { duplicates, new_elements, duplicate_count, new_count } = checkData;
+        const { session_id, duplicates, duplicate_count, new_count } = checkData;
         
         // If there are duplicates, ask user for decisions
         let decisions = {};
@@ -3850,6 +4017,11 @@ async function importXmlFile() {
             // Show dialog for duplicates
             const result = await showDuplicateDialog(duplicates, new_count);
             if (result.cancelled) {
+                const params = new URLSearchParams({
+                    mission_dir: currentMissionDir || '',
+                    db_file_path: currentDbFilePath || ''
+                });
+                await fetch(apiUrl(`/api/import-sessions/${session_id}?${params}`), { method: 'DELETE' });
                 updateStatus('Import cancelled');
                 return;
             }
@@ -3859,46 +4031,16 @@ async function importXmlFile() {
             skipAll = result.skipAll;
         }
         
-        // Create backup before import
-        updateStatus('Creating backup...');
-        if (currentDbFilePath) {
-            const backupResponse = await fetch('/api/backup-database', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    db_file_path: currentDbFilePath
-                })
-            });
-            
-            const backupData = await backupResponse.json();
-            if (!backupData.success) {
-                if (!confirm(`Failed to create backup: ${backupData.error}\n\nContinue with import anyway?`)) {
-                    updateStatus('Import cancelled - backup failed');
-                    return;
-                }
-            }
-        }
-        
-        // Perform import
+        // Apply the staged import (the server snapshots the change journal first, so it can be undone)
         updateStatus('Importing elements...');
         
-        const importFormData = new FormData();
-        importFormData.append('file', selectedXmlFile);
-        importFormData.append('mission_dir', currentMissionDir || '');
-        importFormData.append('db_file_path', currentDbFilePath || '');
-        importFormData.append('element_type', 'type');
-        importFormData.append('overwrite_all', overwriteAll.toString());
-        importFormData.append('skip_all', skipAll.toString());
-        importFormData.append('decisions', JSON.stringify(decisions));
-        
-        const importResponse = await fetch('/api/import-xml', {
-            method: 'POST',
-            body: importFormData
-        });
-        
-        const importData = await importResponse.json();
+        const importData = await runJob(`/api/import-sessions/${session_id}/commit`, {
+            mission_dir: currentMissionDir || '',
+            db_file_path: currentDbFilePath || '',
+            overwrite_all: overwriteAll,
+            skip_all: skipAll,
+            decisions: decisions
+        }, 'Importing elements');
         if (importData.success) {
             // Clear file selection
             selectedXmlFile = null;
@@ -3911,7 +4053,7 @@ async function importXmlFile() {
             const errorMsg = importData.errors && importData.errors.length > 0 
                 ? ` (${importData.errors.length} errors)` 
                 : '';
-            updateStatus(`Import complete: ${importData.added_count} added, ${importData.updated_count} updated, ${importData.skipped_count} skipped${errorMsg}`);
+            updateStatus(`Import complete: ${importData.added_count} added, ${importData.updated_count} updated, ${importData.skipped_count} skipped${errorMsg} - Ctrl+Z to undo`);
             
             if (importData.errors && importData.errors.length > 0) {
                 console.error('Import errors:', importData.errors);
@@ -4272,7 +4414,7 @@ async function saveNewItem() {
     
     try {
         updateStatus('Creating new item...');
-        const response = await fetch('/api/elements/create', {
+        const response = await fetch(apiUrl('/api/elements/create'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
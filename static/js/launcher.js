@@ -1,7 +1,8 @@
 // Launcher JavaScript
 
-const ECONOMY_EDITOR_URL = 'http://localhost:5004';
-const MAP_VIEWER_URL = 'http://localhost:5003';
+// Injected by launcher.html; relative paths when all apps run in one process (combined_app.py)
+const ECONOMY_EDITOR_URL = window.LAUNCHER_ECONOMY_EDITOR_URL || 'http://localhost:5004';
+const MAP_VIEWER_URL = window.LAUNCHER_MAP_VIEWER_URL || 'http://localhost:5003';
 
 let currentApp = 'economy-editor';
 const loadedApps = new Set();
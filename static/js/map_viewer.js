@@ -1,5 +1,16 @@
 // Map Viewer JavaScript
 
+// API path prefix injected by the page template: '' when served standalone,
+// the blueprint mount point (e.g. '/map') when served by combined_app.py.
+const API_BASE = (window.APP_API_BASE || '').replace(/\/$/, '');
+
+function apiUrl(path) {
+    return `${API_BASE}${path}`;
+}
+
+// Identifies this page in saves (X-Editor-Client) so it can skip its own change events
+const EDITOR_CLIENT_ID = Math.random().toString(36).slice(2) + Date.now().toString(36);
+
 let canvas;
 let ctx;
 let markers = [];
@@ -117,6 +128,7 @@ let aiPatrolRadiusEditPatrolIndices = [];
 let aiPatrolRadiusEditStartValues = new Map(); // Map<patrolIndex,{ min, max }>
 let aiPatrolRadiusEditReferencePatrolIndex = -1;
 let aiPatrolInferredDefaults = {};
+let aiPatrolLoadoutSummaries = {}; // loadout name -> {itemCount, attachments, cargo, sets}
 let showAiPatrolMarkers = true;
 let showSelectedAiPatrolOnly = false;
 let aiPatrolTypeFilter = 'all'; // all | waypoints | group
@@ -220,6 +232,7 @@ let markerColorConfig = {
     territoryTypes: {},
     eventSpawnTypes: {}
 };
+let markerColorConfigVersion = null; // Server config version last applied
 
 // Zoom-level LOD tuning (aim: preserve look, reduce draw cost when zoomed out)
 const RENDER_LOD = {
@@ -342,7 +355,7 @@ async function syncMarkerColorConfig() {
         const markerTypeKeys = ['markers', ...Object.keys(markerTypes)];
         const eventSpawnTypeNames = getAllEventSpawnTypeNames();
         const territoryTypeNames = getAllTerritoryTypeNames();
-        const response = await fetch('/api/marker-colors/sync', {
+        const response = await fetch(apiUrl('/api/marker-colors/sync'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -350,7 +363,8 @@ async function syncMarkerColorConfig() {
             body: JSON.stringify({
                 markerTypeKeys,
                 eventSpawnTypeNames,
-                territoryTypeNames
+                territoryTypeNames,
+                version: markerColorConfigVersion
             })
         });
         if (!response.ok) {
@@ -360,7 +374,11 @@ async function syncMarkerColorConfig() {
         if (!data.success) {
             throw new Error(data.error || 'Failed to sync marker colors');
         }
+        if (data.unchanged && data.version === markerColorConfigVersion) {
+            return;
+        }
         applyMarkerColorConfig(data.config || {});
+        markerColorConfigVersion = data.version ?? null;
     } catch (error) {
         console.warn('Marker color config sync failed:', error.message);
     }
@@ -473,7 +491,7 @@ const markerTypes = {
         getShowFlag: () => showMarkers && !!editingEnabled.groupMarkers,
         canEditRadius: false,
         canEditDimensions: false,
-        saveEndpoint: '/api/groups/save',
+        saveEndpoint: apiUrl('/api/groups/save'),
         getDisplayName: () => 'Group Markers',
         getEditControlsId: () => 'groupMarkerEditControls',
         getEditCheckboxId: () => 'editGroupMarkers',
@@ -570,7 +588,9 @@ const markerTypes = {
         getShowFlag: () => showEventSpawns,
         canEditRadius: false,
         canEditDimensions: false,
-        saveEndpoint: '/api/event-spawns/save',
+        saveEndpoint: apiUrl('/api/event-spawns/save'),
+        // Save sends only modified/added/deleted spawns keyed by sourceId
+        supportsChangeset: true,
         getDisplayName: () => 'Event Spawns',
         getEditControlsId: () => 'eventSpawnEditControls',
         getEditCheckboxId: () => 'editEventSpawns',
@@ -680,7 +700,9 @@ const markerTypes = {
         getShowFlag: () => showPlayerSpawnPoints,
         canEditRadius: false,
         canEditDimensions: true,
-        saveEndpoint: '/api/player-spawn-points/save',
+        saveEndpoint: apiUrl('/api/player-spawn-points/save'),
+        // Save sends only modified/added/deleted points keyed by sourceId
+        supportsChangeset: true,
         getDisplayName: () => 'Player Spawn Points',
         getEditControlsId: () => 'spawnPointEditControls',
         getEditCheckboxId: () => 'editPlayerSpawnPoints',
@@ -767,7 +789,9 @@ const markerTypes = {
         getShowFlag: () => showEffectAreas,
         canEditRadius: true,
         canEditDimensions: false,
-        saveEndpoint: '/api/effect-areas/save',
+        saveEndpoint: apiUrl('/api/effect-areas/save'),
+        // Save sends only modified/added/deleted areas keyed by sourceId
+        supportsChangeset: true,
         getDisplayName: () => 'Effect Areas',
         getEditControlsId: () => 'effectAreaEditControls',
         getEditCheckboxId: () => 'editEffectAreas',
@@ -887,7 +911,7 @@ const markerTypes = {
         getShowFlag: () => showTerritories,
         canEditRadius: true,
         canEditDimensions: false,
-        saveEndpoint: '/api/territories/save',
+        saveEndpoint: apiUrl('/api/territories/save'),
         getDisplayName: () => 'Zombie Territory Zones',
         getEditControlsId: () => 'zombieTerritoryZoneEditControls',
         getEditCheckboxId: () => 'editZombieTerritoryZones',
@@ -5087,7 +5111,7 @@ async function handleExportMap() {
     const defaultPath = missionDir ? (missionDir + (missionDir.endsWith('/') || missionDir.endsWith('\\') ? '' : '/') + 'map_export.png') : '';
     const pathToUse = pathValue || defaultPath;
     try {
-        const response = await fetch('/api/export-map', {
+        const response = await fetch(apiUrl('/api/export-map'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -6668,6 +6692,197 @@ function deleteSelectedEffectAreas() {
     deleteSelectedMarkers('effectAreas');
 }
 
+// Build a sourceId-keyed changeset ({ modified, added, deleted }) for types whose
+// save endpoint accepts one. Added markers are listed in ascending index order so the
+// server's added_source_ids line up with addedIndices.
+function buildMarkerChangeset(typeConfig, array) {
+    const changes = { modified: [], added: [], deleted: [] };
+    const addedIndices = Array.from(typeConfig.new)
+        .filter(idx => idx < array.length && !typeConfig.deleted.has(idx))
+        .sort((a, b) => a - b);
+    
+    typeConfig.deleted.forEach(idx => {
+        const marker = array[idx];
+        if (marker && marker.sourceId && !typeConfig.new.has(idx)) {
+            changes.deleted.push(marker.sourceId);
+        }
+    });
+    typeConfig.originalPositions.forEach((_, idx) => {
+        if (idx >= array.length || typeConfig.deleted.has(idx) || typeConfig.new.has(idx)) return;
+        const saveData = typeConfig.prepareSaveData(array[idx], idx);
+        if (saveData.sourceId) {
+            changes.modified.push(saveData);
+        }
+    });
+    addedIndices.forEach(idx => {
+        changes.added.push(typeConfig.prepareSaveData(array[idx], idx));
+    });
+    
+    return { changes, addedIndices };
+}
+
+// Apply the sourceIds returned by a changeset save. Must run before deleted markers
+// are spliced out, while addedIndices still point at the new markers.
+function applySavedSourceIds(array, data, addedIndices) {
+    const sourceIds = data.source_ids || {};
+    array.forEach(marker => {
+        if (marker && marker.sourceId && sourceIds[marker.sourceId]) {
+            marker.sourceId = sourceIds[marker.sourceId];
+        }
+    });
+    const addedSourceIds = data.added_source_ids || [];
+    (addedIndices || []).forEach((idx, i) => {
+        if (array[idx] && addedSourceIds[i]) {
+            array[idx].sourceId = addedSourceIds[i];
+        }
+    });
+    // Event spawns also carry their (eventIndex, posIndex) position in the file
+    const sourceIndices = data.source_indices;
+    if (sourceIndices) {
+        array.forEach(marker => {
+            const indices = marker && marker.sourceId ? sourceIndices[marker.sourceId] : null;
+            if (indices) {
+                marker.eventIndex = indices[0];
+                marker.posIndex = indices[1];
+            }
+        });
+    }
+}
+
+// Change events (/api/events): saves by other editors open on the same mission.
+// Changeset layers are patched by sourceId; the rest are reloaded. A layer with unsaved
+// local edits is left alone; its next save reports the conflict.
+let changeEventSource = null;
+let changeEventMissionDir = '';
+let changeEventLastId = '';
+let changeEventRetryTimer = null;
+
+const CHANGE_EVENT_LAYERS = {
+    'groups': { markerType: 'groupMarkers', reload: reloadGroupMarkers },
+    'effect-areas': { markerType: 'effectAreas', reload: loadEffectAreas },
+    'event-spawns': { markerType: 'eventSpawns', reload: loadEventSpawns },
+    'player-spawn-points': { markerType: 'playerSpawnPoints', reload: loadPlayerSpawnPoints },
+    'territories': { section: 'territories', reload: loadTerritories },
+    'ai-patrols': { reload: loadAiPatrols }
+};
+
+// Save-data keys that only make sense to the page that saved (positions are re-derived)
+const CHANGE_EVENT_SKIPPED_KEYS = new Set(['index', 'isNew', 'isDeleted', 'eventIndex', 'posIndex', 'sourceId']);
+
+function connectChangeEvents(retry = false) {
+    if (changeEventSource && changeEventMissionDir === missionDir && !retry) return;
+    if (changeEventSource) changeEventSource.close();
+    clearTimeout(changeEventRetryTimer);
+    if (changeEventMissionDir !== missionDir) changeEventLastId = '';
+    changeEventMissionDir = missionDir;
+    const resume = changeEventLastId ? `&last_event_id=${encodeURIComponent(changeEventLastId)}` : '';
+    const source = new EventSource(apiUrl(`/api/events?mission_dir=${encodeURIComponent(missionDir)}${resume}`));
+    changeEventSource = source;
+    const on = (type, handler) => source.addEventListener(type, event => {
+        changeEventLastId = event.lastEventId || changeEventLastId;
+        handler(event);
+    });
+    on('layer', event => applyLayerChangeEvent(JSON.parse(event.data)));
+    on('resync', () => {
+        Object.keys(CHANGE_EVENT_LAYERS).forEach(layer => applyLayerChangeEvent({ layer, reload: true }));
+    });
+    // A server at its stream limit answers 503, which EventSource does not retry by itself
+    source.onerror = () => {
+        if (source === changeEventSource && source.readyState === EventSource.CLOSED) {
+            changeEventRetryTimer = setTimeout(() => connectChangeEvents(true), 5000 + Math.random() * 5000);
+        }
+    };
+}
+
+function layerHasUnsavedChanges(layer) {
+    const config = CHANGE_EVENT_LAYERS[layer];
+    if (layer === 'ai-patrols') return aiPatrolHasUnsavedChanges;
+    if (config.section) return getDirtyMarkerTypesForSection(config.section).length > 0;
+    return markerTypeHasChanges(config.markerType);
+}
+
+async function reloadGroupMarkers() {
+    const response = await fetch(apiUrl(`/api/groups?mission_dir=${encodeURIComponent(missionDir)}`));
+    const data = await response.json();
+    if (!data.success) return;
+    markers = data.groups || [];
+    getRegularSelectionSet().clear();
+    markerTypes.groupMarkers.selected.clear();
+    applyFilters();
+    invalidateStaticMarkerCache();
+    requestDraw();
+}
+
+async function applyLayerChangeEvent(event) {
+    const config = CHANGE_EVENT_LAYERS[event.layer];
+    if (!config || event.origin === EDITOR_CLIENT_ID) return;
+    if (layerHasUnsavedChanges(event.layer)) {
+        updateStatus(`${event.layer} was changed by another editor; reload it after saving or discarding your edits`, true);
+        return;
+    }
+    const typeConfig = config.markerType ? markerTypes[config.markerType] : null;
+    if (event.reload || !typeConfig) {
+        await config.reload();
+        return;
+    }
+    
+    const array = typeConfig.getArray();
+    const bySourceId = new Map();
+    array.forEach(marker => {
+        if (marker && marker.sourceId) bySourceId.set(marker.sourceId, marker);
+    });
+    const copySaved = (marker, item) => {
+        Object.entries(item).forEach(([key, value]) => {
+            if (!CHANGE_EVENT_SKIPPED_KEYS.has(key)) marker[key] = value;
+        });
+        return marker;
+    };
+    // Modified and deleted items carry the sourceIds they were saved under
+    event.modified.forEach(item => {
+        const marker = bySourceId.get(item.sourceId);
+        if (marker) copySaved(marker, item);
+    });
+    const deleted = new Set(event.deleted);
+    if (deleted.size > 0) {
+        typeConfig.setArray(array.filter(marker => !(marker && deleted.has(marker.sourceId))));
+        typeConfig.selected.clear();
+    }
+    const current = typeConfig.getArray();
+    applySavedSourceIds(current, { source_ids: event.source_ids }, null);
+    event.added.forEach(item => {
+        const marker = copySaved(typeConfig.createNew(item.x, item.y, item.z), item);
+        marker.sourceId = item.sourceId;
+        current.push(marker);
+    });
+    applySavedSourceIds(current, { source_indices: event.source_indices }, null);
+    current.forEach((marker, idx) => {
+        marker.id = idx;
+    });
+    
+    updateSelectedCount();
+    applyFilters();
+    invalidateStaticMarkerCache();
+    requestDraw();
+}
+
+// Territory zones are addressed by (territoryIndex, zoneIndex) and checked against their
+// sourceId; split prepared zone save data into the explicit changeset /api/territories/save accepts.
+function buildTerritoryZoneChangeset(zoneSaveData) {
+    const changes = { modified: [], added: [], deleted: [] };
+    zoneSaveData.forEach(zone => {
+        if (zone.isDeleted) {
+            if (!zone.isNew) {
+                changes.deleted.push(zone);
+            }
+        } else if (zone.isNew) {
+            changes.added.push(zone);
+        } else {
+            changes.modified.push(zone);
+        }
+    });
+    return changes;
+}
+
 // Generic function to save marker changes
 async function saveMarkerChanges(markerType) {
     const typeConfig = markerTypes[markerType];
@@ -6714,7 +6929,7 @@ async function saveMarkerChanges(markerType) {
                     markerData.push(typeConfig.prepareSaveData(array[idx], idx));
                 }
             });
-        } else {
+        } else if (!typeConfig.supportsChangeset) {
             // For other types, include all markers (they handle filtering on backend)
             markerData.push(...array.map((marker, idx) => typeConfig.prepareSaveData(marker, idx)));
         }
@@ -6731,15 +6946,28 @@ async function saveMarkerChanges(markerType) {
             dataKey = 'zones';
         }
         
-        const requestBody = {
+        let requestBody = {
             mission_dir: missionDir,
             [dataKey]: markerData,
             deleted_indices: deletedIndices,
             new_indices: newIndices
         };
+        let addedIndices = null;
+        if (typeConfig.supportsChangeset) {
+            const changeset = buildMarkerChangeset(typeConfig, array);
+            addedIndices = changeset.addedIndices;
+            requestBody = {
+                mission_dir: missionDir,
+                changes: changeset.changes
+            };
+        }
         
-        // For territory zones, also send territories structure
+        // For territory zones, send an explicit changeset plus the territories structure
         if (isTerritoryZonesFlat) {
+            requestBody = {
+                mission_dir: missionDir,
+                changes: buildTerritoryZoneChangeset(markerData)
+            };
             requestBody.territories = territories.map(t => ({
                 id: t.id,
                 name: t.name,
@@ -6751,7 +6979,8 @@ async function saveMarkerChanges(markerType) {
         const response = await fetch(typeConfig.saveEndpoint, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'X-Editor-Client': EDITOR_CLIENT_ID
             },
             body: JSON.stringify(requestBody)
         });
@@ -6759,6 +6988,14 @@ async function saveMarkerChanges(markerType) {
         const data = await response.json();
         
         if (data.success) {
+            if (addedIndices) {
+                applySavedSourceIds(array, data, addedIndices);
+            } else if (isTerritoryZonesFlat) {
+                // Added zones come back in changeset order
+                const addedZoneIndices = markerData.filter(zone => zone.isNew && !zone.isDeleted).map(zone => zone.index);
+                applySavedSourceIds(array, data, addedZoneIndices);
+            }
+            
             // Remove deleted markers from array (they were already removed from file)
             const indicesToRemove = Array.from(typeConfig.deleted).sort((a, b) => b - a);
             for (const index of indicesToRemove) {
@@ -6825,6 +7062,7 @@ async function saveAllTerritoryMarkerChanges() {
         }
 
         const mergedZones = [];
+        const addedZones = [];  // { markerType, index } in changeset order
         for (const mt of dirtyTypes) {
             const cfg = markerTypes[mt];
             if (!cfg) continue;
@@ -6836,7 +7074,11 @@ async function saveAllTerritoryMarkerChanges() {
             ]);
             allChanged.forEach(idx => {
                 if (idx < array.length) {
-                    mergedZones.push(cfg.prepareSaveData(cfg.getMarker(idx), idx));
+                    const saveData = cfg.prepareSaveData(cfg.getMarker(idx), idx);
+                    mergedZones.push(saveData);
+                    if (saveData.isNew && !saveData.isDeleted) {
+                        addedZones.push({ markerType: mt, index: idx });
+                    }
                 }
             });
         }
@@ -6847,9 +7089,7 @@ async function saveAllTerritoryMarkerChanges() {
 
         const requestBody = {
             mission_dir: missionDir,
-            zones: mergedZones,
-            deleted_indices: [],
-            new_indices: [],
+            changes: buildTerritoryZoneChangeset(mergedZones),
             territories: territories.map(t => ({
                 id: t.id,
                 name: t.name,
@@ -6858,9 +7098,9 @@ async function saveAllTerritoryMarkerChanges() {
             }))
         };
 
-        const response = await fetch('/api/territories/save', {
+        const response = await fetch(apiUrl('/api/territories/save'), {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'X-Editor-Client': EDITOR_CLIENT_ID },
             body: JSON.stringify(requestBody)
         });
 
@@ -6869,10 +7109,20 @@ async function saveAllTerritoryMarkerChanges() {
             return { success: false, message: data.error || 'Failed to save' };
         }
 
+        const addedSourceIds = data.added_source_ids || [];
         for (const mt of dirtyTypes) {
             const typeConfig = markerTypes[mt];
             if (!typeConfig) continue;
             const array = typeConfig.getArray();
+            const addedIndices = [];
+            const addedIds = [];
+            addedZones.forEach((added, i) => {
+                if (added.markerType === mt) {
+                    addedIndices.push(added.index);
+                    addedIds.push(addedSourceIds[i]);
+                }
+            });
+            applySavedSourceIds(array, { source_ids: data.source_ids, added_source_ids: addedIds }, addedIndices);
             const indicesToRemove = Array.from(typeConfig.deleted).sort((a, b) => b - a);
             for (const index of indicesToRemove) {
                 array.splice(index, 1);
@@ -7745,7 +7995,7 @@ async function loadEffectAreas() {
     }
     
     try {
-        const response = await fetch(`/api/effect-areas?mission_dir=${encodeURIComponent(missionDir)}`);
+        const response = await fetch(apiUrl(`/api/effect-areas?mission_dir=${encodeURIComponent(missionDir)}`));
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -7804,7 +8054,7 @@ function createTerritoryTypeMarkerType(territoryType) {
         getShowFlag: () => showTerritories,
         canEditRadius: true,
         canEditDimensions: false,
-        saveEndpoint: '/api/territories/save',
+        saveEndpoint: apiUrl('/api/territories/save'),
         getDisplayName: () => `Territory Zones (${territoryType})`,
         getEditControlsId: () => `territoryType_${territoryType}_EditControls`,
         getEditCheckboxId: () => `editTerritoryType_${territoryType}`,
@@ -7992,6 +8242,7 @@ function updateTerritoriesFromZonesForType(territoryType) {
                 radius: zone.radius,
                 dmin: zone.dmin ?? null,
                 dmax: zone.dmax ?? null,
+                sourceId: zone.sourceId || null,
                 xml: zone.xml || `<zone x="${zone.x}" z="${zone.z}" r="${zone.radius}"/>`
             };
             entry.zones.push(zoneCopy);
@@ -8359,6 +8610,7 @@ function updateZombieTerritoriesFromZones() {
                 radius: zone.radius,
                 dmin: zone.dmin ?? null,
                 dmax: zone.dmax ?? null,
+                sourceId: zone.sourceId || null,
                 xml: zone.xml || `<zone x="${zone.x}" z="${zone.z}" r="${zone.radius}"/>`
             };
             entry.zones.push(zoneCopy);
@@ -8380,7 +8632,7 @@ async function loadTerritories() {
     }
     
     try {
-        const response = await fetch(`/api/territories?mission_dir=${encodeURIComponent(missionDir)}`);
+        const response = await fetch(apiUrl(`/api/territories?mission_dir=${encodeURIComponent(missionDir)}`));
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -8427,7 +8679,7 @@ async function loadEventSpawns() {
     }
     
     try {
-        const response = await fetch(`/api/event-spawns?mission_dir=${encodeURIComponent(missionDir)}`);
+        const response = await fetch(apiUrl(`/api/event-spawns?mission_dir=${encodeURIComponent(missionDir)}`));
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -8488,7 +8740,7 @@ async function loadPlayerSpawnPoints() {
     }
     
     try {
-        const response = await fetch(`/api/player-spawn-points?mission_dir=${encodeURIComponent(missionDir)}`);
+        const response = await fetch(apiUrl(`/api/player-spawn-points?mission_dir=${encodeURIComponent(missionDir)}`));
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -8542,9 +8794,11 @@ async function loadGroups() {
     localStorage.setItem('map_viewer_profileDir', profileDir);
     
     updateStatus('Loading markers...');
+    // Subscribe before loading so saves made meanwhile by other editors are not missed
+    connectChangeEvents();
     
     try {
-        const response = await fetch(`/api/groups?mission_dir=${encodeURIComponent(missionDir)}`);
+        const response = await fetch(apiUrl(`/api/groups?mission_dir=${encodeURIComponent(missionDir)}`));
         const data = await response.json();
         
         if (!data.success) {
@@ -8731,6 +8985,7 @@ function aiPatrolCoerceToDefaultType(value, defaultValue) {
 
 function normalizeAiPatrolForExport(patrol) {
     const normalized = { ...(patrol || {}) };
+    delete normalized._sourceId;
     const hasWaypointsArray = Array.isArray(normalized.Waypoints);
     Object.entries(AI_PATROL_REQUIRED_EXPORT_DEFAULTS).forEach(([field, defaultValue]) => {
         const raw = normalized[field];
@@ -9029,7 +9284,7 @@ async function loadAiPatrols() {
         if (profileDir) {
             params.set('profile_dir', profileDir);
         }
-        const response = await fetch(`/api/ai-patrols?${params.toString()}`);
+        const response = await fetch(apiUrl(`/api/ai-patrols?${params.toString()}`));
         const data = await response.json();
         if (!data.success) {
             aiPatrols = [];
@@ -9038,6 +9293,7 @@ async function loadAiPatrols() {
             return;
         }
         aiPatrols = Array.isArray(data.patrols) ? data.patrols : [];
+        applyAiPatrolSourceIds(aiPatrols, Array.isArray(data.patrol_ids) ? data.patrol_ids : []);
         aiPatrolInferredDefaults = normalizeAiPatrolOverrideDefaults(data.options?.overrideDefaults || {});
         if (typeof data.profile_dir === 'string' && data.profile_dir.trim()) {
             profileDir = data.profile_dir.trim();
@@ -9055,6 +9311,7 @@ async function loadAiPatrols() {
         populateAiPatrolUnlimitedReloadSelect();
         populateSimpleSelect(document.getElementById('aiPatrolFaction'), aiPatrolOptions.factions);
         populateSimpleSelect(document.getElementById('aiPatrolLoadout'), aiPatrolOptions.loadouts);
+        applyAiPatrolLoadoutSummaryTitles();
         populateSimpleSelect(document.getElementById('aiPatrolBehaviour'), aiPatrolOptions.behaviours, { includeEmpty: false });
         populateSimpleSelect(document.getElementById('aiPatrolDefaultStance'), aiPatrolOptions.stances, { includeEmpty: false });
         populateSimpleSelect(document.getElementById('aiPatrolSpeed'), aiPatrolOptions.speeds, { includeEmpty: false });
@@ -9064,11 +9321,44 @@ async function loadAiPatrols() {
         applyAiPatrolToForm();
         updateAiPatrolEditingUI();
         requestDraw();
+        loadAiPatrolLoadoutSummaries();
     } catch (error) {
         console.error('Error loading AI patrols:', error);
     }
 }
 
+async function loadAiPatrolLoadoutSummaries() {
+    if (!missionDir) return;
+    try {
+        const params = new URLSearchParams();
+        params.set('mission_dir', missionDir);
+        if (profileDir) {
+            params.set('profile_dir', profileDir);
+        }
+        const response = await fetch(apiUrl(`/api/ai-patrols/loadouts?${params.toString()}`));
+        const data = await response.json();
+        aiPatrolLoadoutSummaries = data.success && data.loadouts ? data.loadouts : {};
+        applyAiPatrolLoadoutSummaryTitles();
+    } catch (error) {
+        console.error('Error loading AI patrol loadout summaries:', error);
+    }
+}
+
+function applyAiPatrolLoadoutSummaryTitles() {
+    const select = document.getElementById('aiPatrolLoadout');
+    if (!select) return;
+    Array.from(select.options).forEach(opt => {
+        const summary = aiPatrolLoadoutSummaries[opt.value];
+        if (!summary) {
+            opt.title = '';
+        } else if (summary.error) {
+            opt.title = `Invalid loadout: ${summary.error}`;
+        } else {
+            opt.title = `${summary.itemCount} items, ${summary.attachments} attachment slots, ${summary.cargo} cargo, ${summary.sets} sets`;
+        }
+    });
+}
+
 function findNearestAiPatrolWaypoint(screenX, screenY, threshold = 12) {
     if (!Array.isArray(aiPatrols) || aiPatrols.length === 0) return null;
     let best = null;
@@ -9320,6 +9610,65 @@ function discardAiPatrolChanges() {
     updateStatus('Discarded AI patrol changes');
 }
 
+// Patrol sourceIds live on the patrol objects (stripped on export) so they survive undo clones
+function applyAiPatrolSourceIds(patrols, sourceIds) {
+    patrols.forEach((patrol, idx) => {
+        if (patrol && typeof patrol === 'object' && sourceIds[idx]) {
+            patrol._sourceId = sourceIds[idx];
+        }
+    });
+}
+
+function diffAiPatrolForSave(original, current) {
+    const entry = {};
+    const fields = {};
+    Object.keys(current).forEach(key => {
+        if (key === 'Waypoints' && Array.isArray(original.Waypoints) && Array.isArray(current.Waypoints)
+            && original.Waypoints.length === current.Waypoints.length) {
+            const waypoints = {};
+            current.Waypoints.forEach((wp, wpIdx) => {
+                if (JSON.stringify(wp) !== JSON.stringify(original.Waypoints[wpIdx])) {
+                    waypoints[wpIdx] = wp;
+                }
+            });
+            if (Object.keys(waypoints).length > 0) entry.waypoints = waypoints;
+        } else if (JSON.stringify(current[key]) !== JSON.stringify(original[key])) {
+            fields[key] = current[key];
+        }
+    });
+    const removedFields = Object.keys(original).filter(key => !(key in current));
+    if (Object.keys(fields).length > 0) entry.fields = fields;
+    if (removedFields.length > 0) entry.removedFields = removedFields;
+    return Object.keys(entry).length > 0 ? entry : null;
+}
+
+function buildAiPatrolChangeset(patrolsForSave) {
+    const originalsById = new Map();
+    for (const patrol of aiPatrolsOriginal) {
+        if (!patrol || !patrol._sourceId) return null; // Not loaded with IDs; use a full save
+        originalsById.set(patrol._sourceId, normalizeAiPatrolForExport(patrol));
+    }
+    const changes = { modified: [], added: [], deleted: [] };
+    const seen = new Set();
+    aiPatrols.forEach((patrol, idx) => {
+        const sourceId = patrol?._sourceId;
+        if (!sourceId || !originalsById.has(sourceId) || seen.has(sourceId)) {
+            changes.added.push(patrolsForSave[idx]);
+            return;
+        }
+        seen.add(sourceId);
+        const entry = diffAiPatrolForSave(originalsById.get(sourceId), patrolsForSave[idx]);
+        if (entry) changes.modified.push({ sourceId, ...entry });
+    });
+    originalsById.forEach((_, sourceId) => {
+        if (!seen.has(sourceId)) changes.deleted.push(sourceId);
+    });
+    // Server appends additions; fall back to a full save if an added patrol sits between existing ones
+    const firstAdded = aiPatrols.findIndex(p => !p?._sourceId || !originalsById.has(p._sourceId));
+    if (firstAdded >= 0 && firstAdded < aiPatrols.length - changes.added.length) return null;
+    return changes;
+}
+
 async function saveAiPatrols() {
     syncSelectedAiPatrolFromForm();
     if (!missionDir) {
@@ -9328,16 +9677,42 @@ async function saveAiPatrols() {
     }
     try {
         const patrolsForSave = aiPatrols.map(normalizeAiPatrolForExport);
-        const response = await fetch('/api/ai-patrols/save', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                mission_dir: missionDir,
-                patrols: patrolsForSave
+        const changes = buildAiPatrolChangeset(patrolsForSave);
+        const response = changes
+            ? await fetch(apiUrl('/api/ai-patrols/patch'), {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-Editor-Client': EDITOR_CLIENT_ID },
+                body: JSON.stringify({
+                    mission_dir: missionDir,
+                    changes
+                })
             })
-        });
+            : await fetch(apiUrl('/api/ai-patrols/save'), {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-Editor-Client': EDITOR_CLIENT_ID },
+                body: JSON.stringify({
+                    mission_dir: missionDir,
+                    patrols: patrolsForSave
+                })
+            });
         const data = await response.json();
-        if (!data.success) throw new Error(data.error || 'Save failed');
+        if (!data.success) {
+            if (response.status === 409) throw new Error('AIPatrolSettings.json changed on disk; reload patrols and reapply your edits');
+            throw new Error(data.error || 'Save failed');
+        }
+        if (changes) {
+            const sourceIds = data.source_ids || {};
+            const addedIds = Array.isArray(data.added_source_ids) ? data.added_source_ids : [];
+            let addedIdx = 0;
+            patrolsForSave.forEach((patrol, idx) => {
+                const oldId = aiPatrols[idx]?._sourceId;
+                const isExisting = oldId && !changes.added.includes(patrol);
+                const newId = isExisting ? (sourceIds[oldId] || oldId) : addedIds[addedIdx++];
+                if (newId) patrol._sourceId = newId;
+            });
+        } else {
+            applyAiPatrolSourceIds(patrolsForSave, Array.isArray(data.patrol_ids) ? data.patrol_ids : []);
+        }
         aiPatrols = patrolsForSave;
         aiPatrolsOriginal = cloneAiPatrolData(aiPatrols);
         aiPatrolUndoStack = [];
@@ -9417,7 +9792,7 @@ function setupBackgroundImageHandler() {
             const formData = new FormData();
             formData.append('image', file);
             
-            const response = await fetch('/api/upload-background-image', {
+            const response = await fetch(apiUrl('/api/upload-background-image'), {
                 method: 'POST',
                 body: formData
             });
@@ -9496,7 +9871,7 @@ async function loadBackgroundImageFromServer(imageId) {
         };
         
         // Load image from server endpoint
-        img.src = `/api/background-image/${imageId}`;
+        img.src = apiUrl(`/api/background-image/${imageId}`);
     } catch (error) {
         updateStatus(`Error loading image: ${error.message}`, true);
         console.error('Error loading image from server:', error);
@@ -9521,7 +9896,7 @@ async function clearBackgroundImage() {
     const imageId = localStorage.getItem('map_viewer_backgroundImageId');
     if (imageId) {
         try {
-            await fetch(`/api/delete-background-image/${imageId}`, {
+            await fetch(apiUrl(`/api/delete-background-image/${imageId}`), {
                 method: 'DELETE'
             });
         } catch (error) {
@@ -0,0 +1,44 @@
+"""Shared economy editor test fixture: a temporary mission loaded into its editor database."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+TYPES_XML = """<types>
+    <type name="Axe"><nominal>10</nominal><category name="tools" /></type>
+    <type name="Bandage"><nominal>20</nominal><category name="medical" /></type>
+</types>"""
+
+LIMITS_XML = """<lists>
+    <categories><category name="tools" /><category name="medical" /></categories>
+</lists>"""
+
+
+class EconomyMissionTestCase(unittest.TestCase):
+    """Writes ``TYPES_XML`` (db/types.xml) and ``LIMITS_XML`` (cfglimitsdefinition.xml, skipped
+    when None) to a temporary mission, then loads it unless ``load`` is False.
+
+    Sets ``mission_dir``, ``params`` ({"mission_dir": ...}), ``db_file`` and ``client``.
+    """
+
+    TYPES_XML = TYPES_XML
+    LIMITS_XML = LIMITS_XML
+    load = True
+
+    def setUp(self):
+        # Imported here so test modules can still skip cleanly when Flask is missing
+        from economy_editor_app import app, get_db_path
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.mission_dir = tmp.name
+        (Path(self.mission_dir) / "db").mkdir()
+        (Path(self.mission_dir) / "db" / "types.xml").write_text(self.TYPES_XML, encoding="utf-8")
+        if self.LIMITS_XML is not None:
+            (Path(self.mission_dir) / "cfglimitsdefinition.xml").write_text(self.LIMITS_XML, encoding="utf-8")
+        self.params = {"mission_dir": self.mission_dir}
+        self.db_file = str(get_db_path(self.mission_dir))
+        self.client = app.test_client()
+        if self.load:
+            response = self.client.post("/api/load", json=self.params)
+            self.assertEqual(response.status_code, 200, response.json)
@@ -0,0 +1,212 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import map_viewer_app
+    from map_viewer_app import (
+        app,
+        extract_ai_patrol_catalog_from_patrols,
+        serialize_ai_patrol_settings,
+        _ai_patrol_json_chunk,
+        AI_PATROL_SETTINGS_MODELS,
+        AI_PATROL_CATALOG_FILES,
+        LOADOUT_INDEXES,
+        LOADOUT_SUMMARIES,
+    )
+except ModuleNotFoundError as exc:
+    app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+def _patrol(name, faction="West", formation="", speed="JOG", **extra):
+    patrol = {
+        "Name": name,
+        "Faction": faction,
+        "Formation": formation,
+        "Speed": speed,
+        "UnderThreatSpeed": "SPRINT",
+        "LootingBehaviour": "DEFAULT|WEAPONS",
+        "Waypoints": [[100.0, 0.0, 200.0], [110.0, 0.0, 210.0]],
+    }
+    patrol.update(extra)
+    return patrol
+
+
+class _AIPatrolTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name) / "mpmissions" / "dayzOffline.chernarusplus"
+        settings_dir = self.mission_path / "expansion" / "settings"
+        settings_dir.mkdir(parents=True)
+        self.settings_file = settings_dir / "AIPatrolSettings.json"
+        self.catalog_file = Path(self._tmp.name) / "ai_patrol_options.json"
+        patcher = mock.patch.object(map_viewer_app, "get_ai_patrol_options_catalog_path", return_value=self.catalog_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        AI_PATROL_SETTINGS_MODELS.invalidate()
+        AI_PATROL_CATALOG_FILES.invalidate()
+        LOADOUT_INDEXES.invalidate()
+        LOADOUT_SUMMARIES.invalidate()
+        self._tmp.cleanup()
+
+    def _write_settings(self, patrols, **extra):
+        data = {"m_Version": 22, "Enabled": 1}
+        data.update(extra)
+        data["Patrols"] = patrols
+        self.settings_file.write_text(json.dumps(data, indent=4), encoding="utf-8")
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping AI patrol tests: {_IMPORT_ERROR}")
+class AIPatrolCatalogTests(_AIPatrolTestCase):
+    def test_single_pass_catalog(self):
+        catalog = extract_ai_patrol_catalog_from_patrols([
+            _patrol("A", formation="RANDOM", RespawnTime="300"),
+            _patrol("B", faction="East", formation="RANDOM", RespawnTime="600"),
+            _patrol("C", faction="East", RespawnTime="600"),
+            "not a patrol",
+        ])
+        self.assertEqual(catalog["options"]["factions"], ["East", "West"])
+        self.assertEqual(catalog["options"]["speeds"], ["JOG", "SPRINT"])
+        self.assertEqual(catalog["options"]["lootingBehaviours"], ["DEFAULT", "WEAPONS"])
+        self.assertEqual(catalog["overrideDefaults"]["Formation"], "RANDOM")
+        self.assertEqual(catalog["overrideDefaults"]["RespawnTime"], "600")
+        self.assertEqual(catalog["overrideDefaults"]["Persist"], "0")
+
+    def test_get_does_not_write_catalog_and_save_bootstraps_it(self):
+        self._write_settings([_patrol("A", faction="Guards")])
+        response = self.client.get("/api/ai-patrols", query_string={"mission_dir": str(self.mission_path)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["options"]["factions"], ["Guards"])
+        self.assertFalse(self.catalog_file.exists())
+
+        response = self.client.post("/api/ai-patrols/save", json={
+            "mission_dir": str(self.mission_path),
+            "patrols": [_patrol("A", faction="Guards")],
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        catalog = json.loads(self.catalog_file.read_text(encoding="utf-8"))
+        self.assertEqual(catalog["options"]["factions"], ["Guards"])
+
+        # The catalog is canonical from now on
+        self._write_settings([_patrol("A", faction="Raiders")])
+        response = self.client.get("/api/ai-patrols", query_string={"mission_dir": str(self.mission_path)})
+        self.assertEqual(response.json["options"]["factions"], ["Guards"])
+        self.assertEqual(response.json["patrols"][0]["Faction"], "Raiders")
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping AI patrol tests: {_IMPORT_ERROR}")
+class LoadoutIndexTests(_AIPatrolTestCase):
+    def setUp(self):
+        super().setUp()
+        self.loadouts_dir = Path(self._tmp.name) / "profile" / "ExpansionMod" / "Loadouts"
+        self.loadouts_dir.mkdir(parents=True)
+        (self.loadouts_dir / "WestLoadout.json").write_text(json.dumps({
+            "ClassName": "",
+            "InventoryAttachments": [
+                {"SlotName": "Body", "Items": [{"ClassName": "TTsKOJacket_Camo", "InventoryCargo": [{"ClassName": "BandageDressing"}]}]},
+                {"SlotName": "Shoulder", "Items": [{"ClassName": "M4A1"}, {"ClassName": "AKM"}]},
+            ],
+            "InventoryCargo": [{"ClassName": "Rag"}],
+            "Sets": [{"ClassName": "", "InventoryAttachments": [{"SlotName": "Headgear", "Items": [{"ClassName": "BallisticHelmet_Green"}]}]}],
+        }), encoding="utf-8")
+        (self.loadouts_dir / "Broken.json").write_text("{", encoding="utf-8")
+
+    def _summaries(self, **headers):
+        return self.client.get(
+            "/api/ai-patrols/loadouts",
+            query_string={"mission_dir": str(self.mission_path)},
+            headers=headers,
+        )
+
+    def test_summaries_and_revalidation(self):
+        response = self._summaries()
+        self.assertEqual(response.status_code, 200, response.json)
+        loadouts = response.json["loadouts"]
+        self.assertEqual(sorted(loadouts), ["Broken", "WestLoadout"])
+        self.assertEqual(loadouts["WestLoadout"], {"itemCount": 6, "attachments": 2, "cargo": 1, "sets": 1})
+        self.assertIn("error", loadouts["Broken"])
+        self.assertEqual(self._summaries(**{"If-None-Match": response.headers["ETag"]}).status_code, 304)
+
+        (self.loadouts_dir / "Broken.json").write_text('{"ClassName": "", "InventoryCargo": [{"ClassName": "Apple"}]}', encoding="utf-8")
+        response = self._summaries(**{"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["loadouts"]["Broken"]["itemCount"], 1)
+
+    def test_names_follow_directory_changes(self):
+        self._write_settings([_patrol("A")])
+        query = {"mission_dir": str(self.mission_path)}
+        self.assertEqual(self.client.get("/api/ai-patrols", query_string=query).json["options"]["loadouts"],
+                         ["Broken", "WestLoadout"])
+        (self.loadouts_dir / "Broken.json").unlink()
+        self.assertEqual(self.client.get("/api/ai-patrols", query_string=query).json["options"]["loadouts"],
+                         ["WestLoadout"])
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping AI patrol tests: {_IMPORT_ERROR}")
+class AIPatrolPatchTests(_AIPatrolTestCase):
+    def _load(self):
+        response = self.client.get("/api/ai-patrols", query_string={"mission_dir": str(self.mission_path)})
+        self.assertEqual(response.status_code, 200)
+        return response.json["patrol_ids"]
+
+    def _patch(self, changes):
+        return self.client.post("/api/ai-patrols/patch", json={"mission_dir": str(self.mission_path), "changes": changes})
+
+    def test_serializer_matches_json_dump(self):
+        data = {"m_Version": 22, "Nested": {"a": [1, 2, {"b": "ünï"}]}, "Empty": [],
+                "Patrols": [_patrol("A"), _patrol("B", Waypoints=[])], "Tail": {}}
+        chunks = [_ai_patrol_json_chunk(p) for p in data["Patrols"]]
+        self.assertEqual(serialize_ai_patrol_settings(data, chunks), json.dumps(data, indent=4, ensure_ascii=False))
+        data["Patrols"] = []
+        self.assertEqual(serialize_ai_patrol_settings(data, []), json.dumps(data, indent=4, ensure_ascii=False))
+
+    def test_patch_updates_one_waypoint_and_preserves_layout(self):
+        patrols = [_patrol(name) for name in ("A", "B", "C")]
+        self._write_settings(patrols, Tail="x")
+        ids = self._load()
+
+        response = self._patch({
+            "modified": [{"sourceId": ids[1], "waypoints": {"1": [1.5, 2.5, 3.5]}, "fields": {"Faction": "East"}}],
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(response.json["source_ids"], {})
+
+        patrols[1]["Waypoints"][1] = [1.5, 2.5, 3.5]
+        patrols[1]["Faction"] = "East"
+        expected = {"m_Version": 22, "Enabled": 1, "Tail": "x", "Patrols": patrols}
+        self.assertEqual(self.settings_file.read_text(encoding="utf-8"), json.dumps(expected, indent=4, ensure_ascii=False))
+
+    def test_delete_and_add_remap_ids(self):
+        self._write_settings([_patrol(name) for name in ("A", "B", "A", "C", "A")])
+        ids = self._load()
+        response = self._patch({"deleted": [ids[0]], "added": [_patrol("D")]})
+        self.assertEqual(response.status_code, 200, response.json)
+
+        saved = json.loads(self.settings_file.read_text(encoding="utf-8"))["Patrols"]
+        self.assertEqual([p["Name"] for p in saved], ["B", "A", "C", "A", "D"])
+        reloaded = self._load()
+        # Only the later patrols named A were renumbered
+        self.assertEqual(reloaded[0], ids[1])
+        self.assertEqual(reloaded[2], ids[3])
+        self.assertEqual(response.json["source_ids"], {ids[2]: reloaded[1], ids[4]: reloaded[3]})
+        self.assertEqual(response.json["added_source_ids"], [reloaded[4]])
+
+        # The old ID of the last A is now stale
+        self.assertEqual(self._patch({"deleted": [ids[4]]}).status_code, 409)
+
+    def test_malformed_changeset_is_a_client_error(self):
+        self._write_settings([_patrol("A")])
+        for changes in ({"modified": ["x"]}, {"deleted": [["x"]]}, {"added": "x"}):
+            self.assertEqual(self._patch(changes).status_code, 400, changes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from benchmarks.generate_mission import SCALES, generate_mission
+    from benchmarks.run_benchmarks import _moved, build_cases, run_benchmarks
+except ModuleNotFoundError as exc:
+    generate_mission = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+# Every count scaled down so the whole suite runs in well under a second
+TINY = {key: min(value, 3) for key, value in SCALES["small"].items()}
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping benchmark tests: {_IMPORT_ERROR}")
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_moved_positions_alternate(self):
+        for x in (100.0, 100.07, 2531.5):
+            once = _moved({"x": x})["x"]
+            self.assertNotEqual(once, x)
+            self.assertEqual(_moved({"x": once})["x"], x)
+
+    def test_generator_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            mission_a = generate_mission(first, "small", TINY, seed=7)
+            mission_b = generate_mission(second, "small", TINY, seed=7)
+            files_a = sorted(p.relative_to(mission_a) for p in mission_a.rglob("*") if p.is_file())
+            files_b = sorted(p.relative_to(mission_b) for p in mission_b.rglob("*") if p.is_file())
+            self.assertEqual(files_a, files_b)
+            self.assertIn(Path("expansion/settings/AIPatrolSettings.json"), files_a)
+            self.assertIn(Path("mod_1/types.xml"), files_a)
+            for rel in files_a:
+                self.assertEqual((mission_a / rel).read_bytes(), (mission_b / rel).read_bytes(), rel)
+
+    def test_every_endpoint_benchmark_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mission_dir = str(generate_mission(tmp_dir, "small", TINY))
+            results = run_benchmarks(mission_dir, repeat=1)
+        self.assertEqual([r["name"] for r in results], [case.name for case in build_cases()])
+        for result in results:
+            if "itemsPerSecond" in result:
+                self.assertGreater(result["items"], 0, result["name"])
+                continue
+            self.assertLess(result["status"], 400, result["name"])
+            self.assertIn("total", result["stagesMs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import change_events
+    from map_viewer_app import app as map_app, load_effect_areas
+except ModuleNotFoundError as exc:
+    change_events = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+def _events(subscription):
+    return [(event.type, event.data) for event in subscription.get(0)]
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping change event tests: {_IMPORT_ERROR}")
+class ChannelTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "editor.db"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reconnect_replays_missed_events_or_resyncs(self):
+        self.assertIsNone(change_events.publish(self.path, "elements", {"n": 0}))
+        first = change_events.subscribe(self.path)
+        last_id = change_events.publish(self.path, "elements", {"n": 1})
+        change_events.unsubscribe(first)
+        self.assertEqual(_events(first), [("elements", {"n": 1})])
+
+        change_events.publish(self.path, "elements", {"n": 2})
+        resumed = change_events.subscribe(self.path, last_id)
+        self.assertEqual(_events(resumed), [("elements", {"n": 2})])
+        change_events.unsubscribe(resumed)
+
+        # An id from another server process cannot be resumed
+        stale = change_events.subscribe(self.path, "0-1")
+        self.assertEqual([event_type for event_type, _data in _events(stale)], ["resync"])
+        change_events.unsubscribe(stale)
+
+    def test_stream_frames(self):
+        subscription = change_events.subscribe(self.path)
+        change_events.publish(self.path, "layer", {"layer": "groups"})
+        chunks = list(change_events.stream(subscription, stream_seconds=0.2, heartbeat_seconds=0.1))
+        self.assertEqual(chunks[0], f"retry: {change_events.RETRY_MS}\n\n")
+        self.assertIn('event: layer\ndata: {"layer":"groups"}\n\n', chunks[1])
+        self.assertIn(": keep-alive\n\n", chunks[2:])
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping change event tests: {_IMPORT_ERROR}")
+class EditorEventTests(EconomyMissionTestCase):
+    load = False
+
+    def test_economy_edits_publish_changed_fields(self):
+        client = self.client
+        params = {"mission_dir": self.mission_dir}
+        self.assertEqual(client.post("/api/load", json=params).status_code, 200)
+        subscription = change_events.subscribe(self.db_file)
+        self.addCleanup(change_events.unsubscribe, subscription)
+
+        response = client.put("/api/elements/Axe/field/nominal", json=dict(params, value=15))
+        self.assertEqual(response.status_code, 200, response.json)
+        events = _events(subscription)
+        self.assertEqual(events, [("elements", {"changed": [{"element_key": "Axe", "fields": {"nominal": "15"}}], "deleted": []})])
+
+        client.post("/api/elements/delete", json=dict(params, element_keys=["Bandage"]))
+        self.assertEqual(_events(subscription)[0][1]["deleted"], ["Bandage"])
+
+        # Undo re-creates the element, so its whole record is sent
+        self.assertEqual(client.post("/api/journal/undo", json=params).status_code, 200)
+        (event_type, data), = _events(subscription)
+        self.assertEqual((event_type, data["changed"][0]["element_key"]), ("elements", "Bandage"))
+        self.assertEqual(data["changed"][0]["fields"]["_category_names"], ["medical"])
+
+        client.post("/api/categories", json=dict(params, name="weapons"))
+        self.assertEqual(_events(subscription), [("reference", {})])
+
+    def test_map_changeset_save_publishes_layer_event(self):
+        mission_path = Path(self.mission_dir)
+        areas = [{"AreaName": name, "Data": {"Pos": [idx * 100.0, 0.0, 0.0], "Radius": 75.0}} for idx, name in enumerate("AB")]
+        (mission_path / "cfgeffectarea.json").write_text(json.dumps({"Areas": areas}), encoding="utf-8")
+        a, b = load_effect_areas(str(mission_path / "cfgeffectarea.json"))
+        subscription = change_events.subscribe(mission_path)
+        self.addCleanup(change_events.unsubscribe, subscription)
+
+        client = map_app.test_client()
+        moved = {"sourceId": b["sourceId"], "name": "B", "x": 5, "y": 0, "z": 6, "radius": 10}
+        response = client.post("/api/effect-areas/save", headers={"X-Editor-Client": "page-1"}, json={
+            "mission_dir": self.mission_dir,
+            "changes": {"modified": [moved], "added": [{"name": "C", "x": 1, "y": 0, "z": 2, "radius": 20}], "deleted": []},
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        (event_type, data), = _events(subscription)
+        self.assertEqual((event_type, data["layer"], data["origin"]), ("layer", "effect-areas", "page-1"))
+        self.assertEqual(data["modified"], [moved])
+        self.assertEqual(data["source_ids"], response.json["source_ids"])
+        self.assertEqual([item["sourceId"] for item in data["added"]], response.json["added_source_ids"])
+
+    def test_event_stream_endpoints(self):
+        response = map_app.test_client().get("/api/events", query_string={"mission_dir": self.mission_dir})
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual(next(response.response), f"retry: {change_events.RETRY_MS}\n\n".encode())
+        self.assertTrue(change_events.is_watched(self.mission_dir))
+        response.close()
+        self.assertEqual(map_app.test_client().get("/api/events").status_code, 400)
+
+    def test_streams_over_the_limit_are_refused(self):
+        query = {"mission_dir": self.mission_dir}
+        with mock.patch.object(change_events, "MAX_STREAMS", 1):
+            first = map_app.test_client().get("/api/events", query_string=query)
+            refused = map_app.test_client().get("/api/events", query_string=query)
+            self.assertEqual((first.status_code, refused.status_code), (200, 503))
+            self.assertIn("Retry-After", refused.headers)
+            first.close()
+            again = map_app.test_client().get("/api/events", query_string=query)
+            self.assertEqual(again.status_code, 200)
+            again.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import io
+import sqlite3
+import unittest
+
+try:
+    import economy_editor_app
+except ModuleNotFoundError as exc:
+    economy_editor_app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+TYPES_XML = """<types>
+    <type name="Axe"><nominal>10</nominal><lifetime>3600</lifetime><category name="tools" /></type>
+    <type name="Bandage"><nominal>20</nominal><lifetime>1800</lifetime><category name="medical" /></type>
+</types>"""
+
+IMPORT_XML = """<types>
+    <type name="Canteen"><nominal>5</nominal><category name="tools" /></type>
+    <type name="Axe"><nominal>99</nominal><category name="tools" /></type>
+</types>"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class ChangeJournalTests(EconomyMissionTestCase):
+    TYPES_XML = TYPES_XML
+
+    def _query(self, sql, *params):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _nominal(self, key):
+        rows = self._query(
+            "SELECT field_value FROM type_element_fields WHERE element_key = ? AND field_name = 'nominal'", key
+        )
+        return rows[0][0] if rows else None
+
+    def _post(self, path, status=200, **payload):
+        response = self.client.post(path, json={"mission_dir": self.mission_dir, **payload})
+        self.assertEqual(response.status_code, status, response.json)
+        return response.json
+
+    def _set_nominal(self, key, value):
+        response = self.client.put(f"/api/elements/{key}/field/nominal",
+                                   json={"mission_dir": self.mission_dir, "value": value})
+        self.assertEqual(response.status_code, 200, response.json)
+
+    def test_undo_and_redo_field_edit(self):
+        self._set_nominal("Axe", "15")
+        result = self._post("/api/journal/undo")["result"]
+        self.assertEqual(result["label"], "PUT /api/elements/Axe/field/nominal")
+        self.assertEqual(self._nominal("Axe"), "10")
+        self.assertEqual(self._query("SELECT nominal FROM type_element_core WHERE element_key = 'Axe'"), [(10,)])
+
+        self._post("/api/journal/redo")
+        self.assertEqual(self._nominal("Axe"), "15")
+        self._post("/api/journal/redo", status=409)
+
+    def test_undo_restores_deleted_element_with_related_rows(self):
+        before = self._query("SELECT COUNT(*) FROM type_element_fields WHERE element_key = 'Bandage'")
+        self._post("/api/elements/delete", element_keys=["Bandage"])
+        self.assertEqual(self._query("SELECT COUNT(*) FROM type_elements WHERE element_key = 'Bandage'"), [(0,)])
+
+        self._post("/api/journal/undo")
+        self.assertEqual(self._query("SELECT COUNT(*) FROM type_element_fields WHERE element_key = 'Bandage'"), before)
+        self.assertEqual(self._query(
+            "SELECT c.name FROM element_categories ec JOIN categories c ON c.id = ec.category_id WHERE ec.element_key = 'Bandage'"
+        ), [("medical",)])
+
+    def test_new_change_discards_redo(self):
+        self._set_nominal("Axe", "15")
+        self._post("/api/journal/undo")
+        self._set_nominal("Bandage", "25")
+        self._post("/api/journal/redo", status=409)
+        journal = self.client.get("/api/journal", query_string={"mission_dir": self.mission_dir}).json
+        self.assertTrue(journal["can_undo"])
+        self.assertFalse(journal["can_redo"])
+
+    def test_import_snapshot_restores_pre_import_state(self):
+        response = self.client.post("/api/import-xml", data={
+            "file": (io.BytesIO(IMPORT_XML.encode("utf-8")), "extra_types.xml"),
+            "mission_dir": self.mission_dir,
+            "overwrite_all": "true",
+        }, content_type="multipart/form-data")
+        self.assertEqual(response.status_code, 200, response.json)
+        snapshot = response.json["snapshot"]
+        self.assertEqual(self._nominal("Axe"), "99")
+        self._set_nominal("Canteen", "7")
+
+        snapshots = self.client.get("/api/journal/snapshots", query_string={"mission_dir": self.mission_dir}).json
+        self.assertEqual(snapshots["snapshots"][0]["batches_since"], 2)
+
+        undone = self._post(f"/api/journal/snapshots/{snapshot}/restore")["result"]
+        self.assertEqual(len(undone), 2)
+        self.assertEqual(self._nominal("Axe"), "10")
+        self.assertEqual(self._query("SELECT COUNT(*) FROM type_elements WHERE element_key = 'Canteen'"), [(0,)])
+        self._post("/api/journal/snapshots/missing/restore", status=409)
+
+    def test_maintenance_prunes_discarded_and_old_batches(self):
+        self._set_nominal("Axe", "15")
+        self._post("/api/journal/undo")
+        self._set_nominal("Bandage", "25")
+        self._post("/api/journal/snapshots", name="before-axe")
+        self._set_nominal("Axe", "30")
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("UPDATE change_journal SET created_at = datetime(created_at, '-60 days')")
+        conn.commit()
+        conn.close()
+
+        pruned = self._post("/api/database-maintenance")["journal_pruned"]
+        self.assertGreater(pruned["discarded"], 0)
+        self.assertGreater(pruned["applied"], 0)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM change_journal WHERE state <> 'applied'"), [(0,)])
+        # Only the edit made after the snapshot survives, so the snapshot can still be restored
+        journal = self.client.get("/api/journal", query_string={"mission_dir": self.mission_dir}).json
+        self.assertEqual([batch["label"] for batch in journal["batches"]], ["PUT /api/elements/Axe/field/nominal"])
+        self.assertEqual(self._query("SELECT COUNT(*) FROM journal_batches"), [(1,)])
+        self._post("/api/journal/snapshots/before-axe/restore")
+        self.assertEqual(self._nominal("Axe"), "10")
+        self.assertEqual(self._nominal("Bandage"), "25")
+
+
+if __name__ == "__main__":
+    unittest.main()
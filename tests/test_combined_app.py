@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import mission_data
+    from combined_app import app
+    from map_viewer_app import load_type_categories
+except ModuleNotFoundError as exc:
+    app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+ECONOMYCORE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<economycore>
+    <ce folder="mod_types">
+        <file name="mod_types.xml" type="types" />
+        <file name="mod_spawnable.xml" type="spawnabletypes" />
+    </ce>
+</economycore>
+"""
+
+TYPES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<types>
+    <type name="StaticHeliCrash"><category name="{category}" /></type>
+    <type name="Apple" />
+</types>
+"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping combined app tests: {_IMPORT_ERROR}")
+class CombinedAppTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_tools_are_mounted_with_api_base(self):
+        launcher = self.client.get("/")
+        self.assertEqual(launcher.status_code, 200)
+        self.assertIn(b'"/map/"', launcher.data)
+
+        page = self.client.get("/map/")
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b'window.APP_API_BASE = "/map"', page.data)
+        self.assertEqual(self.client.get("/economy/").status_code, 200)
+
+    def test_api_routes_resolve_under_prefix(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            response = self.client.get("/map/api/effect-areas", query_string={"mission_dir": tmp_dir})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json["areas"], [])
+        self.assertEqual(self.client.get("/api/effect-areas").status_code, 404)
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping combined app tests: {_IMPORT_ERROR}")
+class SharedMissionDataTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name)
+        (self.mission_path / "mod_types").mkdir()
+        self.economycore = self.mission_path / "cfgeconomycore.xml"
+        self.economycore.write_text(ECONOMYCORE_XML, encoding="utf-8")
+        self.types_file = self.mission_path / "mod_types" / "mod_types.xml"
+        self.types_file.write_text(TYPES_XML.format(category="vehicles"), encoding="utf-8")
+
+    def tearDown(self):
+        mission_data.invalidate()
+        self._tmp.cleanup()
+
+    def test_type_files_are_parsed_once_and_invalidated_together(self):
+        refs = mission_data.economycore_type_files(self.economycore)
+        self.assertEqual([(r.source_folder, r.source_file) for r in refs], [("mod_types", "mod_types.xml")])
+
+        with mock.patch.object(mission_data.ET, "parse", wraps=mission_data.ET.parse) as parse:
+            self.assertEqual(load_type_categories(str(self.economycore)), {"StaticHeliCrash": ["vehicles"]})
+            self.assertEqual(load_type_categories(str(self.economycore)), {"StaticHeliCrash": ["vehicles"]})
+            # The economy editor's loader reads the same parsed root
+            root = mission_data.types_root(self.types_file)
+            self.assertEqual(len(root.findall("type")), 2)
+            self.assertEqual(parse.call_count, 1)
+
+        self.types_file.write_text(TYPES_XML.format(category="industrialfood"), encoding="utf-8")
+        os.utime(self.types_file, ns=(1, 1))
+        self.assertEqual(load_type_categories(str(self.economycore)), {"StaticHeliCrash": ["industrialfood"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
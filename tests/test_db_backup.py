@@ -0,0 +1,109 @@
+import gzip
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import db_backup
+    from economy_editor_app import app
+except ModuleNotFoundError as exc:
+    db_backup = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+def _make_db(path, rows=2000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item_{i}" * 4,) for i in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+def _row_count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping backup tests: {_IMPORT_ERROR}")
+class DatabaseBackupTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_file = Path(self._tmp.name) / "editor_data_v2.db"
+        _make_db(self.db_file)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_online_backup_with_compression(self):
+        job = db_backup.start_backup(self.db_file, db_backup.RetentionPolicy(compress=True))
+        self.assertTrue(job.wait(10))
+        status = job.as_dict()
+        self.assertEqual((status["state"], status["percent"]), ("done", 100.0))
+        self.assertGreater(status["pages_total"], 0)
+        self.assertTrue(status["backup_path"].endswith(".db.gz"))
+
+        restored = Path(self._tmp.name) / "restored.db"
+        with gzip.open(status["backup_path"], "rb") as src:
+            restored.write_bytes(src.read())
+        self.assertEqual(_row_count(restored), 2000)
+        self.assertEqual([p.name for p in db_backup.backup_dir_for(self.db_file).iterdir()], [Path(status["backup_path"]).name])
+
+    def test_retention_keeps_last_and_daily(self):
+        backup_dir = db_backup.backup_dir_for(self.db_file)
+        backup_dir.mkdir()
+        names = [
+            "editor_data_v2_backup_20260101_080000.db",
+            "editor_data_v2_backup_20260101_090000.db.gz",
+            "editor_data_v2_backup_20260102_080000.db",
+            "editor_data_v2_backup_20260103_080000.db",
+            "editor_data_v2_backup_20260103_090000.db",
+            "editor_data_v2_backup_20260103_090000_1.db",
+            "unrelated.db",
+        ]
+        for name in names:
+            (backup_dir / name).write_bytes(b"")
+
+        removed = db_backup.apply_retention(self.db_file, db_backup.RetentionPolicy(keep_last=2, keep_daily=2))
+        self.assertEqual(sorted(p.name for p in removed), [names[0], names[1], names[3]])
+        self.assertEqual(
+            sorted(p.name for p in backup_dir.iterdir()),
+            sorted([names[2], names[4], names[5], "unrelated.db"]),
+        )
+
+    def test_default_policy_keeps_existing_backups(self):
+        backup_dir = db_backup.backup_dir_for(self.db_file)
+        backup_dir.mkdir()
+        # Written by the old shutil.copy2 backup before retention existed
+        old = backup_dir / "editor_data_v2_backup_20250101_080000.db"
+        old.write_bytes(b"")
+
+        job = db_backup.start_backup(self.db_file)
+        self.assertTrue(job.wait(10))
+        self.assertEqual(job.as_dict()["state"], "done")
+        self.assertTrue(old.exists())
+        self.assertEqual(len(db_backup.list_backups(self.db_file)), 2)
+
+    def test_endpoint_reports_progress(self):
+        client = app.test_client()
+        response = client.post("/api/backup-database", json={"db_file_path": str(self.db_file), "keep_last": 1})
+        self.assertEqual(response.status_code, 202, response.json)
+        db_backup.get_job(response.json["backup_id"]).wait(10)
+
+        status = client.get(f"/api/backup-database/{response.json['backup_id']}").json["status"]
+        self.assertEqual(status["state"], "done")
+        self.assertEqual(_row_count(status["backup_path"]), 2000)
+        self.assertEqual(client.get("/api/backup-database/unknown").status_code, 404)
+        self.assertEqual(
+            client.post("/api/backup-database", json={"db_file_path": str(self.db_file), "keep_last": -1}).status_code,
+            400,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
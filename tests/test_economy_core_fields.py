@@ -0,0 +1,100 @@
+import unittest
+
+try:
+    import economy_editor_app
+    from economy_editor_app import ensure_type_element_core, get_db_connection
+except ModuleNotFoundError as exc:
+    economy_editor_app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+def _type(name, nominal, lifetime, cost):
+    return (f'<type name="{name}"><nominal>{nominal}</nominal><lifetime>{lifetime}</lifetime>'
+            f'<restock>0</restock><min>1</min><quantmin>-1</quantmin><quantmax>-1</quantmax>'
+            f'<cost>{cost}</cost><category name="tools" /></type>')
+
+
+TYPES_XML = "<types>{}</types>".format("".join([
+    _type("Axe", 60, 3000, 100),
+    _type("Bandage", 80, 1800, 50),
+    _type("Canteen", 20, 1800, 70),
+    _type("Drum", 90, 7200, 10),
+    _type("Flare", "", 600, 5),
+]))
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class TypeElementCoreTests(EconomyMissionTestCase):
+    TYPES_XML = TYPES_XML
+    LIMITS_XML = None
+
+    def _query(self, *filters, **args):
+        response = self.client.get("/api/elements/query", query_string={
+            "mission_dir": self.mission_dir, "filter": list(filters), **args,
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        return response.json
+
+    def test_numeric_filter_and_sort_run_in_sqlite(self):
+        result = self._query("nominal>50", "lifetime<3600", sort="cost", order="desc")
+        self.assertEqual(result["total"], 2)
+        self.assertEqual([e["name"] for e in result["elements"]], ["Axe", "Bandage"])
+        self.assertEqual(result["elements"][0]["cost"], 100)
+
+        # Non-numeric values are NULL and sort last
+        by_nominal = self._query(sort="nominal")
+        self.assertEqual(by_nominal["elements"][-1]["name"], "Flare")
+        self.assertIsNone(by_nominal["elements"][-1]["nominal"])
+
+    def test_sort_pages_through_the_index(self):
+        names = [[e["name"] for e in self._query(sort="nominal", limit=2, offset=offset)["elements"]]
+                 for offset in (0, 2, 4)]
+        self.assertEqual(names, [["Canteen", "Axe"], ["Bandage", "Drum"], ["Flare"]])
+        self.assertEqual([e["name"] for e in self._query(sort="nominal", order="desc", offset=3)["elements"]],
+                         ["Canteen", "Flare"])
+        self.assertEqual(len(self._query(sort="nominal", limit=-1)["elements"]), 1)
+
+        conn = get_db_connection(self.mission_dir)
+        plan = " ".join(row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT c.element_key FROM type_element_core c '
+            'JOIN type_elements e ON e.element_key = c.element_key '
+            'WHERE c."cost" IS NOT NULL ORDER BY c."cost", c.element_key LIMIT 10'))
+        conn.close()
+        self.assertIn("idx_core_cost_key", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_writes_keep_core_table_in_sync(self):
+        response = self.client.put("/api/elements/Canteen/field/nominal",
+                                   json={"mission_dir": self.mission_dir, "value": "75"})
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual([e["name"] for e in self._query("nominal>=75")["elements"]], ["Bandage", "Canteen", "Drum"])
+
+        response = self.client.post("/api/elements/delete",
+                                    json={"mission_dir": self.mission_dir, "element_keys": ["Drum"]})
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual([e["name"] for e in self._query("nominal>=75")["elements"]], ["Bandage", "Canteen"])
+
+    def test_existing_database_is_backfilled(self):
+        conn = get_db_connection(self.mission_dir)
+        conn.execute("DROP TABLE type_element_core")
+        conn.commit()
+        ensure_type_element_core(conn.cursor())
+        conn.commit()
+        rows = dict(conn.execute('SELECT element_key, "lifetime" FROM type_element_core').fetchall())
+        conn.close()
+        self.assertEqual(rows, {"Axe": 3000, "Bandage": 1800, "Canteen": 1800, "Drum": 7200, "Flare": 600})
+
+    def test_invalid_filters_are_rejected(self):
+        for bad in ("name>5", "nominal>>5", "nominal>abc"):
+            response = self.client.get("/api/elements/query", query_string={
+                "mission_dir": self.mission_dir, "filter": bad,
+            })
+            self.assertEqual(response.status_code, 400, bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
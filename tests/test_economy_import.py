@@ -0,0 +1,100 @@
+import io
+import sqlite3
+import unittest
+
+try:
+    import economy_editor_app
+except ModuleNotFoundError as exc:
+    economy_editor_app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+IMPORT_XML = b"""<types>
+    <type name="Axe"><nominal>99</nominal><category name="medical" /><flags count_in_cargo="1" /></type>
+    <type name="Bandage"><nominal>77</nominal></type>
+    <type name="Compass"><nominal>5</nominal><value name="Tier1" /><category name="tools" /><flags crafted="1" /></type>
+</types>"""
+
+
+def _query(db_file, sql, *params):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class ImportSessionTests(EconomyMissionTestCase):
+    def _create_session(self, xml=IMPORT_XML):
+        return self.client.post("/api/import-sessions", data={
+            "mission_dir": self.mission_dir, "file": (io.BytesIO(xml), "extra_types.xml"),
+        }, content_type="multipart/form-data")
+
+    def test_session_reports_duplicates_and_commit_applies_decisions(self):
+        response = self._create_session()
+        self.assertEqual(response.status_code, 200, response.json)
+        session = response.json
+        self.assertEqual(session["total"], 3)
+        self.assertEqual([d["element_key"] for d in session["duplicates"]], ["Axe", "Bandage"])
+        self.assertEqual([n["element_key"] for n in session["new_elements"]], ["Compass"])
+        self.assertEqual(self.client.get(f"/api/import-sessions/{session['session_id']}",
+                                         query_string={"mission_dir": self.mission_dir}).json["duplicate_count"], 2)
+
+        response = self.client.post(f"/api/import-sessions/{session['session_id']}/commit", json={
+            "mission_dir": self.mission_dir, "decisions": {"Axe": "overwrite", "Bandage": "skip"},
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        result = response.json
+        self.assertEqual((result["added_count"], result["updated_count"], result["skipped_count"]), (1, 1, 1))
+        self.assertTrue(result["snapshot"].startswith("Before import of extra_types.xml"))
+
+        nominal = dict(_query(self.db_file, "SELECT element_key, field_value FROM type_element_fields WHERE field_name = 'nominal'"))
+        self.assertEqual(nominal, {"Axe": "99", "Bandage": "20", "Compass": "5"})
+        self.assertEqual(_query(self.db_file, """
+            SELECT e.element_key, c.name FROM element_categories e JOIN categories c ON c.id = e.category_id ORDER BY 1
+        """), [("Axe", "medical"), ("Bandage", "medical"), ("Compass", "tools")])
+        self.assertEqual(_query(self.db_file, """
+            SELECT e.element_key, f.name, e.value FROM element_flags e JOIN flags f ON f.id = e.flag_id ORDER BY 1
+        """), [("Axe", "count_in_cargo", 1), ("Compass", "crafted", 1)])
+        self.assertEqual(_query(self.db_file, "SELECT source_file FROM type_elements WHERE element_key = 'Compass'"),
+                         [("extra_types.xml",)])
+        self.assertEqual(_query(self.db_file, "SELECT COUNT(*) FROM import_staging"), [(0,)])
+
+        # The import is one journal batch behind the snapshot
+        undo = self.client.post("/api/journal/undo", json={"mission_dir": self.mission_dir})
+        self.assertEqual(undo.status_code, 200, undo.json)
+        nominal = dict(_query(self.db_file, "SELECT element_key, field_value FROM type_element_fields WHERE field_name = 'nominal'"))
+        self.assertEqual(nominal, {"Axe": "10", "Bandage": "20"})
+
+    def test_discarded_and_unknown_sessions(self):
+        session_id = self._create_session().json["session_id"]
+        params = {"mission_dir": self.mission_dir}
+        self.assertEqual(self.client.delete(f"/api/import-sessions/{session_id}", query_string=params).status_code, 200)
+        self.assertEqual(self.client.get(f"/api/import-sessions/{session_id}", query_string=params).status_code, 404)
+        response = self.client.post(f"/api/import-sessions/{session_id}/commit", json=params)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(_query(self.db_file, "SELECT COUNT(*) FROM import_staging_fields"), [(0,)])
+
+    def test_invalid_xml_is_rejected_without_a_session(self):
+        response = self._create_session(b"<types><type name='Axe'></types>")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid XML", response.json["error"])
+        self.assertEqual(_query(self.db_file, "SELECT COUNT(*) FROM import_sessions"), [(0,)])
+
+    def test_single_request_import_still_works(self):
+        response = self.client.post("/api/import-xml", data={
+            "mission_dir": self.mission_dir, "overwrite_all": "true",
+            "file": (io.BytesIO(IMPORT_XML), "extra_types.xml"),
+        }, content_type="multipart/form-data")
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual((response.json["added_count"], response.json["updated_count"]), (1, 2))
+        self.assertEqual(_query(self.db_file, "SELECT COUNT(*) FROM type_elements"), [(3,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import sqlite3
+import unittest
+
+try:
+    import economy_editor_app
+except ModuleNotFoundError as exc:
+    economy_editor_app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+TYPES_XML = """<types>
+    <type name="Axe"><nominal>10</nominal><category name="tools" /><flags count_in_cargo="1" /></type>
+    <type name="Bandage"><nominal>20</nominal><category name="medical" /></type>
+    <type name="Canteen"><nominal>30</nominal><category name="tools" /></type>
+</types>"""
+
+
+def _count(db_file, sql, *params):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class ForeignKeyMaintenanceTests(EconomyMissionTestCase):
+    TYPES_XML = TYPES_XML
+
+    def test_bulk_delete_cascades_to_related_tables(self):
+        response = self.client.post("/api/elements/delete", json={
+            "mission_dir": self.mission_dir, "element_keys": ["Axe", "Bandage", "Missing"],
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(response.json["deleted_count"], 2)
+        self.assertEqual(response.json["errors"], ["Element 'Missing' not found"])
+        for table in ("type_element_fields", "element_categories", "element_flags"):
+            self.assertEqual(_count(self.db_file, f"SELECT COUNT(*) FROM {table} WHERE element_key IN ('Axe', 'Bandage')"), 0, table)
+        self.assertGreater(_count(self.db_file, "SELECT COUNT(*) FROM type_element_fields WHERE element_key = 'Canteen'"), 0)
+
+    def test_maintenance_purges_existing_orphans(self):
+        # Simulate a database written before foreign keys were enforced
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("DELETE FROM type_elements WHERE element_key = 'Axe'")
+        conn.execute("DELETE FROM categories WHERE name = 'medical'")
+        conn.commit()
+        conn.close()
+        self.assertGreater(_count(self.db_file, "SELECT COUNT(*) FROM type_element_fields WHERE element_key = 'Axe'"), 0)
+
+        response = self.client.post("/api/database-maintenance", json={"mission_dir": self.mission_dir})
+        self.assertEqual(response.status_code, 200, response.json)
+        purged = response.json["purged"]
+        self.assertGreater(purged["type_element_fields"], 0)
+        self.assertEqual(purged["element_categories"], 2)
+        self.assertEqual(_count(self.db_file, "SELECT COUNT(*) FROM type_element_fields WHERE element_key = 'Axe'"), 0)
+        self.assertEqual(_count(self.db_file, "SELECT COUNT(*) FROM element_categories"), 1)
+        self.assertGreater(_count(self.db_file, "SELECT COUNT(*) FROM sqlite_stat1"), 0)
+
+        again = self.client.post("/api/database-maintenance", json={"mission_dir": self.mission_dir})
+        self.assertEqual(again.json["purged"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
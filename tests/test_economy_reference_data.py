@@ -0,0 +1,53 @@
+import unittest
+
+try:
+    import economy_editor_app
+except ModuleNotFoundError as exc:
+    economy_editor_app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class ReferenceDataCacheTests(EconomyMissionTestCase):
+    def _get(self, path, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(path, query_string=self.params, headers=headers)
+
+    def test_element_edits_keep_the_etag(self):
+        first = self._get("/api/reference-data")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([c["name"] for c in first.json["categories"]], ["medical", "tools"])
+
+        response = self.client.post("/api/elements/delete", json=dict(self.params, element_keys=["Axe"]))
+        self.assertEqual(response.status_code, 200, response.json)
+        again = self._get("/api/reference-data", first.headers["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self._get("/api/reference-data").json["version"], first.json["version"])
+
+    def test_reference_writes_bump_the_version(self):
+        data = self._get("/api/reference-data")
+        categories = self._get("/api/categories")
+        self.assertEqual(categories.json["categories"], [{"id": c["id"], "name": c["name"]} for c in data.json["categories"]])
+
+        response = self.client.post("/api/categories", json=dict(self.params, name="weapons"))
+        self.assertEqual(response.status_code, 200, response.json)
+        for path, before in (("/api/reference-data", data), ("/api/categories", categories)):
+            after = self._get(path, before.headers["ETag"])
+            self.assertEqual(after.status_code, 200, path)
+            self.assertIn("weapons", [c["name"] for c in after.json["categories"]])
+
+        # Undoing through the journal is a reference write too
+        bumped = self._get("/api/reference-data")
+        self.assertEqual(self.client.post("/api/journal/undo", json=self.params).status_code, 200)
+        after_undo = self._get("/api/reference-data", bumped.headers["ETag"])
+        self.assertEqual(after_undo.status_code, 200)
+        self.assertNotIn("weapons", [c["name"] for c in after_undo.json["categories"]])
+        self.assertNotEqual(after_undo.json["version"], bumped.json["version"])
+
+
+if __name__ == "__main__":
+    unittest.main()
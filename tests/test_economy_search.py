@@ -0,0 +1,79 @@
+import unittest
+
+try:
+    from economy_editor_app import build_search_query
+except ModuleNotFoundError as exc:
+    build_search_query = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+TYPES_XML = """<types>
+    <type name="Ammo_762x39"><nominal>30</nominal><category name="weapons" /><usage name="Military" /></type>
+    <type name="Ammo_9x19"><nominal>40</nominal><category name="weapons" /><usage name="Police" /></type>
+    <type name="Mag_AKM_30Rnd"><nominal>10</nominal><category name="weapons" /><usage name="Military" /><value name="Tier3" /></type>
+    <type name="Apple"><nominal>50</nominal><category name="food" /><usage name="Farm" /></type>
+</types>"""
+
+LIMITS_XML = """<lists>
+    <categories><category name="weapons" /><category name="food" /></categories>
+    <usageflags><usage name="Military" /><usage name="Police" /><usage name="Farm" /></usageflags>
+    <valueflags><value name="Tier3" /></valueflags>
+</lists>"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping economy editor tests: {_IMPORT_ERROR}")
+class ElementSearchTests(EconomyMissionTestCase):
+    TYPES_XML = TYPES_XML
+    LIMITS_XML = LIMITS_XML
+
+    def _search(self, q, status=200):
+        response = self.client.get("/api/elements/search", query_string={"mission_dir": self.mission_dir, "q": q})
+        self.assertEqual(response.status_code, status, response.json)
+        return response.json
+
+    def _names(self, q):
+        return sorted(element["name"] for element in self._search(q)["elements"])
+
+    def test_build_search_query(self):
+        self.assertEqual(build_search_query("ammo_ 762"), '"ammo"* "762"*')
+        self.assertEqual(build_search_query('"mag akm" OR usageflags:police'), '"mag akm" OR usageflags : "police"*')
+        for bad in ("", "NOT ammo", "ammo OR", "colour:red"):
+            with self.assertRaises(ValueError):
+                build_search_query(bad)
+
+    def test_prefix_boolean_and_column_queries(self):
+        self.assertEqual(self._names("ammo_ 762"), ["Ammo_762x39"])
+        self.assertEqual(self._names("weapons NOT ammo"), ["Mag_AKM_30Rnd"])
+        self.assertEqual(self._names("usageflags:military"), ["Ammo_762x39", "Mag_AKM_30Rnd"])
+        self.assertEqual(self._names("apple OR tier3"), ["Apple", "Mag_AKM_30Rnd"])
+
+        # Name matches outrank matches on linked reference names
+        result = self._search("military OR mag")
+        self.assertEqual(result["elements"][0]["name"], "Mag_AKM_30Rnd")
+        self._search("NOT", status=400)
+
+        # A negative limit would reach SQLite as "no limit"
+        response = self.client.get("/api/elements/search",
+                                   query_string={"mission_dir": self.mission_dir, "q": "weapons", "limit": -1})
+        self.assertEqual(len(response.json["elements"]), 1)
+
+    def test_mutations_keep_index_current(self):
+        categories = self.client.get("/api/categories", query_string={"mission_dir": self.mission_dir}).json
+        food_id = next(c["id"] for c in categories["categories"] if c["name"] == "food")
+        response = self.client.put("/api/elements/Ammo_9x19/categories",
+                                   json={"mission_dir": self.mission_dir, "category_ids": [food_id]})
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(self._names("categories:food"), ["Ammo_9x19", "Apple"])
+
+        response = self.client.post("/api/elements/delete",
+                                    json={"mission_dir": self.mission_dir, "element_keys": ["Apple"]})
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(self._names("categories:food"), ["Ammo_9x19"])
+
+
+if __name__ == "__main__":
+    unittest.main()
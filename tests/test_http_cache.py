@@ -0,0 +1,75 @@
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from flask import Flask, jsonify
+    import http_cache
+except ModuleNotFoundError as exc:
+    http_cache = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+def _make_app(source_file):
+    app = Flask(__name__)
+    http_cache.init_app(app)
+
+    @app.route("/data")
+    def data():
+        etag = http_cache.source_etag(source_file)
+        cached = http_cache.not_modified(etag)
+        if cached is not None:
+            return cached
+        return http_cache.with_etag(jsonify({"items": ["x" * 40] * 200}), etag)
+
+    return app
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping http cache tests: {_IMPORT_ERROR}")
+class HttpCacheTests(unittest.TestCase):
+    def test_source_etag_changes_with_file_contents(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "a.xml"
+            path.write_text("<a/>", encoding="utf-8")
+            first = http_cache.source_etag(path)
+            self.assertEqual(first, http_cache.source_etag(path))
+            path.write_text("<a></a>", encoding="utf-8")
+            os.utime(path, ns=(1, 1))
+            self.assertNotEqual(first, http_cache.source_etag(path))
+
+    def test_missing_file_has_stable_etag(self):
+        self.assertEqual(
+            http_cache.source_etag("/does/not/exist.xml"),
+            http_cache.source_etag("/does/not/exist.xml"),
+        )
+
+    def test_conditional_get_returns_304(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "a.xml"
+            path.write_text("<a/>", encoding="utf-8")
+            client = _make_app(path).test_client()
+            first = client.get("/data")
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["ETag"]
+            second = client.get("/data", headers={"If-None-Match": etag})
+            self.assertEqual(second.status_code, 304)
+            self.assertEqual(second.data, b"")
+
+    def test_large_json_is_gzipped_when_accepted(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            client = _make_app(Path(tmp_dir) / "a.xml").test_client()
+            response = client.get("/data", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+            self.assertIn(b'"items"', gzip.decompress(response.data))
+
+            plain = client.get("/data")
+            self.assertNotIn("Content-Encoding", plain.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
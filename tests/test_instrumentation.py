@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import instrumentation
+    from flask import Flask, jsonify
+    from map_viewer_app import app as map_viewer_app
+except ModuleNotFoundError as exc:
+    instrumentation = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+def _stage_names(header):
+    return [part.split(";", 1)[0] for part in header.split(", ")]
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping instrumentation tests: {_IMPORT_ERROR}")
+class InstrumentationTests(unittest.TestCase):
+    def _make_app(self):
+        app = Flask(__name__)
+
+        @app.route("/api/items/<int:item_id>")
+        def item(item_id):
+            with instrumentation.span("parse"):
+                with instrumentation.span("parse"):
+                    pass
+            conn = instrumentation.connect(":memory:")
+            conn.execute("SELECT 1").fetchall()
+            conn.close()
+            return jsonify({"id": item_id})
+
+        registry = instrumentation.init_app(app)
+        return app, registry
+
+    def test_server_timing_header_and_route_metrics(self):
+        app, registry = self._make_app()
+        client = app.test_client()
+        for item_id in (1, 2, 3):
+            response = client.get(f"/api/items/{item_id}")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            _stage_names(response.headers["Server-Timing"]),
+            ["parse", "db", "jsonify", "build", "total"],
+        )
+
+        metrics = client.get("/api/_metrics").json
+        [route] = metrics["routes"]
+        self.assertEqual((route["method"], route["route"], route["count"]), ("GET", "/api/items/<int:item_id>", 3))
+        self.assertEqual(sum(bucket["count"] for bucket in route["histogram"]), 3)
+        self.assertEqual(set(route["stagesMs"]), {"parse", "db", "jsonify", "build"})
+
+        client.get("/api/_metrics", query_string={"reset": "1"})
+        self.assertEqual(registry.snapshot()["routes"], [])
+
+    def test_spans_are_noops_outside_requests(self):
+        with instrumentation.span("parse"):
+            pass
+        conn = instrumentation.connect(":memory:")
+        self.assertEqual(conn.execute("SELECT 2").fetchone()[0], 2)
+        conn.close()
+
+    def test_map_viewer_reports_parse_stage(self):
+        client = map_viewer_app.test_client()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Path(tmp_dir, "cfgeffectarea.json").write_text('{"Areas": [], "SafePositions": []}', encoding="utf-8")
+            response = client.get("/api/effect-areas", query_string={"mission_dir": tmp_dir})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("parse;dur=", response.headers["Server-Timing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
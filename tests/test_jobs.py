@@ -0,0 +1,103 @@
+import io
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+try:
+    import jobs
+    import economy_editor_app
+except ModuleNotFoundError as exc:
+    jobs = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+from economy_fixtures import EconomyMissionTestCase
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping job tests: {_IMPORT_ERROR}")
+class JobRunnerTests(unittest.TestCase):
+    def test_jobs_run_one_at_a_time_per_database(self):
+        release = threading.Event()
+        order = []
+
+        def blocking(job):
+            order.append("first")
+            release.wait(5)
+            return "first"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first = jobs.submit("test", Path(tmp) / "a.db", blocking)
+            queued = jobs.submit("test", Path(tmp) / "a.db", lambda job: order.append("queued"))
+            cancelled = jobs.submit("test", Path(tmp) / "a.db", lambda job: order.append("cancelled"))
+            other = jobs.submit("test", Path(tmp) / "b.db", lambda job: "other")
+
+            self.assertTrue(other.wait(5))
+            self.assertEqual(other.result, "other")
+            self.assertEqual(queued.state, "pending")
+            self.assertTrue(cancelled.cancel())
+            release.set()
+            for job in (first, queued, cancelled):
+                self.assertTrue(job.wait(5))
+
+        self.assertEqual(order, ["first", "queued"])
+        self.assertEqual((first.state, first.result, cancelled.state), ("done", "first", "cancelled"))
+        self.assertFalse(first.cancel())
+
+    def test_running_job_stops_at_its_next_check(self):
+        started = threading.Event()
+        resume = threading.Event()
+
+        def work(job):
+            job.update(percent=50, items_done=1)
+            started.set()
+            resume.wait(5)
+            job.check_cancelled()
+            return "unreachable"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            job = jobs.submit("test", Path(tmp) / "a.db", work)
+            self.assertTrue(started.wait(5))
+            self.assertEqual((job.as_dict()["percent"], job.as_dict()["items_done"]), (50.0, 1))
+            job.cancel()
+            resume.set()
+            self.assertTrue(job.wait(5))
+        self.assertEqual((job.state, job.result), ("cancelled", None))
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping job tests: {_IMPORT_ERROR}")
+class AsyncEndpointTests(EconomyMissionTestCase):
+    load = False
+
+    def _finish(self, response):
+        self.assertEqual(response.status_code, 202, response.json)
+        job_id = response.json["job_id"]
+        self.assertTrue(jobs.get_job(job_id).wait(10))
+        status = self.client.get(f"/api/jobs/{job_id}").json["status"]
+        self.assertEqual(status["state"], "done", status["error"])
+        return status
+
+    def test_async_load_import_and_export(self):
+        status = self._finish(self.client.post("/api/load", json={"mission_dir": self.mission_dir, "async": True}))
+        self.assertEqual((status["files_parsed"], status["elements_written"]), (1, 2))
+        self.assertEqual(status["result"]["element_count"], 2)
+        self.assertEqual(self.client.post(f"/api/jobs/{status['id']}/cancel").status_code, 409)
+
+        status = self._finish(self.client.post("/api/import-xml", data={
+            "mission_dir": self.mission_dir, "async": "true",
+            "file": (io.BytesIO(b'<types><type name="Compass"><nominal>5</nominal></type></types>'), "extra.xml"),
+        }, content_type="multipart/form-data"))
+        self.assertEqual((status["result"]["added_count"], status["elements_written"]), (1, 1))
+        # The background import is journaled like a request would be
+        journal = self.client.get("/api/journal", query_string={"mission_dir": self.mission_dir}).json
+        self.assertEqual(journal["batches"][0]["label"], "POST /api/import-xml")
+
+        status = self._finish(self.client.post("/api/export", json={"mission_dir": self.mission_dir, "async": True}))
+        self.assertEqual((status["elements_read"], status["files_written"]), (3, 1))
+        self.assertEqual(status["bytes_written"], (Path(self.mission_dir) / "db" / "types.xml").stat().st_size)
+        self.assertEqual(self.client.get("/api/jobs/unknown").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    from map_viewer_app import load_groups_from_xml
+except ModuleNotFoundError as exc:
+    load_groups_from_xml = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+MAPGROUPPOS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<map>
+    <group name="Land_Barn" pos="100 5 200" />
+    <group name="Land_Barn" pos="0 0 0" />
+    <group name="Land_Shed" />
+    <group name="Land_Shed" pos="300 1 400" />
+</map>
+"""
+
+MAPGROUPPROTO_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<prototype>
+    <group name="Land_Barn" lootmax="4" />
+</prototype>
+"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping logging tests: {_IMPORT_ERROR}")
+class LoaderSummaryLoggingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        mission_path = Path(self._tmp.name)
+        self.pos_file = mission_path / "mapgrouppos.xml"
+        self.pos_file.write_text(MAPGROUPPOS_XML, encoding="utf-8")
+        self.proto_file = mission_path / "mapgroupproto.xml"
+        self.proto_file.write_text(MAPGROUPPROTO_XML, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_groups_loader_logs_one_summary_line(self):
+        with self.assertLogs("map_viewer_app", level="INFO") as logs:
+            groups = load_groups_from_xml(str(self.pos_file), str(self.proto_file))
+        self.assertEqual(len(groups), 2)
+        groups_lines = [line for line in logs.output if "groups" in line and "prototypes" not in line]
+        self.assertEqual(groups_lines, [
+            "INFO:map_viewer_app:Loaded 2 of 4 groups "
+            "(matched_proto=1, skipped_invalid_position=1, skipped_no_position=1)"
+        ])
+
+    def test_per_item_detail_only_at_debug(self):
+        with self.assertLogs("map_viewer_app", level="DEBUG") as logs:
+            load_groups_from_xml(str(self.pos_file), str(self.proto_file))
+        self.assertIn("DEBUG:map_viewer_app:Found matching proto for group 'Land_Barn'", logs.output)
+        self.assertIn("DEBUG:map_viewer_app:Skipping group 'Land_Shed': no position found", logs.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
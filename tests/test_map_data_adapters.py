@@ -2,8 +2,12 @@ import unittest
 
 from map_data_adapters import (
     GROUPS_ADAPTER,
+    ChangesetError,
+    changeset_conflicts,
     indexed_identity_parts,
+    split_changeset,
     stable_marker_id,
+    stable_marker_ids,
 )
 
 
@@ -29,6 +33,40 @@ class MapDataAdaptersTests(unittest.TestCase):
         parts = indexed_identity_parts("name", 1, index_chain=(2, 3))
         self.assertEqual(parts, ("name", 1, 2, 3))
 
+    def test_stable_marker_id_is_pinned_across_runs(self):
+        self.assertEqual(stable_marker_id("groups", "Land_Barn", 1, 2.5, None, 0), "groups:daf84949e7b4fc92")
+
+    def test_bulk_ids_match_scalar_ids(self):
+        rows = [indexed_identity_parts(f"Land_{i}", i * 1.5, None, i * 2.25, index_chain=(i,)) for i in range(50)]
+        expected = [stable_marker_id("groups", *row) for row in rows]
+        self.assertEqual(stable_marker_ids("groups", rows), expected)
+        self.assertEqual(GROUPS_ADAPTER.source_ids(rows), expected)
+        self.assertEqual(GROUPS_ADAPTER.source_ids_from_columns(*zip(*rows)), expected)
+
+        payloads = [{} for _ in rows]
+        GROUPS_ADAPTER.add_source_ids(payloads, rows)
+        self.assertEqual([p["sourceId"] for p in payloads], expected)
+
+    def test_bulk_ids_are_unique(self):
+        count = 50_000
+        names = [f"Land_House_{i % 300}" for i in range(count)]
+        xs = [i * 0.37 for i in range(count)]
+        ys = [i * 0.01 for i in range(count)]
+        zs = [i * 0.53 for i in range(count)]
+        indices = list(range(count))
+
+        ids = GROUPS_ADAPTER.source_ids_from_columns(names, xs, ys, zs, indices)
+        self.assertEqual(len(set(ids)), count)
+
+    def test_split_changeset_and_conflicts(self):
+        modified, added, deleted_ids = split_changeset({"modified": [{"sourceId": "a"}, {"sourceId": "b"}], "deleted": ["d"]})
+        self.assertEqual((added, deleted_ids), ([], {"d"}))
+        self.assertEqual(changeset_conflicts(modified, deleted_ids, {"a": 0}), ["b", "d"])
+
+        for changes in (None, ["a"], {"modified": ["a"]}, {"added": {"x": 1}}, {"deleted": [1]}):
+            with self.assertRaises(ChangesetError):
+                split_changeset(changes)
+
 
 if __name__ == "__main__":
     unittest.main()
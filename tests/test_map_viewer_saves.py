@@ -0,0 +1,348 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    from map_viewer_app import (
+        app,
+        load_effect_areas,
+        load_event_spawns,
+        load_territories,
+        load_player_spawn_points,
+        EFFECT_AREA_MODELS,
+        EVENT_SPAWN_MODELS,
+        PLAYER_SPAWN_MODELS,
+    )
+    import mission_files
+except ModuleNotFoundError as exc:
+    app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+def _write_effect_areas(mission_path, names):
+    areas = [
+        {"AreaName": name, "Type": "ContaminatedArea_Static", "Data": {"Pos": [idx * 100.0, 0.0, idx * 50.0], "Radius": 75.0}}
+        for idx, name in enumerate(names)
+    ]
+    (mission_path / "cfgeffectarea.json").write_text(json.dumps({"Areas": areas}), encoding="utf-8")
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping map viewer save tests: {_IMPORT_ERROR}")
+class EffectAreaChangesetTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        EFFECT_AREA_MODELS.invalidate()
+        self._tmp.cleanup()
+
+    def _post(self, changes):
+        return self.client.post(
+            "/api/effect-areas/save",
+            json={"mission_dir": str(self.mission_path), "changes": changes},
+        )
+
+    def test_changeset_updates_deletes_and_adds_by_source_id(self):
+        _write_effect_areas(self.mission_path, ["A", "B", "C"])
+        areas = load_effect_areas(str(self.mission_path / "cfgeffectarea.json"))
+        a, b, c = areas
+
+        response = self._post({
+            "modified": [{"sourceId": c["sourceId"], "name": "C", "x": 1.234, "y": 0, "z": 2, "radius": 10}],
+            "deleted": [a["sourceId"]],
+            "added": [{"name": "D", "x": 5, "y": 0, "z": 6, "radius": 20}],
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+
+        saved = json.loads((self.mission_path / "cfgeffectarea.json").read_text(encoding="utf-8"))["Areas"]
+        self.assertEqual([area["AreaName"] for area in saved], ["B", "C", "D"])
+        self.assertEqual(saved[1]["Data"]["Pos"], [1.23, 0.0, 2.0])
+        # Untouched keys on existing entries survive
+        self.assertEqual(saved[0]["Type"], "ContaminatedArea_Static")
+
+        # The model stored by the save matches a fresh parse of what was written
+        cached = load_effect_areas(str(self.mission_path / "cfgeffectarea.json"))
+        EFFECT_AREA_MODELS.invalidate()
+        reloaded = load_effect_areas(str(self.mission_path / "cfgeffectarea.json"))
+        self.assertEqual(cached, reloaded)
+        body = response.json
+        self.assertEqual(body["source_ids"][b["sourceId"]], reloaded[0]["sourceId"])
+        self.assertEqual(body["source_ids"][c["sourceId"]], reloaded[1]["sourceId"])
+        self.assertEqual(body["added_source_ids"], [reloaded[2]["sourceId"]])
+
+    def test_stale_source_id_is_rejected_without_writing(self):
+        _write_effect_areas(self.mission_path, ["A", "B"])
+        stale = load_effect_areas(str(self.mission_path / "cfgeffectarea.json"))
+        # Someone else inserts an area at the top, shifting every index
+        _write_effect_areas(self.mission_path, ["Z", "A", "B"])
+        before = (self.mission_path / "cfgeffectarea.json").read_text(encoding="utf-8")
+
+        response = self._post({"deleted": [stale[1]["sourceId"]]})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json["conflicts"], [stale[1]["sourceId"]])
+        self.assertEqual((self.mission_path / "cfgeffectarea.json").read_text(encoding="utf-8"), before)
+
+    def test_malformed_changeset_is_a_client_error(self):
+        _write_effect_areas(self.mission_path, ["A"])
+        self.assertEqual(self._post(["x"]).status_code, 400)
+        self.assertEqual(self._post({"modified": ["x"]}).status_code, 400)
+
+
+EVENT_SPAWNS_XML = """<?xml version="1.0" encoding="utf-8"?>
+<eventposdef>
+    <event name="StaticHeliCrash">
+        <pos x="100" z="200" a="0" />
+        <pos x="300" z="400" a="90" />
+        <pos x="500" z="600" a="180" />
+    </event>
+    <event name="StaticPoliceCar">
+        <pos x="700" z="800" a="0" />
+    </event>
+</eventposdef>
+"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping map viewer save tests: {_IMPORT_ERROR}")
+class EventSpawnChangesetTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name)
+        self.spawns_file = self.mission_path / "cfgeventspawns.xml"
+        self.spawns_file.write_text(EVENT_SPAWNS_XML, encoding="utf-8")
+        self.client = app.test_client()
+
+    def tearDown(self):
+        EVENT_SPAWN_MODELS.invalidate()
+        self._tmp.cleanup()
+
+    def _load(self):
+        return load_event_spawns(str(self.spawns_file), None)
+
+    def test_changeset_edits_cached_tree_and_reports_moved_ids(self):
+        heli_a, heli_b, heli_c, police = self._load()
+        response = self.client.post("/api/event-spawns/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {
+                "modified": [{"sourceId": heli_c["sourceId"], "x": 555.556, "z": 666, "a": 45}],
+                "deleted": [heli_a["sourceId"]],
+                "added": [{"name": "StaticBoatFishing", "x": 1, "z": 2, "a": 3}],
+            },
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        body = response.json
+
+        # Compare against a fresh parse of what was written
+        EVENT_SPAWN_MODELS.invalidate()
+        reloaded = {(s["name"], s["posIndex"]): s for s in self._load()}
+        self.assertEqual(len(reloaded), 4)
+        moved_c = reloaded[("StaticHeliCrash", 1)]
+        self.assertEqual((moved_c["x"], moved_c["z"], moved_c["a"]), (555.56, 666.0, 45.0))
+        self.assertEqual(body["source_ids"][heli_b["sourceId"]], reloaded[("StaticHeliCrash", 0)]["sourceId"])
+        self.assertEqual(body["source_ids"][heli_c["sourceId"]], moved_c["sourceId"])
+        self.assertNotIn(police["sourceId"], body["source_ids"])
+        self.assertEqual(body["added_source_ids"], [reloaded[("StaticBoatFishing", 0)]["sourceId"]])
+        self.assertEqual(body["source_indices"][moved_c["sourceId"]], [0, 1])
+
+        # A second edit against the returned IDs applies to the warm cache
+        response = self.client.post("/api/event-spawns/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {"modified": [{"sourceId": moved_c["sourceId"], "x": 10, "z": 20, "a": 0}]},
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+
+    def test_external_edit_invalidates_cache_and_conflicts(self):
+        spawns = self._load()
+        self.spawns_file.write_text(EVENT_SPAWNS_XML.replace('x="100"', 'x="101"'), encoding="utf-8")
+        response = self.client.post("/api/event-spawns/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {"deleted": [spawns[0]["sourceId"]]},
+        })
+        self.assertEqual(response.status_code, 409)
+
+
+TERRITORY_XML = """<?xml version="1.0" encoding="utf-8"?>
+<territory-type>
+    <territory color="1">
+        <zone name="{name}" smin="0" smax="0" dmin="3" dmax="5" x="100.5" z="200.25" r="80" />
+        <zone name="{name}" smin="0" smax="0" dmin="3" dmax="5" x="300" z="400" r="60" />
+    </territory>
+</territory-type>
+"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping map viewer save tests: {_IMPORT_ERROR}")
+class TerritoryChangesetTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name)
+        env_dir = self.mission_path / "env"
+        env_dir.mkdir()
+        self.bear_file = env_dir / "bear_territories.xml"
+        self.wolf_file = env_dir / "wolf_territories.xml"
+        self.bear_file.write_text(TERRITORY_XML.format(name="Bear"), encoding="utf-8")
+        self.wolf_file.write_text(TERRITORY_XML.format(name="Wolf"), encoding="utf-8")
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _zone(self, territories, territory_index, zone_index, **overrides):
+        zone = dict(territories[territory_index]["zones"][zone_index])
+        zone.update(territoryIndex=territory_index, zoneIndex=zone_index,
+                    territoryType=territories[territory_index]["territory_type"])
+        zone.update(overrides)
+        return zone
+
+    def test_only_files_with_real_changes_are_written(self):
+        territories = load_territories(str(self.mission_path))
+        bear_before = self.bear_file.read_text(encoding="utf-8")
+
+        response = self.client.post("/api/territories/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {
+                "modified": [
+                    self._zone(territories, 0, 0),
+                    self._zone(territories, 1, 1, x=310.126),
+                ],
+            },
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(response.json["count"], 1)
+        self.assertEqual(self.bear_file.read_text(encoding="utf-8"), bear_before)
+        self.assertIn('x="310.13"', self.wolf_file.read_text(encoding="utf-8"))
+
+    def test_delete_and_add_zones_and_new_territory(self):
+        territories = load_territories(str(self.mission_path))
+        response = self.client.post("/api/territories/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {
+                "deleted": [self._zone(territories, 0, 0)],
+                "added": [
+                    {"territoryIndex": 0, "territoryType": "bear_territories", "name": "Bear",
+                     "x": 1, "z": 2, "radius": 30, "dmin": 1, "dmax": 2},
+                    {"territoryIndex": 2, "territoryType": "fox_territories", "name": "Fox",
+                     "x": 5, "z": 6, "radius": 40},
+                ],
+            },
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+
+        reloaded = load_territories(str(self.mission_path))
+        by_type = {t["territory_type"]: t for t in reloaded}
+        self.assertEqual([(z["x"], z["z"]) for z in by_type["bear_territories"]["zones"]], [(300.0, 400.0), (1.0, 2.0)])
+        self.assertEqual([z["name"] for z in by_type["fox_territories"]["zones"]], ["Fox"])
+
+        # The surviving bear zone moved up one index; added zones get their IDs in changeset order
+        bear_zones = by_type["bear_territories"]["zones"]
+        self.assertEqual(response.json["source_ids"], {territories[0]["zones"][1]["sourceId"]: bear_zones[0]["sourceId"]})
+        self.assertEqual(response.json["added_source_ids"],
+                         [bear_zones[1]["sourceId"], by_type["fox_territories"]["zones"][0]["sourceId"]])
+
+    def test_zone_moved_by_another_edit_is_a_conflict(self):
+        territories = load_territories(str(self.mission_path))
+        # Someone else deletes the first bear zone, so (0, 0) now holds a different zone
+        self.bear_file.write_text(TERRITORY_XML.format(name="Bear").replace(
+            '<zone name="Bear" smin="0" smax="0" dmin="3" dmax="5" x="100.5" z="200.25" r="80" />', ""), encoding="utf-8")
+        before = self.bear_file.read_text(encoding="utf-8")
+
+        stale = self._zone(territories, 0, 0, x=1)
+        response = self.client.post("/api/territories/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": {"modified": [stale, self._zone(territories, 1, 0, x=2)]},
+        })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json["conflicts"], [stale["sourceId"]])
+        self.assertEqual(self.bear_file.read_text(encoding="utf-8"), before)
+        self.assertNotIn('x="2.0"', self.wolf_file.read_text(encoding="utf-8"))
+
+    def test_failed_file_write_is_reported(self):
+        territories = load_territories(str(self.mission_path))
+        real_write = mission_files.atomic_write_xml
+
+        def failing_write(tree, path):
+            if Path(path).name == self.wolf_file.name:
+                raise OSError("disk full")
+            real_write(tree, path)
+
+        with mock.patch.object(mission_files, "atomic_write_xml", failing_write):
+            response = self.client.post("/api/territories/save", json={
+                "mission_dir": str(self.mission_path),
+                "changes": {"modified": [self._zone(territories, 0, 0, x=1), self._zone(territories, 1, 0, x=2)]},
+            })
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json["files"], [self.bear_file.name])
+        self.assertEqual(response.json["failed_files"], [self.wolf_file.name])
+
+
+PLAYER_SPAWNS_XML = """<?xml version="1.0" encoding="utf-8"?>
+<playerspawnpoints>
+    <fresh>
+        <generator_params>
+            <grid_width>150</grid_width>
+            <grid_height>120</grid_height>
+        </generator_params>
+        <generator_posbubbles>
+            <pos x="1000" z="2000" />
+            <pos x="3000" z="4000" />
+            <pos x="5000" z="6000" />
+        </generator_posbubbles>
+    </fresh>
+</playerspawnpoints>
+"""
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping map viewer save tests: {_IMPORT_ERROR}")
+class PlayerSpawnChangesetTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mission_path = Path(self._tmp.name)
+        self.spawns_file = self.mission_path / "cfgplayerspawnpoints.xml"
+        self.spawns_file.write_text(PLAYER_SPAWNS_XML, encoding="utf-8")
+        self.client = app.test_client()
+
+    def tearDown(self):
+        PLAYER_SPAWN_MODELS.invalidate()
+        self._tmp.cleanup()
+
+    def _post(self, changes):
+        return self.client.post("/api/player-spawn-points/save", json={
+            "mission_dir": str(self.mission_path),
+            "changes": changes,
+        })
+
+    def test_changeset_edits_only_targeted_positions(self):
+        first, second, third = load_player_spawn_points(str(self.spawns_file))
+        self.assertEqual((first["width"], first["height"]), (150.0, 120.0))
+
+        response = self._post({
+            "modified": [{"sourceId": third["sourceId"], "x": 5100.123, "y": 0, "z": 6100}],
+            "deleted": [first["sourceId"]],
+            "added": [{"x": 10, "y": 0, "z": 20}],
+        })
+        self.assertEqual(response.status_code, 200, response.json)
+        written = self.spawns_file.read_text(encoding="utf-8")
+        self.assertIn("<grid_width>150</grid_width>", written)
+
+        PLAYER_SPAWN_MODELS.invalidate()
+        reloaded = load_player_spawn_points(str(self.spawns_file))
+        self.assertEqual([(p["x"], p["z"]) for p in reloaded], [(3000.0, 4000.0), (5100.12, 6100.0), (10.0, 20.0)])
+        body = response.json
+        self.assertEqual(body["source_ids"][second["sourceId"]], reloaded[0]["sourceId"])
+        self.assertEqual(body["source_ids"][third["sourceId"]], reloaded[1]["sourceId"])
+        self.assertEqual(body["added_source_ids"], [reloaded[2]["sourceId"]])
+
+    def test_unknown_source_id_conflicts(self):
+        before = self.spawns_file.read_text(encoding="utf-8")
+        response = self._post({"deleted": ["player_spawns:missing"]})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.spawns_file.read_text(encoding="utf-8"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import map_viewer_app
+    from map_viewer_app import app, flush_marker_color_config
+except ModuleNotFoundError as exc:
+    app = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping marker color tests: {_IMPORT_ERROR}")
+class MarkerColorSyncTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.config_file = Path(self._tmp.name) / "marker_colors.json"
+        patches = [
+            mock.patch.object(map_viewer_app, "get_marker_color_config_path", return_value=self.config_file),
+            mock.patch.object(map_viewer_app, "MARKER_COLOR_SAVE_DELAY", 60.0),
+            mock.patch.dict(map_viewer_app._marker_color_state, {
+                "config": None, "signature": None, "version": 0, "dirty": False, "timer": None,
+            }),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        timer = map_viewer_app._marker_color_state["timer"]
+        if timer is not None:
+            timer.cancel()
+        self._tmp.cleanup()
+
+    def _sync(self, version=None, **names):
+        response = self.client.post("/api/marker-colors/sync", json={"version": version, **names})
+        self.assertEqual(response.status_code, 200, response.json)
+        return response.json
+
+    def test_unchanged_sync_skips_config_and_write(self):
+        first = self._sync(markerTypeKeys=["markers"], territoryTypeNames=["wolf_territories"])
+        self.assertFalse(first["unchanged"])
+        self.assertIn("markers", first["config"]["markerTypes"])
+        self.assertFalse(self.config_file.exists())
+
+        second = self._sync(version=first["version"], markerTypeKeys=["markers"], territoryTypeNames=["wolf_territories"])
+        self.assertEqual(second, {"success": True, "unchanged": True, "version": first["version"]})
+
+        third = self._sync(version=first["version"], eventSpawnTypeNames=["StaticHeliCrash"])
+        self.assertGreater(third["version"], first["version"])
+        self.assertIn("StaticHeliCrash", third["config"]["eventSpawnTypes"])
+
+        self.assertTrue(flush_marker_color_config())
+        saved = json.loads(self.config_file.read_text(encoding="utf-8"))
+        self.assertEqual(saved, third["config"])
+        self.assertFalse(flush_marker_color_config())
+
+    def test_external_edit_is_picked_up(self):
+        first = self._sync(markerTypeKeys=["markers"])
+        flush_marker_color_config()
+        self.config_file.write_text(json.dumps({"markerTypes": {"markers": "#000000"}}), encoding="utf-8")
+        second = self._sync(version=first["version"], markerTypeKeys=["markers"])
+        self.assertFalse(second["unchanged"])
+        self.assertEqual(second["config"]["markerTypes"]["markers"], "#000000")
+
+
+if __name__ == "__main__":
+    unittest.main()
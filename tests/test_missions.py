@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import missions
+    from mission_files import ParsedFileCache
+    from economy_editor_app import app as economy_app
+    from map_viewer_app import app as map_app
+except ModuleNotFoundError as exc:
+    missions = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+@unittest.skipIf(_IMPORT_ERROR is not None, f"Skipping mission registry tests: {_IMPORT_ERROR}")
+class MissionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dirs = []
+        for name in ("chernarus", "livonia", "namalsk"):
+            path = Path(self._tmp.name) / name
+            (path / "db").mkdir(parents=True)
+            (path / "db" / "types.xml").write_text("<types />", encoding="utf-8")
+            self.dirs.append(str(path))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_names_and_default(self):
+        registry = missions.MissionRegistry({"chernarus": self.dirs[0], "livonia": self.dirs[1]}, "livonia")
+        self.assertEqual(registry.resolve("chernarus"), self.dirs[0])
+        self.assertEqual(registry.resolve(""), self.dirs[1])
+        self.assertEqual(registry.resolve(self.dirs[2]), self.dirs[2])
+        self.assertEqual([m["name"] for m in registry.missions()], [None, "livonia", "chernarus"])
+
+        self.assertEqual(missions.MissionRegistry({"chernarus": self.dirs[0]}).resolve(None), self.dirs[0])
+        with self.assertRaises(missions.NoMissionSelected):
+            missions.MissionRegistry().require(None)
+
+    def test_least_recently_used_idle_mission_is_evicted(self):
+        registry = missions.MissionRegistry(max_missions=2)
+        cache = ParsedFileCache()
+        parsed = {}
+        for path in self.dirs[:2]:
+            registry.resolve(path)
+            parsed[path] = cache.get(Path(path) / "db" / "types.xml", lambda p: object())
+
+        with registry.hold(Path(self.dirs[0]) / "editor.db"):
+            registry.resolve(self.dirs[2])
+        # The held mission survived; the idle one was dropped with its parsed files
+        self.assertEqual([m["path"] for m in registry.missions()], [self.dirs[2], self.dirs[0]])
+        self.assertIs(cache.get(Path(self.dirs[0]) / "db" / "types.xml", lambda p: object()), parsed[self.dirs[0]])
+        self.assertIsNot(cache.get(Path(self.dirs[1]) / "db" / "types.xml", lambda p: object()), parsed[self.dirs[1]])
+
+        self.assertTrue(registry.evict(self.dirs[0]))
+        self.assertFalse(registry.evict(self.dirs[0]))
+
+    def test_missing_mission_is_a_client_error(self):
+        self.assertEqual(economy_app.test_client().get("/api/events").status_code, 400)
+        response = map_app.test_client().get("/api/missions")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("missions", response.json)
+
+
+if __name__ == "__main__":
+    unittest.main()